@@ -213,7 +213,8 @@ async def configure_services(config_path: Optional[Path] = None) -> ServiceConta
             event_store=event_store,
             telemetry=telemetry,
             redis_provider=redis_provider,
-            logger=logger
+            logger=logger,
+            agent_config=config_provider.get('agents', {})
         )
     
     container.register_singleton(IRouter, create_router)
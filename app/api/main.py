@@ -3,11 +3,11 @@ import uuid
 import os
 import traceback
 import yaml
-import json
-from typing import Dict, Any
+from typing import Dict, Any, List, Literal, Optional, Union
 from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 import redis.asyncio as redis
@@ -27,7 +27,17 @@ from app.core.orchestration.agent_state import AgentState
 from app.core.repositories.agent_state_repository import IAgentStateRepository
 from app.core.repositories.redis_agent_state_repository import RedisAgentStateRepository
 from app.core.orchestration.circuit_breaker import CircuitBreakerError
+from app.core.exceptions import RateLimitExceeded
+from app.core.routing.scheduler import TRAFFIC_CLASSES
 from app.core.utils.http_client import HTTPClientManager
+from app.core.adapters.base_adapter import BaseAdapter
+from app.core.adapters.retry import RetryManager
+from app.core.adapters.messages import prompt_cache_enabled
+from app.core.utils import json_codec
+from app.core.caching.snapshot import export_snapshot, import_snapshot, resolve_snapshot_path
+from app.core.caching.warmup import warm_up
+from app.core.batch.runner import max_batch_items, parse_items, run_batch
+from app.core.batch.jobs import BatchJobManager
 
 # Import Shutdown Handler - kopiere direkt hier rein
 import signal
@@ -247,6 +257,7 @@ bridge = None
 orchestrator = None
 agent_orchestrator = None
 registry_config = None
+batch_jobs: BatchJobManager = None
 
 # Globale Variablen für Repository und Redis-Client
 # Diese werden im Lifespan-Manager initialisiert
@@ -257,7 +268,7 @@ state_repository: IAgentStateRepository = None
 async def lifespan(app: FastAPI):
     """Initialize and cleanup the bridge."""
     global bridge, orchestrator, agent_orchestrator, registry_config
-    global redis_client, state_repository
+    global redis_client, state_repository, batch_jobs
     
     # Graceful Shutdown Handler einrichten
     shutdown_handler = GracefulShutdownHandler()
@@ -281,6 +292,13 @@ async def lifespan(app: FastAPI):
     # ▶️ Hinzufügen: API-Schlüssel-Validierung nach der Bridge-Initialisierung
     await validate_api_keys(bridge)
     
+    # ▶️ Verbindungen (DNS/TLS) zu den Providern vorab öffnen
+    if os.getenv("HTTP_CLIENT_PREWARM", "true").lower() == "true":
+        try:
+            await bridge.prewarm_http_clients()
+        except Exception as e:
+            print(f"⚠️ [HTTP] Pre-Warm fehlgeschlagen: {e}")
+    
     # ▶️ Hinzufügen: Initialisierung von Redis und dem Repository
     redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     try:
@@ -319,7 +337,7 @@ async def lifespan(app: FastAPI):
         
         # ▶️ Registriere HTTP-Client-Cleanup
         async def cleanup_http_client():
-            """Schließt den globalen HTTP-Client sauber."""
+            """Schließt die HTTP-Clients aller Adapter-Dienste sauber."""
             await HTTPClientManager.close_client()
         
         shutdown_handler.register_cleanup(cleanup_http_client)
@@ -336,8 +354,13 @@ async def lifespan(app: FastAPI):
         """Cleanup für die Bridge und ihre Komponenten."""
         if bridge:
             print("[CLEANUP] Führe Bridge-Cleanup durch...")
-            # Hier könnten weitere Bridge-spezifische Cleanups durchgeführt werden
-            # z.B. Schließen von offenen Adapter-Verbindungen
+            # Hintergrund-Tasks des Routers (z.B. Cache-Health-Prober) stoppen
+            try:
+                await bridge.router.close()
+                print("[CLEANUP] Router geschlossen.")
+            except Exception as e:
+                print(f"[CLEANUP] Fehler beim Schließen des Routers: {e}")
+            # Offene Adapter-Verbindungen schließen
             for adapter_name, adapter in bridge.adapters.items():
                 if hasattr(adapter, 'close'):
                     try:
@@ -348,6 +371,20 @@ async def lifespan(app: FastAPI):
     
     shutdown_handler.register_cleanup(cleanup_bridge)
     
+    # ▶️ Batch-Jobs: unterbrochene Jobs fortsetzen (Redis-Store nur bei funktionierender Verbindung)
+    batch_jobs = BatchJobManager(bridge.router, redis_client if state_repository else None)
+    if os.getenv("BATCH_JOB_RESUME_ON_STARTUP", "true").lower() == "true":
+        resumed = await batch_jobs.resume_pending()
+        if resumed:
+            print(f"🔁 [STARTUP] {resumed} unterbrochene Batch-Jobs werden fortgesetzt")
+    
+    async def cleanup_batch_jobs():
+        """Stoppt laufende Batch-Jobs; ihr Checkpoint bleibt für den nächsten Start erhalten."""
+        await batch_jobs.close()
+    
+    # Zuletzt registriert, läuft also vor Bridge- und Redis-Cleanup
+    shutdown_handler.register_cleanup(cleanup_batch_jobs)
+    
     yield  # Server runs here
     
     # Die Shutdown-Logik wird nun vom Handler übernommen
@@ -370,15 +407,29 @@ class NewConversationResponse(BaseModel):
     message: str
     conversation_id: str
 
+class ChatMessage(BaseModel):
+    role: Literal["system", "user", "assistant"]
+    content: str
+    cache: Optional[bool] = Field(None, description="Stabiler Präfix bis einschließlich dieser Nachricht (Breakpoint für das Prompt-Caching des Providers).")
+
 class MessageRequest(BaseModel):
-    target_llm: str = Field(..., description="Der Kurzname des Ziel-LLMs (z.B. 'gpt4o_mini').")
+    target_llm: Union[str, List[str]] = Field(..., description="Der Kurzname des Ziel-LLMs (z.B. 'gpt4o_mini'), ein Selektor wie 'capability:vision' bzw. 'group:fast' oder eine geordnete Fallback-Liste davon.")
     prompt: str = Field(..., description="Der Text-Prompt, der an das LLM gesendet werden soll.")
+    priority: Optional[str] = Field(None, description="Verkehrsklasse: 'interactive' (Default), 'mission', 'workflow' oder 'batch'.")
+    messages: Optional[List[ChatMessage]] = Field(None, description="Bisheriger Verlauf (System-Prompt, frühere Turns); 'prompt' wird als neue Nutzer-Nachricht angehängt. Ohne 'cache'-Markierungen setzt die Bridge die Cache-Breakpoints selbst.")
+
+    def history_kwargs(self) -> Dict[str, Any]:
+        """``messages`` für die Bridge; ohne Verlauf keine zusätzlichen kwargs (Cache-Schlüssel bleibt unverändert)."""
+        if not self.messages:
+            return {}
+        return {"messages": [message.model_dump(exclude_none=True) for message in self.messages]}
     # In Zukunft könnten hier weitere Parameter wie 'temperature' etc. stehen
 
 class MessageResponse(BaseModel):
     response: str
     conversation_id: str
-    target_llm: str
+    target_llm: Union[str, List[str]]
+    served_by: Optional[str] = Field(None, description="Modell, das tatsächlich geantwortet hat (ggf. über eine Fallback-Route).")
 
 class AvailableModelsResponse(BaseModel):
     models: list[str]
@@ -472,6 +523,15 @@ class HumanInputResponse(BaseModel):
     status: str = "resumed"
     message: str = "Mission wurde mit menschlicher Eingabe fortgesetzt"
 
+class CacheSnapshotRequest(BaseModel):
+    filename: str = Field("cache_snapshot.jsonl.gz", description="Dateiname im Snapshot-Verzeichnis (CACHE_SNAPSHOT_DIR).")
+    overwrite: bool = Field(False, description="Nur Import: vorhandene Schlüssel überschreiben.")
+
+class CacheWarmupRequest(BaseModel):
+    filename: Optional[str] = Field(None, description="Request-Log im Snapshot-Verzeichnis; ohne Angabe wird das Event-Log (ADAPTER_CALL) verwendet.")
+    concurrency: int = Field(4, ge=1, le=64, description="Maximal gleichzeitige Anfragen.")
+    limit: Optional[int] = Field(None, ge=1, description="Maximale Anzahl Anfragen.")
+
 class PausedMissionsResponse(BaseModel):
     """Response-Modell für die Liste pausierter Missionen."""
     paused_missions: list[HumanRequestResponse]
@@ -539,6 +599,17 @@ async def start_new_conversation():
     }
 
 
+@app.get("/v1/conversation/stats", summary="Statistiken des Konversationsspeichers")
+async def get_conversation_stats():
+    """
+    Gibt Größe, Obergrenze und Verdrängungszähler (LRU und Idle-TTL) der im
+    Router gehaltenen Konversationszustände zurück.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.get_conversation_stats()
+
 @app.post("/v1/conversation/{conversation_id}/message", response_model=MessageResponse, summary="Nachricht in Konversation senden")
 async def send_message(conversation_id: str, request: MessageRequest):
     """
@@ -546,48 +617,122 @@ async def send_message(conversation_id: str, request: MessageRequest):
     """
     if not bridge:
         raise HTTPException(status_code=500, detail="Bridge not initialized")
+    if request.priority and request.priority not in TRAFFIC_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Verkehrsklasse '{request.priority}' (erlaubt: {', '.join(TRAFFIC_CLASSES)})")
         
     try:
         response_text = await bridge.bridge_message(
             conversation_id=conversation_id,
             target_llm_name=request.target_llm,
-            message=request.prompt
+            message=request.prompt,
+            priority=request.priority,
+            **request.history_kwargs()
         )
+        state_machine = bridge.router.active_conversations.get(conversation_id)
         return {
             "response": response_text,
             "conversation_id": conversation_id,
-            "target_llm": request.target_llm
+            "target_llm": request.target_llm,
+            "served_by": state_machine.served_by if state_machine else None
         }
-    except CircuitBreakerError as e:
-        # ▶️ Spezifische Fehlerbehandlung für einen offenen Circuit Breaker
-        detail_msg = f"Der Dienst für '{request.target_llm}' ist vorübergehend nicht verfügbar. "
+    except Exception as e:
+        raise _bridge_http_error(e, request.target_llm)
+
+def _bridge_http_error(e: Exception, target_llm: Union[str, List[str]]) -> HTTPException:
+    """Übersetzt Fehler aus der Bridge (Circuit Breaker, Rate-Limit, State Machine etc.) in saubere HTTP-Fehler."""
+    if isinstance(e, CircuitBreakerError):
+        # ▶️ Spezifische Fehlerbehandlung für einen offenen Circuit Breaker (alle Fallbacks erschöpft)
+        targets = target_llm if isinstance(target_llm, str) else ", ".join(target_llm)
+        detail_msg = f"Der Dienst für '{targets}' ist vorübergehend nicht verfügbar. "
         if e.next_attempt_at:
             detail_msg += f"Nächster Versuch möglich ab: {e.next_attempt_at.isoformat()}"
         else:
             detail_msg += "Bitte versuchen Sie es später erneut."
         
-        raise HTTPException(
+        return HTTPException(
             status_code=503,
             detail=detail_msg,
             headers={"Retry-After": "60"}  # Client soll es in 60 Sekunden erneut versuchen
         )
+    if isinstance(e, RateLimitExceeded):
+        # Eigenes Provider-Limit: die Anfrage hätte länger als max_wait_seconds warten müssen
+        return HTTPException(
+            status_code=429,
+            detail=f"Rate-Limit für '{e.service}' ausgeschöpft. Bitte versuchen Sie es später erneut.",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+    
+    error_message = str(e)
+    
+    # Spezifische Fehlerbehandlung
+    if "Invalid state transition" in error_message:
+        return HTTPException(status_code=400, detail=f"State Machine Error: {error_message}")
+    elif "Circuit is open" in error_message:
+        # Fallback für alte Circuit Breaker Exceptions
+        return HTTPException(status_code=503, detail=f"Service Unavailable: {error_message}")
+    elif "Could not resolve target" in error_message or "No models available" in error_message:
+        return HTTPException(status_code=404, detail=f"Model Not Found: {error_message}")
+    else:
+        # Generischer Serverfehler
+        traceback.print_exc()
+        return HTTPException(status_code=500, detail=error_message)
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json_codec.dumps(data)}\n\n"
+
+@app.post("/v1/conversation/{conversation_id}/message/stream", summary="Nachricht senden und Antwort streamen")
+async def send_message_stream(conversation_id: str, request: MessageRequest):
+    """
+    Wie ``/message``, liefert die Antwort aber als Server-Sent Events, sobald der
+    Provider Tokens sendet:
+
+    * ``event: delta`` mit ``{"text": ...}`` pro Chunk
+    * ``event: done`` mit ``served_by`` nach dem letzten Chunk
+    * ``event: error`` mit ``status`` und ``detail``, falls der Stream abbricht
+
+    Fehler vor dem ersten Chunk (offener Breaker, Rate-Limit, unbekanntes Modell)
+    kommen wie bei ``/message`` als HTTP-Fehler.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge not initialized")
+    if request.priority and request.priority not in TRAFFIC_CLASSES:
+        raise HTTPException(status_code=400, detail=f"Unbekannte Verkehrsklasse '{request.priority}' (erlaubt: {', '.join(TRAFFIC_CLASSES)})")
+    
+    chunks = bridge.bridge_message_stream(
+        conversation_id=conversation_id,
+        target_llm_name=request.target_llm,
+        message=request.prompt,
+        priority=request.priority,
+        **request.history_kwargs()
+    )
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = None
     except Exception as e:
-        # Fängt alle Fehler aus der Bridge (Circuit Breaker, State Machine etc.)
-        # und gibt einen sauberen HTTP-Fehler zurück.
-        error_message = str(e)
-        
-        # Spezifische Fehlerbehandlung
-        if "Invalid state transition" in error_message:
-            raise HTTPException(status_code=400, detail=f"State Machine Error: {error_message}")
-        elif "Circuit is open" in error_message:
-            # Fallback für alte Circuit Breaker Exceptions
-            raise HTTPException(status_code=503, detail=f"Service Unavailable: {error_message}")
-        elif "Could not resolve target" in error_message:
-            raise HTTPException(status_code=404, detail=f"Model Not Found: {error_message}")
-        else:
-            # Generischer Serverfehler
-            traceback.print_exc()
-            raise HTTPException(status_code=500, detail=str(e))
+        raise _bridge_http_error(e, request.target_llm)
+    
+    async def events():
+        try:
+            if first_chunk:
+                yield _sse("delta", {"text": first_chunk})
+            async for chunk in chunks:
+                yield _sse("delta", {"text": chunk})
+        except Exception as e:
+            error = _bridge_http_error(e, request.target_llm)
+            yield _sse("error", {"status": error.status_code, "detail": error.detail})
+            return
+        finally:
+            await chunks.aclose()
+        state_machine = bridge.router.active_conversations.get(conversation_id)
+        yield _sse("done", {
+            "conversation_id": conversation_id,
+            "target_llm": request.target_llm,
+            "served_by": state_machine.served_by if state_machine else None
+        })
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 # ==============================================================================
@@ -1020,6 +1165,300 @@ async def get_plugin_status():
     
     return bridge.get_plugin_status()
 
+@app.get("/v1/routing", summary="Routing-Tabelle anzeigen")
+async def get_routing_table():
+    """
+    Gibt die vorkompilierte Routing-Tabelle zurück (Adapter, Modell-Identifier,
+    base_url und Cache-Policy pro Modell) sowie nicht auflösbare Modelle.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.get_routing_status()
+
+@app.get("/v1/routing/scores", summary="Live-Scores der Modellauswahl")
+async def get_routing_scores(target: Optional[str] = None):
+    """
+    Gibt die Live-Statistiken (EWMA von Latenz und Fehlerrate) pro Modell, die
+    Gewichte und die letzten Entscheidungen für ``capability:<x>`` / ``group:<x>``
+    zurück. Mit ``target`` werden die Kandidaten dieses Selektors aktuell bewertet.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.get_model_scores(target)
+
+@app.get("/v1/ratelimits", summary="Provider-Rate-Limits anzeigen")
+async def get_rate_limits():
+    """
+    Gibt die RPM/TPM-Limits pro Adapter-Dienst zurück, dazu Warteschlangenlänge,
+    Wartezeiten, abgewiesene Anfragen und (lokales Backend) den Füllstand der Buckets.
+    Unter ``adaptive_concurrency`` stehen pro Adapter das aktuelle AIMD-Fenster,
+    laufende und wartende Anfragen sowie Drosselungen und Abweisungen.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.get_rate_limit_status()
+
+@app.get("/v1/http-clients", summary="HTTP-Connection-Pools pro Adapter-Dienst")
+async def get_http_clients():
+    """
+    Gibt pro Adapter-Dienst Limits, Timeouts und HTTP/2-Status des Clients
+    zurück, dazu die Pool-Sättigung: laufende und wartende Anfragen,
+    Pool-Timeouts sowie p50/p95 der Wartezeit bis zur Zuteilung.
+    """
+    return HTTPClientManager.get_client_info()
+
+@app.get("/v1/retries", summary="Wiederholungen vorübergehender Provider-Fehler")
+async def get_retries():
+    """
+    Gibt pro Adapter-Dienst die Retry-Policy und die Zähler zurück: Anfragen,
+    Wiederholungen, danach erfolgreiche und erschöpfte Anfragen, vom Budget
+    abgelehnte Wiederholungen und befolgte bzw. zu lange ``Retry-After``.
+    ``retry_latency_ms`` ist die durch Wiederholungen entstandene Zusatzlatenz
+    (ab dem ersten Fehlschlag) als Histogramm mit p50/p95; ``budget`` zeigt
+    das globale Retry-Budget.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    services = [name for name, adapter in bridge.adapters.items() if isinstance(adapter, BaseAdapter)]
+    return RetryManager.get_stats(services)
+
+@app.get("/v1/usage", summary="Token-Verbrauch und Prompt-Cache-Trefferquote")
+async def get_usage():
+    """
+    Gibt pro Adapter-Dienst und Modell die Anfragen sowie Input- und
+    Output-Tokens zurück. ``cached_input_tokens`` kamen aus dem Prompt-Cache
+    des Providers, ``cache_write_tokens`` wurden dort neu abgelegt;
+    ``cached_input_ratio`` ist der gecachte Anteil aller Input-Tokens.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+
+    return {
+        "prompt_cache_enabled": prompt_cache_enabled(),
+        "services": {name: adapter.usage.get_stats() for name, adapter in bridge.adapters.items()
+                     if isinstance(adapter, BaseAdapter)},
+    }
+
+@app.get("/v1/scheduler", summary="Status des Prioritäts-Schedulers")
+async def get_scheduler_status():
+    """
+    Gibt pro Verkehrsklasse (interactive, mission, workflow, batch) Gewicht,
+    Limit, laufende und wartende Upstream-Aufrufe sowie p50/p95 der Wartezeit zurück.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.get_scheduler_status()
+
+@app.post("/v1/registry/reload", summary="Registry neu laden")
+async def reload_registry():
+    """
+    Lädt registry.yaml neu, baut die Routing-Tabelle atomar neu auf und übernimmt die Rate-Limits.
+    Bei einer ungültigen Registry bleibt die bisherige Konfiguration aktiv.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    try:
+        return await bridge.reload_registry_async()
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Registry konnte nicht neu geladen werden: {str(e)}")
+
+@app.get("/v1/cache/health", summary="Status des Response-Caches")
+async def get_cache_health():
+    """
+    Gibt den Zustand des Response-Caches zurück, wie ihn der Hintergrund-Prober sieht
+    (Verfügbarkeit, Fehlerserie, Backoff bis zur nächsten Probe).
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.get_cache_status()
+
+@app.get("/v1/cache/stats", summary="Cache-Statistiken pro Stufe")
+async def get_cache_stats():
+    """
+    Gibt Treffer-, Fehl- und Verdrängungszähler für den In-Process-Cache (L1)
+    und die Redis-Stufe (L2) zurück.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    return bridge.router.response_cache.get_stats()
+
+def _cache_redis_client():
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    client = bridge.router.response_cache.get_redis_client()
+    if client is None:
+        raise HTTPException(status_code=503, detail="Redis-Cache nicht verfügbar")
+    return client
+
+@app.delete("/v1/cache", summary="Cache-Einträge gezielt invalidieren")
+async def invalidate_cache(model: Optional[str] = None, adapter: Optional[str] = None, prefix: Optional[str] = None):
+    """
+    Löscht die Cache-Einträge eines Modells (``model``), eines Adapter-Dienstes
+    (``adapter``) oder aller Modelle, deren Name mit ``prefix`` beginnt, z.B. nach
+    einem Modell-Upgrade. Mehrere Filter werden vereinigt.
+    """
+    if not (model or adapter or prefix):
+        raise HTTPException(status_code=400, detail="Mindestens einer der Parameter 'model', 'adapter' oder 'prefix' ist erforderlich")
+    _cache_redis_client()
+    
+    cache = bridge.router.response_cache
+    tags = set()
+    if model:
+        tags.add(f"model:{model}")
+    if adapter:
+        tags.add(f"adapter:{adapter}")
+    if prefix:
+        tags.update(await cache.find_tags(f"model:{prefix}"))
+    
+    result = await cache.invalidate_tags(sorted(tags))
+    if result is None:
+        raise HTTPException(status_code=503, detail="Redis-Cache nicht verfügbar")
+    return result
+
+@app.post("/v1/cache/export", summary="Cache-Snapshot exportieren")
+async def export_cache_snapshot(request: CacheSnapshotRequest):
+    """
+    Exportiert alle llm_response:*-Einträge samt TTL in eine Snapshot-Datei
+    im Snapshot-Verzeichnis des Servers.
+    """
+    client = _cache_redis_client()
+    return await export_snapshot(client, resolve_snapshot_path(request.filename))
+
+@app.post("/v1/cache/import", summary="Cache-Snapshot importieren")
+async def import_cache_snapshot(request: CacheSnapshotRequest):
+    """
+    Spielt eine Snapshot-Datei aus dem Snapshot-Verzeichnis zurück nach Redis.
+    Bereits abgelaufene Einträge werden übersprungen.
+    """
+    client = _cache_redis_client()
+    path = resolve_snapshot_path(request.filename)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"Snapshot '{path.name}' nicht gefunden")
+    try:
+        return await import_snapshot(client, path, overwrite=request.overwrite)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/v1/cache/warmup", summary="Cache aus Request-Log aufwärmen")
+async def warm_up_cache(request: CacheWarmupRequest):
+    """
+    Wiederholt protokollierte Anfragen mit begrenzter Parallelität durch den Router,
+    damit der Cache nach einem Deploy nicht kalt startet.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    
+    path = resolve_snapshot_path(request.filename) if request.filename else bridge.event_store.log_file
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"Request-Log '{path.name}' nicht gefunden")
+    return await warm_up(bridge.router, path, concurrency=request.concurrency, limit=request.limit)
+
+@app.post("/v1/batch", summary="Viele Prompts als Batch ausführen")
+async def execute_batch(request: Request, concurrency: Optional[int] = None):
+    """
+    Nimmt JSONL oder ein JSON-Array mit Einträgen ``{"target_llm", "prompt", "kwargs"}``
+    entgegen (optional ``id``, ``agent_name``, ``priority``) und führt sie mit höchstens
+    ``concurrency`` gleichzeitigen Anfragen durch den Router aus (Cache, Single-Flight,
+    Circuit Breaker, Scheduler-Klasse ``batch``).
+
+    Die Antwort ist NDJSON in Abschlussreihenfolge: eine ``result``-Zeile pro Eintrag
+    mit Status (ok, error, invalid), zum Schluss eine ``summary``-Zeile mit Durchsatz.
+    """
+    if not bridge:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    if concurrency is not None and concurrency < 1:
+        raise HTTPException(status_code=400, detail="'concurrency' muss mindestens 1 sein")
+    
+    body = (await request.body()).decode("utf-8", errors="replace")
+    try:
+        items = list(parse_items(body))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch enthält keine Einträge")
+    if len(items) > max_batch_items():
+        raise HTTPException(status_code=413, detail=f"Batch zu groß: {len(items)} Einträge (maximal {max_batch_items()})")
+    
+    async def ndjson():
+        async for line in run_batch(bridge.router, items, concurrency=concurrency):
+            yield json_codec.dumps(line) + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+def _require_batch_jobs() -> BatchJobManager:
+    if not batch_jobs:
+        raise HTTPException(status_code=500, detail="Bridge nicht initialisiert")
+    return batch_jobs
+
+@app.post("/v1/batch/jobs", summary="Dauerhaften Batch-Job anlegen")
+async def submit_batch_job(request: Request, concurrency: Optional[int] = None):
+    """
+    Legt aus einem JSONL-Body (ein ``{"target_llm", "prompt", "kwargs"}`` pro Zeile) einen
+    Batch-Job an und gibt sofort dessen ID zurück. Der Job läuft im Hintergrund mit
+    höchstens ``concurrency`` gleichzeitigen Anfragen, sichert seinen Fortschritt laufend
+    und wird nach einem Neustart der API fortgesetzt.
+    """
+    manager = _require_batch_jobs()
+    if concurrency is not None and concurrency < 1:
+        raise HTTPException(status_code=400, detail="'concurrency' muss mindestens 1 sein")
+    
+    job = await manager.submit(request.stream(), concurrency=concurrency)
+    return job.to_dict()
+
+@app.get("/v1/batch/jobs", summary="Batch-Jobs auflisten")
+async def list_batch_jobs():
+    """Gibt Status und Fortschritt aller bekannten Batch-Jobs zurück."""
+    manager = _require_batch_jobs()
+    return {"jobs": [job.to_dict() for job in await manager.list()]}
+
+@app.get("/v1/batch/jobs/{job_id}", summary="Status eines Batch-Jobs")
+async def get_batch_job(job_id: str, stream: bool = False):
+    """
+    Gibt Status, Zähler, Durchsatz und geschätzte Restdauer eines Batch-Jobs zurück.
+    Mit ``stream=true`` kommt der Status als NDJSON jede Sekunde, bis der Job beendet ist.
+    """
+    manager = _require_batch_jobs()
+    job = await manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch-Job '{job_id}' nicht gefunden")
+    if not stream:
+        return job.to_dict()
+    
+    async def ndjson():
+        async for status in manager.watch(job_id):
+            yield json_codec.dumps(status) + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+@app.get("/v1/batch/jobs/{job_id}/results", summary="Ergebnisse eines Batch-Jobs herunterladen")
+async def get_batch_job_results(job_id: str):
+    """
+    Liefert die bisherigen Ergebnisse als JSONL (eine ``result``-Zeile pro Eintrag in
+    Abschlussreihenfolge), auch während der Job noch läuft.
+    """
+    manager = _require_batch_jobs()
+    path = manager.output_path(job_id)
+    if await manager.get(job_id) is None or not path.exists():
+        raise HTTPException(status_code=404, detail=f"Keine Ergebnisse für Batch-Job '{job_id}'")
+    return FileResponse(path, media_type="application/x-ndjson", filename=f"{job_id}.jsonl")
+
+@app.delete("/v1/batch/jobs/{job_id}", summary="Batch-Job abbrechen")
+async def cancel_batch_job(job_id: str):
+    """Bricht einen laufenden Batch-Job ab; bereits geschriebene Ergebnisse bleiben erhalten."""
+    manager = _require_batch_jobs()
+    job = await manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch-Job '{job_id}' nicht gefunden")
+    return job.to_dict()
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -242,13 +242,18 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    cache_status = {"enabled": False}
+    if "bridge" in app_state:
+        cache_status = app_state["bridge"].router.get_cache_status()
+    
     return {
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "components": {
             "bridge": "bridge" in app_state,
             "orchestrator": "orchestrator" in app_state,
-            "state_repository": "state_repository" in app_state
+            "state_repository": "state_repository" in app_state,
+            "cache": cache_status
         }
     }
 
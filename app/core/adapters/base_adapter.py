@@ -1,8 +1,22 @@
+import time
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional
+
+import httpx
+
+from ..ratelimit.adaptive import AdaptiveConcurrency
+from ..exceptions import RateLimitExceeded
+from ..utils import json_codec
+from .retry import RetryManager
+from .usage import UsageTracker
 
 class BaseAdapter(ABC):
     """Abstract base class for all LLM adapters."""
 
+    # Adapter service this instance serves (e.g. 'openrouter_gateway'); selects its HTTP client pool.
+    # Set by LLMBridgeCore when the adapter is loaded; None uses the shared default client.
+    service_name: Optional[str] = None
+
     @abstractmethod
     async def send(self, prompt: str, **kwargs) -> str:
         """
@@ -15,4 +29,137 @@ class BaseAdapter(ABC):
         Returns:
             str: The response from the LLM.
         """
-        pass
\ No newline at end of file
+        pass
+
+    async def stream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Streams the response as text chunks.
+
+        Adapters with a provider streaming API override this; the default
+        yields the complete ``send()`` result as a single chunk.
+        """
+        yield await self.send(prompt, **kwargs)
+
+    def warmup_urls(self) -> List[str]:
+        """Base URLs to open connections to at startup (see HTTPClientManager.prewarm)."""
+        base_url = getattr(self, "base_url", None)
+        return [base_url] if base_url else []
+
+    @property
+    def concurrency(self) -> AdaptiveConcurrency:
+        """Adaptive (AIMD) concurrency window of this adapter, created on first use."""
+        limiter = getattr(self, "_concurrency", None)
+        if limiter is None:
+            limiter = self._concurrency = AdaptiveConcurrency(type(self).__name__)
+        return limiter
+
+    @property
+    def usage(self) -> UsageTracker:
+        """Token usage per model, including prompt-cache reads and writes, created on first use."""
+        tracker = getattr(self, "_usage", None)
+        if tracker is None:
+            tracker = self._usage = UsageTracker()
+        return tracker
+
+    def _pool_exhausted(self) -> RateLimitExceeded:
+        """
+        No free connection in this service's HTTP pool (``httpx.PoolTimeout``).
+
+        This is local back-pressure, not a provider failure: it neither shrinks
+        the concurrency window nor counts for the circuit breaker, and the API
+        answers it with 429 like the other local limits.
+        """
+        service = self.service_name or "default"
+        return RateLimitExceeded(f"HTTP connection pool for '{service}' exhausted.", service, retry_after=1.0)
+
+    @staticmethod
+    def _encode_json_body(kwargs: dict) -> dict:
+        """Encodes a ``json=`` body with the shared JSON codec instead of httpx's stdlib encoder."""
+        if "json" in kwargs:
+            kwargs = dict(kwargs)
+            kwargs["content"] = json_codec.dumpb(kwargs.pop("json"))
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+        return kwargs
+
+    async def _post(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        """
+        Sends a POST request through the adaptive concurrency window.
+
+        Status code, rate-limit headers and latency of the response resize the
+        window. Transient failures (429, 502/503/504, connect errors) are
+        retried per the service's retry policy (see retry.py). Raises
+        ``httpx.HTTPStatusError`` for error responses, like ``raise_for_status()``.
+        """
+        kwargs = self._encode_json_body(kwargs)
+        retry = RetryManager.start(self.service_name)
+        while True:
+            try:
+                response = await self._post_once(client, url, **kwargs)
+            except Exception as e:
+                if await retry.backoff(e):
+                    continue
+                retry.finish(success=False)
+                raise
+            retry.finish(success=True)
+            return response
+
+    async def _post_once(self, client: httpx.AsyncClient, url: str, **kwargs) -> httpx.Response:
+        """A single attempt of ``_post``; the slot is released before any retry backoff."""
+        async with self.concurrency.slot():
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, **kwargs)
+            except httpx.PoolTimeout:
+                raise self._pool_exhausted() from None
+            except httpx.TimeoutException:
+                self.concurrency.observe_timeout()
+                raise
+            self.concurrency.observe(response.status_code, response.headers, time.perf_counter() - started)
+        response.raise_for_status()
+        return response
+
+    async def _post_sse(self, client: httpx.AsyncClient, url: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Sends a streaming POST request and yields the ``data:`` payloads of the
+        server-sent events.
+
+        Holds a slot of the concurrency window until the stream ends. The
+        window observes the status code and headers, with the latency of the
+        complete stream, so it stays comparable to ``_post``. Failures before
+        the first event are retried like in ``_post``; once data has been
+        yielded, errors propagate.
+        """
+        kwargs = self._encode_json_body(kwargs)
+        retry = RetryManager.start(self.service_name)
+        while True:
+            received = False
+            try:
+                async with self.concurrency.slot():
+                    started = time.perf_counter()
+                    try:
+                        async with client.stream("POST", url, **kwargs) as response:
+                            if response.status_code >= 400:
+                                self.concurrency.observe(response.status_code, response.headers,
+                                                         time.perf_counter() - started)
+                                await response.aread()
+                                response.raise_for_status()
+                            async for line in response.aiter_lines():
+                                # Blank lines separate events; 'event:', 'id:' and ':' comments carry no text
+                                if line.startswith("data:"):
+                                    received = True
+                                    yield line[5:].strip()
+                            self.concurrency.observe(response.status_code, response.headers,
+                                                     time.perf_counter() - started)
+                    except httpx.PoolTimeout:
+                        raise self._pool_exhausted() from None
+                    except httpx.TimeoutException:
+                        self.concurrency.observe_timeout()
+                        raise
+            except Exception as e:
+                # The caller already has part of the answer; a retry would duplicate it
+                if not received and await retry.backoff(e):
+                    continue
+                retry.finish(success=False)
+                raise
+            retry.finish(success=True)
+            return
@@ -2,7 +2,9 @@
 
 from .base_adapter import BaseAdapter
 from ..utils.http_client import HTTPClientManager
-import json
+from ..utils import json_codec
+from . import messages as chat_messages
+from typing import AsyncIterator
 
 class ClaudeAdapter(BaseAdapter):
     """
@@ -28,7 +30,8 @@ class ClaudeAdapter(BaseAdapter):
         Args:
             prompt (str): Der Input-Prompt.
             model (str): Das zu verwendende Claude-Modell (z.B. "claude-3.5-sonnet").
-            **kwargs: Zusätzliche Parameter wie 'max_tokens'.
+            **kwargs: Zusätzliche Parameter wie 'max_tokens'; ``messages`` ist der
+                      bisherige Verlauf (System-Nachrichten werden zu ``system``).
 
         Returns:
             str: Die Antwort des LLM.
@@ -39,36 +42,35 @@ class ClaudeAdapter(BaseAdapter):
         # Bereite Request-Payload vor
         max_tokens = kwargs.pop('max_tokens', 2048)
         endpoint = f"{self.base_url}/messages"
+        # Stabile Präfixe (Persona, Verlauf) mit cache_control-Breakpoints
+        system, messages = chat_messages.to_anthropic(chat_messages.pop_messages(prompt, kwargs))
         
         payload = {
             "model": model,
             "max_tokens": max_tokens,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ],
+            "messages": messages,
             **kwargs  # Zusätzliche Parameter wie temperature
         }
+        if system:
+            payload["system"] = system
         
         # Verwende den zentralen HTTP-Client
-        client = await HTTPClientManager.get_client()
+        client = await HTTPClientManager.get_client(self.service_name)
         
         try:
             print(f"🧠 [HTTP] Sending request to Claude {model}")
             
-            response = await client.post(
+            # Über das adaptive Nebenläufigkeits-Fenster; prüft den HTTP-Status wie raise_for_status()
+            response = await self._post(
+                client,
                 endpoint,
                 json=payload,
                 headers=self._base_headers
             )
             
-            # Prüfe HTTP-Status
-            response.raise_for_status()
-            
             # Parse JSON Response
-            data = response.json()
+            data = json_codec.loads(response.content)
+            self.usage.record_anthropic(model, data.get("usage"))
             
             # Extrahiere Antwort gemäß Claude API Format
             if "content" in data and len(data["content"]) > 0:
@@ -80,4 +82,58 @@ class ClaudeAdapter(BaseAdapter):
         except Exception as e:
             print(f"❌ [HTTP] Error in ClaudeAdapter for model '{model}': {e}")
             # Re-raise für Circuit Breaker
-            raise e
\ No newline at end of file
+            raise e
+
+    async def stream(self, prompt: str, model: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Streamt die Antwort als Text-Chunks (Messages API mit ``"stream": true``).
+
+        Args:
+            prompt (str): Der Input-Prompt.
+            model (str): Das zu verwendende Claude-Modell.
+            **kwargs: Zusätzliche Parameter wie 'max_tokens'.
+
+        Yields:
+            str: Die Text-Deltas der ``content_block_delta``-Events.
+        """
+        if not model:
+            raise ValueError("Ein 'model'-Parameter ist für den ClaudeAdapter zwingend erforderlich.")
+        
+        max_tokens = kwargs.pop('max_tokens', 2048)
+        endpoint = f"{self.base_url}/messages"
+        system, messages = chat_messages.to_anthropic(chat_messages.pop_messages(prompt, kwargs))
+        payload = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "messages": messages,
+            **kwargs,
+            "stream": True
+        }
+        if system:
+            payload["system"] = system
+        client = await HTTPClientManager.get_client(self.service_name)
+        events = self._post_sse(client, endpoint, json=payload, headers=self._base_headers)
+        
+        try:
+            print(f"🧠 [HTTP] Streaming request to Claude {model}")
+            usage = {}
+            async for data in events:
+                event = json_codec.loads(data)
+                event_type = event.get("type")
+                if event_type == "content_block_delta" and event["delta"].get("type") == "text_delta":
+                    yield event["delta"]["text"]
+                elif event_type == "message_start":
+                    # Input- und Cache-Tokens stehen am Anfang, die Output-Tokens im letzten message_delta
+                    usage.update((event.get("message") or {}).get("usage") or {})
+                elif event_type == "message_delta":
+                    usage.update(event.get("usage") or {})
+                elif event_type == "error":
+                    # z.B. overloaded_error nach bereits gesendeten Chunks
+                    raise ValueError(f"Claude stream error: {event.get('error')}")
+            self.usage.record_anthropic(model, usage)
+        except Exception as e:
+            print(f"❌ [HTTP] Streaming error in ClaudeAdapter for model '{model}': {e}")
+            raise
+        finally:
+            # Gibt Verbindung und Nebenläufigkeits-Slot auch bei vorzeitigem Abbruch sofort frei
+            await events.aclose()
@@ -2,7 +2,9 @@
 
 from .base_adapter import BaseAdapter
 from ..utils.http_client import HTTPClientManager
-import json
+from ..utils import json_codec
+from . import messages as chat_messages
+from typing import AsyncIterator
 
 class GeminiAdapter(BaseAdapter):
     """
@@ -29,7 +31,8 @@ class GeminiAdapter(BaseAdapter):
         Args:
             prompt (str): Der Input-Prompt.
             model (str): Das zu verwendende Gemini-Modell (z.B. "gemini-1.5-pro-latest").
-            **kwargs: Zusätzliche Parameter für die Generierung.
+            **kwargs: Zusätzliche Parameter für die Generierung; ``messages`` ist
+                      der bisherige Verlauf (siehe messages.py).
 
         Returns:
             str: Die Antwort des LLM.
@@ -39,13 +42,11 @@ class GeminiAdapter(BaseAdapter):
 
         # Bereite Request-Payload vor
         endpoint = f"{self.base_url}/models/{model}:generateContent?key={self.api_key}"
+        # Gemini cacht gleiche Präfixe implizit; System-Nachrichten werden zur systemInstruction
+        system, contents = chat_messages.to_gemini(chat_messages.pop_messages(prompt, kwargs))
         
         payload = {
-            "contents": [{
-                "parts": [{
-                    "text": prompt
-                }]
-            }],
+            "contents": contents,
             "generationConfig": {
                 "maxOutputTokens": kwargs.get('max_tokens', 2048),
                 "temperature": kwargs.get('temperature', 0.7),
@@ -53,24 +54,26 @@ class GeminiAdapter(BaseAdapter):
                 "topK": kwargs.get('top_k', 10)
             }
         }
+        if system:
+            payload["systemInstruction"] = system
         
         # Verwende den zentralen HTTP-Client
-        client = await HTTPClientManager.get_client()
+        client = await HTTPClientManager.get_client(self.service_name)
         
         try:
             print(f"🔮 [HTTP] Sending request to Gemini {model}")
             
-            response = await client.post(
+            # Über das adaptive Nebenläufigkeits-Fenster; prüft den HTTP-Status wie raise_for_status()
+            response = await self._post(
+                client,
                 endpoint,
                 json=payload,
                 headers=self._base_headers
             )
             
-            # Prüfe HTTP-Status
-            response.raise_for_status()
-            
             # Parse JSON Response
-            data = response.json()
+            data = json_codec.loads(response.content)
+            self.usage.record_gemini(model, data.get("usageMetadata"))
             
             # Extrahiere Antwort gemäß Gemini API Format
             if "candidates" in data and len(data["candidates"]) > 0:
@@ -86,4 +89,55 @@ class GeminiAdapter(BaseAdapter):
         except Exception as e:
             print(f"❌ [HTTP] Error in GeminiAdapter for model '{model}': {e}")
             # Re-raise für Circuit Breaker
-            raise e
\ No newline at end of file
+            raise e
+
+    async def stream(self, prompt: str, model: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Streamt die Antwort als Text-Chunks (``streamGenerateContent`` mit ``alt=sse``).
+
+        Args:
+            prompt (str): Der Input-Prompt.
+            model (str): Das zu verwendende Gemini-Modell.
+            **kwargs: Zusätzliche Parameter für die Generierung.
+
+        Yields:
+            str: Die Textteile jedes Teilergebnisses.
+        """
+        if not model:
+            raise ValueError("Ein 'model'-Parameter ist für den GeminiAdapter zwingend erforderlich.")
+        
+        endpoint = f"{self.base_url}/models/{model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        system, contents = chat_messages.to_gemini(chat_messages.pop_messages(prompt, kwargs))
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "maxOutputTokens": kwargs.get('max_tokens', 2048),
+                "temperature": kwargs.get('temperature', 0.7),
+                "topP": kwargs.get('top_p', 0.8),
+                "topK": kwargs.get('top_k', 10)
+            }
+        }
+        if system:
+            payload["systemInstruction"] = system
+        client = await HTTPClientManager.get_client(self.service_name)
+        events = self._post_sse(client, endpoint, json=payload, headers=self._base_headers)
+        
+        try:
+            print(f"🔮 [HTTP] Streaming request to Gemini {model}")
+            usage = None
+            async for data in events:
+                # Jedes Event ist ein vollständiges GenerateContentResponse mit dem neuen Textteil
+                event = json_codec.loads(data)
+                # usageMetadata ist kumulativ; das letzte Event enthält die Summe
+                usage = event.get("usageMetadata") or usage
+                for candidate in event.get("candidates", [])[:1]:
+                    for part in candidate.get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+            self.usage.record_gemini(model, usage)
+        except Exception as e:
+            print(f"❌ [HTTP] Streaming error in GeminiAdapter for model '{model}': {e}")
+            raise
+        finally:
+            # Gibt Verbindung und Nebenläufigkeits-Slot auch bei vorzeitigem Abbruch sofort frei
+            await events.aclose()
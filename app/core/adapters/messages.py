@@ -0,0 +1,177 @@
+# llm_bridge/adapters/messages.py
+"""
+Nachrichtenlisten (Multi-Turn) und Prompt-Caching der Provider.
+
+Aufrufer übergeben den bisherigen Verlauf als ``messages`` (in den kwargs von
+``Router.route_message``); ``prompt`` ist die neue Nachricht des Nutzers und
+wird hinten angehängt. Eine Nachricht hat die Form
+``{"role": "system" | "user" | "assistant", "content": str}``, optional mit
+``"cache": True``.
+
+``cache`` markiert einen stabilen Präfix: alles bis einschließlich dieser
+Nachricht wiederholt sich in späteren Anfragen (Agenten-Persona, bisheriger
+Verlauf). Ohne Markierungen setzt ``cache_breakpoints`` sie automatisch hinter
+die letzte System-Nachricht und hinter den bisherigen Verlauf. Die Adapter
+übersetzen sie:
+
+* Anthropic (``claude_adapter``): ``cache_control``-Breakpoints, höchstens 4.
+* OpenRouter: ``cache_control`` in Content-Parts für Anthropic- und
+  Gemini-Modelle; andere Provider cachen Präfixe automatisch.
+* OpenAI und Gemini: automatisches Präfix-Caching, solange der Präfix
+  unverändert vorne steht.
+* CLI-Tools (Universal Adapter) kennen keine Nachrichtenlisten:
+  ``flatten_messages`` fasst System-Text und Verlauf zu einem Prompt zusammen.
+
+Mit ``PROMPT_CACHE_ENABLED=false`` senden die Adapter keine Breakpoints.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+ROLES = ("system", "user", "assistant")
+
+# Anthropic erlaubt höchstens vier cache_control-Breakpoints pro Anfrage
+MAX_CACHE_BREAKPOINTS = 4
+
+EPHEMERAL = {"type": "ephemeral"}
+
+# Rollen-Präfixe früherer Turns in ``flatten_messages``
+ROLE_LABELS = {"user": "User", "assistant": "Assistant"}
+
+
+def prompt_cache_enabled() -> bool:
+    return os.getenv("PROMPT_CACHE_ENABLED", "true").lower() == "true"
+
+
+def validate_history(messages: Any) -> List[Dict[str, Any]]:
+    """
+    Prüft einen übergebenen Verlauf und gibt ihn als Liste von Kopien zurück.
+
+    Raises:
+        ValueError: Kein Array von Nachrichten mit gültiger Rolle und Text.
+    """
+    if not isinstance(messages, list):
+        raise ValueError("'messages' must be a list of {role, content} objects.")
+    history = []
+    for index, message in enumerate(messages):
+        if not isinstance(message, dict):
+            raise ValueError(f"messages[{index}] must be an object.")
+        if message.get("role") not in ROLES:
+            raise ValueError(f"messages[{index}].role must be one of: {', '.join(ROLES)}.")
+        if not isinstance(message.get("content"), str):
+            raise ValueError(f"messages[{index}].content must be a string.")
+        entry = {"role": message["role"], "content": message["content"]}
+        if message.get("cache"):
+            entry["cache"] = True
+        history.append(entry)
+    return history
+
+
+def build_messages(prompt: str, history: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Verlauf plus ``prompt`` als letzte Nutzer-Nachricht."""
+    return [*(history or []), {"role": "user", "content": prompt}]
+
+
+def pop_messages(prompt: str, kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Entfernt ``messages`` aus den Adapter-kwargs und gibt die vollständige Nachrichtenliste zurück."""
+    return build_messages(prompt, kwargs.pop("messages", None))
+
+
+def conversation_text(prompt: str, history: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Gesamter Text der Anfrage, z.B. für die Token-Schätzung des Rate-Limiters."""
+    if not history:
+        return prompt
+    return "\n".join([*(message["content"] for message in history), prompt])
+
+
+def flatten_messages(messages: List[Dict[str, Any]]) -> str:
+    """
+    Nachrichtenliste als ein Prompt für Tools ohne Multi-Turn-Unterstützung:
+    System-Text vorne, frühere Turns mit Rollen-Präfix, die neue Nachricht am
+    Ende. Eine einzelne Nutzer-Nachricht bleibt unverändert.
+    """
+    system = [message["content"] for message in messages if message["role"] == "system"]
+    turns = [message for message in messages if message["role"] != "system"]
+    if not system and len(turns) == 1:
+        return turns[0]["content"]
+    parts = list(system)
+    if len(turns) > 1:
+        parts.append("\n\n".join(f"{ROLE_LABELS[message['role']]}: {message['content']}" for message in turns[:-1]))
+    if turns:
+        parts.append(turns[-1]["content"])
+    return "\n\n".join(parts)
+
+
+def cache_breakpoints(messages: List[Dict[str, Any]]) -> Set[int]:
+    """
+    Indizes der Nachrichten, hinter denen ein Cache-Breakpoint liegt.
+
+    Explizite ``cache``-Markierungen haben Vorrang. Sonst: die letzte
+    System-Nachricht und die letzte Nachricht vor der neuen Nutzer-Nachricht,
+    sofern es einen Verlauf gibt. Bei mehr als vier Markierungen bleiben die
+    erste (meist die Persona) und die drei letzten.
+    """
+    if not prompt_cache_enabled():
+        return set()
+    marked = [index for index, message in enumerate(messages) if message.get("cache")]
+    if not marked:
+        system = [index for index, message in enumerate(messages) if message["role"] == "system"]
+        if system:
+            marked.append(system[-1])
+        last_history = len(messages) - 2
+        if last_history >= 0 and messages[last_history]["role"] != "system":
+            marked.append(last_history)
+    if len(marked) > MAX_CACHE_BREAKPOINTS:
+        marked = [marked[0], *marked[-(MAX_CACHE_BREAKPOINTS - 1):]]
+    return set(marked)
+
+
+def _text_block(text: str, cached: bool) -> Dict[str, Any]:
+    block = {"type": "text", "text": text}
+    if cached:
+        block["cache_control"] = EPHEMERAL
+    return block
+
+
+def to_openai(messages: List[Dict[str, Any]], cache_control: bool = False) -> List[Dict[str, Any]]:
+    """
+    OpenAI-Format (auch OpenRouter, Ollama). Mit ``cache_control`` werden
+    markierte Nachrichten zu Content-Parts mit Breakpoint (OpenRouter leitet
+    sie an Anthropic bzw. Gemini weiter).
+    """
+    breakpoints = cache_breakpoints(messages) if cache_control else set()
+    return [
+        {"role": message["role"], "content": [_text_block(message["content"], True)]}
+        if index in breakpoints else {"role": message["role"], "content": message["content"]}
+        for index, message in enumerate(messages)
+    ]
+
+
+def to_anthropic(messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Messages-API-Format: (System-Blöcke, Nachrichten). System-Nachrichten
+    wandern in den ``system``-Parameter; Breakpoints als ``cache_control``.
+    """
+    breakpoints = cache_breakpoints(messages)
+    system, turns = [], []
+    for index, message in enumerate(messages):
+        cached = index in breakpoints
+        if message["role"] == "system":
+            system.append(_text_block(message["content"], cached))
+        else:
+            turns.append({"role": message["role"],
+                          "content": [_text_block(message["content"], True)] if cached else message["content"]})
+    return system, turns
+
+
+def to_gemini(messages: List[Dict[str, Any]]) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    generateContent-Format: (``systemInstruction`` oder None, ``contents``).
+    Gemini cacht Präfixe implizit; Breakpoints gibt es hier nicht.
+    """
+    system = [{"text": message["content"]} for message in messages if message["role"] == "system"]
+    contents = [
+        {"role": "model" if message["role"] == "assistant" else "user", "parts": [{"text": message["content"]}]}
+        for message in messages if message["role"] != "system"
+    ]
+    return ({"parts": system} if system else None), contents
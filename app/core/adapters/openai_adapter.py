@@ -1,6 +1,7 @@
 from .base_adapter import BaseAdapter
 from ..utils.http_client import HTTPClientManager
-import json
+from ..utils import json_codec
+from . import messages as chat_messages
 
 class OpenAIAdapter(BaseAdapter):
     """
@@ -25,7 +26,8 @@ class OpenAIAdapter(BaseAdapter):
         Args:
             prompt (str): Der Input-Prompt.
             model (str): Das zu verwendende OpenAI-Modell (z.B. "gpt-4", "gpt-3.5-turbo").
-            **kwargs: Zusätzliche Parameter wie 'max_tokens', 'temperature'.
+            **kwargs: Zusätzliche Parameter wie 'max_tokens', 'temperature';
+                      ``messages`` ist der bisherige Verlauf (siehe messages.py).
 
         Returns:
             str: Die Antwort des LLM.
@@ -33,31 +35,33 @@ class OpenAIAdapter(BaseAdapter):
         # Bereite Request-Payload vor
         max_tokens = kwargs.pop('max_tokens', 2048)
         endpoint = f"{self.base_url}/chat/completions"
+        # OpenAI cacht gleiche Präfixe automatisch; Persona und Verlauf stehen daher vorne
+        messages = chat_messages.to_openai(chat_messages.pop_messages(prompt, kwargs))
         
         payload = {
             "model": model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": messages,
             "max_tokens": max_tokens,
             **kwargs  # Zusätzliche Parameter wie temperature
         }
         
         # Verwende den zentralen HTTP-Client
-        client = await HTTPClientManager.get_client()
+        client = await HTTPClientManager.get_client(self.service_name)
         
         try:
             print(f"🤖 [HTTP] Sending request to OpenAI {model}")
             
-            response = await client.post(
+            # Über das adaptive Nebenläufigkeits-Fenster; prüft den HTTP-Status wie raise_for_status()
+            response = await self._post(
+                client,
                 endpoint,
                 json=payload,
                 headers=self._base_headers
             )
             
-            # Prüfe HTTP-Status
-            response.raise_for_status()
-            
             # Parse JSON Response
-            data = response.json()
+            data = json_codec.loads(response.content)
+            self.usage.record_openai(model, data.get("usage"))
             
             # Extrahiere Antwort gemäß OpenAI API Format
             if "choices" in data and len(data["choices"]) > 0:
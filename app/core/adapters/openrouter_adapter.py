@@ -2,7 +2,12 @@
 
 from .base_adapter import BaseAdapter
 from ..utils.http_client import HTTPClientManager
-import json
+from ..utils import json_codec
+from . import messages as chat_messages
+from typing import AsyncIterator
+
+# Modelle, für die OpenRouter cache_control-Breakpoints an den Provider weitergibt
+CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "google/gemini")
 
 # Der Klassenname wurde hier final geändert
 class OpenRouterAdapter(BaseAdapter):
@@ -39,7 +44,8 @@ class OpenRouterAdapter(BaseAdapter):
         Args:
             prompt (str): Der Input-Prompt.
             model (str): Das zu verwendende Modell (z.B. "openai/gpt-4o" oder "deepseek-r1:latest").
-            **kwargs: Zusätzliche API-Parameter (inkl. dynamische base_url).
+            **kwargs: Zusätzliche API-Parameter (inkl. dynamische base_url);
+                      ``messages`` ist der bisherige Verlauf (siehe messages.py).
 
         Returns:
             str: Die Antwort des LLM.
@@ -55,27 +61,27 @@ class OpenRouterAdapter(BaseAdapter):
         # Bereite Request-Payload vor
         payload = {
             "model": model,
-            "messages": [{"role": "user", "content": prompt}],
+            "messages": self._messages(prompt, model, kwargs),
             **kwargs  # Zusätzliche Parameter wie temperature, max_tokens, etc.
         }
         
         # Verwende den zentralen HTTP-Client
-        client = await HTTPClientManager.get_client()
+        client = await HTTPClientManager.get_client(self.service_name)
         
         try:
             print(f"🌐 [HTTP] Sending request to {endpoint} with model {model}")
             
-            response = await client.post(
+            # Über das adaptive Nebenläufigkeits-Fenster; prüft den HTTP-Status wie raise_for_status()
+            response = await self._post(
+                client,
                 endpoint,
                 json=payload,
                 headers=self._base_headers
             )
             
-            # Prüfe HTTP-Status
-            response.raise_for_status()
-            
             # Parse JSON Response
-            data = response.json()
+            data = json_codec.loads(response.content)
+            self.usage.record_openai(model, data.get("usage"))
             
             # Extrahiere Antwort
             if "choices" in data and len(data["choices"]) > 0:
@@ -87,4 +93,62 @@ class OpenRouterAdapter(BaseAdapter):
         except Exception as e:
             print(f"❌ [HTTP] Error in OpenRouterAdapter for model '{model}' at '{endpoint}': {e}")
             # Re-raise für Circuit Breaker
-            raise e
\ No newline at end of file
+            raise e
+
+    async def stream(self, prompt: str, model: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Streamt die Antwort als Text-Chunks (``"stream": true``, OpenAI-SSE-Format).
+        Funktioniert auch für Ollama, dessen /v1-Endpunkt dasselbe Format liefert.
+
+        Args:
+            prompt (str): Der Input-Prompt.
+            model (str): Das zu verwendende Modell.
+            **kwargs: Zusätzliche API-Parameter (inkl. dynamische base_url).
+
+        Yields:
+            str: Die Text-Deltas in Reihenfolge.
+        """
+        if not model:
+            raise ValueError("Ein 'model'-Parameter ist für den OpenRouterAdapter zwingend erforderlich.")
+        
+        dynamic_base_url = kwargs.pop('base_url', self.base_url)
+        endpoint = f"{dynamic_base_url.rstrip('/')}/chat/completions"
+        payload = {
+            "model": model,
+            "messages": self._messages(prompt, model, kwargs),
+            **kwargs,
+            "stream": True
+        }
+        client = await HTTPClientManager.get_client(self.service_name)
+        events = self._post_sse(client, endpoint, json=payload, headers=self._base_headers)
+        
+        try:
+            print(f"🌐 [HTTP] Streaming request to {endpoint} with model {model}")
+            usage = None
+            async for data in events:
+                if data == "[DONE]":
+                    # Kein break: der Stream endet danach ohnehin und wird so vollständig verbucht
+                    continue
+                event = json_codec.loads(data)
+                if "error" in event:
+                    # OpenRouter meldet Fehler mitten im Stream als eigenes Event
+                    raise ValueError(f"Stream error: {event['error']}")
+                # OpenRouter liefert die Token-Zahlen im letzten Chunk
+                usage = event.get("usage") or usage
+                choices = event.get("choices") or []
+                content = choices[0].get("delta", {}).get("content") if choices else None
+                if content:
+                    yield content
+            self.usage.record_openai(model, usage)
+        except Exception as e:
+            print(f"❌ [HTTP] Streaming error in OpenRouterAdapter for model '{model}' at '{endpoint}': {e}")
+            raise
+        finally:
+            # Gibt Verbindung und Nebenläufigkeits-Slot auch bei vorzeitigem Abbruch sofort frei
+            await events.aclose()
+
+    @staticmethod
+    def _messages(prompt: str, model: str, kwargs: dict) -> list:
+        """Nachrichtenliste; Breakpoints nur für Provider, die ``cache_control`` verstehen."""
+        return chat_messages.to_openai(chat_messages.pop_messages(prompt, kwargs),
+                                       cache_control=model.startswith(CACHE_CONTROL_MODEL_PREFIXES))
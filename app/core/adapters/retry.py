@@ -0,0 +1,230 @@
+# llm_bridge/adapters/retry.py
+"""
+Wiederholungen vorübergehender Provider-Fehler in der Adapter-Schicht.
+
+Ein einzelnes 429 oder 502 soll weder den Circuit Breaker belasten noch eine
+Mission scheitern lassen. ``BaseAdapter._post`` (und ``_post_sse`` vor dem
+ersten Chunk) wiederholt deshalb Anfragen, bei denen der Provider die Anfrage
+nachweislich nicht verarbeitet hat:
+
+* HTTP-Status aus ``retry_on_status`` (Standard: 429, 502, 503, 504, 529),
+* Verbindungsfehler beim Aufbau (``ConnectError``, ``ConnectTimeout``).
+
+Lese-Timeouts, 500 und abgebrochene Verbindungen werden nicht wiederholt: Der
+Provider könnte die Anfrage bereits verarbeitet (und abgerechnet) haben.
+
+Wartezeit: Exponentieller Backoff mit Full Jitter (``base_delay_ms`` x 2^n,
+höchstens ``max_delay_ms``). Ein ``Retry-After`` des Providers ist die
+Untergrenze; verlangt er länger als ``max_retry_after_seconds``, wird nicht
+gewartet, sondern der Fehler sofort weitergegeben (Breaker und Fallbacks
+übernehmen).
+
+Ein globales Budget begrenzt die Wiederholungen auf ``RETRY_BUDGET_RATIO``
+der Anfragen (wie das Hedging-Budget): Fällt ein Provider ganz aus, vervielfachen
+Wiederholungen die Last nicht. Die Policy ist pro Adapter-Dienst
+konfigurierbar (``retries`` in registry.yaml).
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Iterable, Optional
+
+import httpx
+
+from ..ratelimit.adaptive import parse_retry_after
+from ..utils.latency import LatencyTracker
+
+DEFAULT_SERVICE = "default"
+
+DEFAULT_RETRY_SETTINGS = {
+    "enabled": True,
+    "max_attempts": 3,               # Inklusive des ersten Versuchs
+    "base_delay_ms": 250,
+    "max_delay_ms": 8000,
+    "max_retry_after_seconds": 20.0,
+    "retry_on_status": [429, 502, 503, 504, 529],  # 529: Anthropic 'overloaded'
+}
+
+# Obere Grenzen (ms) des Histogramms der durch Wiederholungen verursachten Latenz
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Verbindungsaufbau fehlgeschlagen: die Anfrage hat den Provider nie erreicht
+RETRYABLE_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+def _env_defaults() -> dict:
+    return {
+        **DEFAULT_RETRY_SETTINGS,
+        "enabled": os.getenv("RETRY_ENABLED", "true").lower() == "true",
+        "max_attempts": int(os.getenv("RETRY_MAX_ATTEMPTS", str(DEFAULT_RETRY_SETTINGS["max_attempts"]))),
+        "base_delay_ms": int(os.getenv("RETRY_BASE_DELAY_MS", str(DEFAULT_RETRY_SETTINGS["base_delay_ms"]))),
+        "max_delay_ms": int(os.getenv("RETRY_MAX_DELAY_MS", str(DEFAULT_RETRY_SETTINGS["max_delay_ms"]))),
+        "max_retry_after_seconds": float(os.getenv("RETRY_MAX_RETRY_AFTER_SECONDS",
+                                                   str(DEFAULT_RETRY_SETTINGS["max_retry_after_seconds"]))),
+    }
+
+
+class RetryBudget:
+    """Credits für Wiederholungen: ``ratio`` pro Anfrage, ein Credit pro Wiederholung (global)."""
+
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        # Burst für ruhige Phasen: einzelne Fehler lassen sich auch bei wenig Verkehr wiederholen
+        self.max_credits = max(1.0, ratio * 100)
+        self.credits = self.max_credits if ratio > 0 else 0.0
+
+    def deposit(self) -> None:
+        self.credits = min(self.max_credits, self.credits + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.credits < 1.0:
+            return False
+        self.credits -= 1.0
+        return True
+
+
+class RetryStats:
+    """Zähler und Latenz-Histogramm der Wiederholungen eines Adapter-Dienstes."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.recovered = 0          # Erfolgreich nach mindestens einer Wiederholung
+        self.exhausted = 0          # Alle Versuche fehlgeschlagen
+        self.budget_denied = 0
+        self.retry_after_honoured = 0
+        self.retry_after_too_long = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency = LatencyTracker()
+
+    def record_latency(self, seconds: float) -> None:
+        milliseconds = seconds * 1000
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if milliseconds <= bound),
+                     len(LATENCY_BUCKETS_MS))
+        self.histogram[index] += 1
+        self.latency.record(seconds)
+
+    def to_dict(self) -> dict:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "exhausted": self.exhausted,
+            "budget_denied": self.budget_denied,
+            "retry_after_honoured": self.retry_after_honoured,
+            "retry_after_too_long": self.retry_after_too_long,
+            "retry_latency_ms": {
+                "p50": round((self.latency.percentile(50) or 0.0) * 1000, 1),
+                "p95": round((self.latency.percentile(95) or 0.0) * 1000, 1),
+                "histogram": dict(zip(labels, self.histogram)),
+            },
+        }
+
+
+class RetryState:
+    """Versuche einer einzelnen Anfrage; ``backoff()`` entscheidet über die nächste Wiederholung und wartet."""
+
+    __slots__ = ("service", "settings", "stats", "attempt", "first_failure")
+
+    def __init__(self, service: str, settings: dict, stats: RetryStats):
+        self.service = service
+        self.settings = settings
+        self.stats = stats
+        self.attempt = 1
+        self.first_failure: Optional[float] = None
+
+    def _retryable(self, error: BaseException) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.settings["retry_on_status"]
+        return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+    async def backoff(self, error: BaseException) -> bool:
+        """
+        Wartet vor der nächsten Wiederholung und gibt True zurück; False, wenn
+        der Fehler weitergegeben werden soll (nicht wiederholbar, Versuche
+        oder Budget erschöpft, ``Retry-After`` zu lang).
+        """
+        if not self.settings["enabled"] or not self._retryable(error):
+            return False
+        if self.first_failure is None:
+            self.first_failure = time.perf_counter()
+        if self.attempt >= self.settings["max_attempts"]:
+            self.stats.exhausted += 1
+            return False
+
+        retry_after = None
+        if isinstance(error, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(error.response.headers)
+        if retry_after is not None and retry_after > self.settings["max_retry_after_seconds"]:
+            self.stats.retry_after_too_long += 1
+            return False
+        if not RetryManager.budget.withdraw():
+            self.stats.budget_denied += 1
+            print(f"🔁 [Retry] '{self.service}': Retry-Budget erschöpft, Fehler wird weitergegeben")
+            return False
+
+        # Full Jitter verteilt gleichzeitige Wiederholungen; Retry-After ist die Untergrenze
+        ceiling = min(self.settings["max_delay_ms"], self.settings["base_delay_ms"] * 2 ** (self.attempt - 1))
+        delay = random.uniform(0, ceiling) / 1000
+        if retry_after is not None:
+            self.stats.retry_after_honoured += 1
+            delay = max(delay, retry_after)
+        self.stats.retries += 1
+        self.attempt += 1
+        reason = error.response.status_code if isinstance(error, httpx.HTTPStatusError) else type(error).__name__
+        print(f"🔁 [Retry] '{self.service}': {reason}, Versuch {self.attempt}/{self.settings['max_attempts']} "
+              f"in {delay:.2f}s")
+        await asyncio.sleep(delay)
+        return True
+
+    def finish(self, success: bool) -> None:
+        """Schließt die Anfrage ab; erfasst die Zusatzlatenz ab dem ersten Fehlschlag."""
+        if self.attempt > 1:
+            if success:
+                self.stats.recovered += 1
+            self.stats.record_latency(time.perf_counter() - self.first_failure)
+
+
+class RetryManager:
+    """Retry-Policies pro Adapter-Dienst (``retries`` in registry.yaml) und globales Budget."""
+
+    _settings: Dict[str, dict] = {}
+    _stats: Dict[str, RetryStats] = {}
+    budget = RetryBudget(float(os.getenv("RETRY_BUDGET_RATIO", "0.1")))
+
+    @classmethod
+    def configure(cls, settings: Dict[str, dict]) -> None:
+        """Übernimmt die Policies pro Dienst; nicht gesetzte Felder kommen aus den RETRY_*-Variablen."""
+        cls._settings = {service: {k: v for k, v in (config or {}).items() if v is not None}
+                         for service, config in settings.items()}
+
+    @classmethod
+    def resolve_settings(cls, service: Optional[str]) -> dict:
+        return {**_env_defaults(), **cls._settings.get(service or DEFAULT_SERVICE, {})}
+
+    @classmethod
+    def start(cls, service: Optional[str]) -> RetryState:
+        """Beginnt eine Anfrage: zahlt ins Budget ein und liefert den Zustand für ``backoff()``."""
+        service = service or DEFAULT_SERVICE
+        stats = cls._stats.get(service)
+        if stats is None:
+            stats = cls._stats[service] = RetryStats()
+        stats.requests += 1
+        cls.budget.deposit()
+        return RetryState(service, cls.resolve_settings(service), stats)
+
+    @classmethod
+    def get_stats(cls, services: Iterable[str] = ()) -> dict:
+        """Policy und Zähler pro Dienst sowie der Stand des globalen Budgets."""
+        names = sorted(set(cls._stats) | set(cls._settings) | set(services))
+        return {
+            "budget": {"ratio": cls.budget.ratio, "credits": round(cls.budget.credits, 2),
+                       "max_credits": cls.budget.max_credits},
+            "services": {
+                name: {"policy": cls.resolve_settings(name), **cls._stats.get(name, RetryStats()).to_dict()}
+                for name in names
+            },
+        }
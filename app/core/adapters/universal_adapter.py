@@ -1,10 +1,8 @@
 # app/core/adapters/universal_adapter.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 
-class AdapterError(Exception):
-    """Benutzerdefinierte Exception für Adapter-Fehler."""
-    pass
+from ..exceptions import AdapterError  # noqa: F401  (bisheriger Importpfad der Plugins)
 
 class UniversalAdapter(ABC):
     """
@@ -20,4 +18,12 @@ class UniversalAdapter(ABC):
     @abstractmethod
     async def chat_completion(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         """Die Kernmethode zur Ausführung einer Konversationsanfrage."""
-        pass
\ No newline at end of file
+        pass
+
+    async def stream_completion(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """
+        Streaming-Variante von ``chat_completion``. Standard: die vollständige
+        Antwort als ein Chunk; Adapter mit inkrementeller Ausgabe überschreiben sie.
+        """
+        response = await self.chat_completion(messages, **kwargs)
+        yield response["choices"][0]["message"]["content"]
@@ -0,0 +1,80 @@
+# llm_bridge/adapters/usage.py
+"""
+Token-Verbrauch pro Adapter und Modell, mit den aus dem Prompt-Cache des
+Providers gelesenen und dorthin geschriebenen Input-Tokens.
+
+Die Adapter lesen die Zahlen aus den ``usage``-Angaben der Antworten
+(Anthropic: ``cache_read_input_tokens``/``cache_creation_input_tokens``,
+OpenAI/OpenRouter: ``prompt_tokens_details.cached_tokens``, Gemini:
+``cachedContentTokenCount``). ``input_tokens`` zählt immer alle Input-Tokens
+der Anfrage, inklusive der gecachten.
+"""
+
+from typing import Any, Dict, Optional
+
+
+class ModelUsage:
+    """Summen eines Modells."""
+
+    __slots__ = ("requests", "input_tokens", "cached_input_tokens", "cache_write_tokens", "output_tokens")
+
+    def __init__(self):
+        self.requests = 0
+        self.input_tokens = 0
+        self.cached_input_tokens = 0
+        self.cache_write_tokens = 0
+        self.output_tokens = 0
+
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in self.__slots__}
+        data["cached_input_ratio"] = (round(self.cached_input_tokens / self.input_tokens, 3)
+                                      if self.input_tokens else 0.0)
+        return data
+
+
+class UsageTracker:
+    """Token-Verbrauch eines Adapters, aufgeschlüsselt nach Modell."""
+
+    def __init__(self):
+        self._models: Dict[str, ModelUsage] = {}
+
+    def record(self, model: str, input_tokens: int = 0, output_tokens: int = 0, cached_input_tokens: int = 0,
+               cache_write_tokens: int = 0) -> None:
+        usage = self._models.get(model)
+        if usage is None:
+            usage = self._models[model] = ModelUsage()
+        usage.requests += 1
+        usage.input_tokens += input_tokens or 0
+        usage.output_tokens += output_tokens or 0
+        usage.cached_input_tokens += cached_input_tokens or 0
+        usage.cache_write_tokens += cache_write_tokens or 0
+
+    def record_openai(self, model: str, usage: Optional[Dict[str, Any]]) -> None:
+        """``usage`` im OpenAI-Format (OpenAI, OpenRouter, Ollama)."""
+        if not usage:
+            return
+        details = usage.get("prompt_tokens_details") or {}
+        self.record(model, input_tokens=usage.get("prompt_tokens", 0), output_tokens=usage.get("completion_tokens", 0),
+                    cached_input_tokens=details.get("cached_tokens", 0),
+                    cache_write_tokens=details.get("cache_write_tokens", 0))
+
+    def record_anthropic(self, model: str, usage: Optional[Dict[str, Any]]) -> None:
+        """``usage`` der Messages-API; ``input_tokens`` enthält dort nur die ungecachten Tokens."""
+        if not usage:
+            return
+        cached = usage.get("cache_read_input_tokens") or 0
+        written = usage.get("cache_creation_input_tokens") or 0
+        self.record(model, input_tokens=(usage.get("input_tokens") or 0) + cached + written,
+                    output_tokens=usage.get("output_tokens", 0), cached_input_tokens=cached,
+                    cache_write_tokens=written)
+
+    def record_gemini(self, model: str, usage: Optional[Dict[str, Any]]) -> None:
+        """``usageMetadata`` von generateContent."""
+        if not usage:
+            return
+        self.record(model, input_tokens=usage.get("promptTokenCount", 0),
+                    output_tokens=usage.get("candidatesTokenCount", 0),
+                    cached_input_tokens=usage.get("cachedContentTokenCount", 0))
+
+    def get_stats(self) -> dict:
+        return {model: usage.to_dict() for model, usage in self._models.items()}
@@ -0,0 +1,5 @@
+# llm_bridge/batch/__init__.py
+"""
+Batch-Subsystem der Bridge: viele unabhängige Prompts mit begrenzter
+Parallelität durch den Router schicken.
+"""
@@ -0,0 +1,240 @@
+# llm_bridge/batch/jobs.py
+"""
+Dauerhafte Batch-Jobs für große Prompt-Mengen (z.B. 100k Prompts über Nacht).
+
+Anders als ``POST /v1/batch`` hängt ein Job nicht an einer HTTP-Anfrage: Die
+Eingabe wird ins Job-Verzeichnis kopiert, ein Hintergrund-Task
+(``create_background_task``) arbeitet sie mit begrenzter Parallelität über
+``run_batch`` und damit durch den Router ab.
+
+Checkpoints:
+
+* Jedes Ergebnis wird sofort an ``output.jsonl`` angehängt. Die Ausgabe ist
+  die maßgebliche Liste erledigter Einträge; beim Fortsetzen werden die dort
+  vorhandenen Indizes übersprungen, eine beim Absturz halb geschriebene letzte
+  Zeile wird abgeschnitten.
+* Status und Zähler landen alle ``BATCH_JOB_CHECKPOINT_INTERVAL`` Ergebnisse
+  im Job-Store (Dateisystem oder Redis, siehe store.py).
+
+Beim Start der API setzt ``resume_pending`` alle Jobs im Status ``queued``
+oder ``running`` fort. Laufen mehrere Replikas mit gemeinsamem Redis-Store,
+darf das nur eine davon tun (``BATCH_JOB_RESUME_ON_STARTUP``).
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from ..utils import json_codec
+from ..utils.task_manager import create_background_task
+from .runner import iter_items, run_batch
+from .store import ACTIVE_STATUSES, BatchJob, FileJobStore, RedisJobStore, resolve_job_dir
+
+INPUT_FILE = "input.jsonl"
+OUTPUT_FILE = "output.jsonl"
+
+
+def recover_output(path: Path, on_result: Optional[Callable[[dict], None]] = None) -> Set[int]:
+    """
+    Liest die bisherigen Ergebnisse eines Jobs und gibt die erledigten Indizes zurück.
+
+    Die Ergebniszeilen selbst (mit den Antworttexten) werden nicht gehalten,
+    sondern einzeln an ``on_result`` übergeben, z.B. für die Zähler. Eine
+    unvollständige letzte Zeile (Absturz beim Schreiben) wird aus der Datei
+    entfernt, damit weitere Ergebnisse sauber angehängt werden.
+    """
+    done: Set[int] = set()
+    if not path.exists():
+        return done
+    valid_size = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                result = json_codec.loads(raw)
+            except json_codec.JSONDecodeError:
+                break
+            valid_size += len(raw)
+            if result["index"] in done:
+                continue
+            done.add(result["index"])
+            if on_result is not None:
+                on_result(result)
+    if valid_size < path.stat().st_size:
+        print(f"⚠️ [BatchJob] Unvollständige Zeile in {path} entfernt")
+        with open(path, "r+b") as f:
+            f.truncate(valid_size)
+    return done
+
+
+class BatchJobManager:
+    """Legt Batch-Jobs an, führt sie im Hintergrund aus und setzt sie nach einem Neustart fort."""
+
+    def __init__(self, router: Any, redis_client: Any = None):
+        self.router = router
+        self.checkpoint_interval = max(1, int(os.getenv("BATCH_JOB_CHECKPOINT_INTERVAL", "50")))
+        self.store = FileJobStore()
+        if os.getenv("BATCH_JOB_STORE", "file").lower() == "redis":
+            if redis_client is not None:
+                self.store = RedisJobStore(redis_client)
+            else:
+                print("⚠️ [BatchJob] Redis-Store angefordert, aber kein Redis-Client verfügbar; nutze Dateisystem")
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._jobs: Dict[str, BatchJob] = {}
+
+    async def submit(self, chunks: AsyncIterator[bytes], concurrency: Optional[int] = None) -> BatchJob:
+        """Schreibt die JSONL-Eingabe stückweise (z.B. aus dem HTTP-Body) ins Job-Verzeichnis und startet den Job."""
+        job = BatchJob(f"job_{uuid.uuid4().hex[:12]}", concurrency=concurrency)
+        with open(resolve_job_dir(job.id, create=True) / INPUT_FILE, "wb") as f:
+            pending = b""
+            async for chunk in chunks:
+                pending += chunk
+                *complete, pending = pending.split(b"\n")
+                for line in complete:
+                    if line.strip():
+                        job.total += 1
+                        f.write(line.rstrip(b"\r") + b"\n")
+            if pending.strip():
+                job.total += 1
+                f.write(pending.rstrip(b"\r") + b"\n")
+        await self.store.save(job)
+        print(f"📦 [BatchJob] {job.id} angelegt ({job.total} Einträge)")
+        self._start(job)
+        return job
+
+    async def resume_pending(self) -> int:
+        """Setzt alle unterbrochenen Jobs fort (Aufruf beim Start der API)."""
+        resumed = 0
+        for job_id in await self.store.list_active_ids():
+            job = await self.store.get(job_id)
+            if job is None or job.status not in ACTIVE_STATUSES or job_id in self._tasks:
+                continue
+            print(f"🔁 [BatchJob] Setze {job_id} fort ({job.processed}/{job.total} erledigt)")
+            self._start(job)
+            resumed += 1
+        return resumed
+
+    def _start(self, job: BatchJob) -> None:
+        self._jobs[job.id] = job
+        task = create_background_task(self._run(job), name=f"batch-job-{job.id}")
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._forget(job.id))
+
+    def _forget(self, job_id: str) -> None:
+        # Der letzte Checkpoint liegt im Store; danach liest get() von dort
+        self._tasks.pop(job_id, None)
+        self._jobs.pop(job_id, None)
+
+    async def _run(self, job: BatchJob) -> None:
+        directory = resolve_job_dir(job.id)
+        output_path = directory / OUTPUT_FILE
+        # Zähler aus der Ausgabe neu aufbauen: sie enthält auch Ergebnisse nach dem letzten Checkpoint
+        job.processed = job.succeeded = job.failed = job.invalid = 0
+        job.errors = {}
+        done = recover_output(output_path, lambda result: self._count(job, result))
+        job.status = "running"
+        job.started_at = job.started_at or time.time()
+        await self._checkpoint(job)
+
+        started = time.perf_counter()
+        processed_before = job.processed
+        try:
+            with open(directory / INPUT_FILE, "r", encoding="utf-8") as source, \
+                    open(output_path, "a", encoding="utf-8") as output:
+                items = (item for item in iter_items(source) if item.index not in done)
+                since_checkpoint = 0
+                async for result in run_batch(self.router, items, concurrency=job.concurrency, batch_id=job.id):
+                    if result["type"] == "summary":
+                        continue
+                    output.write(json_codec.dumps(result) + "\n")
+                    output.flush()
+                    self._count(job, result)
+                    elapsed = time.perf_counter() - started
+                    job.items_per_second = round((job.processed - processed_before) / elapsed, 2) if elapsed else 0.0
+                    since_checkpoint += 1
+                    if since_checkpoint >= self.checkpoint_interval:
+                        since_checkpoint = 0
+                        await self._checkpoint(job)
+            job.status = "completed"
+            print(f"✅ [BatchJob] {job.id} abgeschlossen: {job.succeeded}/{job.total} erfolgreich")
+        except asyncio.CancelledError:
+            # Shutdown oder Abbruch: der Checkpoint bleibt fortsetzbar, sofern nicht ausdrücklich abgebrochen
+            if job.status != "cancelled":
+                print(f"⏸️ [BatchJob] {job.id} unterbrochen bei {job.processed}/{job.total}")
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            print(f"❌ [BatchJob] {job.id} fehlgeschlagen: {e}")
+        finally:
+            if job.finished:
+                job.finished_at = time.time()
+            await self._checkpoint(job)
+
+    @staticmethod
+    def _count(job: BatchJob, result: dict) -> None:
+        job.processed += 1
+        if result["status"] == "ok":
+            job.succeeded += 1
+        elif result["status"] == "invalid":
+            job.invalid += 1
+        else:
+            job.failed += 1
+            job.errors[result["error_type"]] = job.errors.get(result["error_type"], 0) + 1
+
+    async def _checkpoint(self, job: BatchJob) -> None:
+        job.updated_at = time.time()
+        try:
+            await self.store.save(job)
+        except Exception as e:
+            # Die Ausgabe ist maßgeblich; ein verpasster Checkpoint kostet beim Fortsetzen nichts
+            print(f"⚠️ [BatchJob] Checkpoint für {job.id} fehlgeschlagen: {e}")
+
+    async def get(self, job_id: str) -> Optional[BatchJob]:
+        """Aktueller Stand: aus dem Speicher, solange der Job in diesem Prozess läuft, sonst aus dem Store."""
+        return self._jobs.get(job_id) or await self.store.get(job_id)
+
+    async def list(self) -> list:
+        jobs = {job.id: job for job in await self.store.list()}
+        jobs.update({job_id: job for job_id, job in self._jobs.items() if job_id in jobs})
+        return list(jobs.values())
+
+    async def cancel(self, job_id: str) -> Optional[BatchJob]:
+        job = await self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.status = "cancelled"
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        else:
+            job.finished_at = time.time()
+            await self._checkpoint(job)
+        print(f"🛑 [BatchJob] {job_id} abgebrochen")
+        return job
+
+    async def watch(self, job_id: str, interval: float = 1.0) -> AsyncIterator[dict]:
+        """Liefert den Job-Status alle ``interval`` Sekunden, bis der Job beendet ist."""
+        while True:
+            job = await self.get(job_id)
+            if job is None:
+                return
+            yield job.to_dict()
+            if job.finished:
+                return
+            await asyncio.sleep(interval)
+
+    def output_path(self, job_id: str) -> Path:
+        return resolve_job_dir(job_id) / OUTPUT_FILE
+
+    async def close(self) -> None:
+        """Stoppt laufende Jobs beim Shutdown; sie bleiben ``running`` und werden beim nächsten Start fortgesetzt."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
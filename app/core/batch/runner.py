@@ -0,0 +1,222 @@
+# llm_bridge/batch/runner.py
+"""
+Batch-Ausführung unabhängiger Prompts.
+
+Eingabe ist JSONL (ein Objekt pro Zeile) oder ein JSON-Array mit Einträgen
+der Form ``{"target_llm": ..., "prompt": ..., "kwargs": {...}}``; optional
+``id``, ``agent_name`` und ``priority``. Jeder Eintrag läuft über
+``Router.route_message`` und damit durch Cache, Single-Flight, Scheduler und
+Circuit Breaker. Die Conversation-IDs beginnen mit ``batch_``, der Scheduler
+plant sie daher in der Klasse ``batch`` ein.
+
+Ergebnisse werden in Abschlussreihenfolge geliefert (NDJSON-tauglich), zum
+Schluss eine Zusammenfassung mit Durchsatz und Latenz-Perzentilen.
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, Optional
+
+from ..utils import json_codec
+
+DEFAULT_BATCH_CONCURRENCY = 8
+DEFAULT_BATCH_MAX_ITEMS = 10000
+
+
+class BatchItem:
+    """Ein Eintrag des Batches; ungültige Einträge tragen statt der Felder einen ``error``."""
+
+    __slots__ = ("index", "id", "target_llm", "prompt", "kwargs", "agent_name", "priority", "error")
+
+    def __init__(self, index: int, id: Optional[str] = None, target_llm: Any = None, prompt: Optional[str] = None,
+                 kwargs: Optional[Dict[str, Any]] = None, agent_name: Optional[str] = None,
+                 priority: Optional[str] = None, error: Optional[str] = None):
+        self.index = index
+        self.id = id
+        self.target_llm = target_llm
+        self.prompt = prompt
+        self.kwargs = kwargs or {}
+        self.agent_name = agent_name
+        self.priority = priority
+        self.error = error
+
+    @classmethod
+    def from_entry(cls, index: int, entry: Any) -> "BatchItem":
+        if not isinstance(entry, dict):
+            return cls(index, error="Item must be a JSON object.")
+        item_id = entry.get("id")
+        item_id = str(item_id) if item_id is not None else None
+        target_llm, prompt = entry.get("target_llm"), entry.get("prompt")
+        kwargs = entry.get("kwargs") or {}
+        if not target_llm or not isinstance(target_llm, (str, list)):
+            return cls(index, item_id, error="Field 'target_llm' is required.")
+        if not isinstance(prompt, str) or not prompt:
+            return cls(index, item_id, error="Field 'prompt' is required.")
+        if not isinstance(kwargs, dict):
+            return cls(index, item_id, error="Field 'kwargs' must be an object.")
+        return cls(index, item_id, target_llm, prompt, kwargs, entry.get("agent_name"), entry.get("priority"))
+
+    def to_dict(self) -> dict:
+        """Eingabeform des Eintrags (für Checkpoints und Wiederaufnahme)."""
+        return {"id": self.id, "target_llm": self.target_llm, "prompt": self.prompt, "kwargs": self.kwargs,
+                "agent_name": self.agent_name, "priority": self.priority}
+
+
+def iter_items(lines: Iterable[str], start: int = 0) -> Iterator[BatchItem]:
+    """Liest JSONL zeilenweise; leere Zeilen zählen nicht, kaputte Zeilen werden ungültige Einträge."""
+    index = start
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            entry = json_codec.loads(line)
+        except json_codec.JSONDecodeError as e:
+            yield BatchItem(index, error=f"Invalid JSON: {e}")
+        else:
+            yield BatchItem.from_entry(index, entry)
+        index += 1
+
+
+def parse_items(body: str) -> Iterator[BatchItem]:
+    """Erkennt JSON-Array oder JSONL am ersten Zeichen."""
+    if body.lstrip().startswith("["):
+        try:
+            entries = json_codec.loads(body)
+        except json_codec.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON array: {e}") from None
+        return (BatchItem.from_entry(index, entry) for index, entry in enumerate(entries))
+    return iter_items(body.splitlines())
+
+
+def _percentile(ordered: list, p: float) -> Optional[float]:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class BatchStats:
+    """Zähler und Latenzen eines Batches für die abschließende Zusammenfassung."""
+
+    def __init__(self, batch_id: str, concurrency: int):
+        self.batch_id = batch_id
+        self.concurrency = concurrency
+        self.started = time.perf_counter()
+        self.counts = {"ok": 0, "error": 0, "invalid": 0}
+        self.errors: Dict[str, int] = {}
+        self.latencies: list = []
+
+    def add(self, result: dict) -> None:
+        self.counts[result["status"]] += 1
+        if result["status"] == "ok":
+            self.latencies.append(result["latency_ms"])
+        elif result["status"] == "error":
+            self.errors[result["error_type"]] = self.errors.get(result["error_type"], 0) + 1
+
+    def summary(self) -> dict:
+        duration = time.perf_counter() - self.started
+        total = sum(self.counts.values())
+        ordered = sorted(self.latencies)
+        return {
+            "type": "summary",
+            "batch_id": self.batch_id,
+            "total": total,
+            "succeeded": self.counts["ok"],
+            "failed": self.counts["error"],
+            "invalid": self.counts["invalid"],
+            "errors": self.errors,
+            "concurrency": self.concurrency,
+            "duration_seconds": round(duration, 3),
+            "items_per_second": round(total / duration, 2) if duration > 0 else 0.0,
+            "latency_ms": {"p50": _percentile(ordered, 50), "p95": _percentile(ordered, 95),
+                           "max": ordered[-1] if ordered else None},
+        }
+
+
+async def run_item(router: Any, item: BatchItem, batch_id: str) -> dict:
+    """Schickt einen Eintrag durch den Router; Fehler werden zum Ergebnis, nicht zur Exception."""
+    result = {"type": "result", "index": item.index, "id": item.id}
+    if item.error:
+        return {**result, "status": "invalid", "error": item.error}
+
+    conversation_id = f"batch_{batch_id}_{item.index}"
+    extra = {"priority": item.priority} if item.priority else {}
+    started = time.perf_counter()
+    try:
+        response = await router.route_message(
+            conversation_id=conversation_id,
+            target_llm_name=item.target_llm,
+            prompt=item.prompt,
+            agent_name=item.agent_name,
+            **extra,
+            **item.kwargs
+        )
+        state_machine = router.active_conversations.get(conversation_id)
+        return {**result, "status": "ok", "target_llm": item.target_llm,
+                "served_by": getattr(state_machine, "served_by", None), "response": response,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as e:
+        return {**result, "status": "error", "target_llm": item.target_llm,
+                "error": str(e), "error_type": type(e).__name__,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    finally:
+        # Batch-Konversationen nicht im Router-Zustand behalten
+        router.active_conversations.pop(conversation_id, None)
+
+
+def max_batch_items() -> int:
+    """Obergrenze für Einträge pro Batch-Anfrage (``BATCH_MAX_ITEMS``)."""
+    return int(os.getenv("BATCH_MAX_ITEMS", str(DEFAULT_BATCH_MAX_ITEMS)))
+
+
+def resolve_concurrency(concurrency: Optional[int]) -> int:
+    """Angefragte Parallelität, begrenzt durch BATCH_MAX_CONCURRENCY."""
+    default = int(os.getenv("BATCH_DEFAULT_CONCURRENCY", str(DEFAULT_BATCH_CONCURRENCY)))
+    maximum = int(os.getenv("BATCH_MAX_CONCURRENCY", "64"))
+    return max(1, min(concurrency or default, maximum))
+
+
+async def run_batch(router: Any, items: Iterable[BatchItem], concurrency: Optional[int] = None,
+                    batch_id: Optional[str] = None) -> AsyncIterator[dict]:
+    """
+    Führt die Einträge mit höchstens ``concurrency`` gleichzeitigen Anfragen aus.
+
+    Liefert jedes Ergebnis, sobald es vorliegt, und zum Schluss die
+    Zusammenfassung (``"type": "summary"``). Wird der Iterator vorzeitig
+    geschlossen (z.B. Client-Abbruch), werden laufende Anfragen abgebrochen.
+    """
+    batch_id = batch_id or uuid.uuid4().hex[:8]
+    concurrency = resolve_concurrency(concurrency)
+    stats = BatchStats(batch_id, concurrency)
+    # Begrenzte Queue: liest der Konsument langsam, pausieren die Worker statt Ergebnisse zu puffern
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    source = iter(items)
+
+    async def worker() -> None:
+        # Die Worker teilen sich einen Iterator; große Eingaben werden dadurch gestreamt
+        for item in source:
+            await results.put(await run_item(router, item, batch_id))
+
+    async def supervise() -> None:
+        try:
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        finally:
+            await results.put(None)
+
+    supervisor = asyncio.ensure_future(supervise())
+    try:
+        while True:
+            result = await results.get()
+            if result is None:
+                break
+            stats.add(result)
+            yield result
+        # Fehler beim Lesen der Eingabe nicht verschlucken
+        supervisor.result()
+        print(f"📦 [Batch] {batch_id}: {stats.counts['ok']}/{sum(stats.counts.values())} erfolgreich")
+        yield stats.summary()
+    finally:
+        if not supervisor.done():
+            supervisor.cancel()
+            await asyncio.gather(supervisor, return_exceptions=True)
@@ -0,0 +1,151 @@
+# llm_bridge/batch/store.py
+"""
+Persistenz der Batch-Jobs.
+
+Ein Job besteht aus einem Verzeichnis unter ``BATCH_JOB_DIR`` mit der
+Eingabe (``input.jsonl``) und den Ergebnissen (``output.jsonl``) sowie einem
+Job-Datensatz mit Status und Fortschritt. Der Datensatz liegt entweder im
+Job-Verzeichnis (``job.json``, Standard) oder in Redis (``BATCH_JOB_STORE=redis``),
+damit Status-Abfragen von jeder Replika aus funktionieren. Das Job-Verzeichnis
+muss in beiden Fällen einen Neustart überleben (Volume).
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+JOB_KEY_PREFIX = "llm_bridge:batch_job:"
+JOBS_INDEX_KEY = "llm_bridge:batch_jobs"
+ACTIVE_JOBS_SET_KEY = "llm_bridge:active_batch_jobs"
+FINISHED_JOB_TTL_SECONDS = 7 * 24 * 3600
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class BatchJob:
+    """Status und Fortschritt eines Batch-Jobs (der Checkpoint)."""
+
+    __slots__ = ("id", "status", "total", "processed", "succeeded", "failed", "invalid", "errors", "concurrency",
+                 "created_at", "started_at", "updated_at", "finished_at", "items_per_second", "error")
+
+    def __init__(self, id: str, total: int = 0, concurrency: Optional[int] = None, status: str = "queued"):
+        self.id = id
+        self.status = status
+        self.total = total
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.invalid = 0
+        self.errors: Dict[str, int] = {}
+        self.concurrency = concurrency
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.updated_at = self.created_at
+        self.finished_at: Optional[float] = None
+        self.items_per_second = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in self.__slots__}
+        remaining = self.total - self.processed
+        data["eta_seconds"] = (round(remaining / self.items_per_second)
+                               if self.status == "running" and self.items_per_second > 0 else None)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchJob":
+        job = cls(data["id"])
+        for field in cls.__slots__:
+            if field in data:
+                setattr(job, field, data[field])
+        return job
+
+
+def jobs_root() -> Path:
+    return Path(os.getenv("BATCH_JOB_DIR", "batch_jobs"))
+
+
+def resolve_job_dir(job_id: str, create: bool = False) -> Path:
+    """Verzeichnis eines Jobs unter ``BATCH_JOB_DIR``; Verzeichnisanteile in der ID werden verworfen."""
+    directory = jobs_root() / Path(job_id).name
+    if create:
+        directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+class FileJobStore:
+    """Job-Datensätze als ``job.json`` im Job-Verzeichnis (Single-Node)."""
+
+    name = "file"
+
+    async def save(self, job: BatchJob) -> None:
+        path = resolve_job_dir(job.id, create=True) / "job.json"
+        tmp = path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(job.to_dict(), f)
+        # Atomar ersetzen: ein Absturz beim Schreiben hinterlässt den vorherigen Checkpoint
+        os.replace(tmp, path)
+
+    async def get(self, job_id: str) -> Optional[BatchJob]:
+        path = resolve_job_dir(job_id) / "job.json"
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return BatchJob.from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    async def list(self) -> List[BatchJob]:
+        directory = jobs_root()
+        if not directory.exists():
+            return []
+        jobs = [await self.get(path.name) for path in directory.iterdir() if path.is_dir()]
+        return sorted((job for job in jobs if job), key=lambda job: job.created_at)
+
+    async def list_active_ids(self) -> List[str]:
+        return [job.id for job in await self.list() if job.status in ACTIVE_STATUSES]
+
+
+class RedisJobStore:
+    """Job-Datensätze in Redis; aktive Jobs zusätzlich in einem Set (wie bei den Missionen)."""
+
+    name = "redis"
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    async def save(self, job: BatchJob) -> None:
+        key = f"{JOB_KEY_PREFIX}{job.id}"
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.set(key, json.dumps(job.to_dict()), ex=FINISHED_JOB_TTL_SECONDS if job.finished else None)
+            pipe.zadd(JOBS_INDEX_KEY, {job.id: job.created_at})
+            if job.finished:
+                pipe.srem(ACTIVE_JOBS_SET_KEY, job.id)
+            else:
+                pipe.sadd(ACTIVE_JOBS_SET_KEY, job.id)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[BatchJob]:
+        data = await self._client.get(f"{JOB_KEY_PREFIX}{job_id}")
+        return BatchJob.from_dict(json.loads(data)) if data else None
+
+    async def list(self) -> List[BatchJob]:
+        job_ids = await self._client.zrange(JOBS_INDEX_KEY, 0, -1)
+        jobs = []
+        for job_id in job_ids:
+            job = await self.get(job_id)
+            if job is None:
+                # Datensatz abgelaufen: Index nachziehen
+                await self._client.zrem(JOBS_INDEX_KEY, job_id)
+            else:
+                jobs.append(job)
+        return jobs
+
+    async def list_active_ids(self) -> List[str]:
+        return list(await self._client.smembers(ACTIVE_JOBS_SET_KEY))
@@ -0,0 +1,4 @@
+# llm_bridge/caching/__init__.py
+"""
+Caching-Subsystem der Bridge: Health-Prüfung und Verwaltung des Response-Caches.
+"""
@@ -0,0 +1,197 @@
+# llm_bridge/caching/compression.py
+"""
+Kompression der Cache-Werte in Redis.
+
+Redis ist in docker-compose auf 256mb mit ``allkeys-lru`` begrenzt; lange
+LLM-Antworten verdrängen dort viele nützliche Einträge. Werte oberhalb einer
+Größenschwelle werden daher komprimiert (zstd, falls installiert, sonst zlib)
+und mit einem kleinen Text-Header abgelegt:
+
+    LB1;t=<Speicherzeitpunkt>;c=<codec>;n=<Originallänge>;<base64-Payload>
+    LB1;t=<Speicherzeitpunkt>;<JSON-Payload>
+
+Alle Header-Felder sind optional; ohne ``c=`` ist der Payload unkomprimiertes
+JSON. Der Speicherzeitpunkt (Unix-Zeit) wird für Stale-While-Revalidate
+benötigt. Base64 ist nötig, weil die Redis-Clients mit ``decode_responses=True``
+arbeiten. Werte ohne Header werden weiterhin als rohes JSON gelesen, damit
+bestehende Einträge nach einem Update gültig bleiben.
+"""
+
+import base64
+import os
+import zlib
+from typing import Any, Optional, Tuple
+
+from ..utils import json_codec
+
+try:
+    import zstandard
+except ImportError:  # Optional: pip install zstandard
+    zstandard = None
+
+HEADER_MAGIC = "LB1;"
+
+_zstd_compressor = zstandard.ZstdCompressor(level=3) if zstandard else None
+_zstd_decompressor = zstandard.ZstdDecompressor() if zstandard else None
+
+
+def default_codec() -> str:
+    """zstd, falls verfügbar, sonst zlib (überschreibbar per CACHE_COMPRESSION_CODEC)."""
+    codec = os.getenv("CACHE_COMPRESSION_CODEC")
+    if codec:
+        return codec
+    return "zstd" if zstandard else "zlib"
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        return _zstd_compressor.compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, 6)
+    raise ValueError(f"Unbekannter Kompressions-Codec: '{codec}'")
+
+
+def _decompress(codec: str, data: bytes, original_length: int) -> bytes:
+    if codec == "zstd":
+        if _zstd_decompressor is None:
+            raise ValueError("Cache-Wert ist mit zstd komprimiert, aber 'zstandard' ist nicht installiert")
+        return _zstd_decompressor.decompress(data, max_output_size=original_length)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unbekannter Kompressions-Codec: '{codec}'")
+
+
+class CacheValueCodec:
+    """
+    Kodiert Cache-Werte für Redis und führt Buch über die Einsparung.
+
+    Einträge oberhalb von ``max_entry_bytes`` werden gar nicht gecacht
+    (``encode`` gibt dann None zurück).
+    """
+
+    def __init__(self,
+                 codec: Optional[str] = None,
+                 min_bytes: Optional[int] = None,
+                 max_entry_bytes: Optional[int] = None):
+        """
+        Args:
+            codec: 'zstd' oder 'zlib'; standardmäßig zstd, falls installiert.
+            min_bytes: Werte ab dieser Größe werden komprimiert (0 = immer).
+            max_entry_bytes: Werte oberhalb dieser Größe werden nicht gecacht (0 = unbegrenzt).
+        """
+        self.codec = codec or default_codec()
+        if self.codec == "zstd" and zstandard is None:
+            print("⚠️ [Cache] 'zstandard' nicht installiert, verwende zlib")
+            self.codec = "zlib"
+        self.min_bytes = min_bytes if min_bytes is not None else int(os.getenv("CACHE_COMPRESSION_MIN_BYTES", "1024"))
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else int(os.getenv("CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+
+        self.compressed_entries = 0
+        self.uncompressed_entries = 0
+        self.skipped_too_large = 0
+        self.original_bytes = 0
+        self.stored_bytes = 0
+
+    def exceeds_max_size(self, value: Any, max_entry_bytes: Optional[int] = None) -> bool:
+        """
+        Schnelle Vorprüfung für Strings, bevor L1 oder Redis beschrieben werden.
+        Übergroße Werte werden dabei als übersprungen gezählt. Gemessen wird in
+        UTF-8-Bytes wie bei ``encode``: Umlaute, CJK und Emoji belegen mehr als
+        ein Byte pro Zeichen.
+
+        Args:
+            max_entry_bytes: Grenze aus der Cache-Policy; sonst die globale.
+        """
+        limit = self.max_entry_bytes if max_entry_bytes is None else max_entry_bytes
+        if limit and isinstance(value, str) and len(value.encode("utf-8")) > limit:
+            self.skipped_too_large += 1
+            return True
+        return False
+
+    def encode(self, value: Any, max_entry_bytes: Optional[int] = None,
+               stored_at: Optional[float] = None) -> Optional[str]:
+        """
+        Serialisiert und ggf. komprimiert einen Wert; None, wenn er zu groß ist.
+
+        Args:
+            max_entry_bytes: Größengrenze aus der Cache-Policy; sonst die globale.
+            stored_at: Speicherzeitpunkt (Unix-Zeit), der im Header abgelegt wird.
+        """
+        limit = self.max_entry_bytes if max_entry_bytes is None else max_entry_bytes
+        payload = json_codec.dumpb(value)
+        original_length = len(payload)
+        if limit and original_length > limit:
+            self.skipped_too_large += 1
+            return None
+
+        header = HEADER_MAGIC if stored_at is None else f"{HEADER_MAGIC}t={stored_at:.3f};"
+        plain = payload.decode("utf-8")
+        if stored_at is not None:
+            plain = header + plain
+
+        encoded = None
+        if original_length >= self.min_bytes:
+            compressed = base64.b64encode(_compress(self.codec, payload)).decode("ascii")
+            candidate = f"{header}c={self.codec};n={original_length};{compressed}"
+            # Nur verwenden, wenn es tatsächlich kleiner ist
+            if len(candidate) < len(plain):
+                encoded = candidate
+
+        if encoded is None:
+            encoded = plain
+            self.uncompressed_entries += 1
+        else:
+            self.compressed_entries += 1
+
+        self.original_bytes += original_length
+        self.stored_bytes += len(encoded)
+        return encoded
+
+    @staticmethod
+    def decode(raw: str) -> Any:
+        """Liest Werte mit Header sowie rohes JSON (Altbestand)."""
+        return CacheValueCodec.decode_entry(raw)[0]
+
+    @staticmethod
+    def decode_entry(raw: str) -> Tuple[Any, Optional[float]]:
+        """Liest einen Wert samt Speicherzeitpunkt (None bei Einträgen ohne ``t=``)."""
+        if not raw.startswith(HEADER_MAGIC):
+            return json_codec.loads(raw), None
+
+        header, payload = parse_header(raw)
+        stored_at = float(header["t"]) if "t" in header else None
+        if "c" in header:
+            payload = _decompress(header["c"], base64.b64decode(payload), int(header["n"]))
+        return json_codec.loads(payload), stored_at
+
+    def get_stats(self) -> dict:
+        saved = self.original_bytes - self.stored_bytes
+        return {
+            "codec": self.codec,
+            "min_bytes": self.min_bytes,
+            "max_entry_bytes": self.max_entry_bytes,
+            "compressed_entries": self.compressed_entries,
+            "uncompressed_entries": self.uncompressed_entries,
+            "skipped_too_large": self.skipped_too_large,
+            "original_bytes": self.original_bytes,
+            "stored_bytes": self.stored_bytes,
+            "bytes_saved": saved,
+            "compression_ratio": round(self.original_bytes / self.stored_bytes, 3) if self.stored_bytes else 1.0,
+        }
+
+
+def parse_header(raw: str) -> Tuple[dict, str]:
+    """
+    Zerlegt ``LB1;k=v;...;<payload>`` in Header-Felder und Payload.
+    Header-Felder haben einen Namen aus Kleinbuchstaben; JSON-Payloads beginnen
+    nie so und können daher selbst ';' und '=' enthalten.
+    """
+    fields = {}
+    rest = raw[len(HEADER_MAGIC):]
+    while True:
+        part, sep, remainder = rest.partition(";")
+        name, eq, value = part.partition("=")
+        if not sep or not eq or not (name.isalpha() and name.islower()):
+            return fields, rest
+        fields[name] = value
+        rest = remainder
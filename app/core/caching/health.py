@@ -0,0 +1,162 @@
+# llm_bridge/caching/health.py
+"""
+Hintergrund-Health-Prüfung für den Redis-Cache.
+
+Statt vor jedem gerouteten Request ein PING an Redis zu schicken, überwacht ein
+Hintergrund-Task die Erreichbarkeit und pflegt ein einfaches In-Memory-Flag.
+Der Hot-Path liest nur dieses Flag und verursacht dadurch keinen zusätzlichen
+Round-Trip. Fällt Redis aus, wird der Cache automatisch deaktiviert und mit
+Exponential Backoff erneut geprüft, bis er wieder erreichbar ist.
+"""
+
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
+
+from ..utils.task_manager import create_background_task
+
+
+class CacheHealthProber:
+    """
+    Überwacht die Erreichbarkeit eines Caches über eine Probe-Coroutine.
+
+    Der Zustand ``available`` ist bewusst ein reines Attribut-Lesen, damit der
+    Hot-Path im Router ohne Netzwerkzugriff entscheiden kann, ob er den Cache
+    überhaupt anspricht.
+    """
+
+    def __init__(
+        self,
+        probe: Callable[[], Awaitable[Any]],
+        name: str = "redis",
+        interval_seconds: Optional[float] = None,
+        timeout_seconds: Optional[float] = None,
+        max_backoff_seconds: Optional[float] = None,
+    ):
+        """
+        Args:
+            probe: Coroutine-Funktion, die bei Erfolg zurückkehrt und bei einem
+                   Fehler eine Exception wirft (z.B. ``redis_client.ping``).
+            name: Name für Logs und Status-Ausgaben.
+            interval_seconds: Prüfintervall bei gesundem Cache.
+            timeout_seconds: Maximale Dauer einer einzelnen Probe.
+            max_backoff_seconds: Obergrenze für das Backoff bei Ausfällen.
+        """
+        self._probe = probe
+        self.name = name
+        self._interval = interval_seconds or float(os.getenv("CACHE_PROBE_INTERVAL_SECONDS", "5"))
+        self._timeout = timeout_seconds or float(os.getenv("CACHE_PROBE_TIMEOUT_SECONDS", "0.5"))
+        self._max_backoff = max_backoff_seconds or float(os.getenv("CACHE_PROBE_MAX_BACKOFF_SECONDS", "60"))
+
+        # Bis zur ersten erfolgreichen Probe gilt der Cache als nicht verfügbar,
+        # damit ein toter Redis beim Start keine Request-Latenz kostet.
+        self._available = False
+        self._consecutive_failures = 0
+        self._last_success_at: Optional[datetime] = None
+        self._last_failure_at: Optional[datetime] = None
+        self._last_error: Optional[str] = None
+        self._last_latency_ms: Optional[float] = None
+        self._next_probe_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def available(self) -> bool:
+        """Schnelles In-Memory-Flag für den Hot-Path."""
+        return self._available
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Startet den Hintergrund-Task, falls er noch nicht läuft (idempotent)."""
+        if self.is_running:
+            return
+        self._task = create_background_task(self._run(), name=f"cache-prober-{self.name}")
+
+    async def stop(self) -> None:
+        """Beendet den Hintergrund-Task sauber."""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def report_failure(self, error: Exception) -> None:
+        """
+        Wird vom Hot-Path bei einem Cache-Fehler aufgerufen.
+        Deaktiviert den Cache sofort; die Wieder-Aktivierung übernimmt die Probe.
+        """
+        if self._available:
+            print(f"⚠️ [Cache] '{self.name}' nach Fehler im Request-Pfad deaktiviert: {error}")
+        self._mark_failure(error)
+
+    async def probe_once(self) -> bool:
+        """Führt eine einzelne Probe aus und aktualisiert den Zustand."""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._probe(), timeout=self._timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            was_available = self._available
+            self._mark_failure(e)
+            if was_available:
+                print(f"⚠️ [Cache] '{self.name}' nicht erreichbar, Cache deaktiviert: {e!r}")
+            return False
+
+        self._last_latency_ms = (time.perf_counter() - started) * 1000
+        if not self._available:
+            if self._consecutive_failures:
+                print(f"✅ [Cache] '{self.name}' wieder erreichbar, Cache reaktiviert "
+                      f"(nach {self._consecutive_failures} Fehlversuchen)")
+            else:
+                print(f"✅ [Cache] '{self.name}' erreichbar, Cache aktiviert")
+        self._available = True
+        self._consecutive_failures = 0
+        self._last_success_at = datetime.now()
+        return True
+
+    def _mark_failure(self, error: Exception) -> None:
+        self._available = False
+        self._consecutive_failures += 1
+        self._last_failure_at = datetime.now()
+        self._last_error = str(error) or type(error).__name__
+
+    def _next_delay(self) -> float:
+        """Intervall bei Erfolg, Exponential Backoff mit Jitter bei Fehlern."""
+        if self._consecutive_failures == 0:
+            return self._interval
+        backoff = self._interval * (2 ** (self._consecutive_failures - 1))
+        return min(backoff, self._max_backoff) * random.uniform(0.8, 1.2)
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe_once()
+            delay = self._next_delay()
+            self._next_probe_at = time.monotonic() + delay
+            await asyncio.sleep(delay)
+
+    def get_status(self) -> dict:
+        """Gibt den aktuellen Zustand für API und Monitoring zurück."""
+        next_probe_in = None
+        if self._next_probe_at is not None:
+            next_probe_in = max(0.0, round(self._next_probe_at - time.monotonic(), 2))
+        return {
+            "name": self.name,
+            "available": self._available,
+            "running": self.is_running,
+            "consecutive_failures": self._consecutive_failures,
+            "last_success_at": self._last_success_at.isoformat() if self._last_success_at else None,
+            "last_failure_at": self._last_failure_at.isoformat() if self._last_failure_at else None,
+            "last_error": self._last_error,
+            "last_probe_latency_ms": round(self._last_latency_ms, 2) if self._last_latency_ms is not None else None,
+            "next_probe_in_seconds": next_probe_in,
+            "interval_seconds": self._interval,
+            "max_backoff_seconds": self._max_backoff,
+        }
@@ -0,0 +1,161 @@
+# llm_bridge/caching/local_cache.py
+"""
+In-Process L1-Cache für LLM-Antworten.
+
+Ein begrenzter LRU-Cache mit Byte-Budget und TTL pro Eintrag, der vor den
+Redis-Schlüsseln ``llm_response:*`` sitzt. Treffer werden ohne Netzwerkzugriff
+und ohne ``json.loads`` bedient, weil die bereits dekodierte Antwort im Speicher
+liegt.
+"""
+
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+
+class _LocalEntry:
+    __slots__ = ("value", "size", "expires_at", "stored_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float, stored_at: float):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.stored_at = stored_at
+
+
+class LocalResponseCache:
+    """
+    LRU-Cache mit Byte-Budget und TTL pro Eintrag.
+
+    Die Größe eines Eintrags wird über ``sys.getsizeof`` von Schlüssel und Wert
+    geschätzt. Das ist für Strings exakt genug und kostet keine zusätzliche
+    Serialisierung im Hot-Path.
+    """
+
+    def __init__(self,
+                 max_bytes: Optional[int] = None,
+                 default_ttl_seconds: Optional[float] = None,
+                 max_entry_bytes: Optional[int] = None):
+        """
+        Args:
+            max_bytes: Gesamtbudget des Caches in Bytes (0 deaktiviert den Cache).
+            default_ttl_seconds: TTL, falls beim Speichern keine angegeben wird.
+            max_entry_bytes: Einträge oberhalb dieser Größe werden nicht lokal gehalten.
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+        self.default_ttl = default_ttl_seconds if default_ttl_seconds is not None else float(os.getenv("CACHE_L1_TTL_SECONDS", "300"))
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else int(os.getenv("CACHE_L1_MAX_ENTRY_BYTES", str(self.max_bytes // 8)))
+
+        self._entries: "OrderedDict[str, _LocalEntry]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Liefert den Wert oder None; abgelaufene Einträge werden dabei entfernt."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Liefert (Wert, Speicherzeitpunkt als Unix-Zeit) oder None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value, entry.stored_at
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None,
+            stored_at: Optional[float] = None) -> bool:
+        """
+        Speichert einen Wert. Gibt False zurück, wenn der Eintrag das Budget
+        für einzelne Einträge sprengt und daher nicht lokal gehalten wird.
+
+        Args:
+            stored_at: Ursprünglicher Speicherzeitpunkt (Unix-Zeit), z.B. aus Redis;
+                       standardmäßig jetzt.
+        """
+        if not self.enabled:
+            return False
+
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            self.rejected += 1
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.default_ttl if ttl_seconds is None else min(ttl_seconds, self.default_ttl)
+        self._entries[key] = _LocalEntry(value, size, time.monotonic() + ttl,
+                                         stored_at if stored_at is not None else time.time())
+        self._bytes += size
+
+        # LRU-Verdrängung, bis das Byte-Budget wieder eingehalten wird
+        while self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+        return True
+
+    def delete(self, key: str) -> bool:
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+        }
+
+
+# Globale L1-Instanz, die sich beide Router-Implementierungen teilen
+_local_response_cache: Optional[LocalResponseCache] = None
+
+
+def get_local_response_cache() -> LocalResponseCache:
+    """Gibt die prozessweite L1-Cache-Instanz zurück."""
+    global _local_response_cache
+    if _local_response_cache is None:
+        _local_response_cache = LocalResponseCache()
+    return _local_response_cache
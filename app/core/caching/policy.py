@@ -0,0 +1,116 @@
+# llm_bridge/caching/policy.py
+"""
+Cache-Policies pro Modell und pro Agent.
+
+Die ``cache``-Blöcke aus ``registry.yaml`` werden beim Start des Routers einmal
+zu einer Lookup-Tabelle ``(Modell, Agent) -> CachePolicy`` aufgelöst. Im
+Hot-Path ist die Auflösung damit ein einzelner Dict-Zugriff.
+
+Vererbung: globale Defaults -> Modell-Policy -> Agent-Policy. Nicht gesetzte
+Felder (None) werden von der jeweils übergeordneten Ebene übernommen.
+
+Mit ``soft_ttl_seconds`` arbeitet der Cache im Stale-While-Revalidate-Modus:
+Einträge älter als die Soft-TTL werden sofort ausgeliefert und im Hintergrund
+erneuert; ``ttl_seconds`` ist die harte TTL, nach der der Eintrag verfällt.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+
+class CachePolicy:
+    """Aufgelöste Cache-Policy für eine Kombination aus Modell und Agent."""
+
+    __slots__ = ("enabled", "ttl_seconds", "deterministic_only", "max_entry_bytes", "soft_ttl_seconds")
+
+    def __init__(self, enabled: bool, ttl_seconds: int, deterministic_only: bool,
+                 max_entry_bytes: Optional[int], soft_ttl_seconds: Optional[int] = None):
+        self.enabled = enabled
+        self.ttl_seconds = ttl_seconds
+        self.deterministic_only = deterministic_only
+        self.max_entry_bytes = max_entry_bytes
+        self.soft_ttl_seconds = soft_ttl_seconds
+
+    def allows(self, kwargs: Dict[str, Any]) -> bool:
+        """
+        Darf eine Anfrage mit diesen Parametern gecacht werden?
+
+        Bei ``deterministic_only`` nur mit explizitem ``temperature == 0``; ohne
+        Angabe gilt der (nicht-deterministische) Provider-Default.
+        """
+        if not self.enabled:
+            return False
+        if self.deterministic_only and kwargs.get("temperature") != 0:
+            return False
+        return True
+
+    def is_stale(self, age_seconds: Optional[float]) -> bool:
+        """Ist ein Treffer dieses Alters älter als die Soft-TTL (nur im SWR-Modus)?"""
+        if self.soft_ttl_seconds is None or age_seconds is None:
+            return False
+        return age_seconds > self.soft_ttl_seconds
+
+    def merged(self, overrides: Any) -> "CachePolicy":
+        """Neue Policy, bei der die gesetzten Felder aus ``overrides`` Vorrang haben."""
+        if not isinstance(overrides, dict):
+            return self
+
+        def pick(field: str, current: Any) -> Any:
+            value = overrides.get(field)
+            return current if value is None else value
+
+        return CachePolicy(
+            enabled=pick("enabled", self.enabled),
+            ttl_seconds=int(pick("ttl_seconds", self.ttl_seconds)),
+            deterministic_only=pick("deterministic_only", self.deterministic_only),
+            max_entry_bytes=pick("max_entry_bytes", self.max_entry_bytes),
+            soft_ttl_seconds=pick("soft_ttl_seconds", self.soft_ttl_seconds),
+        )
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class CachePolicyTable:
+    """Vorberechnete Lookup-Tabelle ``(Modell, Agent) -> CachePolicy``."""
+
+    def __init__(self,
+                 model_config: Dict[str, Any],
+                 agent_config: Optional[Dict[str, Any]] = None,
+                 default_ttl_seconds: Optional[int] = None):
+        """
+        Args:
+            model_config: Modell-Konfigurationen (Dicts mit optionalem ``cache``-Block).
+            agent_config: Agenten-Konfigurationen (Dicts mit ``model`` und optionalem ``cache``-Block).
+            default_ttl_seconds: Globale TTL; standardmäßig ``CACHE_TTL_SECONDS``.
+        """
+        ttl = default_ttl_seconds if default_ttl_seconds is not None else int(os.getenv("CACHE_TTL_SECONDS", "86400"))
+        soft_ttl = os.getenv("CACHE_SOFT_TTL_SECONDS")
+        self.default = CachePolicy(enabled=True, ttl_seconds=ttl, deterministic_only=False, max_entry_bytes=None,
+                                   soft_ttl_seconds=int(soft_ttl) if soft_ttl else None)
+        self._table: Dict[Tuple[str, Optional[str]], CachePolicy] = {}
+
+        for model_name, config in model_config.items():
+            if isinstance(config, dict):
+                self._table[(model_name, None)] = self.default.merged(config.get("cache"))
+
+        for agent_name, config in (agent_config or {}).items():
+            if not isinstance(config, dict) or not config.get("model"):
+                continue
+            model_policy = self._table.get((config["model"], None), self.default)
+            self._table[(config["model"], agent_name)] = model_policy.merged(config.get("cache"))
+
+    def resolve(self, model_name: str, agent_name: Optional[str] = None) -> CachePolicy:
+        """Policy für ein Modell, ggf. mit den Overrides des aufrufenden Agenten."""
+        if agent_name is not None:
+            policy = self._table.get((model_name, agent_name))
+            if policy is not None:
+                return policy
+        return self._table.get((model_name, None), self.default)
+
+    def to_dict(self) -> dict:
+        """Übersicht aller aufgelösten Policies, z.B. für die Status-API."""
+        return {
+            (f"{model}:{agent}" if agent else model): policy.to_dict()
+            for (model, agent), policy in self._table.items()
+        }
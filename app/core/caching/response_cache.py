@@ -0,0 +1,329 @@
+# llm_bridge/caching/response_cache.py
+"""
+Zweistufiger Response-Cache für die Router.
+
+L1 ist der prozessweite In-Memory-Cache (``LocalResponseCache``), L2 sind die
+Redis-Schlüssel ``llm_response:*``. Beide Router-Implementierungen nutzen diese
+Klasse, damit Schlüsselbildung, Tier-Reihenfolge und Zähler identisch sind.
+Für Modelle mit aktiviertem ``similarity_cache`` verweist zusätzlich ein
+Similarity-Index von nahezu identischen Prompts auf vorhandene Einträge.
+Redis-Werte werden oberhalb einer Größenschwelle komprimiert abgelegt.
+
+Jeder Redis-Eintrag wird zusätzlich in Tag-Indizes (``llm_response_tag:model:<name>``,
+``llm_response_tag:adapter:<service>``) eingetragen. Das sind Sorted Sets mit
+dem Ablaufzeitpunkt als Score; abgelaufene Mitglieder werden bei jedem
+Schreiben entfernt. Damit lassen sich nach einem Modell-Upgrade gezielt die
+Einträge eines Modells löschen, ohne Redis komplett zu leeren.
+"""
+
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ..utils import json_codec
+from .compression import CacheValueCodec
+from .health import CacheHealthProber
+from .local_cache import LocalResponseCache, get_local_response_cache
+from .similarity import SimilarityIndex, SimilaritySettings, get_similarity_index
+
+CACHE_KEY_PREFIX = "llm_response:"
+CACHE_TAG_PREFIX = "llm_response_tag:"
+
+
+def _escape_pattern(value: str) -> str:
+    """Maskiert Glob-Sonderzeichen für SCAN MATCH."""
+    for char in "\\*?[]":
+        value = value.replace(char, "\\" + char)
+    return value
+
+
+class CacheHit(NamedTuple):
+    """
+    Ein Cache-Treffer samt der Stufe, aus der er stammt ('local' oder 'redis'),
+    der Art des Treffers ('exact' oder 'approximate') und dem Speicherzeitpunkt
+    (Unix-Zeit; None bei Alteinträgen ohne Zeitstempel).
+    """
+    value: Any
+    tier: str
+    match: str = "exact"
+    stored_at: Optional[float] = None
+
+    @property
+    def age_seconds(self) -> Optional[float]:
+        return time.time() - self.stored_at if self.stored_at is not None else None
+
+
+class ResponseCache:
+    """
+    Fassade über L1 (In-Process) und L2 (Redis).
+
+    Lesen: L1 -> Redis (Treffer werden in L1 übernommen).
+    Schreiben: L1 und Redis.
+    Ob Redis angesprochen wird, entscheidet allein das Flag des Health-Probers.
+    """
+
+    def __init__(self,
+                 client: Any = None,
+                 connect: Optional[Callable[[], Awaitable[Any]]] = None,
+                 local: Optional[LocalResponseCache] = None,
+                 similarity: Optional[SimilarityIndex] = None,
+                 codec: Optional[CacheValueCodec] = None,
+                 name: str = "response-cache"):
+        """
+        Args:
+            client: Bereits erstellter Redis-Client (optional).
+            connect: Coroutine-Funktion, die einen Redis-Client liefert; wird von
+                     der Health-Probe genutzt, solange kein Client existiert.
+            local: L1-Cache; standardmäßig die prozessweit geteilte Instanz.
+            similarity: Similarity-Index; standardmäßig die prozessweit geteilte Instanz.
+            codec: Serialisierung/Kompression der Redis-Werte.
+            name: Name für Logs und Status-Ausgaben.
+        """
+        self.local = local if local is not None else get_local_response_cache()
+        self.similarity = similarity if similarity is not None else get_similarity_index()
+        self.codec = codec or CacheValueCodec()
+        self._client = client
+        self._connect = connect
+        self.prober: Optional[CacheHealthProber] = None
+        if client is not None or connect is not None:
+            self.prober = CacheHealthProber(self._probe, name=name)
+
+        # Zähler für die Redis-Stufe (L1 zählt selbst)
+        self.redis_hits = 0
+        self.redis_misses = 0
+        self.redis_writes = 0
+        self.redis_errors = 0
+        self.redis_skipped = 0
+
+    @staticmethod
+    def make_key(target_llm: str, prompt: str, kwargs: Dict[str, Any]) -> str:
+        """Erzeugt den sha256-basierten Cache-Schlüssel für eine Anfrage."""
+        cache_data = f"{target_llm}:{prompt}:{json_codec.dumps(kwargs, sort_keys=True)}"
+        return f"{CACHE_KEY_PREFIX}{hashlib.sha256(cache_data.encode()).hexdigest()}"
+
+    @staticmethod
+    def make_scope(target_llm: str, kwargs: Dict[str, Any]) -> str:
+        """Bereich für den Similarity-Index: gleiches Zielmodell, gleiche Parameter."""
+        scope_data = f"{target_llm}:{json_codec.dumps(kwargs, sort_keys=True)}"
+        return hashlib.sha256(scope_data.encode()).hexdigest()
+
+    @staticmethod
+    def make_tags(target_llm: str, adapter_service: Optional[str] = None) -> Tuple[str, ...]:
+        """Tags, unter denen ein Eintrag für die Invalidierung indiziert wird."""
+        tags = [f"model:{target_llm}"]
+        if adapter_service:
+            tags.append(f"adapter:{adapter_service}")
+        return tuple(tags)
+
+    @property
+    def enabled(self) -> bool:
+        return self.local.enabled or self.prober is not None
+
+    async def _probe(self) -> None:
+        client = self._client
+        if client is None:
+            client = await self._connect()
+        await client.ping()
+        self._client = client
+
+    def _redis(self) -> Any:
+        """Gibt den Redis-Client zurück, wenn der Prober ihn als verfügbar meldet."""
+        if self.prober is None:
+            return None
+        # Der Prober braucht einen laufenden Event Loop und wird daher lazy gestartet
+        self.prober.start()
+        if not self.prober.available:
+            self.redis_skipped += 1
+            return None
+        return self._client
+
+    def get_redis_client(self) -> Any:
+        """Redis-Client für Wartungsoperationen (Export/Import); None, wenn Redis nicht verfügbar ist."""
+        if self.prober is None or not self.prober.available:
+            return None
+        return self._client
+
+    def _report_error(self, error: Exception, operation: str) -> None:
+        self.redis_errors += 1
+        print(f"⚠️ [Cache] Redis-{operation}-Fehler: {error}")
+        self.prober.report_failure(error)
+
+    async def get(self, key: str) -> Optional[CacheHit]:
+        """Sucht eine Antwort erst in L1, dann in Redis."""
+        entry = self.local.get_entry(key)
+        if entry is not None:
+            return CacheHit(entry[0], "local", stored_at=entry[1])
+
+        client = self._redis()
+        if client is None:
+            return None
+
+        try:
+            raw = await client.get(key)
+        except Exception as e:
+            self._report_error(e, "Lese")
+            return None
+
+        if raw is None:
+            self.redis_misses += 1
+            return None
+
+        try:
+            value, stored_at = self.codec.decode_entry(raw)
+        except Exception as e:
+            # Beschädigter oder mit fehlendem Codec geschriebener Eintrag: wie ein Miss behandeln
+            print(f"⚠️ [Cache] Eintrag nicht lesbar, ignoriere ihn: {e}")
+            self.redis_misses += 1
+            return None
+
+        self.redis_hits += 1
+        self.local.set(key, value, stored_at=stored_at)
+        return CacheHit(value, "redis", stored_at=stored_at)
+
+    async def get_similar(self, scope: str, prompt: str, settings: SimilaritySettings) -> Optional[CacheHit]:
+        """
+        Sucht eine Antwort für einen nahezu identischen Prompt.
+        Wird nur nach einem exakten Cache-Miss aufgerufen.
+        """
+        match = self.similarity.lookup(scope, prompt, settings)
+        if match is None:
+            return None
+
+        key, _score = match
+        hit = await self.get(key)
+        if hit is None:
+            # Antwort ist inzwischen aus L1/Redis verschwunden
+            self.similarity.discard(key)
+            return None
+        return hit._replace(match="approximate")
+
+    def index_similar(self, scope: str, prompt: str, key: str,
+                      settings: SimilaritySettings, ttl_seconds: int) -> None:
+        """Nimmt einen beantworteten Prompt in den Similarity-Index auf."""
+        self.similarity.add(scope, prompt, key, settings, ttl_seconds)
+
+    async def set(self, key: str, value: Any, ttl_seconds: int,
+                  max_entry_bytes: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        """
+        Speichert eine Antwort in L1 und, falls verfügbar, in Redis.
+        Übergroße Antworten werden gar nicht gecacht.
+
+        Args:
+            max_entry_bytes: Größengrenze aus der Cache-Policy (None = globale Grenze).
+            tags: Tags für den Invalidierungs-Index (siehe ``make_tags``).
+        """
+        if self.codec.exceeds_max_size(value, max_entry_bytes):
+            return
+        stored_at = time.time()
+        client = self._redis()
+        encoded = None
+        if client is not None:
+            # Vor L1 kodieren: ist der Wert für Redis zu groß, bleibt er auch aus L1 draußen
+            encoded = self.codec.encode(value, max_entry_bytes, stored_at)
+            if encoded is None:
+                return
+        self.local.set(key, value, ttl_seconds, stored_at)
+        if encoded is None:
+            return
+
+        try:
+            if tags:
+                # Wert und Tag-Indizes in einem Roundtrip schreiben
+                expires_at = stored_at + ttl_seconds
+                pipe = client.pipeline(transaction=False)
+                pipe.set(key, encoded, ex=ttl_seconds)
+                for tag in tags:
+                    tag_key = f"{CACHE_TAG_PREFIX}{tag}"
+                    pipe.zadd(tag_key, {key: expires_at})
+                    pipe.zremrangebyscore(tag_key, "-inf", stored_at)
+                await pipe.execute()
+            else:
+                await client.set(key, encoded, ex=ttl_seconds)
+            self.redis_writes += 1
+        except Exception as e:
+            self._report_error(e, "Schreib")
+
+    async def find_tags(self, prefix: str) -> List[str]:
+        """Alle vorhandenen Tags, die mit ``prefix`` beginnen (z.B. ``model:claude``)."""
+        client = self.get_redis_client()
+        if client is None:
+            return []
+        tags = []
+        async for tag_key in client.scan_iter(match=f"{CACHE_TAG_PREFIX}{_escape_pattern(prefix)}*"):
+            tags.append(tag_key[len(CACHE_TAG_PREFIX):])
+        return sorted(tags)
+
+    async def invalidate_tags(self, tags: Iterable[str], batch_size: int = 500) -> Optional[dict]:
+        """
+        Löscht alle Einträge der angegebenen Tags aus Redis und aus dem lokalen L1.
+
+        Die Schlüssel werden per ZSCAN aus dem Tag-Index gelesen und batchweise
+        über eine Pipeline gelöscht. L1-Caches anderer Prozesse verfallen erst
+        nach ``CACHE_L1_TTL_SECONDS``.
+
+        Returns:
+            Zähler pro Tag, oder None, wenn Redis nicht verfügbar ist.
+        """
+        client = self.get_redis_client()
+        if client is None:
+            return None
+
+        result = {"deleted": 0, "tags": {}}
+        for tag in tags:
+            tag_key = f"{CACHE_TAG_PREFIX}{tag}"
+            deleted = 0
+
+            async def flush(keys: list) -> int:
+                pipe = client.pipeline(transaction=False)
+                pipe.delete(*keys)
+                pipe.zrem(tag_key, *keys)
+                count, _ = await pipe.execute()
+                for key in keys:
+                    self.local.delete(key)
+                    self.similarity.discard(key)
+                return count
+
+            batch = []
+            async for key, _score in client.zscan_iter(tag_key, count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    deleted += await flush(batch)
+                    batch = []
+            if batch:
+                deleted += await flush(batch)
+
+            result["tags"][tag] = deleted
+            result["deleted"] += deleted
+
+        print(f"🗑️ [Cache] {result['deleted']} Einträge invalidiert ({', '.join(result['tags']) or 'keine Tags'})")
+        return result
+
+    def get_stats(self) -> dict:
+        """Treffer-, Fehl- und Verdrängungszähler pro Stufe."""
+        lookups = self.redis_hits + self.redis_misses
+        return {
+            "local": self.local.get_stats(),
+            "redis": {
+                "enabled": self.prober is not None,
+                "hits": self.redis_hits,
+                "misses": self.redis_misses,
+                "hit_ratio": round(self.redis_hits / lookups, 4) if lookups else 0.0,
+                "writes": self.redis_writes,
+                "errors": self.redis_errors,
+                "skipped_unavailable": self.redis_skipped,
+                "compression": self.codec.get_stats(),
+            },
+            "similarity": self.similarity.get_stats(),
+        }
+
+    def get_status(self) -> dict:
+        """Zustand und Statistiken für API und Monitoring."""
+        return {
+            "enabled": self.enabled,
+            "health": self.prober.get_status() if self.prober else None,
+            "stats": self.get_stats(),
+        }
+
+    async def close(self) -> None:
+        if self.prober:
+            await self.prober.stop()
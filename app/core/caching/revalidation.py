@@ -0,0 +1,70 @@
+# llm_bridge/caching/revalidation.py
+"""
+Hintergrund-Erneuerung veralteter Cache-Einträge (Stale-While-Revalidate).
+
+Ist ein Treffer älter als die Soft-TTL seiner Policy, liefert der Router ihn
+sofort aus und plant über ``create_background_task`` eine Erneuerung ein. Der
+Refresh läuft durch den Circuit Breaker des Adapters: Ist dieser offen, bleibt
+der veraltete Eintrag einfach bis zur harten TTL bestehen.
+"""
+
+from typing import Any, Awaitable, Callable, Set
+
+from ..orchestration.circuit_breaker import CircuitBreakerError
+from ..utils.task_manager import create_background_task
+
+
+class CacheRevalidator:
+    """Plant Refreshs pro Cache-Schlüssel höchstens einmal gleichzeitig ein."""
+
+    def __init__(self):
+        self._pending: Set[str] = set()
+        self.stale_hits = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.breaker_open = 0
+        self.deduplicated = 0
+
+    def schedule(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Plant die Erneuerung eines veralteten Eintrags ein.
+
+        Args:
+            key: Cache-Schlüssel des Eintrags.
+            refresh: Coroutine-Funktion, die den Upstream-Call ausführt und den
+                     Cache aktualisiert.
+
+        Returns:
+            False, wenn für diesen Schlüssel bereits ein Refresh läuft.
+        """
+        self.stale_hits += 1
+        if key in self._pending:
+            self.deduplicated += 1
+            return False
+        self._pending.add(key)
+        create_background_task(self._run(key, refresh), name=f"cache-revalidate-{key[-12:]}")
+        return True
+
+    async def _run(self, key: str, refresh: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await refresh()
+            self.refreshed += 1
+        except CircuitBreakerError as e:
+            # Provider degradiert: veralteten Eintrag weiter ausliefern
+            self.breaker_open += 1
+            print(f"⏸️ [Cache] Refresh übersprungen, Circuit Breaker offen: {e}")
+        except Exception as e:
+            self.failed += 1
+            print(f"⚠️ [Cache] Hintergrund-Refresh fehlgeschlagen, behalte veralteten Eintrag: {e}")
+        finally:
+            self._pending.discard(key)
+
+    def get_stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "stale_hits": self.stale_hits,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "breaker_open": self.breaker_open,
+            "deduplicated": self.deduplicated,
+        }
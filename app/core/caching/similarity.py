@@ -0,0 +1,326 @@
+# llm_bridge/caching/similarity.py
+"""
+Ähnlichkeits-Cache für nahezu identische Prompts.
+
+Der exakte sha256-Schlüssel verfehlt Prompts, die sich nur in Whitespace,
+Zeitstempeln oder Mission-IDs unterscheiden (z.B. Agenten-Prompts aus
+``AgentOrchestrator._create_agent_prompt``). Dieses Modul kanonisiert Prompts
+über konfigurierbare Masken und findet ähnliche, bereits beantwortete Prompts
+über einen lokalen MinHash/LSH-Index. Der Index hält nur Verweise auf die
+exakten Cache-Schlüssel; die Antworten selbst liegen weiterhin in L1/Redis.
+
+Die MinHash-Schätzung allein reicht nicht: Lange Prompts, die sich nur in
+einem Fakt unterscheiden ("Berlin" statt "Paris"), liegen über jeder
+sinnvollen Schwelle. Ein Kandidat wird deshalb zusätzlich Token für Token
+verglichen (Groß-/Kleinschreibung und Satzzeichen ignoriert); mehr als
+``max_token_diff`` abweichende Tokens (Standard: 0) verwerfen ihn.
+"""
+
+import difflib
+import hashlib
+import os
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Eingebaute Masken: Name -> (Regex, Platzhalter)
+BUILTIN_MASKS: Dict[str, Tuple[str, str]] = {
+    "uuid": (r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b", "<uuid>"),
+    "timestamp": (r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?\b", "<timestamp>"),
+    "mission_id": (r"\b(?:mission|wf)_[0-9a-f]{8}\b", "<mission_id>"),
+    "unix_time": (r"\b1\d{9}(?:\d{3})?\b", "<unix_time>"),
+}
+
+# Whitespace wird nicht per Platzhalter, sondern durch Zusammenfassen normalisiert
+WHITESPACE_MASK = "whitespace"
+
+DEFAULT_MASKS = ["uuid", "timestamp", "mission_id", WHITESPACE_MASK]
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_MAX_TOKEN_DIFF = 0
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WHITESPACE_RE = re.compile(r"\s+")
+_PUNCTUATION_RE = re.compile(r"[^\w<>]+")
+
+
+def token_fingerprint(canonical: str) -> Tuple[int, ...]:
+    """Tokens eines kanonischen Prompts als Hashes, ohne Groß-/Kleinschreibung und Satzzeichen."""
+    tokens = (_PUNCTUATION_RE.sub("", token.lower()) for token in canonical.split())
+    return tuple(zlib.crc32(token.encode()) for token in tokens if token)
+
+
+def token_diff(a: Tuple[int, ...], b: Tuple[int, ...]) -> int:
+    """Anzahl abweichender Tokens zwischen zwei Fingerprints (ersetzt, eingefügt oder gelöscht)."""
+    matcher = difflib.SequenceMatcher(None, a, b, autojunk=False)
+    return sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal")
+
+
+class PromptCanonicalizer:
+    """Wendet die konfigurierten Masken auf einen Prompt an."""
+
+    def __init__(self, masks: List[str], custom_masks: Optional[Dict[str, str]] = None):
+        self.collapse_whitespace = WHITESPACE_MASK in masks
+        self._patterns: List[Tuple[re.Pattern, str]] = []
+        for name in masks:
+            if name == WHITESPACE_MASK:
+                continue
+            if name not in BUILTIN_MASKS:
+                raise ValueError(f"Unbekannte Similarity-Maske: '{name}'")
+            pattern, placeholder = BUILTIN_MASKS[name]
+            self._patterns.append((re.compile(pattern), placeholder))
+        for name, pattern in (custom_masks or {}).items():
+            self._patterns.append((re.compile(pattern), f"<{name}>"))
+
+    def canonicalize(self, prompt: str) -> str:
+        for pattern, placeholder in self._patterns:
+            prompt = pattern.sub(placeholder, prompt)
+        if self.collapse_whitespace:
+            prompt = _WHITESPACE_RE.sub(" ", prompt).strip()
+        return prompt
+
+
+class SimilaritySettings:
+    """Aufgelöste Similarity-Konfiguration eines Modells aus ``registry.yaml``."""
+
+    __slots__ = ("threshold", "max_token_diff", "canonicalizer")
+
+    def __init__(self, threshold: float, canonicalizer: PromptCanonicalizer,
+                 max_token_diff: int = DEFAULT_MAX_TOKEN_DIFF):
+        self.threshold = threshold
+        self.max_token_diff = max_token_diff
+        self.canonicalizer = canonicalizer
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["SimilaritySettings"]:
+        """
+        Erzeugt die Settings aus dem ``similarity_cache``-Block eines Modells.
+        Gibt None zurück, wenn der Block fehlt oder nicht aktiviert ist.
+        """
+        if not isinstance(config, dict) or not config.get("enabled"):
+            return None
+        threshold = config.get("threshold")
+        max_token_diff = config.get("max_token_diff")
+        masks = config.get("masks")
+        return cls(
+            threshold=DEFAULT_THRESHOLD if threshold is None else float(threshold),
+            max_token_diff=DEFAULT_MAX_TOKEN_DIFF if max_token_diff is None else int(max_token_diff),
+            canonicalizer=PromptCanonicalizer(
+                DEFAULT_MASKS if masks is None else masks,
+                config.get("custom_masks"),
+            ),
+        )
+
+
+class MinHasher:
+    """MinHash-Signaturen über Wort-Shingles, reines Python."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._perms = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+                       for _ in range(num_perm)]
+
+    def shingles(self, text: str) -> Set[int]:
+        tokens = text.split()
+        size = self.shingle_size
+        if len(tokens) <= size:
+            return {zlib.crc32(" ".join(tokens).encode())}
+        return {zlib.crc32(" ".join(tokens[i:i + size]).encode())
+                for i in range(len(tokens) - size + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = self.shingles(text)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    @staticmethod
+    def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+        """Geschätzte Jaccard-Ähnlichkeit zweier Signaturen."""
+        equal = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+        return equal / len(sig_a)
+
+
+class _IndexedPrompt:
+    __slots__ = ("scope", "signature", "tokens", "canonical_hash", "expires_at")
+
+    def __init__(self, scope: str, signature: Tuple[int, ...], tokens: Tuple[int, ...], canonical_hash: str,
+                 expires_at: float):
+        self.scope = scope
+        self.signature = signature
+        self.tokens = tokens
+        self.canonical_hash = canonical_hash
+        self.expires_at = expires_at
+
+
+class SimilarityIndex:
+    """
+    LSH-Index über MinHash-Signaturen, begrenzt per LRU.
+
+    Einträge sind nach ``scope`` (Zielmodell + Parameter) getrennt, damit nur
+    Prompts an dasselbe Modell mit denselben Parametern verglichen werden.
+    Kanonisch identische Prompts werden ohne LSH über einen Hash gefunden.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, max_entries: Optional[int] = None):
+        if num_perm % bands:
+            raise ValueError("num_perm muss durch bands teilbar sein")
+        self.hasher = MinHasher(num_perm=num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("CACHE_SIMILARITY_MAX_ENTRIES", "10000"))
+
+        self._entries: "OrderedDict[str, _IndexedPrompt]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = {}
+        self._canonical: Dict[Tuple[str, str], str] = {}
+
+        self.lookups = 0
+        self.canonical_hits = 0
+        self.lsh_hits = 0
+        self.below_threshold = 0
+        self.token_diff_rejected = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _band_keys(self, scope: str, signature: Tuple[int, ...]):
+        rows = self.rows
+        for band in range(self.bands):
+            yield (scope, band, signature[band * rows:(band + 1) * rows])
+
+    def lookup(self, scope: str, prompt: str, settings: SimilaritySettings) -> Optional[Tuple[str, float]]:
+        """
+        Sucht den ähnlichsten indizierten Prompt.
+
+        Returns:
+            (Cache-Schlüssel, Ähnlichkeit) oder None, wenn kein Kandidat die
+            Schwelle erreicht oder der beste sich in mehr als
+            ``max_token_diff`` Tokens unterscheidet.
+        """
+        self.lookups += 1
+        now = time.monotonic()
+        canonical = settings.canonicalizer.canonicalize(prompt)
+
+        canonical_hash = hashlib.sha256(canonical.encode()).hexdigest()
+        key = self._canonical.get((scope, canonical_hash))
+        if key is not None and self._entries[key].expires_at > now:
+            self._entries.move_to_end(key)
+            self.canonical_hits += 1
+            return key, 1.0
+
+        signature = self.hasher.signature(canonical)
+        candidates: Set[str] = set()
+        for band_key in self._band_keys(scope, signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best_key, best_score = None, 0.0
+        for candidate in candidates:
+            entry = self._entries[candidate]
+            if entry.expires_at <= now:
+                continue
+            score = self.hasher.similarity(signature, entry.signature)
+            if score > best_score:
+                best_key, best_score = candidate, score
+
+        if best_key is None:
+            return None
+        if best_score < settings.threshold:
+            self.below_threshold += 1
+            return None
+        # Die Schätzung übersieht einzelne geänderte Fakten; der exakte Token-Vergleich nicht
+        if token_diff(token_fingerprint(canonical), self._entries[best_key].tokens) > settings.max_token_diff:
+            self.token_diff_rejected += 1
+            return None
+
+        self._entries.move_to_end(best_key)
+        self.lsh_hits += 1
+        return best_key, best_score
+
+    def add(self, scope: str, prompt: str, cache_key: str, settings: SimilaritySettings, ttl_seconds: float) -> None:
+        """Indiziert einen beantworteten Prompt unter seinem exakten Cache-Schlüssel."""
+        if cache_key in self._entries:
+            self.discard(cache_key)
+
+        canonical = settings.canonicalizer.canonicalize(prompt)
+        entry = _IndexedPrompt(
+            scope=scope,
+            signature=self.hasher.signature(canonical),
+            tokens=token_fingerprint(canonical),
+            canonical_hash=hashlib.sha256(canonical.encode()).hexdigest(),
+            expires_at=time.monotonic() + ttl_seconds,
+        )
+        self._entries[cache_key] = entry
+        self._canonical[(scope, entry.canonical_hash)] = cache_key
+        for band_key in self._band_keys(scope, entry.signature):
+            self._buckets.setdefault(band_key, set()).add(cache_key)
+
+        while len(self._entries) > self.max_entries:
+            self.discard(next(iter(self._entries)))
+            self.evictions += 1
+
+    def discard(self, cache_key: str) -> bool:
+        """Entfernt einen Eintrag, z.B. wenn die Antwort nicht mehr im Cache liegt."""
+        entry = self._entries.pop(cache_key, None)
+        if entry is None:
+            return False
+        canonical_key = (entry.scope, entry.canonical_hash)
+        if self._canonical.get(canonical_key) == cache_key:
+            del self._canonical[canonical_key]
+        for band_key in self._band_keys(entry.scope, entry.signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(cache_key)
+                if not bucket:
+                    del self._buckets[band_key]
+        return True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._buckets.clear()
+        self._canonical.clear()
+
+    def get_stats(self) -> dict:
+        hits = self.canonical_hits + self.lsh_hits
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "lookups": self.lookups,
+            "hits": hits,
+            "canonical_hits": self.canonical_hits,
+            "lsh_hits": self.lsh_hits,
+            "below_threshold": self.below_threshold,
+            "token_diff_rejected": self.token_diff_rejected,
+            "hit_ratio": round(hits / self.lookups, 4) if self.lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# Globaler Index, den sich beide Router-Implementierungen teilen
+_similarity_index: Optional[SimilarityIndex] = None
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Gibt den prozessweiten Similarity-Index zurück."""
+    global _similarity_index
+    if _similarity_index is None:
+        _similarity_index = SimilarityIndex()
+    return _similarity_index
+
+
+def build_similarity_settings(model_config: Dict[str, Any]) -> Dict[str, SimilaritySettings]:
+    """Löst die ``similarity_cache``-Blöcke aller Modelle einmalig auf."""
+    settings = {}
+    for model_name, config in model_config.items():
+        if not isinstance(config, dict):
+            continue
+        resolved = SimilaritySettings.from_config(config.get("similarity_cache"))
+        if resolved is not None:
+            settings[model_name] = resolved
+    return settings
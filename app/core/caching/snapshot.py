@@ -0,0 +1,183 @@
+# llm_bridge/caching/snapshot.py
+"""
+Export und Import des Redis-Response-Caches (``llm_response:*``).
+
+Nach einem Deploy oder einem Redis-Flush startet der Cache sonst kalt. Ein
+Snapshot ist eine JSONL-Datei (gzip-komprimiert bei Endung ``.gz``): eine
+Kopfzeile mit Metadaten, danach pro Eintrag Schlüssel, Rohwert (inkl. Header
+und Kompression, unverändert aus Redis) und verbleibende TTL. Ab Version 2
+folgen die Tag-Indizes (``llm_response_tag:*``), damit importierte Einträge
+weiterhin gezielt invalidiert werden können.
+
+Beim Import wird die TTL um die seit dem Export vergangene Zeit reduziert;
+inzwischen abgelaufene Einträge werden übersprungen.
+"""
+
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, IO, Optional
+
+from .response_cache import CACHE_KEY_PREFIX, CACHE_TAG_PREFIX
+
+SNAPSHOT_FORMAT = "llm-bridge-cache-snapshot"
+SNAPSHOT_VERSION = 2
+
+
+def _open(path: Path, mode: str) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def resolve_snapshot_path(name: str) -> Path:
+    """
+    Löst einen Dateinamen im Snapshot-Verzeichnis (``CACHE_SNAPSHOT_DIR``) auf.
+    Für die API: Verzeichnisanteile im Namen werden verworfen.
+    """
+    directory = Path(os.getenv("CACHE_SNAPSHOT_DIR", "cache_snapshots"))
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / Path(name).name
+
+
+async def export_snapshot(client: Any, path: Path, prefix: str = CACHE_KEY_PREFIX,
+                          batch_size: int = 500) -> dict:
+    """
+    Schreibt alle Schlüssel mit ``prefix`` per SCAN in eine Snapshot-Datei.
+
+    Werte und TTLs werden batchweise über eine Pipeline (GET + PTTL) gelesen,
+    anschließend die Tag-Indizes.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    exported = 0
+    vanished = 0
+    tags = 0
+
+    with _open(path, "w") as f:
+        f.write(json.dumps({
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "prefix": prefix,
+            "created_at": time.time(),
+        }) + "\n")
+
+        async def flush(keys: list) -> None:
+            nonlocal exported, vanished
+            pipe = client.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+                pipe.pttl(key)
+            results = await pipe.execute()
+            for i, key in enumerate(keys):
+                value, pttl = results[2 * i], results[2 * i + 1]
+                if value is None:
+                    # Zwischen SCAN und GET abgelaufen oder verdrängt
+                    vanished += 1
+                    continue
+                f.write(json.dumps({"key": key, "value": value, "pttl": pttl}, ensure_ascii=False) + "\n")
+                exported += 1
+
+        batch = []
+        async for key in client.scan_iter(match=f"{prefix}*", count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+        async for tag_key in client.scan_iter(match=f"{CACHE_TAG_PREFIX}*", count=batch_size):
+            members = await client.zrange(tag_key, 0, -1, withscores=True)
+            if members:
+                f.write(json.dumps({"tag": tag_key, "members": members}, ensure_ascii=False) + "\n")
+                tags += 1
+
+    result = {
+        "path": str(path),
+        "exported": exported,
+        "vanished": vanished,
+        "tags": tags,
+        "bytes": path.stat().st_size,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"📦 [Cache] Snapshot exportiert: {exported} Einträge -> {path}")
+    return result
+
+
+async def import_snapshot(client: Any, path: Path, overwrite: bool = False,
+                          batch_size: int = 500) -> dict:
+    """
+    Spielt eine Snapshot-Datei zurück nach Redis.
+
+    Args:
+        overwrite: Vorhandene Schlüssel überschreiben (sonst nur fehlende setzen).
+    """
+    path = Path(path)
+    started = time.perf_counter()
+    imported = 0
+    expired = 0
+    skipped_existing = 0
+    tags = 0
+
+    with _open(path, "r") as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"'{path}' ist kein Cache-Snapshot")
+        if header.get("version", 0) > SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot-Version {header['version']} wird nicht unterstützt")
+        elapsed_ms = int((time.time() - header.get("created_at", time.time())) * 1000)
+
+        async def flush(entries: list) -> None:
+            nonlocal imported, skipped_existing
+            pipe = client.pipeline(transaction=False)
+            for key, value, ttl_ms in entries:
+                pipe.set(key, value, px=ttl_ms, nx=not overwrite)
+            results = await pipe.execute()
+            for ok in results:
+                if ok:
+                    imported += 1
+                else:
+                    skipped_existing += 1
+
+        batch = []
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if "tag" in entry:
+                # Tag-Index: nur noch nicht abgelaufene Mitglieder übernehmen
+                now = time.time()
+                members = {key: score for key, score in entry["members"] if score > now}
+                if members:
+                    await client.zadd(entry["tag"], members)
+                    tags += 1
+                continue
+            pttl: Optional[int] = entry.get("pttl")
+            ttl_ms = None
+            if pttl is not None and pttl >= 0:
+                ttl_ms = pttl - elapsed_ms
+                if ttl_ms <= 0:
+                    expired += 1
+                    continue
+            batch.append((entry["key"], entry["value"], ttl_ms))
+            if len(batch) >= batch_size:
+                await flush(batch)
+                batch = []
+        if batch:
+            await flush(batch)
+
+    result = {
+        "path": str(path),
+        "imported": imported,
+        "expired": expired,
+        "skipped_existing": skipped_existing,
+        "tags": tags,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"📥 [Cache] Snapshot importiert: {imported} Einträge aus {path} "
+          f"({expired} abgelaufen, {skipped_existing} bereits vorhanden)")
+    return result
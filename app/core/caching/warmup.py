@@ -0,0 +1,117 @@
+# llm_bridge/caching/warmup.py
+"""
+Cache-Warm-up durch Wiederholen protokollierter Anfragen.
+
+Unterstützte Quellen (JSONL, eine Anfrage pro Zeile):
+
+* Request-Logs mit ``target_llm`` (oder ``model``) und ``prompt`` (oder
+  ``message``), optional ``params`` und ``agent_name``.
+* ``bridge_events.jsonl``: ``ADAPTER_CALL``-Events erfolgreicher Aufrufe.
+  Diese enthalten den Prompt nur, wenn ``EVENT_LOG_PROMPTS`` aktiviert ist.
+
+Jede Anfrage läuft durch ``Router.route_message`` und damit durch Cache,
+Single-Flight, Policies und Circuit Breaker. Identische Anfragen werden nur
+einmal wiederholt.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+def _parse_entry(entry: Dict[str, Any]) -> Optional[Tuple[str, str, Dict[str, Any], Optional[str]]]:
+    """Normalisiert eine Log-Zeile zu (target_llm, prompt, params, agent_name)."""
+    if not isinstance(entry, dict):
+        return None
+    if entry.get("event_type") == "ADAPTER_CALL":
+        if not entry.get("success"):
+            return None
+        target, prompt = entry.get("target_llm"), entry.get("prompt")
+        params = entry.get("request_params") or {}
+    else:
+        target = entry.get("target_llm") or entry.get("target_llm_name") or entry.get("model")
+        prompt = entry.get("prompt") or entry.get("message")
+        params = entry.get("params") or {}
+    if not target or not prompt:
+        return None
+    return target, prompt, params, entry.get("agent_name")
+
+
+def iter_requests(path: Path) -> Iterator[Tuple[str, str, Dict[str, Any], Optional[str]]]:
+    """Liest eine JSONL-Datei und liefert jede verwertbare Anfrage genau einmal."""
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                parsed = _parse_entry(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+            if parsed is None:
+                continue
+            target, prompt, params, agent_name = parsed
+            fingerprint = hashlib.sha256(
+                f"{target}:{prompt}:{json.dumps(params, sort_keys=True)}:{agent_name}".encode()
+            ).hexdigest()
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            yield parsed
+
+
+async def warm_up(router: Any, path: Path, concurrency: int = 4, limit: Optional[int] = None) -> dict:
+    """
+    Wiederholt die Anfragen aus ``path`` mit begrenzter Parallelität.
+
+    Args:
+        router: Eine der beiden Router-Implementierungen.
+        concurrency: Maximale Anzahl gleichzeitiger Upstream-Aufrufe.
+        limit: Maximale Anzahl wiederholter Anfragen (None = alle).
+    """
+    path = Path(path)
+    started = time.perf_counter()
+    stats = {"replayed": 0, "failed": 0}
+    errors: Dict[str, int] = {}
+
+    # Die Worker teilen sich einen Iterator; die Datei wird dadurch gestreamt
+    requests = enumerate(iter_requests(path))
+    if limit is not None:
+        requests = itertools.islice(requests, limit)
+
+    async def worker() -> None:
+        for n, (target, prompt, params, agent_name) in requests:
+            conversation_id = f"cache_warmup_{n}"
+            try:
+                await router.route_message(
+                    conversation_id=conversation_id,
+                    target_llm_name=target,
+                    prompt=prompt,
+                    agent_name=agent_name,
+                    **params
+                )
+                stats["replayed"] += 1
+            except Exception as e:
+                stats["failed"] += 1
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            finally:
+                # Warm-up-Konversationen nicht im Router-Zustand behalten
+                router.active_conversations.pop(conversation_id, None)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    total = stats["replayed"] + stats["failed"]
+    result = {
+        "path": str(path),
+        "requests": total,
+        **stats,
+        "errors": errors,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+    print(f"🔥 [Cache] Warm-up abgeschlossen: {stats['replayed']}/{total} Anfragen "
+          f"({stats['failed']} fehlgeschlagen)")
+    return result
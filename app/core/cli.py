@@ -0,0 +1,151 @@
+# llm_bridge/cli.py
+"""
+Kommandozeile der LLM Bridge (Entry-Point ``llm-bridge`` aus pyproject.toml).
+
+Beispiele:
+    llm-bridge cache export snapshot.jsonl.gz
+    llm-bridge cache import snapshot.jsonl.gz --overwrite
+    llm-bridge cache warmup bridge_events.jsonl --concurrency 8
+    llm-bridge batch prompts.jsonl results.jsonl --concurrency 16
+    llm-bridge bench json --iterations 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+from .utils import json_codec
+
+
+def _redis_client_from_env():
+    """Erstellt einen Redis-Client aus REDIS_URL bzw. REDIS_HOST/PORT/DB (wie der Router)."""
+    import redis.asyncio as redis
+
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        return redis.from_url(redis_url, decode_responses=True)
+    return redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        db=int(os.getenv("REDIS_DB", "0")),
+        decode_responses=True,
+    )
+
+
+async def _cache_export(args: argparse.Namespace) -> dict:
+    from .caching.snapshot import export_snapshot
+
+    client = _redis_client_from_env()
+    try:
+        return await export_snapshot(client, args.path, batch_size=args.batch_size)
+    finally:
+        await client.aclose()
+
+
+async def _cache_import(args: argparse.Namespace) -> dict:
+    from .caching.snapshot import import_snapshot
+
+    client = _redis_client_from_env()
+    try:
+        return await import_snapshot(client, args.path, overwrite=args.overwrite, batch_size=args.batch_size)
+    finally:
+        await client.aclose()
+
+
+async def _cache_warmup(args: argparse.Namespace) -> dict:
+    from .caching.warmup import warm_up
+    from .core import LLMBridgeCore
+
+    bridge = await LLMBridgeCore.create_async()
+    try:
+        return await warm_up(bridge.router, args.path, concurrency=args.concurrency, limit=args.limit)
+    finally:
+        await bridge.router.close()
+
+
+async def _batch(args: argparse.Namespace) -> dict:
+    from .batch.runner import iter_items, run_batch
+    from .core import LLMBridgeCore
+
+    summary = {}
+    with open(args.input, "r", encoding="utf-8") as source:
+        bridge = await LLMBridgeCore.create_async()
+        try:
+            with open(args.output, "w", encoding="utf-8") as target:
+                # Eingabe wird zeilenweise gelesen, Ergebnisse sofort geschrieben
+                async for line in run_batch(bridge.router, iter_items(source), concurrency=args.concurrency):
+                    if line["type"] == "summary":
+                        summary = line
+                    else:
+                        target.write(json_codec.dumps(line) + "\n")
+        finally:
+            await bridge.router.close()
+    return summary
+
+
+async def _bench_json(args: argparse.Namespace) -> dict:
+    from .utils.json_bench import run_benchmark
+
+    return run_benchmark(iterations=args.iterations)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="llm-bridge", description="LLM Bridge Kommandozeile")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    cache = commands.add_parser("cache", help="Response-Cache verwalten")
+    cache_commands = cache.add_subparsers(dest="cache_command", required=True)
+
+    export = cache_commands.add_parser("export", help="llm_response:* in eine Snapshot-Datei exportieren")
+    export.add_argument("path", help="Zieldatei (.jsonl oder .jsonl.gz)")
+    export.add_argument("--batch-size", type=int, default=500)
+    export.set_defaults(handler=_cache_export)
+
+    restore = cache_commands.add_parser("import", help="Snapshot-Datei nach Redis zurückspielen")
+    restore.add_argument("path", help="Snapshot-Datei (.jsonl oder .jsonl.gz)")
+    restore.add_argument("--overwrite", action="store_true", help="Vorhandene Schlüssel überschreiben")
+    restore.add_argument("--batch-size", type=int, default=500)
+    restore.set_defaults(handler=_cache_import)
+
+    warmup = cache_commands.add_parser("warmup", help="Request-Log oder bridge_events.jsonl erneut abspielen")
+    warmup.add_argument("path", help="JSONL-Request-Log oder bridge_events.jsonl")
+    warmup.add_argument("--concurrency", type=int, default=4, help="Maximal gleichzeitige Anfragen")
+    warmup.add_argument("--limit", type=int, default=None, help="Maximale Anzahl Anfragen")
+    warmup.set_defaults(handler=_cache_warmup)
+
+    batch = commands.add_parser("batch", help="JSONL-Datei mit Prompts als Batch ausführen")
+    batch.add_argument("input", help="JSONL mit {target_llm, prompt, kwargs} pro Zeile")
+    batch.add_argument("output", help="Ergebnisdatei (NDJSON, Abschlussreihenfolge)")
+    batch.add_argument("--concurrency", type=int, default=None,
+                       help="Maximal gleichzeitige Anfragen (Standard: BATCH_DEFAULT_CONCURRENCY)")
+    batch.set_defaults(handler=_batch)
+
+    bench = commands.add_parser("bench", help="Mikrobenchmarks")
+    bench_commands = bench.add_subparsers(dest="bench_command", required=True)
+
+    bench_json = bench_commands.add_parser("json", help="JSON-Codec-Backends gegen die Standardbibliothek messen")
+    bench_json.add_argument("--iterations", type=int, default=20000, help="Aufrufe pro Operation")
+    bench_json.set_defaults(handler=_bench_json)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    args = build_parser().parse_args(argv)
+    try:
+        result = asyncio.run(args.handler(args))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,18 +3,149 @@
 from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Dict, Any, Optional, Union
 
+from ..caching.similarity import (BUILTIN_MASKS, DEFAULT_MASKS, DEFAULT_MAX_TOKEN_DIFF, DEFAULT_THRESHOLD,
+                                  WHITESPACE_MASK)
+from ..routing.hedging import (DEFAULT_HEDGE_BUDGET, DEFAULT_HEDGE_INITIAL_DELAY_MS, DEFAULT_HEDGE_MIN_SAMPLES,
+                               DEFAULT_HEDGE_PERCENTILE, DEFAULT_HEDGE_VIA)
+from ..routing.selection import parse_selector
+
 
 class CostConfig(BaseModel):
     input_per_million_tokens: float
     output_per_million_tokens: float
 
 
+class SimilarityCacheConfig(BaseModel):
+    """Opt-in Ähnlichkeits-Cache für nahezu identische Prompts (MinHash/LSH)."""
+    enabled: bool = False
+    threshold: float = DEFAULT_THRESHOLD  # Geschätzte Jaccard-Ähnlichkeit der kanonisierten Prompts
+    max_token_diff: int = Field(DEFAULT_MAX_TOKEN_DIFF, ge=0)  # Abweichende Tokens nach Kanonisierung
+    masks: List[str] = Field(default_factory=lambda: list(DEFAULT_MASKS))
+    custom_masks: Dict[str, str] = Field(default_factory=dict)  # Name -> Regex
+
+    @field_validator('threshold')
+    @classmethod
+    def threshold_in_range(cls, value):
+        if not 0.0 < value <= 1.0:
+            raise ValueError("threshold muss zwischen 0 (exklusiv) und 1 liegen")
+        return value
+
+    @field_validator('masks')
+    @classmethod
+    def masks_must_be_known(cls, value):
+        known = set(BUILTIN_MASKS) | {WHITESPACE_MASK}
+        unknown = set(value) - known
+        if unknown:
+            raise ValueError(f"Unbekannte Masken: {sorted(unknown)} (erlaubt: {sorted(known)})")
+        return value
+
+
+class CachePolicyConfig(BaseModel):
+    """
+    Cache-Policy eines Modells oder Agenten. Nicht gesetzte Felder werden
+    geerbt (global -> Modell -> Agent).
+    """
+    enabled: Optional[bool] = None
+    ttl_seconds: Optional[int] = Field(default=None, gt=0)
+    deterministic_only: Optional[bool] = None  # Nur bei temperature == 0 cachen
+    max_entry_bytes: Optional[int] = Field(default=None, ge=0)  # 0 = unbegrenzt
+    # Stale-While-Revalidate: ältere Treffer sofort liefern und im Hintergrund erneuern
+    soft_ttl_seconds: Optional[int] = Field(default=None, gt=0)
+
+
+class HedgingConfig(BaseModel):
+    """
+    Hedged Requests: Antwortet die primäre Route nicht innerhalb des Latenz-Perzentils,
+    wird parallel eine gleichwertige Route angefragt. ``target`` verweist auf ein
+    anderes Registry-Modell; ohne ``target`` wird dasselbe Modell über ``via`` angefragt.
+    """
+    enabled: bool = True
+    target: Optional[str] = None
+    via: str = DEFAULT_HEDGE_VIA
+    percentile: float = Field(default=DEFAULT_HEDGE_PERCENTILE, gt=0, lt=100)
+    budget: float = Field(default=DEFAULT_HEDGE_BUDGET, ge=0, le=1)  # Anteil zusätzlicher Anfragen
+    min_samples: int = Field(default=DEFAULT_HEDGE_MIN_SAMPLES, ge=1)  # Vorher gilt initial_delay_ms
+    initial_delay_ms: int = Field(default=DEFAULT_HEDGE_INITIAL_DELAY_MS, gt=0)
+
+
+class RateLimitConfig(BaseModel):
+    """
+    Ausgehende Limits eines Adapter-Dienstes (Schlüssel im ``rate_limits``-Block).
+    Anfragen warten bis zu ``max_wait_seconds`` (Default: PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS).
+    """
+    enabled: bool = True
+    requests_per_minute: Optional[int] = Field(default=None, gt=0)
+    tokens_per_minute: Optional[int] = Field(default=None, gt=0)  # Geschätzt aus der Prompt-Länge
+    max_wait_seconds: Optional[float] = Field(default=None, ge=0)
+
+
+class HTTPClientConfig(BaseModel):
+    """
+    HTTP-Client eines Adapter-Dienstes (Schlüssel im ``http_clients``-Block).
+    Jeder Dienst hat einen eigenen Connection Pool; nicht gesetzte Felder
+    übernehmen die Standardwerte aus utils/http_client.py.
+    """
+    max_connections: Optional[int] = Field(default=None, gt=0)
+    max_keepalive_connections: Optional[int] = Field(default=None, ge=0)
+    keepalive_expiry: Optional[float] = Field(default=None, ge=0)
+    connect_timeout: Optional[float] = Field(default=None, gt=0)
+    read_timeout: Optional[float] = Field(default=None, gt=0)
+    write_timeout: Optional[float] = Field(default=None, gt=0)
+    pool_timeout: Optional[float] = Field(default=None, gt=0)  # Wartezeit auf einen freien Platz im Pool
+    http2: Optional[bool] = None  # Benötigt httpx[http2]; sonst HTTP/1.1
+    max_concurrent_requests: Optional[int] = Field(default=None, gt=0)  # Default: max_connections (HTTP/2: x100)
+    prewarm_connections: Optional[int] = Field(default=None, ge=0)  # Beim Start geöffnete Verbindungen pro base_url
+
+
+class RetryConfig(BaseModel):
+    """
+    Wiederholungen vorübergehender Fehler eines Adapter-Dienstes (Schlüssel im
+    ``retries``-Block). Nicht gesetzte Felder kommen aus den RETRY_*-Variablen.
+    """
+    enabled: Optional[bool] = None
+    max_attempts: Optional[int] = Field(default=None, ge=1)  # Inklusive des ersten Versuchs
+    base_delay_ms: Optional[int] = Field(default=None, ge=0)
+    max_delay_ms: Optional[int] = Field(default=None, ge=0)
+    max_retry_after_seconds: Optional[float] = Field(default=None, ge=0)  # Längeres Retry-After: nicht wiederholen
+    retry_on_status: Optional[List[int]] = None  # Default: 429, 502, 503, 504, 529
+
+
+class CLIWorkerConfig(BaseModel):
+    """
+    Pool langlebiger Prozesse für CLI-Tools mit REPL oder JSON-Lines-Protokoll
+    (siehe plugins/cli_worker_pool.py). Ohne diesen Block startet jede Nachricht
+    einen eigenen Prozess.
+    """
+    protocol: str = "jsonl"  # "jsonl" oder "repl"
+    processes: int = Field(default=1, ge=1)
+    max_concurrency_per_process: int = Field(default=1, ge=1)  # Nur jsonl; eine REPL bearbeitet eine Anfrage
+    idle_timeout_seconds: Optional[float] = Field(default=None, gt=0)  # Default: CLI_WORKER_IDLE_SECONDS
+    end_marker: Optional[str] = None  # repl: Text, der das Ende einer Antwort markiert (z.B. ">>> ")
+    await_initial_marker: bool = False  # repl: Banner bis zum ersten Marker verwerfen
+    max_output_bytes: Optional[int] = Field(default=None, gt=0)  # Default: CLI_MAX_OUTPUT_BYTES
+    request_timeout_seconds: Optional[float] = Field(default=None, gt=0)  # Default: CLI_REQUEST_TIMEOUT_SECONDS
+
+    @field_validator('protocol')
+    @classmethod
+    def protocol_must_be_known(cls, value):
+        if value not in ("jsonl", "repl"):
+            raise ValueError("protocol muss 'jsonl' oder 'repl' sein")
+        return value
+
+    @model_validator(mode='after')
+    def repl_needs_end_marker(self):
+        if self.protocol == "repl" and not self.end_marker:
+            raise ValueError("protocol 'repl' benötigt einen end_marker")
+        return self
+
+
 class ModelConfig(BaseModel):
     adapter_service: str
     provider: Optional[str] = None  # CLI-Modelle haben keinen Provider
     context_window: Optional[int] = None  # CLI-Modelle haben kein context_window
     cost: Optional[CostConfig] = None  # CLI-Modelle haben keine Kosten
     capabilities: Optional[List[str]] = None  # CLI-Modelle haben keine capabilities
+    groups: Optional[List[str]] = None  # Adressierbar als 'group:<name>' (Auswahl nach Score)
     notes: Optional[str] = None
     model_name_direct: Optional[str] = None
     model_name_openrouter: Optional[str] = None
@@ -24,6 +155,14 @@ class ModelConfig(BaseModel):
     command: Optional[str] = None
     execution_env: Optional[str] = None
     interaction_mode: Optional[str] = None
+    cli_workers: Optional[CLIWorkerConfig] = None  # Langlebige Prozesse statt eines Prozesses pro Nachricht
+    # Caching
+    cache: Optional[CachePolicyConfig] = None
+    similarity_cache: Optional[SimilarityCacheConfig] = None
+    # Hedged Requests über gleichwertige Routen
+    hedging: Optional[HedgingConfig] = None
+    # Fallback-Kette, falls der Circuit Breaker dieses Modells offen ist (Modellnamen oder Selektoren)
+    fallbacks: Optional[List[str]] = None
 
 
 class AgentConfig(BaseModel):
@@ -36,6 +175,7 @@ class AgentConfig(BaseModel):
     max_iterations: int
     temperature: float
     input_schema: Optional[str] = None  # Für erweiterte Agenten
+    cache: Optional[CachePolicyConfig] = None  # Überschreibt die Cache-Policy des Modells
 
 
 class ConditionalTransition(BaseModel):
@@ -101,6 +241,9 @@ class RegistrySchema(BaseModel):
     agents: Dict[str, AgentConfig]
     crews: Dict[str, CrewConfig]
     mission_templates: Dict[str, MissionTemplateConfig] = Field(default_factory=dict)
+    rate_limits: Dict[str, RateLimitConfig] = Field(default_factory=dict)  # Adapter-Dienst -> Limits
+    http_clients: Dict[str, HTTPClientConfig] = Field(default_factory=dict)  # Adapter-Dienst -> HTTP-Pool
+    retries: Dict[str, RetryConfig] = Field(default_factory=dict)  # Adapter-Dienst -> Retry-Policy
     
     class Config:
         # Erlaube zusätzliche Felder für Backwards-Kompatibilität
@@ -109,7 +252,9 @@ class RegistrySchema(BaseModel):
     @classmethod
     def build_from_yaml_data(cls, data: Dict[str, Any]) -> 'RegistrySchema':
         """Bereitet die rohen YAML-Daten für die Pydantic-Validierung vor."""
-        known_keys = {'agents', 'crews', 'mission_templates', '_registry_info', '_model_templates'}
+        known_keys = {'agents', 'crews', 'mission_templates', 'rate_limits', 'http_clients', 'retries',
+                      '_registry_info',
+                      '_model_templates'}
         
         # Alle unbekannten Schlüssel auf oberster Ebene werden als Modelle interpretiert
         # AUSSER _model_templates (YAML-Anker-Definitionen)
@@ -120,7 +265,10 @@ class RegistrySchema(BaseModel):
             'models': model_data,
             'agents': data.get('agents', {}),
             'crews': data.get('crews', {}),
-            'mission_templates': data.get('mission_templates', {})
+            'mission_templates': data.get('mission_templates', {}),
+            'rate_limits': data.get('rate_limits') or {},
+            'http_clients': data.get('http_clients') or {},
+            'retries': data.get('retries') or {}
         }
         return cls.model_validate(validation_data)
 
@@ -140,6 +288,32 @@ class RegistrySchema(BaseModel):
             if agent_config.model not in all_models:
                 raise ValueError(f"Agent '{agent_name}' referenziert ein nicht-existierendes Modell: '{agent_config.model}'")
         
+        # 1b. Hedging-Ziele müssen existieren
+        for model_name, model_config in all_models.items():
+            hedging = model_config.hedging
+            if hedging and hedging.target and hedging.target not in all_models:
+                raise ValueError(f"Modell '{model_name}' referenziert ein nicht-existierendes Hedging-Ziel: '{hedging.target}'")
+        
+        # 1c. Fallback-Ziele müssen existieren (Selektoren wie 'capability:x' ausgenommen)
+        for model_name, model_config in all_models.items():
+            for fallback in model_config.fallbacks or []:
+                if fallback == model_name:
+                    raise ValueError(f"Modell '{model_name}' verweist in 'fallbacks' auf sich selbst")
+                if fallback not in all_models and not parse_selector(fallback):
+                    raise ValueError(f"Modell '{model_name}' referenziert ein nicht-existierendes Fallback-Modell: '{fallback}'")
+        
+        # 1d. Rate-Limits sollten einen genutzten Adapter-Dienst (oder ein Plattform-Modell) betreffen
+        known_services = {m.adapter_service for m in all_models.values()} | set(all_models)
+        unknown_services = set(self.rate_limits) - known_services
+        if unknown_services:
+            print(f"⚠️ Warnung: 'rate_limits' für unbekannte Adapter-Dienste: {sorted(unknown_services)}")
+        unknown_services = set(self.http_clients) - {m.adapter_service for m in all_models.values()}
+        if unknown_services:
+            print(f"⚠️ Warnung: 'http_clients' für unbekannte Adapter-Dienste: {sorted(unknown_services)}")
+        unknown_services = set(self.retries) - {m.adapter_service for m in all_models.values()}
+        if unknown_services:
+            print(f"⚠️ Warnung: 'retries' für unbekannte Adapter-Dienste: {sorted(unknown_services)}")
+        
         # 2. Prüfe Crew-Konfigurationen
         for crew_name, crew_config in all_crews.items():
             # Supervisor-Modell muss existieren
@@ -4,6 +4,7 @@ import importlib.util
 import inspect
 import yaml
 import aiofiles
+from typing import AsyncIterator, List, Union
 from langfuse import Langfuse
 from pydantic import ValidationError
 from .config.schema import RegistrySchema
@@ -12,6 +13,9 @@ from .monitoring.status_monitor import StatusMonitor
 from .monitoring.event_store import EventStore  # <-- NEU: EventStore statt BasicLogger
 from .orchestration.circuit_breaker import CircuitBreaker
 from .plugins.base_plugin import LLMAdapterPlugin
+from .adapters.base_adapter import BaseAdapter
+from .utils.http_client import HTTPClientManager
+from .adapters.retry import RetryManager
 
 class LLMBridgeCore:
     def __init__(self, model_config: dict = None, registry_config: RegistrySchema = None):
@@ -41,11 +45,22 @@ class LLMBridgeCore:
         elif model_config is None:
             raise ValueError("Entweder model_config oder registry_config muss angegeben werden.")
         
+        # Eigener HTTP-Pool und Retry-Policy pro Adapter-Dienst ('http_clients', 'retries' in registry.yaml)
+        if registry_config:
+            HTTPClientManager.configure({k: v.model_dump() for k, v in registry_config.http_clients.items()})
+            RetryManager.configure({k: v.model_dump() for k, v in registry_config.retries.items()})
+        
         # --- NEU: Universelles Adapter-System laden ---
         self._load_all_adapters(model_config)
         # --- Ende NEU ---
         
-        self.router = Router(self.adapters, self.circuit_breakers, model_config, self.event_store, self.langfuse)
+        # Agenten-Konfiguration für die Cache-Policies pro Agent
+        agent_config = {k: v.model_dump() for k, v in registry_config.agents.items()} if registry_config else None
+        # RPM/TPM-Limits pro Adapter-Dienst
+        rate_limit_config = {k: v.model_dump() for k, v in registry_config.rate_limits.items()} if registry_config else None
+        
+        self.router = Router(self.adapters, self.circuit_breakers, model_config, self.event_store, self.langfuse,
+                             agent_config, rate_limit_config)
 
     @classmethod
     async def create_async(cls, model_config: dict = None) -> 'LLMBridgeCore':
@@ -146,6 +161,9 @@ class LLMBridgeCore:
 
             if not adapter_service: 
                 continue
+            # Bereits geladene Adapter (beim Neuladen der Registry) samt Breaker-Zustand behalten
+            if (adapter_service if platform == 'api' else model_name) in self.adapters:
+                continue
             plugin_class = self.loaded_plugins.get(adapter_service)
             if not plugin_class: 
                 continue
@@ -157,6 +175,8 @@ class LLMBridgeCore:
                     if adapter_service not in initialized_api_services:
                         if plugin_instance.is_available(config):
                             adapter = plugin_instance.create_adapter(config)
+                            if isinstance(adapter, BaseAdapter):
+                                adapter.service_name = adapter_service
                             self.adapters[adapter_service] = adapter
                             self.circuit_breakers[adapter_service] = CircuitBreaker(self.event_store, adapter_service)
                             initialized_api_services[adapter_service] = True
@@ -211,6 +231,40 @@ class LLMBridgeCore:
             print(f"   {e}")
             raise
     
+    async def reload_registry_async(self) -> dict:
+        """
+        Lädt und validiert die Registry neu, lädt Adapter für neu hinzugekommene
+        Dienste und baut die Routing-Tabelle des Routers atomar neu auf.
+        Bei einer ungültigen Registry bleibt der bisherige Stand aktiv.
+        """
+        registry_config = await self._load_and_validate_registry_async()
+        model_config = {k: v.model_dump() for k, v in registry_config.models.items()}
+        agent_config = {k: v.model_dump() for k, v in registry_config.agents.items()}
+        
+        HTTPClientManager.configure({k: v.model_dump() for k, v in registry_config.http_clients.items()})
+        RetryManager.configure({k: v.model_dump() for k, v in registry_config.retries.items()})
+        self._load_all_adapters(model_config)
+        self.router.rebuild_routing(model_config, agent_config)
+        self.router.rate_limiter.configure({k: v.model_dump() for k, v in registry_config.rate_limits.items()})
+        self.registry_config = registry_config
+        
+        await self.event_store.log_event("INFO", "LLMBridgeCore", "Registry neu geladen, Routing-Tabelle neu aufgebaut.")
+        return self.router.get_routing_status()
+
+    async def prewarm_http_clients(self) -> dict:
+        """
+        Öffnet beim Start Verbindungen zu allen ``base_url``s der API-Adapter
+        (inkl. abweichender ``base_url`` einzelner Modelle, z.B. Ollama).
+        """
+        targets = {}
+        for name, adapter in self.adapters.items():
+            if isinstance(adapter, BaseAdapter):
+                targets.setdefault(name, set()).update(adapter.warmup_urls())
+        for route in self.router.routing_table.routes():
+            if route.base_url and route.adapter_name in targets:
+                targets[route.adapter_name].add(route.base_url)
+        return await HTTPClientManager.prewarm({name: urls for name, urls in targets.items() if urls})
+
     def get_registry_config(self) -> RegistrySchema:
         """Gibt die validierte Registry-Konfiguration zurück."""
         if self.registry_config is None:
@@ -229,9 +283,10 @@ class LLMBridgeCore:
         """Registriert einen neuen LLM-Adapter UND einen passenden Circuit Breaker."""
         self.adapters[name] = adapter
         self.circuit_breakers[name] = CircuitBreaker(self.event_store, name)  # <-- Breaker mit EventStore
+        self.router.rebuild_routing()
         await self.event_store.log_event("INFO", "LLMBridgeCore", f"Adapter '{name}' registered.")
 
-    async def bridge_message(self, conversation_id: str, target_llm_name: str, message: str, **kwargs) -> str:
+    async def bridge_message(self, conversation_id: str, target_llm_name: Union[str, List[str]], message: str, **kwargs) -> str:
         await self.event_store.log_event("INFO", "LLMBridgeCore", 
                                         f"Bridging message to '{target_llm_name}'", 
                                         conversation_id=conversation_id,
@@ -265,6 +320,33 @@ class LLMBridgeCore:
                                             f"Monitor status: {self.monitor.get_status_colored()}")
             raise e  # <-- Wirft den Fehler weiter, anstatt ihn zu "schlucken"
     
+    async def bridge_message_stream(self, conversation_id: str, target_llm_name: Union[str, List[str]], message: str, **kwargs) -> AsyncIterator[str]:
+        """Wie ``bridge_message``, liefert die Antwort aber als Text-Chunks (siehe ``Router.route_message_stream``)."""
+        await self.event_store.log_event("INFO", "LLMBridgeCore", 
+                                        f"Streaming message to '{target_llm_name}'", 
+                                        conversation_id=conversation_id,
+                                        message_length=len(message))
+        self.monitor.set_status("YELLOW")
+        
+        try:
+            async for chunk in self.router.route_message_stream(
+                conversation_id=conversation_id,
+                target_llm_name=target_llm_name,
+                prompt=message,
+                **kwargs
+            ):
+                yield chunk
+            self.monitor.set_status("GREEN")
+            await self.event_store.log_event("INFO", "LLMBridgeCore", "Message streamed successfully.",
+                                            conversation_id=conversation_id)
+            
+        except Exception as e:
+            self.monitor.set_status("RED")
+            await self.event_store.log_event("ERROR", "LLMBridgeCore", 
+                                            f"Failed to stream message: {e}",
+                                            conversation_id=conversation_id)
+            raise
+    
     # ========================================
     # SDK-KOMFORT-METHODEN FÜR ENTWICKLER
     # ========================================
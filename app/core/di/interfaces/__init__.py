@@ -99,6 +99,7 @@ class IRouter(Protocol):
                           conversation_id: str,
                           target_llm_name: str,
                           prompt: str,
+                          agent_name: Optional[str] = None,
                           **kwargs) -> str:
         """Route a message to the appropriate LLM"""
         ...
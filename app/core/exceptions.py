@@ -0,0 +1,27 @@
+# llm_bridge/exceptions.py
+"""
+Gemeinsame Exceptions der Kernschichten.
+
+Adapter, Rate-Limiter, Circuit Breaker und API werfen bzw. fangen diese
+Fehler; sie liegen hier, damit keine Schicht dafür die Implementierung einer
+anderen importieren muss.
+"""
+
+
+class AdapterError(Exception):
+    """Benutzerdefinierte Exception für Adapter-Fehler."""
+    pass
+
+
+class RateLimitExceeded(Exception):
+    """
+    Lokale Drosselung: Die Deadline lief ab, bevor die Buckets eines Dienstes
+    die Anfrage zuließen (oder sie passt nie hinein), das Concurrency-Fenster
+    blieb voll oder der HTTP-Verbindungspool war erschöpft. Kein Fehler des
+    Providers; der Circuit Breaker zählt ihn nicht, die API antwortet mit 429.
+    """
+
+    def __init__(self, message: str, service: str, retry_after: float):
+        super().__init__(message)
+        self.service = service
+        self.retry_after = retry_after
@@ -1,10 +1,13 @@
 # llm_bridge/monitoring/event_store.py
 import json
 import asyncio
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from ..utils import json_codec
+
 class EventStore:
     """
     Enterprise Event Store für die vollständige Auditierung aller Bridge-Aktivitäten.
@@ -14,6 +17,8 @@ class EventStore:
     def __init__(self, log_file: str = "bridge_events.jsonl"):
         self.log_file = Path(log_file)
         self._lock = asyncio.Lock()
+        # Prompts nur auf ausdrücklichen Wunsch protokollieren (z.B. für Cache-Warm-up)
+        self.log_prompts = os.getenv("EVENT_LOG_PROMPTS", "false").lower() in ("1", "true", "yes")
         self._ensure_log_file()
         
     def _ensure_log_file(self):
@@ -48,7 +53,7 @@ class EventStore:
         
         async with self._lock:
             with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+                f.write(json_codec.dumps(event) + '\n')
                 
     async def log_adapter_call(self, 
                               adapter_name: str, 
@@ -57,8 +62,21 @@ class EventStore:
                               prompt_length: int,
                               success: bool,
                               response_length: Optional[int] = None,
-                              error_message: Optional[str] = None):
-        """Spezielles Logging für LLM-API-Aufrufe."""
+                              error_message: Optional[str] = None,
+                              target_llm: Optional[str] = None,
+                              agent_name: Optional[str] = None,
+                              prompt: Optional[str] = None,
+                              request_params: Optional[Dict[str, Any]] = None):
+        """
+        Spezielles Logging für LLM-API-Aufrufe.
+
+        ``prompt`` und ``request_params`` werden nur mit ``EVENT_LOG_PROMPTS=true``
+        gespeichert; damit lassen sich die Aufrufe später für ein Cache-Warm-up
+        wiederholen.
+        """
+        replay_data = {}
+        if self.log_prompts and prompt is not None:
+            replay_data = {"prompt": prompt, "request_params": request_params or {}}
         await self.log_event(
             event_type="ADAPTER_CALL",
             component="Router",
@@ -69,7 +87,10 @@ class EventStore:
             prompt_length=prompt_length,
             success=success,
             response_length=response_length,
-            error_message=error_message
+            error_message=error_message,
+            target_llm=target_llm,
+            agent_name=agent_name,
+            **replay_data
         )
         
     async def log_state_transition(self, 
@@ -122,7 +143,7 @@ class EventStore:
                     break
                     
                 try:
-                    event = json.loads(line.strip())
+                    event = json_codec.loads(line.strip())
                     
                     # Filter anwenden
                     if conversation_id and event.get('conversation_id') != conversation_id:
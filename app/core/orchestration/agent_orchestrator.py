@@ -280,14 +280,7 @@ VORHERIGE ERGEBNISSE VON ANDEREN AGENTEN:
 {json.dumps(serializable_results, indent=2, ensure_ascii=False)}
 """
         
-        prompt = f"""Du bist ein {agent_config['role']}.
-
-DEINE IDENTITÄT:
-- Rolle: {agent_config['role']}
-- Ziel: {agent_config['goal']}
-- Hintergrund: {agent_config['backstory']}
-
-MISSION KONTEXT:
+        prompt = f"""MISSION KONTEXT:
 - Hochrangiges Ziel: {state.high_level_goal}
 - Mission ID: {state.mission_id}
 {context_section}
@@ -303,7 +296,7 @@ AUFGABE:
 Nutze diese menschliche Antwort, um deine ursprüngliche Aufgabe fortzusetzen und abzuschließen.
 Integriere die menschliche Eingabe in deine Arbeit und liefere ein vollständiges Ergebnis.
 
-WICHTIGE HINWEISE:
+HINWEISE ZUR FORTSETZUNG:
 - Die menschliche Antwort ist autoritativ und sollte respektiert werden
 - Nutze die Antwort um deine Arbeit zu verbessern oder zu vervollständigen
 - Falls du weitere Klärungen benötigst, kannst du erneut ask_human verwenden
@@ -469,31 +462,40 @@ Setze deine Aufgabe fort:"""
         """
         INTELLIGENCE LAYER: Führt einen Agenten mit Tool-Calling-Unterstützung aus.
         
+        Der System-Prompt (Persona, Tools) und die bisherigen Turns der
+        Tool-Schleife gehen als ``messages`` an die Bridge; jede Iteration
+        sendet nur das neue Tool-Ergebnis. Der unveränderte Präfix wird vom
+        Provider aus dem Prompt-Cache gelesen, statt bei jedem Tool-Call
+        erneut voll berechnet zu werden.
+        
         Args:
             state: Mission-Zustand
             agent_name: Name des Agenten
             agent_config: Agent-Konfiguration aus registry.yaml
-            initial_prompt: Ursprünglicher Agent-Prompt
+            initial_prompt: Aufgabe bzw. Fortsetzung als erste Nutzer-Nachricht
             
         Returns:
             str: Finale Antwort des Agenten
         """
         # Hole verfügbare Tools für diesen Agenten
         agent_tools = agent_config.get('tools', [])
+        system_prompt = self._create_agent_system_prompt(agent_config)
         
         # Wenn keine Tools verfügbar, führe den Agenten normal aus
         if not agent_tools:
             return await self.bridge.bridge_message(
                 conversation_id=f"{state.mission_id}_{agent_name}",
                 target_llm_name=agent_config['model'],
-                message=initial_prompt
+                message=initial_prompt,
+                messages=[{"role": "system", "content": system_prompt}],
+                agent_name=agent_name
             )
         
-        # Erweitere den Prompt um Tool-Informationen
-        enhanced_prompt = self._create_tool_enhanced_prompt(initial_prompt, agent_tools)
+        # Tool-Informationen gehören zum stabilen System-Prompt
+        history = [{"role": "system", "content": self._create_tool_enhanced_prompt(system_prompt, agent_tools)}]
         
         # Tool-Use-Schleife
-        current_prompt = enhanced_prompt
+        current_prompt = initial_prompt
         tool_call_count = 0
         max_tool_calls = 5  # Verhindere Endlosschleifen
         
@@ -502,7 +504,9 @@ Setze deine Aufgabe fort:"""
             llm_response = await self.bridge.bridge_message(
                 conversation_id=f"{state.mission_id}_{agent_name}_tool_{tool_call_count}",
                 target_llm_name=agent_config['model'],
-                message=current_prompt
+                message=current_prompt,
+                messages=history,
+                agent_name=agent_name
             )
             
             # Prüfe ob es sich um einen Tool-Call handelt
@@ -512,10 +516,10 @@ Setze deine Aufgabe fort:"""
                 # Parse und führe Tool aus
                 tool_result = await self._execute_tool_call(llm_response, state, agent_name)
                 
-                # Erstelle neuen Prompt mit Tool-Ergebnis
-                current_prompt = self._create_tool_result_prompt(
-                    initial_prompt, llm_response, tool_result, agent_tools
-                )
+                # Turn in den Verlauf übernehmen; die nächste Nachricht enthält nur das Tool-Ergebnis
+                history = [*history, {"role": "user", "content": current_prompt},
+                           {"role": "assistant", "content": llm_response}]
+                current_prompt = self._create_tool_result_prompt(tool_result, agent_tools)
                 
                 # Logge Tool-Nutzung
                 state.add_history_entry(f"Agent {agent_name} used tool, iteration {tool_call_count}")
@@ -530,12 +534,14 @@ Setze deine Aufgabe fort:"""
         logger.warning(f"Agent {agent_name} reached maximum tool calls")
         
         # Bitte den Agenten um eine finale Antwort ohne weitere Tools
-        final_prompt = f"{initial_prompt}\n\nBitte gib deine finale Antwort basierend auf den bisher gesammelten Informationen. Verwende KEINE Tools mehr."
+        final_prompt = f"{current_prompt}\n\nBitte gib deine finale Antwort basierend auf den bisher gesammelten Informationen. Verwende KEINE Tools mehr."
         
         return await self.bridge.bridge_message(
             conversation_id=f"{state.mission_id}_{agent_name}_final",
             target_llm_name=agent_config['model'],
-            message=final_prompt
+            message=final_prompt,
+            messages=history,
+            agent_name=agent_name
         )
     
     def _create_tool_enhanced_prompt(self, original_prompt: str, agent_tools: List[str]) -> str:
@@ -646,22 +652,15 @@ Wenn du keine weiteren Tools benötigst, gib deine finale Antwort im normalen Te
             return {"error": error_msg}
     
     def _create_tool_result_prompt(self, 
-                                  original_prompt: str, 
-                                  tool_call: str, 
                                   tool_result: Dict[str, Any], 
                                   available_tools: List[str]) -> str:
-        """Erstellt einen neuen Prompt mit Tool-Ergebnis."""
+        """Erstellt die nächste Nutzer-Nachricht mit dem Tool-Ergebnis (Aufgabe und Tool-Call stehen im Verlauf)."""
         
         result_summary = json.dumps(tool_result, indent=2, ensure_ascii=False)[:1000]
         if len(json.dumps(tool_result)) > 1000:
             result_summary += "... (gekürzt)"
         
-        return f"""{original_prompt}
-
-TOOL-AUSFÜHRUNG:
-Du hast das Tool verwendet: {tool_call}
-
-TOOL-ERGEBNIS:
+        return f"""TOOL-ERGEBNIS:
 {result_summary}
 
 Nutze diese Informationen um deine Aufgabe fortzusetzen. Du kannst weitere Tools verwenden oder deine finale Antwort geben.
@@ -729,7 +728,7 @@ Antworte NUR mit dem JSON-Array, ohne zusätzlichen Text."""
         return prompt
     
     def _create_agent_prompt(self, agent_config: Dict[str, Any], task_description: str, state: AgentState) -> str:
-        """Erstellt den Prompt für einen spezifischen Agenten."""
+        """Erstellt die Nutzer-Nachricht für einen Agenten: Aufgabe und Mission-Kontext (Persona: ``_create_agent_system_prompt``)."""
         # Hole vorherige Ergebnisse für Kontext
         previous_results = {}
         for completed_agent in state.completed_nodes:
@@ -761,6 +760,24 @@ VORHERIGE ERGEBNISSE VON ANDEREN AGENTEN:
 {json.dumps(serializable_results, indent=2, ensure_ascii=False)}
 """
         
+        prompt = f"""AKTUELLE AUFGABE:
+{task_description}
+
+MISSION KONTEXT:
+- Hochrangiges Ziel: {state.high_level_goal}
+- Mission ID: {state.mission_id}
+{context_section}
+Führe deine Aufgabe aus:"""
+        
+        return prompt
+    
+    def _create_agent_system_prompt(self, agent_config: Dict[str, Any]) -> str:
+        """
+        Erstellt den System-Prompt eines Agenten: Identität, Output-Format und
+        Arbeitshinweise. Er hängt nur von der Agent-Konfiguration ab und ist
+        damit über Aufgaben und Missionen hinweg identisch (Prompt-Cache des
+        Providers, siehe adapters/messages.py).
+        """
         output_schema_name = agent_config.get('output_schema', 'Text')
         input_schema = agent_config.get('input_schema')
         
@@ -799,31 +816,18 @@ ERWARTETES OUTPUT-FORMAT: {output_schema_name}
             if input_schema:
                 schema_instruction += f"ERWARTETER INPUT-TYP: {input_schema}\n"
         
-        prompt = f"""Du bist ein {agent_config['role']}.
+        return f"""Du bist ein {agent_config['role']}.
 
 DEINE IDENTITÄT:
 - Rolle: {agent_config['role']}
 - Ziel: {agent_config['goal']}
 - Hintergrund: {agent_config['backstory']}
-
-AKTUELLE AUFGABE:
-{task_description}
-
-MISSION KONTEXT:
-- Hochrangiges Ziel: {state.high_level_goal}
-- Mission ID: {state.mission_id}
-{context_section}
 {schema_instruction}
-
 WICHTIGE HINWEISE:
 - Arbeite präzise und strukturiert
 - Nutze die vorherigen Ergebnisse anderer Agenten als Kontext
 - Liefere ein Ergebnis, das dem erwarteten Format entspricht
-- Sei gründlich aber effizient
-
-Führe deine Aufgabe aus:"""
-        
-        return prompt
+- Sei gründlich aber effizient"""
     
     def _create_synthesis_prompt(self, goal: str, results: Dict[str, Any]) -> str:
         """Erstellt den Prompt für die finale Synthese."""
@@ -4,7 +4,9 @@ import asyncio
 import random
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Type, Optional
+from typing import AsyncIterator, Type, Optional
+
+from ..exceptions import RateLimitExceeded
 
 class CircuitBreakerState(Enum):
     CLOSED = "CLOSED"      # Anfragen werden durchgelassen
@@ -59,6 +61,20 @@ class CircuitBreaker:
         # Diese Property sollte nicht die State ändern, um Thread-Safety zu gewährleisten
         return self._state
     
+    @property
+    def next_attempt_at(self) -> Optional[datetime]:
+        """Frühester Zeitpunkt für den nächsten Test-Request, solange der Kreis offen ist."""
+        return self._next_attempt_at
+
+    def is_open(self) -> bool:
+        """
+        True, solange der Kreis offen ist und die Wartezeit noch läuft; ein Aufruf
+        würde also sofort abgewiesen. Ändert den Zustand nicht.
+        """
+        if self._state != CircuitBreakerState.OPEN:
+            return False
+        return not (self._next_attempt_at and datetime.now() >= self._next_attempt_at)
+
     @property
     def event_store(self):
         """Backwards-Kompatibilität für event_store Property."""
@@ -71,6 +87,55 @@ class CircuitBreaker:
 
     async def execute(self, coro):
         """Führt eine Coroutine aus und wendet die Circuit Breaker Logik an."""
+        try:
+            await self._admit()
+        except CircuitBreakerError:
+            coro.close()
+            raise
+        
+        # Im HALF_OPEN oder CLOSED Zustand, führen wir die Anfrage aus
+        try:
+            result = await coro
+        except RateLimitExceeded:
+            # Eigene Drosselung (Rate-Limit/Nebenläufigkeit), kein Fehler des Providers
+            raise
+        except self._expected_exception as e:
+            await self.record_failure()
+            raise e
+        except Exception as e:
+            # Nicht erwartete Exceptions führen nicht zu Circuit Breaker Aktivierung
+            raise e
+        
+        await self.record_success()
+        return result
+
+    async def stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Wie ``execute`` für einen Antwort-Stream: Erfolg oder Fehler wird erst
+        am Ende des Streams verbucht, ein Fehler mitten im Stream zählt also mit.
+        Bricht der Konsument ab (Client-Disconnect), wird nichts verbucht.
+        """
+        try:
+            await self._admit()
+        except CircuitBreakerError:
+            await chunks.aclose()
+            raise
+        
+        try:
+            async for chunk in chunks:
+                yield chunk
+        except RateLimitExceeded:
+            raise
+        except self._expected_exception:
+            await self.record_failure()
+            raise
+        finally:
+            await chunks.aclose()
+        
+        await self.record_success()
+
+    async def _admit(self):
+        """Weist Anfragen bei offenem Kreis ab bzw. lässt nach der Wartezeit einen Test-Request zu."""
         async with self._lock:
             if self._state == CircuitBreakerState.OPEN:
                 if self._next_attempt_at and datetime.now() >= self._next_attempt_at:
@@ -95,19 +160,6 @@ class CircuitBreaker:
                         error_msg += f" Next attempt at {self._next_attempt_at.isoformat()}"
                     
                     raise CircuitBreakerError(error_msg, self._next_attempt_at)
-        
-        # Im HALF_OPEN oder CLOSED Zustand, führen wir die Anfrage aus
-        try:
-            result = await coro
-        except self._expected_exception as e:
-            await self.record_failure()
-            raise e
-        except Exception as e:
-            # Nicht erwartete Exceptions führen nicht zu Circuit Breaker Aktivierung
-            raise e
-        
-        await self.record_success()
-        return result
 
     async def record_success(self):
         """Wird bei einer erfolgreichen Anfrage aufgerufen."""
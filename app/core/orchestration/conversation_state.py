@@ -1,5 +1,6 @@
 # llm_bridge/orchestration/conversation_state.py
 import asyncio
+import time
 from enum import Enum, auto
 from ..utils.task_manager import create_background_task
 
@@ -11,13 +12,29 @@ class State(Enum):
     ERROR = auto()
 
 class ConversationStateMachine:
+    # Kompakt, da der Router pro Konversation eine Instanz hält
+    __slots__ = ("id", "current_state", "last_participant", "previous_participant", "turns", "last_active",
+                 "served_by")
+
     def __init__(self, conversation_id: str):
         self.id = conversation_id
         self.current_state = State.IDLE
-        # Die Kette der LLMs, die an der Konversation teilgenommen haben.
-        self.participants_chain = []
+        # Ringpuffer der letzten beiden Teilnehmer: mehr braucht die Loop-Erkennung
+        # (A -> A, A -> B -> A) nicht, und die Kette wächst nicht mit der Konversation.
+        self.last_participant = None
+        self.previous_participant = None
+        self.turns = 0
+        # Zeitpunkt der letzten Nutzung (für die Idle-TTL des ConversationStore)
+        self.last_active = time.monotonic()
+        # Modell, das die letzte Anfrage tatsächlich beantwortet hat (ggf. über eine Fallback-Route)
+        self.served_by = None
         print(f"  State Machine for conversation '{self.id}' created, initial state: IDLE.")
 
+    @property
+    def participants_chain(self) -> tuple:
+        """Die letzten (höchstens zwei) Teilnehmer, ältester zuerst."""
+        return tuple(p for p in (self.previous_participant, self.last_participant) if p is not None)
+
     def transition_to(self, target_llm_name: str, event_store, allow_repeats: bool = False) -> bool:
         if self.current_state in [State.CONVERSATION_ENDED, State.ERROR]:
             error_msg = f"Conversation '{self.id}' is already ended or in an error state."
@@ -33,7 +50,7 @@ class ConversationStateMachine:
         
         if not allow_repeats and not is_mission_control:
             # Regel 1: Verhindert direkte Wiederholungen (A -> A)
-            if len(self.participants_chain) > 0 and target_llm_name == self.participants_chain[-1]:
+            if self.last_participant is not None and target_llm_name == self.last_participant:
                 error_msg = f"Direct repetition loop to '{target_llm_name}' is not allowed."
                 if event_store:
                     asyncio.create_task(event_store.log_event("ERROR", "ConversationStateMachine", error_msg, conversation_id=self.id))
@@ -41,7 +58,7 @@ class ConversationStateMachine:
                 raise Exception(f"Invalid state transition: {error_msg}")
             
             # Regel 2: Verhindert den Ping-Pong-Loop (A -> B -> A)
-            if len(self.participants_chain) > 1 and target_llm_name == self.participants_chain[-2]:
+            if self.previous_participant is not None and target_llm_name == self.previous_participant:
                 error_msg = f"Ping-pong loop back to '{target_llm_name}' is not allowed."
                 if event_store:
                     asyncio.create_task(event_store.log_event("ERROR", "ConversationStateMachine", error_msg, conversation_id=self.id))
@@ -56,11 +73,13 @@ class ConversationStateMachine:
                 name=f"log-transition-{self.id}"
             )
         self.current_state = State.AWAITING_RESPONSE
-        self.participants_chain.append(target_llm_name)
+        self.previous_participant = self.last_participant
+        self.last_participant = target_llm_name
+        self.turns += 1
         return True
 
     def record_response(self, from_llm_name: str, event_store):
-        if self.current_state == State.AWAITING_RESPONSE and self.participants_chain and self.participants_chain[-1] == from_llm_name:
+        if self.current_state == State.AWAITING_RESPONSE and self.last_participant == from_llm_name:
             if event_store:
                 create_background_task(
                     event_store.log_event("INFO", "ConversationStateMachine", 
@@ -0,0 +1,133 @@
+# llm_bridge/orchestration/conversation_store.py
+"""
+Begrenzter Speicher für die Zustandsmaschinen aktiver Konversationen.
+
+Der Router legt pro Konversations-ID (API-Konversationen, Missionen,
+Workflow-Schritte ``{workflow_id}_step_{n}``) eine ``ConversationStateMachine``
+an. Ohne Begrenzung wachsen langlebige API-Prozesse damit unbegrenzt.
+
+Der Store ist ein LRU mit Idle-TTL: Jeder Zugriff schiebt eine Konversation an
+das Ende der Reihenfolge. Damit liegen die am längsten ungenutzten Einträge
+vorne, und abgelaufene Einträge werden beim Anlegen neuer Konversationen in
+amortisiert O(1) von vorne entfernt, ohne Hintergrund-Task.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from .conversation_state import ConversationStateMachine
+
+_MISSING = object()
+
+
+class ConversationStore:
+    """
+    LRU-Speicher ``conversation_id -> ConversationStateMachine`` mit Idle-TTL.
+
+    Unterstützt die bisher genutzten Dict-Operationen (``in``, ``[]``, ``get``,
+    ``pop``, ``del``), damit er ``Router.active_conversations`` direkt ersetzt.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, idle_ttl_seconds: Optional[float] = None):
+        """
+        Args:
+            max_entries: Maximale Anzahl Konversationen (Default: CONVERSATION_STORE_MAX_ENTRIES).
+            idle_ttl_seconds: Konversationen ohne Zugriff werden danach verworfen
+                              (Default: CONVERSATION_IDLE_TTL_SECONDS, 0 = keine TTL).
+        """
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("CONVERSATION_STORE_MAX_ENTRIES", "10000"))
+        self.idle_ttl = idle_ttl_seconds if idle_ttl_seconds is not None else float(os.getenv("CONVERSATION_IDLE_TTL_SECONDS", "3600"))
+
+        self._entries: "OrderedDict[str, ConversationStateMachine]" = OrderedDict()
+
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return self.get(conversation_id) is not None
+
+    def __getitem__(self, conversation_id: str) -> ConversationStateMachine:
+        state_machine = self.get(conversation_id)
+        if state_machine is None:
+            raise KeyError(conversation_id)
+        return state_machine
+
+    def __setitem__(self, conversation_id: str, state_machine: ConversationStateMachine) -> None:
+        self._entries.pop(conversation_id, None)
+        state_machine.last_active = time.monotonic()
+        self._entries[conversation_id] = state_machine
+        self._evict()
+
+    def __delitem__(self, conversation_id: str) -> None:
+        del self._entries[conversation_id]
+
+    def _is_expired(self, state_machine: ConversationStateMachine, now: float) -> bool:
+        return self.idle_ttl > 0 and now - state_machine.last_active > self.idle_ttl
+
+    def get(self, conversation_id: str, default=None) -> Optional[ConversationStateMachine]:
+        """Liefert die Zustandsmaschine und markiert sie als zuletzt genutzt."""
+        state_machine = self._entries.get(conversation_id)
+        if state_machine is None:
+            return default
+
+        now = time.monotonic()
+        if self._is_expired(state_machine, now):
+            del self._entries[conversation_id]
+            self.expirations += 1
+            return default
+
+        state_machine.last_active = now
+        self._entries.move_to_end(conversation_id)
+        return state_machine
+
+    def get_or_create(self, conversation_id: str) -> ConversationStateMachine:
+        """Liefert die Zustandsmaschine einer Konversation oder legt eine neue an."""
+        state_machine = self.get(conversation_id)
+        if state_machine is None:
+            state_machine = ConversationStateMachine(conversation_id)
+            self._entries[conversation_id] = state_machine
+            self.created += 1
+            self._evict()
+        return state_machine
+
+    def pop(self, conversation_id: str, default=_MISSING):
+        if default is _MISSING:
+            return self._entries.pop(conversation_id)
+        return self._entries.pop(conversation_id, default)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        """Entfernt abgelaufene Einträge von vorne und hält die Obergrenze ein."""
+        now = time.monotonic()
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if not self._is_expired(oldest, now):
+                break
+            self._entries.popitem(last=False)
+            self.expirations += 1
+
+        while self.max_entries > 0 and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_stats(self) -> dict:
+        """Größe und Verdrängungszähler für API und Monitoring."""
+        return {
+            "active": len(self._entries),
+            "max_entries": self.max_entries,
+            "idle_ttl_seconds": self.idle_ttl,
+            "created": self.created,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
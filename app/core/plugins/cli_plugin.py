@@ -2,17 +2,29 @@
 import asyncio
 import os
 import shlex
-from typing import Dict, Any, List
-from ..adapters.universal_adapter import UniversalAdapter, AdapterError
+from typing import Dict, Any, List, AsyncIterator
+from ..adapters.universal_adapter import UniversalAdapter
+from ..exceptions import AdapterError
+from ..adapters.messages import flatten_messages
 from .base_plugin import LLMAdapterPlugin
+from .cli_worker_pool import CLIWorkerPool, run_once
 
 class CLIToolAdapter(UniversalAdapter):
-    """Adapter für die Interaktion mit Kommandozeilen-Tools."""
+    """
+    Adapter für die Interaktion mit Kommandozeilen-Tools.
+
+    Prozesse werden per exec ohne Shell gestartet und stdout wird in Chunks
+    gestreamt. Mit ``cli_workers`` in der Modellkonfiguration laufen die
+    Anfragen über einen Pool langlebiger Prozesse (siehe cli_worker_pool.py),
+    sonst startet jede Nachricht einen eigenen Prozess.
+    """
     def __init__(self, model_config: Dict[str, Any]):
         super().__init__(model_config)
         self.command = self.config.get('command')
         self.execution_env = self.config.get('execution_env', 'local')
         self.wsl_distro = self.config.get('wsl_distro')
+        self.workers_config = self.config.get('cli_workers')
+        self._pool = None
 
     async def chat_completion(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
         
@@ -22,33 +34,48 @@ class CLIToolAdapter(UniversalAdapter):
         print(f"  Tool-Name: {self.tool_name}")
         print(f"  Befehl: {self.command}")
         print(f"  Ausführungsumgebung: {self.execution_env}")
+        print(f"  Worker-Pool: {self.workers_config.get('protocol') if self.workers_config else 'nein'}")
         print("-------------------------------------\n")
         # --- ENDE DEBUG-AUSGABE ---
 
-        prompt = messages[-1]['content']
-        if self.execution_env == 'wsl':
-            response_text = await self._execute_wsl_command(prompt, **kwargs)
-        else:
-            response_text = await self._execute_local_command(prompt, **kwargs)
+        chunks = [chunk async for chunk in self.stream_completion(messages, **kwargs)]
+        response_text = "".join(chunks).strip()
         
         return {"choices": [{"message": {"content": response_text}}]}
 
-    async def _execute_local_command(self, prompt, **kwargs):
-        process = await asyncio.create_subprocess_shell(
-            self.command,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate(input=prompt.encode('utf-8'))
-        if process.returncode != 0:
-            raise AdapterError(f"Local command failed: {stderr.decode()}")
-        return stdout.decode().strip()
+    async def stream_completion(self, messages: List[Dict[str, str]], **kwargs) -> AsyncIterator[str]:
+        """
+        Liefert stdout des Tools in Chunks, sobald es eintrifft. CLI-Tools
+        erhalten einen einzelnen Prompt: System-Nachrichten (z.B. die
+        Agenten-Persona) und Verlauf werden vorangestellt.
+        """
+        prompt = flatten_messages(messages)
+        argv = await self._build_argv()
+        if self.workers_config:
+            if self._pool is None:
+                self._pool = CLIWorkerPool(self.tool_name, argv, self.workers_config)
+            chunks = self._pool.stream(prompt)
+        else:
+            chunks = run_once(argv, prompt)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
 
-    async def _execute_wsl_command(self, prompt, **kwargs):
+    async def _build_argv(self) -> List[str]:
+        """Argumentliste für exec; ``command`` wird wie in einer Shell in Wörter zerlegt, aber nicht interpretiert."""
+        if not self.command:
+            raise AdapterError(f"Kein Befehl für CLI-Tool '{self.tool_name}' konfiguriert.")
+        argv = shlex.split(self.command)
+        if self.execution_env == 'wsl':
+            argv = ['wsl', '-d', await self._resolve_wsl_distro(), *argv]
+        return argv
+
+    async def _resolve_wsl_distro(self) -> str:
         if not self.wsl_distro:
             # Versuche, die Standard-Distribution zu finden
-            proc_distro = await asyncio.create_subprocess_shell('wsl -l', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            proc_distro = await asyncio.create_subprocess_exec('wsl', '-l', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
             stdout_distro, _ = await proc_distro.communicate()
             output = stdout_distro.decode('utf-16-le', errors='ignore').strip()
             lines = output.splitlines()
@@ -63,19 +90,15 @@ class CLIToolAdapter(UniversalAdapter):
             raise AdapterError("Keine WSL-Distribution gefunden oder konfiguriert.")
         
         # Bereinige den Distributionsnamen
-        clean_distro = self.wsl_distro.replace('\x00', '').strip()
-        wsl_command = f'wsl -d "{clean_distro}" {self.command}'
-        
-        process = await asyncio.create_subprocess_shell(
-            wsl_command,
-            stdin=asyncio.subprocess.PIPE,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await process.communicate(input=prompt.encode('utf-8'))
-        if process.returncode != 0:
-            raise AdapterError(f"WSL command failed (Code {process.returncode}): {stderr.decode()}")
-        return stdout.decode().strip()
+        return self.wsl_distro.replace('\x00', '').strip()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self._pool.get_stats() if self._pool else {}
+
+    async def close(self) -> None:
+        """Beendet die Worker-Prozesse (Aufruf beim Shutdown)."""
+        if self._pool is not None:
+            await self._pool.close()
 
 class CLIAdapterPlugin(LLMAdapterPlugin):
     """Plugin-Definition für den CLI-Adapter."""
@@ -0,0 +1,391 @@
+# app/core/plugins/cli_worker_pool.py
+"""
+Prozesse für den CLIToolAdapter.
+
+Ohne Pool startet jede Nachricht einen neuen Prozess (``run_once``); bei
+lokalen CLI-Modellen dominiert dieser Start die Latenz. Tools mit einer REPL
+oder einem JSON-Lines-Protokoll können stattdessen in einem Pool langlebiger
+Prozesse laufen (``cli_workers`` in der Modellkonfiguration):
+
+* ``jsonl``: pro Anfrage eine Zeile ``{"id": n, "prompt": ...}`` auf stdin;
+  das Tool antwortet mit Zeilen ``{"id": n, "delta": ...}`` und schließt mit
+  ``{"id": n, "done": true}`` (alternativ ``"response"`` bzw. ``"error"``).
+  Über die ID können mehrere Anfragen gleichzeitig in einem Prozess laufen.
+* ``repl``: Prompt als Zeile auf stdin, die Antwort endet mit ``end_marker``
+  (z.B. dem Eingabe-Prompt der REPL); eine Anfrage pro Prozess gleichzeitig.
+
+Prozesse werden immer per exec ohne Shell gestartet. stdout kommt in Chunks,
+sobald es eintrifft; die Ausgabe pro Anfrage ist auf ``max_output_bytes``
+begrenzt. Prozesse ohne Anfrage werden nach ``idle_timeout_seconds`` beendet.
+"""
+
+import asyncio
+import codecs
+import itertools
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..exceptions import AdapterError
+from ..utils import json_codec
+from ..utils.task_manager import create_background_task
+
+READ_CHUNK_BYTES = 4096
+
+
+def _limits(config: Dict[str, Any]) -> tuple:
+    """Ausgabe-Obergrenze und Timeout aus der Modellkonfiguration bzw. den Umgebungsvariablen."""
+    max_output = config.get("max_output_bytes") or int(os.getenv("CLI_MAX_OUTPUT_BYTES", "1048576"))
+    timeout = config.get("request_timeout_seconds") or float(os.getenv("CLI_REQUEST_TIMEOUT_SECONDS", "300"))
+    return max_output, timeout
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+
+class _Utf8Decoder:
+    """Dekodiert Chunks inkrementell; ein an der Chunk-Grenze geteiltes Zeichen wird zurückgehalten."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    def decode(self, data: bytes, final: bool = False) -> str:
+        return self._decoder.decode(data, final)
+
+
+async def run_once(argv: List[str], prompt: str, config: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """
+    Startet ``argv`` für eine Anfrage, schreibt den Prompt auf stdin und liefert
+    stdout in Chunks. Überschreitet die Ausgabe die Obergrenze oder den Timeout,
+    wird der Prozess beendet.
+    """
+    max_output, timeout = _limits(config or {})
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except OSError as e:
+        raise AdapterError(f"CLI command could not be started: {e}") from e
+    deadline = time.monotonic() + timeout
+    # stderr parallel lesen, damit eine volle Pipe das Tool nicht blockiert
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+    try:
+        try:
+            process.stdin.write(prompt.encode("utf-8"))
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            # Tool hat stdin nicht gelesen (wie communicate(): Exit-Code entscheidet)
+            pass
+
+        received = 0
+        decoder = _Utf8Decoder()
+        while True:
+            data = await asyncio.wait_for(process.stdout.read(READ_CHUNK_BYTES), max(0.0, deadline - time.monotonic()))
+            if not data:
+                break
+            received += len(data)
+            if received > max_output:
+                raise AdapterError(f"CLI output exceeded {max_output} bytes.")
+            text = decoder.decode(data)
+            if text:
+                yield text
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+        returncode = await asyncio.wait_for(process.wait(), max(0.0, deadline - time.monotonic()))
+        if returncode != 0:
+            stderr = await stderr_task
+            raise AdapterError(f"CLI command failed (Code {returncode}): {stderr.decode(errors='replace')}")
+    except asyncio.TimeoutError:
+        raise AdapterError(f"CLI command timed out after {timeout:.0f}s.") from None
+    finally:
+        await _kill(process)
+        stderr_task.cancel()
+
+
+class _Worker:
+    """Ein langlebiger Prozess des Pools."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.active = 0
+        self.last_used = time.monotonic()
+        self.requests = 0
+        # jsonl: Antwort-Queues pro Anfrage-ID, befüllt vom Reader-Task
+        self.queues: Dict[int, asyncio.Queue] = {}
+        self.reader: Optional[asyncio.Task] = None
+        # repl: Pending-Ausgabe nach dem End-Marker (gehört zur nächsten Antwort)
+        self.buffer = ""
+        self.decoder = _Utf8Decoder()
+        # stdout geschlossen: der Prozess nimmt keine Anfragen mehr an, auch wenn er noch nicht beendet ist
+        self.closed = False
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed and self.process.returncode is None
+
+
+class CLIWorkerPool:
+    """Pool langlebiger CLI-Prozesse mit Nebenläufigkeit pro Prozess und Idle-Reaping."""
+
+    def __init__(self, name: str, argv: List[str], config: Dict[str, Any]):
+        self.name = name
+        self.argv = argv
+        self.protocol = config.get("protocol", "jsonl")
+        self.max_processes = max(1, config.get("processes") or 1)
+        # Eine REPL kann nur eine Anfrage gleichzeitig beantworten
+        self.per_process = 1 if self.protocol == "repl" else max(1, config.get("max_concurrency_per_process") or 1)
+        self.idle_timeout = float(config.get("idle_timeout_seconds") or os.getenv("CLI_WORKER_IDLE_SECONDS", "300"))
+        self.end_marker = config.get("end_marker")
+        self.await_initial_marker = bool(config.get("await_initial_marker"))
+        self.max_output, self.timeout = _limits(config)
+
+        self.workers: List[_Worker] = []
+        self._spawning = 0
+        self._available = asyncio.Condition()
+        self._ids = itertools.count(1)
+        self._reaper: Optional[asyncio.Task] = None
+        self.spawned = 0
+        self.reaped = 0
+        self.crashed = 0
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Beantwortet einen Prompt über einen freien Prozess und liefert stdout in Chunks.
+
+        Endet eine repl-Anfrage vor dem End-Marker (Timeout, Client getrennt,
+        abgebrochener Hedge, Fehler), steckt der Rest ihrer Antwort noch in
+        Pipe und Puffer: Der Prozess wird verworfen, damit die nächste Anfrage
+        nicht die Ausgabe der vorherigen liest. jsonl-Antworten sind über die
+        Anfrage-ID zugeordnet; späte Zeilen verwirft der Reader.
+        """
+        worker = await self._acquire()
+        completed = False
+        try:
+            if self.protocol == "repl":
+                chunks = self._stream_repl(worker, prompt)
+            else:
+                chunks = self._stream_jsonl(worker, prompt)
+            async for chunk in chunks:
+                yield chunk
+            completed = True
+        except asyncio.TimeoutError:
+            raise AdapterError(f"CLI worker '{self.name}' timed out after {self.timeout:.0f}s.") from None
+        finally:
+            if not completed and self.protocol == "repl":
+                await self._discard(worker)
+            worker.active -= 1
+            worker.last_used = time.monotonic()
+            async with self._available:
+                self._available.notify()
+
+    async def _acquire(self) -> _Worker:
+        async with self._available:
+            while True:
+                self.workers = [w for w in self.workers if w.alive]
+                free = [w for w in self.workers if w.active < self.per_process]
+                if free:
+                    worker = min(free, key=lambda w: w.active)
+                    worker.active += 1
+                    worker.requests += 1
+                    return worker
+                if len(self.workers) + self._spawning < self.max_processes:
+                    break
+                await self._available.wait()
+            self._spawning += 1
+        try:
+            worker = await self._spawn()
+        except BaseException:
+            async with self._available:
+                self._spawning -= 1
+                # Ein anderer Wartender darf den Start erneut versuchen
+                self._available.notify()
+            raise
+        async with self._available:
+            self._spawning -= 1
+            self.workers.append(worker)
+            worker.active += 1
+            worker.requests += 1
+        return worker
+
+    async def _spawn(self) -> _Worker:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *self.argv,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+        except OSError as e:
+            raise AdapterError(f"CLI worker '{self.name}' could not be started: {e}") from e
+        worker = _Worker(process)
+        self.spawned += 1
+        print(f"⚙️ [CLI] Worker für '{self.name}' gestartet (PID {process.pid}, {self.protocol})")
+        if self.protocol == "jsonl":
+            worker.reader = asyncio.ensure_future(self._read_jsonl(worker))
+        elif self.await_initial_marker:
+            # Banner und erster Eingabe-Prompt der REPL gehören zu keiner Antwort
+            try:
+                async for _ in self._read_until_marker(worker, limit=self.max_output):
+                    pass
+            except Exception:
+                await _kill(process)
+                raise
+        if self._reaper is None or self._reaper.done():
+            self._reaper = create_background_task(self._reap(), name=f"cli-reaper-{self.name}")
+        return worker
+
+    async def _stream_repl(self, worker: _Worker, prompt: str) -> AsyncIterator[str]:
+        # Mehrzeilige Prompts würden die REPL mehrere Eingaben sehen lassen
+        line = " ".join(prompt.splitlines())
+        await self._write(worker, line)
+        async for chunk in self._read_until_marker(worker, limit=self.max_output):
+            yield chunk
+
+    async def _write(self, worker: _Worker, line: str) -> None:
+        try:
+            worker.process.stdin.write(line.encode("utf-8") + b"\n")
+            await worker.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            self.crashed += 1
+            await self._discard(worker)
+            raise AdapterError(f"CLI worker '{self.name}' exited (Code {worker.process.returncode}).") from None
+
+    async def _read_until_marker(self, worker: _Worker, limit: int) -> AsyncIterator[str]:
+        """Liest stdout bis ``end_marker``; Text davor wird in Chunks geliefert."""
+        marker = self.end_marker
+        deadline = time.monotonic() + self.timeout
+        received = 0
+        while True:
+            index = worker.buffer.find(marker)
+            if index >= 0:
+                if index:
+                    yield worker.buffer[:index]
+                worker.buffer = worker.buffer[index + len(marker):]
+                return
+            # Ende des Puffers zurückhalten, falls dort der Anfang des Markers steht
+            safe = len(worker.buffer) - len(marker) + 1
+            if safe > 0:
+                yield worker.buffer[:safe]
+                worker.buffer = worker.buffer[safe:]
+            data = await asyncio.wait_for(worker.process.stdout.read(READ_CHUNK_BYTES),
+                                          max(0.0, deadline - time.monotonic()))
+            if not data:
+                worker.closed = True
+                self.crashed += 1
+                raise AdapterError(f"CLI worker '{self.name}' exited (Code {worker.process.returncode}).")
+            received += len(data)
+            if received > limit:
+                await self._discard(worker)
+                raise AdapterError(f"CLI output exceeded {limit} bytes.")
+            worker.buffer += worker.decoder.decode(data)
+
+    async def _stream_jsonl(self, worker: _Worker, prompt: str) -> AsyncIterator[str]:
+        request_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue()
+        worker.queues[request_id] = queue
+        if worker.closed:
+            queue.put_nowait(None)
+        try:
+            await self._write(worker, json_codec.dumps({"id": request_id, "prompt": prompt}))
+
+            deadline = time.monotonic() + self.timeout
+            received = 0
+            while True:
+                message = await asyncio.wait_for(queue.get(), max(0.0, deadline - time.monotonic()))
+                if message is None:
+                    raise AdapterError(f"CLI worker '{self.name}' exited (Code {worker.process.returncode}).")
+                if message.get("error"):
+                    raise AdapterError(f"CLI worker '{self.name}' error: {message['error']}")
+                text = message.get("delta") or message.get("response") or ""
+                received += len(text.encode("utf-8"))
+                if received > self.max_output:
+                    raise AdapterError(f"CLI output exceeded {self.max_output} bytes.")
+                if text:
+                    yield text
+                if message.get("done") or "response" in message:
+                    return
+        finally:
+            # Späte Zeilen einer abgebrochenen Anfrage verwirft der Reader
+            worker.queues.pop(request_id, None)
+
+    async def _read_jsonl(self, worker: _Worker) -> None:
+        """Verteilt die Antwortzeilen eines jsonl-Prozesses an die wartenden Anfragen."""
+        try:
+            while True:
+                line = await worker.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    message = json_codec.loads(line)
+                    queue = worker.queues.get(message.get("id"))
+                except (ValueError, AttributeError):
+                    print(f"⚠️ [CLI] '{self.name}': Zeile ohne gültiges JSON ignoriert")
+                    continue
+                if queue is not None:
+                    queue.put_nowait(message)
+        except ValueError:
+            # Zeile länger als das StreamReader-Limit
+            print(f"⚠️ [CLI] '{self.name}': Zeile zu lang, Worker wird beendet")
+            await _kill(worker.process)
+        finally:
+            worker.closed = True
+            try:
+                # Exit-Code für die Fehlermeldung abwarten
+                await asyncio.wait_for(worker.process.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            if worker.queues:
+                self.crashed += 1
+            for queue in worker.queues.values():
+                queue.put_nowait(None)
+
+    async def _discard(self, worker: _Worker) -> None:
+        # Zuerst aus dem Pool nehmen: auch bei erneutem Abbruch während des Wartens bekommt er keine Anfrage mehr
+        worker.closed = True
+        if worker in self.workers:
+            self.workers.remove(worker)
+        await _kill(worker.process)
+
+    async def _reap(self) -> None:
+        """Beendet Prozesse, die länger als ``idle_timeout`` keine Anfrage hatten."""
+        interval = max(1.0, min(self.idle_timeout / 2, 30.0))
+        while self.workers:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for worker in list(self.workers):
+                if worker.active == 0 and now - worker.last_used >= self.idle_timeout:
+                    await self._discard(worker)
+                    self.reaped += 1
+                    print(f"💤 [CLI] Idle-Worker für '{self.name}' beendet (PID {worker.process.pid})")
+
+    async def close(self) -> None:
+        if self._reaper is not None:
+            self._reaper.cancel()
+        for worker in list(self.workers):
+            if worker.reader is not None:
+                worker.reader.cancel()
+            await self._discard(worker)
+
+    def get_stats(self) -> dict:
+        return {
+            "protocol": self.protocol,
+            "processes": len([w for w in self.workers if w.alive]),
+            "max_processes": self.max_processes,
+            "max_concurrency_per_process": self.per_process,
+            "active_requests": sum(w.active for w in self.workers),
+            "spawned": self.spawned,
+            "reaped": self.reaped,
+            "crashed": self.crashed,
+        }
@@ -0,0 +1,5 @@
+# llm_bridge/ratelimit/__init__.py
+"""
+Rate-Limiting-Subsystem der Bridge: Token-Buckets pro Adapter-Dienst für
+Anfragen und Tokens pro Minute, im Prozess oder über Redis geteilt.
+"""
@@ -0,0 +1,258 @@
+# llm_bridge/ratelimit/adaptive.py
+"""
+Adaptive Nebenläufigkeit (AIMD) pro Adapter.
+
+Statische RPM/TPM-Limits (limiter.py) müssen von Hand gepflegt werden und
+kennen die aktuelle Last beim Provider nicht. Zusätzlich begrenzt daher jeder
+Adapter die Zahl gleichzeitig laufender Anfragen mit einem Fenster, das sich
+selbst einstellt:
+
+* Additive Increase: Jede erfolgreiche Antwort bei ausgelastetem Fenster
+  vergrößert es um ``1 / fenster`` (etwa +1 pro Runde).
+* Multiplicative Decrease: 429, 5xx und Timeouts verkleinern es um den Faktor
+  ``ADAPTIVE_CONCURRENCY_BACKOFF``, auffällig langsame Antworten (mehr als
+  ``ADAPTIVE_CONCURRENCY_SLOW_FACTOR`` x EWMA der Latenz) um 10%. Höchstens
+  eine Verkleinerung pro Latenz-Runde, damit eine Welle gleichzeitiger 429
+  das Fenster nicht auf das Minimum stürzt.
+* Rate-Limit-Header: ``retry-after`` (bzw. ``retry-after-ms``) pausiert den
+  Adapter, ``*ratelimit*remaining*`` für Anfragen deckelt das Fenster, ein
+  erschöpftes Token-Kontingent zählt wie eine Drosselung.
+
+Anfragen über dem Fenster warten in einer FIFO-Warteschlange, höchstens
+``ADAPTIVE_CONCURRENCY_MAX_WAIT_SECONDS``; danach ``RateLimitExceeded``.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+from ..exceptions import RateLimitExceeded
+
+# Obergrenze für Pausen aus retry-after, falls ein Provider unsinnige Werte schickt
+MAX_RETRY_AFTER_SECONDS = 300.0
+SLOW_DECREASE_FACTOR = 0.9
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Wartezeit in Sekunden aus ``retry-after-ms`` oder ``retry-after`` (Sekunden oder HTTP-Datum)."""
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_remaining(headers: Mapping[str, str]):
+    """
+    Verbleibende Kontingente aus den Rate-Limit-Headern der Provider
+    (``x-ratelimit-remaining-requests``, ``anthropic-ratelimit-tokens-remaining``, ...).
+
+    Returns:
+        (verbleibende Anfragen, verbleibende Tokens), jeweils das Minimum oder None.
+    """
+    requests = tokens = None
+    for key, value in headers.items():
+        key = key.lower()
+        if "ratelimit" not in key or "remaining" not in key:
+            continue
+        try:
+            remaining = float(value)
+        except ValueError:
+            continue
+        if "token" in key:
+            tokens = remaining if tokens is None else min(tokens, remaining)
+        else:
+            requests = remaining if requests is None else min(requests, remaining)
+    return requests, tokens
+
+
+class AdaptiveConcurrency:
+    """AIMD-Fenster für gleichzeitige Anfragen eines Adapters mit FIFO-Warteschlange."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.enabled = os.getenv("ADAPTIVE_CONCURRENCY_ENABLED", "true").lower() == "true"
+        self.minimum = max(1, int(os.getenv("ADAPTIVE_CONCURRENCY_MIN", "1")))
+        self.maximum = max(self.minimum, int(os.getenv("ADAPTIVE_CONCURRENCY_MAX", "64")))
+        self.backoff = float(os.getenv("ADAPTIVE_CONCURRENCY_BACKOFF", "0.5"))
+        self.slow_factor = float(os.getenv("ADAPTIVE_CONCURRENCY_SLOW_FACTOR", "3.0"))
+        self.max_wait = float(os.getenv("ADAPTIVE_CONCURRENCY_MAX_WAIT_SECONDS", "60"))
+        initial = int(os.getenv("ADAPTIVE_CONCURRENCY_INITIAL", "8"))
+        self.window = float(min(self.maximum, max(self.minimum, initial)))
+
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._paused_until = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._last_decrease = 0.0
+
+        self.requests = 0
+        self.throttled = 0
+        self.server_errors = 0
+        self.timeouts = 0
+        self.slow = 0
+        self.pauses = 0
+        self.rejections = 0
+
+    @property
+    def limit(self) -> int:
+        return max(self.minimum, int(self.window))
+
+    async def acquire(self) -> None:
+        """Wartet auf einen freien Platz im Fenster (und das Ende einer retry-after-Pause)."""
+        started = time.monotonic()
+        if not self.enabled:
+            self.in_flight += 1
+            return
+        if self._waiters or self.in_flight >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter), timeout=self.max_wait)
+            except asyncio.TimeoutError:
+                self._abandon(waiter)
+                raise self._rejected(self.max_wait) from None
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        else:
+            self.in_flight += 1
+
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            remaining = self.max_wait - (time.monotonic() - started)
+            if pause > remaining:
+                self.release()
+                raise self._rejected(pause)
+            try:
+                await asyncio.sleep(pause)
+            except BaseException:
+                self.release()
+                raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    @asynccontextmanager
+    async def slot(self):
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _wake(self) -> None:
+        # Der Platz wird beim Wecken übergeben; so kann sich niemand vordrängeln
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        if waiter.done() and not waiter.cancelled():
+            # Der Platz wurde bereits übergeben, während der Wartende aufgab
+            self.release()
+        else:
+            waiter.cancel()
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _rejected(self, retry_after: float) -> RateLimitExceeded:
+        self.rejections += 1
+        print(f"🚦 [Concurrency] '{self.name}': Wartezeit überschritten (Fenster {self.limit}, "
+              f"{len(self._waiters)} wartend)")
+        return RateLimitExceeded(f"Concurrency limit for '{self.name}' exceeded.", self.name, retry_after)
+
+    def _decrease(self, factor: float) -> None:
+        now = time.monotonic()
+        # Höchstens einmal pro Latenz-Runde: die übrigen Fehler stammen aus demselben Fenster
+        if now - self._last_decrease < max(1.0, self._latency_ewma or 0.0):
+            return
+        self._last_decrease = now
+        self.window = max(float(self.minimum), self.window * factor)
+
+    def observe(self, status_code: int, headers: Mapping[str, str], latency_seconds: float) -> None:
+        """Wertet Status, Rate-Limit-Header und Latenz einer Provider-Antwort aus."""
+        if not self.enabled:
+            return
+        self.requests += 1
+        retry_after = parse_retry_after(headers)
+        if retry_after:
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + min(retry_after, MAX_RETRY_AFTER_SECONDS))
+            self.pauses += 1
+
+        if status_code == 429:
+            self.throttled += 1
+            self._decrease(self.backoff)
+            return
+        if status_code >= 500:
+            self.server_errors += 1
+            self._decrease(self.backoff)
+            return
+        if status_code >= 400:
+            return
+
+        slow = bool(self._latency_ewma) and latency_seconds > self.slow_factor * self._latency_ewma
+        self._latency_ewma = (latency_seconds if self._latency_ewma is None
+                              else self._latency_ewma + 0.2 * (latency_seconds - self._latency_ewma))
+
+        remaining_requests, remaining_tokens = parse_remaining(headers)
+        if remaining_requests is not None and remaining_requests < self.window:
+            # Der Provider lässt in diesem Zeitraum nur noch so viele Anfragen zu
+            self.window = max(float(self.minimum), remaining_requests)
+        elif remaining_tokens is not None and remaining_tokens <= 0:
+            self._decrease(self.backoff)
+        elif slow:
+            self.slow += 1
+            self._decrease(SLOW_DECREASE_FACTOR)
+        elif self.in_flight >= self.limit:
+            # Nur ein ausgelastetes Fenster wächst; sonst fehlt das Signal, ob mehr möglich ist
+            self.window = min(float(self.maximum), self.window + 1 / self.window)
+        self._wake()
+
+    def observe_timeout(self) -> None:
+        """Ein Timeout zählt wie eine Überlastung des Providers."""
+        if not self.enabled:
+            return
+        self.requests += 1
+        self.timeouts += 1
+        self._decrease(self.backoff)
+
+    def get_stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window": round(self.window, 2),
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queue_depth": len(self._waiters),
+            "paused_for_seconds": round(max(0.0, self._paused_until - time.monotonic()), 1),
+            "latency_ewma_ms": round(self._latency_ewma * 1000, 1) if self._latency_ewma is not None else None,
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "server_errors": self.server_errors,
+            "timeouts": self.timeouts,
+            "slow": self.slow,
+            "pauses": self.pauses,
+            "rejections": self.rejections,
+        }
@@ -0,0 +1,268 @@
+# llm_bridge/ratelimit/limiter.py
+"""
+Ausgehende Rate-Limits pro Adapter-Dienst.
+
+Provider drosseln mit 429, sobald Anfragen (RPM) oder Tokens (TPM) pro Minute
+überschritten werden; diese Fehler öffnen dann die Circuit Breaker. Der
+RateLimiter taktet ausgehende Aufrufe deshalb vorher selbst:
+
+* Zwei Token-Buckets pro Dienst (``requests_per_minute``, ``tokens_per_minute``
+  aus dem ``rate_limits``-Block der registry.yaml), die kontinuierlich auffüllen.
+* Der Tokenverbrauch wird aus der Prompt-Länge geschätzt (plus ``max_tokens``,
+  falls angegeben), da die echte Zahl erst nach der Antwort feststeht. Eine
+  Anfrage, die größer ist als der ganze TPM-Bucket, passt nie hinein und wird
+  sofort abgewiesen.
+* Wartende Aufrufer stehen pro Dienst in einer FIFO-Warteschlange; eine große
+  Anfrage wird nicht dauerhaft von kleinen überholt. Statt eines Fehlers wird
+  gewartet, höchstens bis zur Deadline (``max_wait_seconds``), danach
+  ``RateLimitExceeded``.
+
+Die Buckets liegen im Prozess (Single-Node) oder in Redis, damit sich mehrere
+Replikas ein Limit teilen (``PROVIDER_RATE_LIMIT_BACKEND=redis``, siehe redis_store.py).
+"""
+
+import asyncio
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from ..exceptions import RateLimitExceeded
+
+DEFAULT_CHARS_PER_TOKEN = 4.0
+DEFAULT_MAX_WAIT_SECONDS = 30.0
+
+
+def estimate_tokens(prompt: str, max_tokens: Any = None, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN) -> int:
+    """Grobe Token-Schätzung einer Anfrage: Prompt-Länge / Zeichen pro Token plus ``max_tokens``."""
+    estimate = math.ceil(len(prompt or "") / chars_per_token) if chars_per_token > 0 else 0
+    if isinstance(max_tokens, int) and max_tokens > 0:
+        estimate += max_tokens
+    return max(1, estimate)
+
+
+class RateLimitPolicy:
+    """Aufgelöster ``rate_limits``-Eintrag eines Adapter-Dienstes."""
+
+    __slots__ = ("requests_per_minute", "tokens_per_minute", "max_wait_seconds")
+
+    def __init__(self, requests_per_minute: Optional[int], tokens_per_minute: Optional[int], max_wait_seconds: float):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_wait_seconds = max_wait_seconds
+
+    @classmethod
+    def from_config(cls, config: Any, default_max_wait: float) -> Optional["RateLimitPolicy"]:
+        """Erstellt die Policy aus einem Dict oder None, wenn kein Limit gesetzt bzw. deaktiviert ist."""
+        if not isinstance(config, dict) or not config.get("enabled", True):
+            return None
+        rpm = config.get("requests_per_minute") or None
+        tpm = config.get("tokens_per_minute") or None
+        if rpm is None and tpm is None:
+            return None
+        max_wait = config.get("max_wait_seconds")
+        return cls(rpm, tpm, float(default_max_wait if max_wait is None else max_wait))
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def refill(state: List[float], policy: RateLimitPolicy, now: float) -> None:
+    """Füllt beide Buckets (``[anfragen, tokens, zeitpunkt]``) in-place bis ``now`` auf."""
+    elapsed = max(0.0, now - state[2])
+    if policy.requests_per_minute:
+        state[0] = min(policy.requests_per_minute, state[0] + elapsed * policy.requests_per_minute / 60)
+    if policy.tokens_per_minute:
+        state[1] = min(policy.tokens_per_minute, state[1] + elapsed * policy.tokens_per_minute / 60)
+    state[2] = now
+
+
+def take(state: List[float], policy: RateLimitPolicy, cost: int, now: float) -> float:
+    """
+    Füllt beide Buckets auf und entnimmt eine Anfrage und ``cost`` Tokens.
+
+    Returns:
+        0, wenn entnommen wurde, sonst die Wartezeit in Sekunden, bis beide
+        Buckets genug enthalten (dann wird nichts entnommen).
+    """
+    refill(state, policy, now)
+    rpm = policy.requests_per_minute
+    tpm = policy.tokens_per_minute
+
+    wait = 0.0
+    if rpm and state[0] < 1:
+        wait = (1 - state[0]) * 60 / rpm
+    if tpm and state[1] < cost:
+        wait = max(wait, (cost - state[1]) * 60 / tpm)
+    if wait == 0.0:
+        if rpm:
+            state[0] -= 1
+        if tpm:
+            state[1] -= cost
+    return wait
+
+
+class LocalBucketStore:
+    """Buckets im Prozess; genügt, solange nur eine Replika die Provider anfragt."""
+
+    name = "local"
+
+    def __init__(self):
+        self._buckets: Dict[str, List[float]] = {}
+
+    def _state(self, service: str, policy: RateLimitPolicy) -> List[float]:
+        state = self._buckets.get(service)
+        if state is None:
+            # Neue Dienste starten mit vollen Buckets
+            state = self._buckets[service] = [policy.requests_per_minute or 0, policy.tokens_per_minute or 0,
+                                              time.monotonic()]
+        return state
+
+    async def reserve(self, service: str, policy: RateLimitPolicy, cost: int) -> float:
+        return take(self._state(service, policy), policy, cost, time.monotonic())
+
+    def peek(self, service: str, policy: RateLimitPolicy) -> Optional[dict]:
+        """Aktueller Füllstand (aufgefüllt, ohne Entnahme) für die Status-API."""
+        state = self._state(service, policy)
+        refill(state, policy, time.monotonic())
+        return {
+            "requests": round(state[0], 2) if policy.requests_per_minute else None,
+            "tokens": round(state[1]) if policy.tokens_per_minute else None,
+        }
+
+
+class _ServiceQueue:
+    """FIFO-Warteschlange und Zähler eines Dienstes."""
+
+    __slots__ = ("lock", "waiting", "acquired", "delayed", "timeouts", "oversized", "wait_seconds",
+                 "max_wait_seconds")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()  # asyncio.Lock weckt Wartende in Ankunftsreihenfolge
+        self.waiting = 0
+        self.acquired = 0
+        self.delayed = 0
+        self.timeouts = 0
+        self.oversized = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+
+class RateLimiter:
+    """Token-Buckets (RPM/TPM) pro Adapter-Dienst mit fairer Warteschlange und Deadline."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, redis_client: Any = None):
+        self.default_max_wait = float(os.getenv("PROVIDER_RATE_LIMIT_MAX_WAIT_SECONDS", str(DEFAULT_MAX_WAIT_SECONDS)))
+        self.chars_per_token = float(os.getenv("PROVIDER_RATE_LIMIT_CHARS_PER_TOKEN", str(DEFAULT_CHARS_PER_TOKEN)))
+
+        self.local_store = LocalBucketStore()
+        self.store = self.local_store
+        if os.getenv("PROVIDER_RATE_LIMIT_BACKEND", "local").lower() == "redis":
+            if redis_client is not None:
+                from .redis_store import RedisBucketStore
+                self.store = RedisBucketStore(redis_client, fallback=self.local_store)
+            else:
+                print("⚠️ [RateLimit] Redis-Backend angefordert, aber kein Redis-Client verfügbar; nutze lokale Buckets")
+
+        self.policies: Dict[str, RateLimitPolicy] = {}
+        self._queues: Dict[str, _ServiceQueue] = {}
+        self.configure(config)
+
+    def configure(self, config: Optional[Dict[str, Any]]) -> None:
+        """Übernimmt die ``rate_limits`` der Registry; Warteschlangen und Füllstände bleiben erhalten."""
+        policies = {}
+        for service, service_config in (config or {}).items():
+            policy = RateLimitPolicy.from_config(service_config, self.default_max_wait)
+            if policy is not None:
+                policies[service] = policy
+        self.policies = policies
+        if policies:
+            print(f"🚦 [RateLimit] Limits für {len(policies)} Dienste aktiv ({self.store.name})")
+
+    async def acquire(self, service: str, prompt: str, max_tokens: Any = None) -> float:
+        """
+        Wartet, bis ``service`` eine weitere Anfrage mit dem geschätzten
+        Tokenverbrauch von ``prompt`` zulässt, und verbucht sie.
+
+        Returns:
+            Die Wartezeit in Sekunden (0 für Dienste ohne Limit).
+
+        Raises:
+            RateLimitExceeded: Die Anfrage hätte länger als ``max_wait_seconds`` warten müssen
+                oder ist größer als der ganze TPM-Bucket.
+        """
+        policy = self.policies.get(service)
+        if policy is None:
+            return 0.0
+
+        queue = self._queues.get(service)
+        if queue is None:
+            queue = self._queues[service] = _ServiceQueue()
+
+        cost = estimate_tokens(prompt, max_tokens, self.chars_per_token)
+        if policy.tokens_per_minute and cost > policy.tokens_per_minute:
+            # Größer als der ganze Bucket: würde auch nach beliebig langem Warten nicht zugelassen
+            queue.oversized += 1
+            print(f"🚦 [RateLimit] '{service}': Anfrage mit ~{cost} Tokens übersteigt "
+                  f"tokens_per_minute ({policy.tokens_per_minute}), abgewiesen")
+            raise RateLimitExceeded(f"Request for '{service}' exceeds tokens_per_minute "
+                                    f"({cost} > {policy.tokens_per_minute}).", service, 60.0)
+
+        started = time.monotonic()
+        deadline = started + policy.max_wait_seconds
+        queue.waiting += 1
+        try:
+            if queue.lock.locked():
+                try:
+                    await asyncio.wait_for(queue.lock.acquire(), timeout=policy.max_wait_seconds)
+                except asyncio.TimeoutError:
+                    raise self._exceeded(service, queue, policy.max_wait_seconds) from None
+            else:
+                await queue.lock.acquire()
+            try:
+                while True:
+                    wait = await self.store.reserve(service, policy, cost)
+                    if wait <= 0:
+                        break
+                    if time.monotonic() + wait > deadline:
+                        raise self._exceeded(service, queue, wait)
+                    await asyncio.sleep(wait)
+            finally:
+                queue.lock.release()
+        finally:
+            queue.waiting -= 1
+
+        waited = time.monotonic() - started
+        queue.acquired += 1
+        if waited > 0.001:
+            queue.delayed += 1
+            queue.wait_seconds += waited
+            queue.max_wait_seconds = max(queue.max_wait_seconds, waited)
+        return waited
+
+    def _exceeded(self, service: str, queue: _ServiceQueue, retry_after: float) -> RateLimitExceeded:
+        queue.timeouts += 1
+        print(f"🚦 [RateLimit] '{service}': Deadline überschritten, Anfrage abgewiesen")
+        return RateLimitExceeded(f"Rate limit for '{service}' exceeded.", service, retry_after)
+
+    def get_stats(self) -> dict:
+        """Limits, Warteschlangen und Wartezeiten pro Dienst für API und Monitoring."""
+        services = {}
+        for service, policy in self.policies.items():
+            queue = self._queues.get(service)
+            services[service] = {
+                "policy": policy.to_dict(),
+                "queue_depth": queue.waiting if queue else 0,
+                "acquired": queue.acquired if queue else 0,
+                "delayed": queue.delayed if queue else 0,
+                "timeouts": queue.timeouts if queue else 0,
+                "oversized": queue.oversized if queue else 0,
+                "avg_wait_ms": round(queue.wait_seconds / queue.delayed * 1000, 1) if queue and queue.delayed else 0.0,
+                "max_wait_ms": round(queue.max_wait_seconds * 1000, 1) if queue else 0.0,
+                "available": self.store.peek(service, policy),
+            }
+        return {
+            "backend": self.store.name,
+            "chars_per_token": self.chars_per_token,
+            "services": services,
+        }
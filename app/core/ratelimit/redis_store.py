@@ -0,0 +1,78 @@
+# llm_bridge/ratelimit/redis_store.py
+"""
+Redis-Backend für die Rate-Limit-Buckets.
+
+Mehrere Replikas teilen sich dieselben Provider-Limits. Auffüllen und
+Entnehmen laufen atomar in einem Lua-Skript mit der Uhr des Redis-Servers,
+damit abweichende Uhren der Replikas keine Rolle spielen. Ist Redis nicht
+erreichbar, fällt der Limiter auf die lokalen Buckets zurück: Die Limits
+gelten dann pro Replika statt global, Anfragen laufen aber weiter.
+"""
+
+from typing import Any
+
+from .limiter import LocalBucketStore, RateLimitPolicy
+
+RATE_LIMIT_KEY_PREFIX = "llm_ratelimit:"
+
+# Gleiche Logik wie limiter.take(); KEYS[1] = Hash mit r (Anfragen), t (Tokens), ts (Zeitpunkt)
+_TAKE_SCRIPT = """
+-- Vor Redis 5 nötig, damit TIME in Skripten erlaubt ist; ab Redis 7 ein No-Op, das wegfallen kann
+if redis.replicate_commands then redis.replicate_commands() end
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'r', 't', 'ts')
+local r = tonumber(state[1]) or rpm
+local t = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+if rpm > 0 then r = math.min(rpm, r + elapsed * rpm / 60) end
+if tpm > 0 then t = math.min(tpm, t + elapsed * tpm / 60) end
+
+local wait = 0
+if rpm > 0 and r < 1 then wait = (1 - r) * 60 / rpm end
+if tpm > 0 and t < cost then wait = math.max(wait, (cost - t) * 60 / tpm) end
+if wait == 0 then
+    if rpm > 0 then r = r - 1 end
+    if tpm > 0 then t = t - cost end
+end
+
+redis.call('HSET', KEYS[1], 'r', tostring(r), 't', tostring(t), 'ts', tostring(now))
+-- Nach einer Minute ohne Anfragen sind beide Buckets ohnehin wieder voll
+redis.call('EXPIRE', KEYS[1], 61)
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """Buckets in Redis, geteilt von allen Replikas."""
+
+    name = "redis"
+
+    def __init__(self, client: Any, fallback: LocalBucketStore):
+        self.client = client
+        self.fallback = fallback
+        self._script = None
+        self.errors = 0
+
+    async def reserve(self, service: str, policy: RateLimitPolicy, cost: int) -> float:
+        try:
+            if self._script is None:
+                self._script = self.client.register_script(_TAKE_SCRIPT)
+            wait = await self._script(
+                keys=[RATE_LIMIT_KEY_PREFIX + service],
+                args=[policy.requests_per_minute or 0, policy.tokens_per_minute or 0, cost],
+            )
+            return float(wait)
+        except Exception as e:
+            self.errors += 1
+            if self.errors == 1 or self.errors % 100 == 0:
+                print(f"⚠️ [RateLimit] Redis nicht verfügbar ({e}), nutze lokale Buckets ({self.errors} Fehler)")
+            return await self.fallback.reserve(service, policy, cost)
+
+    def peek(self, service: str, policy: RateLimitPolicy) -> None:
+        # Füllstand liegt in Redis; die Status-API liest ihn nicht synchron aus
+        return None
@@ -4,6 +4,7 @@ import redis.asyncio as redis
 from typing import Optional, List
 from .agent_state_repository import IAgentStateRepository
 from ..orchestration.agent_state import AgentState
+from ..utils import json_codec
 
 # Konstanten für Redis-Schlüssel, um "Magic Strings" zu vermeiden
 STATE_KEY_PREFIX = "llm_bridge:mission_state:"
@@ -25,7 +26,7 @@ class RedisAgentStateRepository(IAgentStateRepository):
         - Die Mission-ID wird zu einem Set aktiver Missionen hinzugefügt oder daraus entfernt.
         """
         key = self._get_key(state.mission_id)
-        state_json = state.model_dump_json()
+        state_json = json_codec.dump_model(state)
 
         # Wir verwenden eine Pipeline, um sicherzustellen, dass beide Operationen
         # (Speichern des Zustands und Aktualisieren des Sets) atomar erfolgen.
@@ -45,7 +46,7 @@ class RedisAgentStateRepository(IAgentStateRepository):
         key = self._get_key(mission_id)
         data = await self._client.get(key)
         if data:
-            return AgentState.model_validate_json(data)
+            return json_codec.load_model(AgentState, data)
         return None
 
     async def delete(self, mission_id: str) -> None:
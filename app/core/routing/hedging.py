@@ -0,0 +1,173 @@
+# llm_bridge/routing/hedging.py
+"""
+Hedged Requests über gleichwertige Routen.
+
+Viele Modelle sind sowohl direkt als auch über ``openrouter_gateway``
+erreichbar. Antwortet die primäre Route nicht innerhalb eines Perzentils
+ihrer bisherigen Latenz, geht eine zweite Anfrage an die gleichwertige Route;
+die erste Antwort gewinnt, die andere Anfrage wird abgebrochen.
+
+Ein Budget begrenzt den Zusatzverkehr: Jede Anfrage verdient ``budget``
+Credits (z.B. 0.05), jeder Hedge kostet einen Credit. Langfristig gehen so
+höchstens 5% zusätzliche Anfragen an die Provider, auch wenn ein Provider
+komplett hängt.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from ..utils.latency import LatencyTracker
+
+DEFAULT_HEDGE_VIA = "openrouter_gateway"
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_HEDGE_BUDGET = 0.05
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_INITIAL_DELAY_MS = 2000
+
+
+class HedgePolicy:
+    """Aufgelöste ``hedging``-Konfiguration eines Modells."""
+
+    __slots__ = ("target", "via", "percentile", "budget", "min_samples", "initial_delay_ms")
+
+    def __init__(self, target: Optional[str], via: Optional[str], percentile: float, budget: float,
+                 min_samples: int, initial_delay_ms: int):
+        self.target = target
+        self.via = via
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.initial_delay_ms = initial_delay_ms
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional["HedgePolicy"]:
+        """Erstellt die Policy aus dem ``hedging``-Block (Dict) oder None, wenn deaktiviert."""
+        if not isinstance(config, dict) or not config.get("enabled", True):
+            return None
+
+        def pick(field: str, default: Any) -> Any:
+            value = config.get(field)
+            return default if value is None else value
+
+        return cls(
+            target=config.get("target"),
+            via=pick("via", DEFAULT_HEDGE_VIA),
+            percentile=float(pick("percentile", DEFAULT_HEDGE_PERCENTILE)),
+            budget=float(pick("budget", DEFAULT_HEDGE_BUDGET)),
+            min_samples=int(pick("min_samples", DEFAULT_HEDGE_MIN_SAMPLES)),
+            initial_delay_ms=int(pick("initial_delay_ms", DEFAULT_HEDGE_INITIAL_DELAY_MS)),
+        )
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, HedgePolicy) and self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def _retrieve_exception(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
+
+
+class HedgeBudget:
+    """Credits für Hedges: ``ratio`` pro Anfrage, ein Credit pro Hedge."""
+
+    def __init__(self, ratio: float):
+        self.ratio = ratio
+        # Kleiner Burst, damit nach einer ruhigen Phase einzelne Hedges sofort möglich sind
+        self.max_credits = max(1.0, ratio * 100)
+        self.credits = 1.0 if ratio > 0 else 0.0
+
+    def deposit(self) -> None:
+        self.credits = min(self.max_credits, self.credits + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.credits < 1.0:
+            return False
+        self.credits -= 1.0
+        return True
+
+
+class Hedger:
+    """Hedging-Zustand (Latenzen, Budget, Zähler) eines Modells."""
+
+    def __init__(self, policy: HedgePolicy):
+        self.policy = policy
+        self.latency = LatencyTracker()
+        self.budget = HedgeBudget(policy.budget)
+
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.budget_exhausted = 0
+
+    def delay(self) -> float:
+        """Wartezeit in Sekunden, bevor die zweite Route angefragt wird."""
+        if len(self.latency) < self.policy.min_samples:
+            return self.policy.initial_delay_ms / 1000
+        return self.latency.percentile(self.policy.percentile)
+
+    async def run(self, primary: Callable[[], Awaitable[Any]], secondary: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Führt ``primary`` aus und startet ``secondary``, falls ``primary`` nach
+        ``delay()`` noch nicht geantwortet hat und das Budget es erlaubt.
+        Die erste erfolgreiche Antwort gewinnt; scheitern beide, wird der
+        Fehler der primären Route geworfen.
+        """
+        self.requests += 1
+        self.budget.deposit()
+        started = time.perf_counter()
+        primary_task = asyncio.ensure_future(primary())
+        secondary_task = None
+
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=self.delay())
+            if not done and not self.budget.withdraw():
+                self.budget_exhausted += 1
+                await asyncio.wait({primary_task})
+                done = {primary_task}
+
+            if done:
+                result = primary_task.result()
+                self.latency.record(time.perf_counter() - started)
+                return result
+
+            self.hedges += 1
+            secondary_task = asyncio.ensure_future(secondary())
+            pending = {primary_task, secondary_task}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Bei gleichzeitiger Fertigstellung hat die primäre Route Vorrang
+                for task in sorted(done, key=lambda t: t is not primary_task):
+                    if task.exception() is not None:
+                        continue
+                    if task is primary_task:
+                        self.latency.record(time.perf_counter() - started)
+                    else:
+                        self.hedge_wins += 1
+                        if not primary_task.done():
+                            # Untergrenze der primären Latenz; ohne sie sähe der Tracker nur die
+                            # schnellen Antworten und die Hedge-Verzögerung würde immer kürzer
+                            self.latency.record(time.perf_counter() - started)
+                    return task.result()
+            raise primary_task.exception()
+        finally:
+            for task in (primary_task, secondary_task):
+                if task is not None and not task.done():
+                    task.cancel()
+                    # Fehler des Verlierers abholen, sonst meldet asyncio "Task exception was never retrieved"
+                    task.add_done_callback(_retrieve_exception)
+
+    def get_stats(self) -> dict:
+        return {
+            "policy": self.policy.to_dict(),
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_ratio": round(self.hedges / self.requests, 4) if self.requests else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "budget_exhausted": self.budget_exhausted,
+            "latency_samples": len(self.latency),
+            "current_delay_ms": round(self.delay() * 1000, 1),
+        }
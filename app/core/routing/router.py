@@ -1,33 +1,63 @@
 # llm_bridge/routing/router.py
 
-# Importiere die Adapter-Klassen, um ihren Typ prüfen zu können
-from ..adapters.openrouter_adapter import OpenRouterAdapter
-from ..adapters.claude_adapter import ClaudeAdapter
-from ..adapters.gemini_adapter import GeminiAdapter
-from ..adapters.universal_adapter import UniversalAdapter
-from ..orchestration.conversation_state import ConversationStateMachine  # <-- NEU
+from ..adapters.base_adapter import BaseAdapter
+from ..adapters.messages import build_messages, conversation_text, validate_history
+from ..orchestration.conversation_store import ConversationStore
 from ..orchestration.circuit_breaker import CircuitBreakerError  # <-- NEU: Import für spezifische Exception
+from ..caching.policy import CachePolicyTable
+from ..caching.response_cache import ResponseCache
+from ..caching.revalidation import CacheRevalidator
+from ..caching.similarity import build_similarity_settings
+from ..exceptions import RateLimitExceeded
+from ..ratelimit.limiter import RateLimiter
+from .hedging import Hedger
+from .routing_table import Route, RoutingTable
+from .scheduler import PriorityScheduler
+from .selection import ModelSelector, parse_selector
+from .single_flight import SingleFlight
 
 # --- NEU: Redis Cache Imports ---
 import os
+import time
 import redis.asyncio as redis
-import hashlib
-import json
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple, Union
 # --- Ende NEU ---
 
 class Router:
-    def __init__(self, adapters: dict, circuit_breakers: dict, model_config: dict = None, event_store = None, langfuse = None):
+    def __init__(self, adapters: dict, circuit_breakers: dict, model_config: dict = None, event_store = None, langfuse = None, agent_config: dict = None, rate_limit_config: dict = None):
         self.adapters = adapters
         self.circuit_breakers = circuit_breakers
         self.model_config = model_config or {}
-        self.active_conversations = {}  # Ersetzt die einfache conversation_history
+        # Begrenzter LRU-Speicher mit Idle-TTL für die Zustandsmaschinen der Konversationen
+        self.active_conversations = ConversationStore()
         self.event_store = event_store
         self.langfuse = langfuse
         
         # --- NEU: Redis Cache Initialisierung ---
         self.cache: Optional[redis.Redis] = None
         self._init_cache()
+        
+        # Zweistufiger Cache: prozessweiter L1 vor Redis (Health-Prober statt PING pro Request)
+        self.response_cache = ResponseCache(client=self.cache, name="router-cache")
+        
+        # Cache-Policies, Similarity-Einstellungen und Routing-Tabelle (siehe rebuild_routing)
+        self._agent_config = agent_config
+        self.hedgers = {}
+        # Live-Statistiken für die Auswahl über capability:<x> / group:<x>
+        self.model_selector = ModelSelector()
+        self.rebuild_routing()
+        
+        # Identische, gleichzeitig laufende Anfragen teilen sich einen Upstream-Call
+        self.single_flight = SingleFlight()
+        
+        # Stale-While-Revalidate: veraltete Treffer im Hintergrund erneuern
+        self.revalidator = CacheRevalidator()
+        
+        # Verkehrsklassen (interactive, mission, workflow, batch) für Upstream-Aufrufe
+        self.scheduler = PriorityScheduler()
+        
+        # RPM/TPM-Limits pro Adapter-Dienst ('rate_limits' in registry.yaml)
+        self.rate_limiter = RateLimiter(rate_limit_config, redis_client=self.cache)
     
     def _init_cache(self):
         """Initialisiert Redis Cache-Verbindung"""
@@ -57,32 +87,432 @@ class Router:
             print("⚠️ Caching ist deaktiviert. Bridge läuft ohne Cache.")
             self.cache = None
 
-    async def route_message(self, conversation_id: str, target_llm_name: str, prompt: str, **kwargs) -> str:
-        # --- NEU: Cache-Logik VOR dem LLM-Aufruf ---
-        cached_response = None
-        cache_key = None
+    def rebuild_routing(self, model_config: dict = None, agent_config: dict = None):
+        """
+        Baut Cache-Policies, Similarity-Einstellungen und Routing-Tabelle neu auf,
+        z.B. nach dem Neuladen der Registry oder dem Registrieren eines Adapters.
+
+        Die neuen Objekte werden komplett vorbereitet und dann ohne ``await``
+        dazwischen zugewiesen; jede Anfrage sieht damit entweder den alten oder
+        den neuen Stand.
+        """
+        model_config = self.model_config if model_config is None else model_config
+        if agent_config is None:
+            agent_config = self._agent_config
+        
+        # Cache-Policies pro Modell/Agent, einmalig zur Lookup-Tabelle aufgelöst
+        cache_policies = CachePolicyTable(model_config, agent_config)
+        # Ähnlichkeits-Cache pro Modell (opt-in über 'similarity_cache' in registry.yaml)
+        similarity_settings = build_similarity_settings(model_config)
+        routing_table = RoutingTable.build(model_config, self.adapters, self.circuit_breakers,
+                                           cache_policies, similarity_settings)
+        # Hedging-Zustand (Latenzen, Budget) bei unveränderter Policy übernehmen
+        hedgers = {}
+        for name in model_config:
+            route = routing_table.get(name)
+            if route is None or route.hedge is None:
+                continue
+            previous = self.hedgers.get(name)
+            hedgers[name] = previous if previous and previous.policy == route.hedge_policy else Hedger(route.hedge_policy)
         
+        self.model_config = model_config
+        self._agent_config = agent_config
+        self.cache_policies = cache_policies
+        self.similarity_settings = similarity_settings
+        self.routing_table = routing_table
+        self.hedgers = hedgers
+        print(f"🧭 [Router] Routing-Tabelle erstellt: {len(routing_table)} Routen")
+
+    def get_routing_status(self) -> dict:
+        """Aufgelöste Routen, nicht auflösbare Modelle und Hedging-Zähler für API und Monitoring."""
+        status = self.routing_table.to_dict()
+        status["hedging"] = {name: hedger.get_stats() for name, hedger in self.hedgers.items()}
+        return status
+
+    def select_model(self, target: str) -> str:
+        """Löst ``capability:<x>`` bzw. ``group:<x>`` zum Modell mit dem besten Score auf."""
+        kind, value = parse_selector(target)
+        return self.model_selector.select(target, self.routing_table.candidates(kind, value))
+
+    def get_model_scores(self, target: Optional[str] = None) -> dict:
+        """Live-Scores: Statistiken pro Modell und letzte Entscheidungen, optional für einen Selektor."""
+        status = self.model_selector.get_stats()
+        selector = parse_selector(target) if target else None
+        if selector:
+            status["candidates"] = self.model_selector.score(self.routing_table.candidates(*selector))
+        return status
+
+    def get_cache_status(self) -> dict:
+        """Status des Response-Caches (Health und Zähler pro Stufe) für API und Monitoring."""
+        status = self.response_cache.get_status()
+        status["single_flight"] = self.single_flight.get_stats()
+        status["stale_while_revalidate"] = self.revalidator.get_stats()
+        status["policies"] = self.cache_policies.to_dict()
+        return status
+
+    def get_rate_limit_status(self) -> dict:
+        """Limits, Warteschlangen und Wartezeiten pro Adapter-Dienst, dazu die adaptiven Fenster."""
+        status = self.rate_limiter.get_stats()
+        status["adaptive_concurrency"] = {
+            name: adapter.concurrency.get_stats()
+            for name, adapter in self.adapters.items()
+            if isinstance(adapter, BaseAdapter)
+        }
+        return status
+
+    def get_scheduler_status(self) -> dict:
+        """Belegung, Warteschlangen und Wartezeiten pro Verkehrsklasse."""
+        return self.scheduler.get_stats()
+
+    def get_conversation_stats(self) -> dict:
+        """Größe und Verdrängungszähler des Konversationsspeichers."""
+        return self.active_conversations.get_stats()
+
+    async def close(self):
+        """Stoppt Hintergrund-Tasks und schließt die Cache-Verbindung."""
+        await self.response_cache.close()
         if self.cache:
+            await self.cache.aclose()
+
+    def _fallback_chain(self, target: Union[str, List[str]]) -> List[str]:
+        """
+        Reihenfolge der Routen für eine Anfrage: jedes angegebene Ziel, jeweils
+        gefolgt von seinen ``fallbacks`` aus der Registry (ohne Duplikate).
+        """
+        targets = [target] if isinstance(target, str) else list(target)
+        chain = []
+        for name in targets:
+            for hop in (name, *self.routing_table.fallbacks(name)):
+                if hop not in chain:
+                    chain.append(hop)
+        return chain
+
+    async def route_message(self, conversation_id: str, target_llm_name: Union[str, List[str]], prompt: str, agent_name: Optional[str] = None, priority: Optional[str] = None, **kwargs) -> str:
+        """
+        Leitet eine Nachricht an ein Modell weiter.
+
+        ``target_llm_name`` ist ein Modellname, ein Selektor (``capability:<x>``,
+        ``group:<x>``) oder eine geordnete Liste davon. Ist der Circuit Breaker
+        einer Route offen, geht die Anfrage ohne Aufruf des Providers an die
+        nächste Route der Fallback-Kette; welche Route geantwortet hat, steht
+        in ``served_by`` der Zustandsmaschine und im Event-Log.
+
+        ``priority`` wählt die Verkehrsklasse des Upstream-Aufrufs (siehe
+        scheduler.py); ohne Angabe entscheidet das Präfix der Conversation-ID.
+
+        ``messages`` in den kwargs ist der bisherige Verlauf (System-Prompt,
+        frühere Turns); ``prompt`` wird als neue Nutzer-Nachricht angehängt.
+        Der Verlauf gehört zum Cache-Schlüssel, die Adapter nutzen dafür das
+        Prompt-Caching der Provider (siehe adapters/messages.py).
+        """
+        self._normalize_history(kwargs)
+        traffic_class = self.scheduler.classify(conversation_id, priority)
+        chain = self._fallback_chain(target_llm_name)
+        if not chain:
+            raise Exception("No target model given.")
+        
+        for hop, target in enumerate(chain):
+            is_last = hop == len(chain) - 1
             try:
-                # Teste Redis-Verbindung beim ersten Aufruf
-                await self.cache.ping()
-                
-                # Erstelle einen eindeutigen Cache-Schlüssel
-                cache_data = f"{target_llm_name}:{prompt}:{json.dumps(kwargs, sort_keys=True)}"
-                cache_key = f"llm_response:{hashlib.sha256(cache_data.encode()).hexdigest()}"
+                response, served_by = await self._route_to(
+                    conversation_id, target, prompt, agent_name, kwargs, skip_if_open=not is_last,
+                    traffic_class=traffic_class
+                )
+            except CircuitBreakerError as e:
+                if is_last:
+                    raise
+                print(f"↪️ [Router] Route '{target}' nicht verfügbar ({e}), weiter mit '{chain[hop + 1]}'")
+                continue
+            
+            state_machine = self.active_conversations.get(conversation_id)
+            if state_machine is not None:
+                state_machine.served_by = served_by
+            if hop and self.event_store:
+                await self.event_store.log_event(
+                    "FALLBACK", "Router",
+                    f"'{chain[0]}' über Fallback '{served_by}' bedient (Hop {hop})",
+                    conversation_id=conversation_id,
+                    requested_target=chain[0],
+                    served_by=served_by,
+                    hop=hop,
+                    skipped=chain[:hop]
+                )
+            return response
+
+    async def route_message_stream(self, conversation_id: str, target_llm_name: Union[str, List[str]], prompt: str,
+                                   agent_name: Optional[str] = None, priority: Optional[str] = None,
+                                   **kwargs) -> AsyncIterator[str]:
+        """
+        Wie ``route_message``, liefert die Antwort aber als Text-Chunks, sobald
+        der Provider sie sendet.
+
+        Cache-Treffer und Antworten eines bereits laufenden identischen Requests
+        (Single-Flight) kommen als ein Chunk. Die Fallback-Kette greift nur bis
+        zum ersten Chunk; ein Fehler danach wird an den Aufrufer weitergereicht.
+        Hedging gilt für Streams nicht.
+        """
+        self._normalize_history(kwargs)
+        traffic_class = self.scheduler.classify(conversation_id, priority)
+        chain = self._fallback_chain(target_llm_name)
+        if not chain:
+            raise Exception("No target model given.")
+        
+        for hop, target in enumerate(chain):
+            is_last = hop == len(chain) - 1
+            chunks = None
+            try:
+                try:
+                    served_by, chunks = await self._stream_to(
+                        conversation_id, target, prompt, agent_name, kwargs, skip_if_open=not is_last,
+                        traffic_class=traffic_class
+                    )
+                    # Erst der erste Chunk zeigt, ob die Route bedient: Breaker und Limits greifen davor
+                    first_chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    first_chunk = None
+                except CircuitBreakerError as e:
+                    if is_last:
+                        raise
+                    print(f"↪️ [Router] Route '{target}' nicht verfügbar ({e}), weiter mit '{chain[hop + 1]}'")
+                    continue
                 
-                # Prüfe Cache
-                cached_response = await self.cache.get(cache_key)
-                if cached_response:
-                    print(f"✅ Cache-Hit für {target_llm_name[:20]}...")
-                    # Parse JSON und gib direkt zurück
-                    return json.loads(cached_response)
+                state_machine = self.active_conversations.get(conversation_id)
+                if state_machine is not None:
+                    state_machine.served_by = served_by
+                if hop and self.event_store:
+                    await self.event_store.log_event(
+                        "FALLBACK", "Router",
+                        f"'{chain[0]}' über Fallback '{served_by}' bedient (Hop {hop})",
+                        conversation_id=conversation_id,
+                        requested_target=chain[0],
+                        served_by=served_by,
+                        hop=hop,
+                        skipped=chain[:hop]
+                    )
+                if first_chunk is not None:
+                    yield first_chunk
+                async for chunk in chunks:
+                    yield chunk
+                return
+            finally:
+                if chunks is not None:
+                    await chunks.aclose()
+
+    @staticmethod
+    def _normalize_history(kwargs: dict) -> None:
+        """Prüft ``messages`` vor dem Routing; ein fehlerhafter Verlauf soll keinen Breaker öffnen."""
+        if kwargs.get("messages"):
+            kwargs["messages"] = validate_history(kwargs["messages"])
+        else:
+            # Ohne Verlauf bleibt der Cache-Schlüssel wie bei reinen Prompts
+            kwargs.pop("messages", None)
+
+    async def _stream_to(self, conversation_id: str, target_llm_name: str, prompt: str, agent_name: Optional[str],
+                         kwargs: dict, skip_if_open: bool = False,
+                         traffic_class: str = "interactive") -> Tuple[str, AsyncIterator[str]]:
+        """
+        Eine Route der Fallback-Kette im Streaming-Modus, analog zu ``_route_to``.
+
+        Returns:
+            (Name des Modells, Chunk-Iterator). Der Iterator läuft durch Scheduler,
+            Rate-Limiter und Circuit Breaker und schreibt die vollständige Antwort
+            am Ende in den Cache.
+        """
+        if parse_selector(target_llm_name):
+            selector = target_llm_name
+            target_llm_name = self.select_model(selector)
+            print(f"🎯 [Router] '{selector}' -> '{target_llm_name}'")
+        
+        route = self.routing_table.get(target_llm_name)
+        if route is not None and agent_name is None:
+            cache_policy, similarity = route.cache_policy, route.similarity
+        else:
+            cache_policy = self.cache_policies.resolve(target_llm_name, agent_name)
+            similarity = self.similarity_settings.get(target_llm_name)
+        cache_key = self.response_cache.make_key(target_llm_name, prompt, kwargs) if cache_policy.allows(kwargs) else None
+        similarity_scope = None
+        
+        if cache_key and self.response_cache.enabled:
+            cache_hit = await self.response_cache.get(cache_key)
+            if not cache_hit and similarity:
+                similarity_scope = self.response_cache.make_scope(target_llm_name, kwargs)
+                cache_hit = await self.response_cache.get_similar(similarity_scope, prompt, similarity)
+            if cache_hit:
+                if cache_policy.is_stale(cache_hit.age_seconds):
+                    self.revalidator.schedule(
+                        cache_key,
+                        lambda: self._revalidate(cache_key, target_llm_name, prompt, dict(kwargs), cache_policy)
+                    )
+                print(f"✅ Cache-Hit ({cache_hit.tier}, {cache_hit.match}) für {target_llm_name[:20]}... (Stream)")
+                return target_llm_name, self._single_chunk(cache_hit.value)
+            print(f"🔍 Cache-Miss für {target_llm_name[:20]}... (Stream)")
+        
+        if skip_if_open and route is not None and route.breaker.is_open():
+            raise CircuitBreakerError(f"Circuit is open for '{route.adapter_name}'.", route.breaker.next_attempt_at)
+        
+        state_machine = self.active_conversations.get_or_create(conversation_id)
+        allow_repeats = conversation_id.startswith('mission_')
+        if not state_machine.transition_to(target_llm_name, self.event_store, allow_repeats=allow_repeats):
+            raise Exception(f"Invalid state transition for conversation '{conversation_id}'.")
+        if route is None:
+            route = self.routing_table.require(target_llm_name)
+        
+        async def stream_upstream():
+            call_upstream = self._prepare_upstream(route, prompt, kwargs)
+            if cache_key and cache_key in self.single_flight:
+                # Identischer Request läuft bereits: dessen Antwort als ein Chunk
+                response = await self._run_scheduled(cache_key, traffic_class, call_upstream)
+                state_machine.record_response(from_llm_name=target_llm_name, event_store=self.event_store)
+                if cache_key and response and self.response_cache.enabled:
+                    await self._store_response(cache_key, response, cache_policy, prompt, similarity,
+                                               similarity_scope, tags=route.cache_tags)
+                yield response
+                return
+            
+            generation = None
+            if self.langfuse:
+                generation = self.langfuse.start_generation(
+                    name=f"call-{target_llm_name}",
+                    input=prompt,
+                    model=target_llm_name,
+                    metadata={"conversation_id": conversation_id, "target_llm": target_llm_name, "stream": True}
+                )
+            chunks = []
+            provider_started = None
+            await self.scheduler.acquire(traffic_class)
+            try:
+                await self.rate_limiter.acquire(route.adapter_name, conversation_text(prompt, kwargs.get('messages')),
+                                                kwargs.get('max_tokens'))
+                # Für die Modellauswahl zählt nur der Provider-Aufruf, nicht Scheduler- und Rate-Limit-Wartezeit
+                provider_started = time.perf_counter()
+                call_kwargs = dict(kwargs, model=route.model_identifier)
+                if route.is_universal:
+                    # Universal Adapter (z.B. CLI) streamen über stream_completion
+                    messages = build_messages(prompt, call_kwargs.pop('messages', None))
+                    upstream = route.adapter.stream_completion(messages, **call_kwargs)
                 else:
-                    print(f"🔍 Cache-Miss für {target_llm_name[:20]}...")
-                    
+                    if route.base_url:
+                        call_kwargs['base_url'] = route.base_url
+                    upstream = route.adapter.stream(prompt, **call_kwargs)
+                async for chunk in route.breaker.stream(upstream):
+                    chunks.append(chunk)
+                    yield chunk
             except Exception as e:
-                print(f"⚠️ Cache-Fehler: {e}")
-                # Bei Cache-Fehler einfach weitermachen
+                if provider_started is not None and not isinstance(e, (CircuitBreakerError, RateLimitExceeded)):
+                    self.model_selector.record(route.name, time.perf_counter() - provider_started, success=False)
+                if generation:
+                    generation.update(level="ERROR", status_message=str(e))
+                if self.event_store:
+                    await self.event_store.log_adapter_call(
+                        adapter_name=route.adapter_name,
+                        model_name=route.model_identifier,
+                        conversation_id=conversation_id,
+                        prompt_length=len(prompt),
+                        success=False,
+                        error_message=str(e)
+                    )
+                raise
+            finally:
+                self.scheduler.release(traffic_class)
+                if generation:
+                    # Auch bei Fehler oder Client-Abbruch: bis dahin gestreamter Text
+                    generation.update(output="".join(chunks))
+                    generation.end()
+            
+            response = "".join(chunks).strip()
+            self.model_selector.record(route.name, time.perf_counter() - provider_started, success=True)
+            if self.event_store:
+                await self.event_store.log_adapter_call(
+                    adapter_name=route.adapter_name,
+                    model_name=route.model_identifier,
+                    conversation_id=conversation_id,
+                    prompt_length=len(prompt),
+                    success=True,
+                    response_length=len(response),
+                    target_llm=target_llm_name,
+                    agent_name=agent_name,
+                    prompt=prompt,
+                    request_params=kwargs
+                )
+            state_machine.record_response(from_llm_name=target_llm_name, event_store=self.event_store)
+            # Nur vollständig empfangene Antworten landen im Cache
+            if cache_key and response and self.response_cache.enabled:
+                await self._store_response(cache_key, response, cache_policy, prompt, similarity, similarity_scope,
+                                           tags=route.cache_tags)
+        
+        return target_llm_name, stream_upstream()
+
+    @staticmethod
+    async def _single_chunk(text: str) -> AsyncIterator[str]:
+        yield text
+
+    async def _run_scheduled(self, cache_key: Optional[str], traffic_class: str, call_upstream) -> str:
+        """Upstream-Call ohne Streaming über Scheduler und (bei Cache-Schlüssel) Single-Flight."""
+        def call_scheduled():
+            return self.scheduler.run(traffic_class, call_upstream)
+        if cache_key:
+            return await self.single_flight.run(cache_key, call_scheduled)
+        return await call_scheduled()
+
+    async def _route_to(self, conversation_id: str, target_llm_name: str, prompt: str, agent_name: Optional[str],
+                        kwargs: dict, skip_if_open: bool = False,
+                        traffic_class: str = "interactive") -> Tuple[str, str]:
+        """
+        Eine Route der Fallback-Kette: Cache, Zustandsmaschine, Upstream-Call.
+
+        Args:
+            skip_if_open: Bei offenem Circuit Breaker sofort ``CircuitBreakerError``
+                          werfen, ohne Zustandsübergang und ohne Provider-Aufruf.
+            traffic_class: Verkehrsklasse, in der der Upstream-Aufruf eingeplant wird.
+
+        Returns:
+            (Antwort, Name des Modells, das geantwortet hat)
+        """
+        # Gruppe/Fähigkeit statt festem Modell: Kandidaten mit dem besten Score wählen
+        if parse_selector(target_llm_name):
+            selector = target_llm_name
+            target_llm_name = self.select_model(selector)
+            print(f"🎯 [Router] '{selector}' -> '{target_llm_name}'")
+        
+        # --- NEU: Cache-Logik VOR dem LLM-Aufruf (L1 im Prozess, dann Redis) ---
+        # Nicht cachebare Anfragen (Policy deaktiviert oder temperature != 0 bei
+        # deterministic_only) umgehen L1, Redis und Single-Flight komplett.
+        # Routing-Tabelle einmal pro Anfrage lesen; ein Rebuild tauscht sie als Ganzes aus
+        route = self.routing_table.get(target_llm_name)
+        if route is not None and agent_name is None:
+            cache_policy, similarity = route.cache_policy, route.similarity
+        else:
+            cache_policy = self.cache_policies.resolve(target_llm_name, agent_name)
+            similarity = self.similarity_settings.get(target_llm_name)
+        cache_key = None
+        similarity_scope = None
+        
+        if cache_policy.allows(kwargs):
+            cache_key = self.response_cache.make_key(target_llm_name, prompt, kwargs)
+        
+        if cache_key and self.response_cache.enabled:
+            cache_hit = await self.response_cache.get(cache_key)
+            if not cache_hit and similarity:
+                # Nahezu identische Prompts (andere Mission-ID, Zeitstempel, Whitespace)
+                similarity_scope = self.response_cache.make_scope(target_llm_name, kwargs)
+                cache_hit = await self.response_cache.get_similar(similarity_scope, prompt, similarity)
+            if cache_hit:
+                if cache_policy.is_stale(cache_hit.age_seconds):
+                    # Veraltet (Soft-TTL überschritten): sofort ausliefern, im Hintergrund erneuern
+                    print(f"♻️ Veralteter Cache-Hit ({cache_hit.tier}, {cache_hit.match}, {cache_hit.age_seconds:.0f}s) "
+                          f"für {target_llm_name[:20]}..., erneuere im Hintergrund")
+                    self.revalidator.schedule(
+                        cache_key,
+                        lambda: self._revalidate(cache_key, target_llm_name, prompt, dict(kwargs), cache_policy)
+                    )
+                else:
+                    print(f"✅ Cache-Hit ({cache_hit.tier}, {cache_hit.match}) für {target_llm_name[:20]}...")
+                return cache_hit.value, target_llm_name
+            print(f"🔍 Cache-Miss für {target_llm_name[:20]}...")
+        
+        # Offener Breaker und weitere Routen in der Kette: Provider gar nicht erst aufrufen
+        if skip_if_open and route is not None and route.breaker.is_open():
+            raise CircuitBreakerError(f"Circuit is open for '{route.adapter_name}'.", route.breaker.next_attempt_at)
         
         # --- NEU: LangFuse v3 minimale funktionsfähige API ---
         generation = None
@@ -97,10 +527,7 @@ class Router:
         # --- Ende NEU ---
         
         # Hole die State Machine für diese Konversation oder erstelle eine neue
-        state_machine = self.active_conversations.setdefault(
-            conversation_id,
-            ConversationStateMachine(conversation_id)
-        )
+        state_machine = self.active_conversations.get_or_create(conversation_id)
 
         # Prüfe, ob der Übergang erlaubt ist
         # Für Mission Control (mission_* conversation_ids) erlaube Wiederholungen
@@ -108,16 +535,26 @@ class Router:
         if not state_machine.transition_to(target_llm_name, self.event_store, allow_repeats=allow_repeats):
             raise Exception(f"Invalid state transition for conversation '{conversation_id}'.")
 
-        adapter_name, model_identifier = self._resolve_target(target_llm_name)
-        if not adapter_name:
-            raise Exception(f"Could not resolve target '{target_llm_name}'.")
-
-        target_adapter = self.adapters.get(adapter_name)
-        breaker = self.circuit_breakers.get(adapter_name)
-        if not target_adapter or not breaker:
-            raise Exception(f"Adapter or Circuit Breaker for '{adapter_name}' not found.")
-
-        kwargs['model'] = model_identifier
+        if route is None:
+            route = self.routing_table.require(target_llm_name)
+        adapter_name, model_identifier = route.adapter_name, route.model_identifier
+        call_upstream = self._prepare_upstream(route, prompt, kwargs)
+        
+        # Hedging: antwortet die primäre Route zu langsam, parallel die gleichwertige Route anfragen
+        hedger = self.hedgers.get(target_llm_name) if route.hedge else None
+        if hedger:
+            call_primary = call_upstream
+            call_hedge = self._prepare_upstream(route.hedge, prompt, kwargs)
+            
+            def call_upstream():
+                return hedger.run(call_primary, call_hedge)
+        
+        # Prioritäts-Scheduler: erst der Upstream-Aufruf belegt einen Platz seiner Verkehrsklasse
+        # (bei Single-Flight nur der führende Request)
+        call_unscheduled = call_upstream
+        
+        def call_upstream():
+            return self.scheduler.run(traffic_class, call_unscheduled)
         
         # Log den API-Aufruf
         if self.event_store:
@@ -130,24 +567,15 @@ class Router:
             )
         
         
+        # Single-Flight: läuft bereits ein identischer Request, warten wir auf dessen Ergebnis
+        if cache_key and cache_key in self.single_flight:
+            print(f"🔗 Identischer Request an {target_llm_name[:20]}... läuft bereits, warte auf dessen Antwort")
+        
         try:
-            # Prüfe ob es ein Universal Adapter (CLI/Browser) oder klassischer API-Adapter ist
-            if isinstance(target_adapter, UniversalAdapter):
-                # Für Universal Adapter: verwende chat_completion
-                messages = [{"role": "user", "content": prompt}]
-                chat_response = await breaker.execute(target_adapter.chat_completion(messages, **kwargs))
-                response = chat_response["choices"][0]["message"]["content"]
+            if cache_key:
+                response = await self.single_flight.run(cache_key, call_upstream)
             else:
-                # Für klassische API-Adapter: verwende send mit model-Parameter
-                # Sichere, dass der korrekte model_identifier verwendet wird
-                kwargs['model'] = model_identifier
-                
-                # Lese die base_url aus der Konfiguration, falls vorhanden (für Ollama)
-                model_config = self.model_config.get(target_llm_name, {})
-                if 'base_url' in model_config:
-                    kwargs['base_url'] = model_config['base_url']
-                
-                response = await breaker.execute(target_adapter.send(prompt, **kwargs))
+                response = await call_upstream()
             
             # --- NEU: LangFuse v3 Generation bei Erfolg aktualisieren ---
             if generation:
@@ -162,25 +590,23 @@ class Router:
                     conversation_id=conversation_id,
                     prompt_length=len(prompt),
                     success=True,
-                    response_length=len(response) if response else 0
+                    response_length=len(response) if response else 0,
+                    target_llm=target_llm_name,
+                    agent_name=agent_name,
+                    prompt=prompt,
+                    request_params=kwargs
                 )
             
             # Den neuen Zustand nach erfolgreicher Antwort festhalten
             state_machine.record_response(from_llm_name=target_llm_name, event_store=self.event_store)
             
             # --- NEU: Response im Cache speichern ---
-            if self.cache and cache_key and response:
-                try:
-                    # Cache für 24 Stunden (86400 Sekunden)
-                    cache_ttl = int(os.getenv("CACHE_TTL_SECONDS", "86400"))
-                    await self.cache.set(cache_key, json.dumps(response), ex=cache_ttl)
-                    print(f"💾 Response im Cache gespeichert (TTL: {cache_ttl}s)")
-                except Exception as e:
-                    print(f"⚠️ Cache-Speicher-Fehler: {e}")
-                    # Bei Cache-Fehler einfach weitermachen
+            if cache_key and response and self.response_cache.enabled:
+                await self._store_response(cache_key, response, cache_policy, prompt, similarity, similarity_scope,
+                                           tags=route.cache_tags)
             # --- Ende NEU ---
             
-            return response
+            return response, target_llm_name
             
         except CircuitBreakerError as e:
             # ▶️ Spezifische Fehlerbehandlung für einen offenen Circuit Breaker
@@ -226,40 +652,91 @@ class Router:
             if generation:
                 generation.end()
     
-    # Die alte _is_loop Methode wird entfernt, da die State Machine dies übernimmt.
-    
-    def _resolve_target(self, target_name: str) -> tuple[str | None, str | None]:
+    def _prepare_upstream(self, route: Route, prompt: str, kwargs: dict):
         """
-        Findet den korrekten Adapter-Dienst und den passenden Modell-Identifier,
-        basierend auf der Plattform (API vs. CLI/Browser/Desktop).
+        Baut den Upstream-Call für eine Route aus der Routing-Tabelle.
+
+        Returns:
+            ``call_upstream``, das bei jedem Aufruf eine neue Coroutine durch
+            Rate-Limiter und Circuit Breaker startet. Nur dieser Aufruf verbucht
+            seine Latenz für die Modellauswahl; Single-Flight-Follower warten auf
+            ihn und verbuchen nichts.
         """
-        if target_name not in self.model_config:
-            return None, None
+        target_adapter = route.adapter
+        breaker = route.breaker
+        rate_limiter = self.rate_limiter
 
-        config = self.model_config[target_name]
+        call_kwargs = dict(kwargs)
+        call_kwargs['model'] = route.model_identifier
+        # Token-Schätzung über den gesamten Verlauf, nicht nur die neue Nachricht
+        request_text = conversation_text(prompt, kwargs.get('messages'))
         
-        # NEUE, KORREKTE LOGIK
-        if config.get('platform', 'api') != 'api':
-            # Dies ist ein Plattform-Adapter (CLI, Browser etc.)
-            # Der Adapter ist direkt unter target_name registriert
-            model_identifier = config.get("command") or config.get("tool_name")
-            return target_name, model_identifier
+        # Prüfe ob es ein Universal Adapter (CLI/Browser) oder klassischer API-Adapter ist
+        if route.is_universal:
+            # Für Universal Adapter: verwende chat_completion mit der vollständigen Nachrichtenliste
+            messages = build_messages(prompt, call_kwargs.pop('messages', None))
+            
+            async def call_upstream():
+                await rate_limiter.acquire(route.adapter_name, request_text, call_kwargs.get('max_tokens'))
+                chat_response = await self._timed_call(
+                    route, breaker.execute(target_adapter.chat_completion(messages, **call_kwargs))
+                )
+                return chat_response["choices"][0]["message"]["content"]
         else:
-            # Dies ist ein API-basierter Adapter
-            adapter_service_name = config.get('adapter_service')
+            # Für klassische API-Adapter: verwende send mit model-Parameter
+            # base_url aus der Registry, falls vorhanden (für Ollama)
+            if route.base_url:
+                call_kwargs['base_url'] = route.base_url
             
-            # Den registrierten Adapter für diesen Dienst holen
-            active_adapter = self.adapters.get(adapter_service_name)
-            if not active_adapter:
-                return None, None
-
-            # INTELLIGENTE AUSWAHL für API-Adapter:
-            # Prüfen, ob der aktive Adapter ein direkter, nativer Adapter ist
-            if isinstance(active_adapter, (ClaudeAdapter, GeminiAdapter)):
-                # Ja -> Nutze den 'direct'-Modellnamen
-                model_identifier = config.get("model_name_direct")
-            else: 
-                # Nein -> Nutze den 'openrouter'-Modellnamen, fallback auf 'direct'
-                model_identifier = config.get("model_name_openrouter") or config.get("model_name_direct")
-                
-            return adapter_service_name, model_identifier
\ No newline at end of file
+            async def call_upstream():
+                # Vor dem Breaker warten: ein selbst verursachtes 429 soll den Kreis nicht öffnen
+                await rate_limiter.acquire(route.adapter_name, request_text, call_kwargs.get('max_tokens'))
+                return await self._timed_call(route, breaker.execute(target_adapter.send(prompt, **call_kwargs)))
+
+        return call_upstream
+
+    async def _timed_call(self, route: Route, provider_call):
+        """
+        Misst nur den Provider-Aufruf (nach Scheduler und Rate-Limiter) und verbucht ihn
+        im ``ModelSelector``. Lokale Ablehnungen (offener Breaker, eigenes Rate-Limit,
+        erschöpfter Verbindungspool) und abgebrochene Hedge-Verlierer zählen nicht.
+        """
+        started = time.perf_counter()
+        try:
+            result = await provider_call
+        except (CircuitBreakerError, RateLimitExceeded):
+            raise
+        except Exception:
+            self.model_selector.record(route.name, time.perf_counter() - started, success=False)
+            raise
+        self.model_selector.record(route.name, time.perf_counter() - started, success=True)
+        return result
+
+    async def _store_response(self, cache_key: str, response: str, cache_policy, prompt: str,
+                              similarity=None, similarity_scope: Optional[str] = None, tags: tuple = ()):
+        """
+        Speichert eine Antwort gemäß Policy und indiziert sie ggf. für den Similarity-Cache.
+        ``tags`` (Modell, Adapter-Dienst) ermöglichen die gezielte Invalidierung.
+        """
+        # TTL aus der Policy (Default: CACHE_TTL_SECONDS, 24 Stunden)
+        cache_ttl = cache_policy.ttl_seconds
+        await self.response_cache.set(cache_key, response, cache_ttl, cache_policy.max_entry_bytes, tags)
+        if similarity_scope:
+            self.response_cache.index_similar(similarity_scope, prompt, cache_key, similarity, cache_ttl)
+        print(f"💾 Response im Cache gespeichert (TTL: {cache_ttl}s)")
+
+    async def _revalidate(self, cache_key: str, target_llm_name: str, prompt: str, kwargs: dict, cache_policy):
+        """
+        Erneuert einen veralteten Cache-Eintrag im Hintergrund.
+        Läuft durch Single-Flight und Circuit Breaker; ein offener Breaker wirft
+        ``CircuitBreakerError`` und der veraltete Eintrag bleibt bestehen.
+        """
+        route = self.routing_table.require(target_llm_name)
+        call_upstream = self._prepare_upstream(route, prompt, kwargs)
+        # Hintergrundarbeit: Revalidierung läuft in der Klasse 'batch'
+        response = await self.single_flight.run(cache_key, lambda: self.scheduler.run("batch", call_upstream))
+        if response:
+            similarity = route.similarity
+            similarity_scope = self.response_cache.make_scope(target_llm_name, kwargs) if similarity else None
+            await self._store_response(cache_key, response, cache_policy, prompt, similarity, similarity_scope,
+                                       tags=route.cache_tags)
@@ -6,8 +6,6 @@ This version uses injected dependencies instead of creating them internally.
 """
 
 from typing import Dict, Optional, Any
-import hashlib
-import json
 import logging
 from ..di.interfaces import (
     IRouter,
@@ -17,7 +15,13 @@ from ..di.interfaces import (
     ILogger
 )
 from ..orchestration.conversation_state import ConversationStateMachine
+from ..orchestration.conversation_store import ConversationStore
 from ..orchestration.circuit_breaker import CircuitBreakerError
+from ..caching.policy import CachePolicyTable
+from ..caching.response_cache import CacheHit, ResponseCache
+from ..caching.revalidation import CacheRevalidator
+from ..caching.similarity import build_similarity_settings
+from .single_flight import SingleFlight
 
 class Router(IRouter):
     """
@@ -34,7 +38,8 @@ class Router(IRouter):
                  event_store: IEventStore,
                  telemetry: ITelemetry,
                  redis_provider: Optional[IRedisProvider] = None,
-                 logger: Optional[ILogger] = None):
+                 logger: Optional[ILogger] = None,
+                 agent_config: Optional[Dict[str, Any]] = None):
         """
         Initialize router with injected dependencies
         
@@ -46,6 +51,7 @@ class Router(IRouter):
             telemetry: Telemetry service
             redis_provider: Optional Redis provider for caching
             logger: Optional logger
+            agent_config: Optional agent configuration for per-agent cache policies
         """
         self.adapters = adapters
         self.circuit_breakers = circuit_breakers
@@ -55,72 +61,79 @@ class Router(IRouter):
         self.redis_provider = redis_provider
         self.logger = logger or logging.getLogger(__name__)
         
-        # Conversation state management
-        self.active_conversations: Dict[str, ConversationStateMachine] = {}
+        # Conversation state management: bounded LRU with idle TTL
+        self.active_conversations = ConversationStore()
         
-        # Cache client will be initialized lazily
-        self._cache_client = None
+        # Two-tier response cache: shared in-process L1 in front of Redis.
+        # The Redis client is acquired lazily by the cache health prober.
         self._cache_enabled = redis_provider is not None
+        self.response_cache = ResponseCache(
+            connect=redis_provider.get_client if redis_provider else None,
+            name="router-di-cache"
+        )
+        
+        # Per-model/per-agent cache policies, resolved once into a lookup table
+        self.cache_policies = CachePolicyTable(model_config, agent_config, default_ttl_seconds=3600)
+        
+        # Opt-in near-duplicate prompt matching per model ('similarity_cache' in registry.yaml)
+        self.similarity_settings = build_similarity_settings(model_config)
+        
+        # Identical concurrent requests share a single upstream call
+        self.single_flight = SingleFlight()
+        
+        # Stale-while-revalidate: stale hits are refreshed in the background
+        self.revalidator = CacheRevalidator()
         
         self.logger.info(
             f"Router initialized with {len(adapters)} adapters, "
             f"cache {'enabled' if self._cache_enabled else 'disabled'}"
         )
     
-    async def _get_cache_client(self):
-        """Get Redis cache client (lazy initialization)"""
-        if not self._cache_enabled:
-            return None
-            
-        if self._cache_client is None:
-            try:
-                self._cache_client = await self.redis_provider.get_client()
-                await self._cache_client.ping()
-                self.logger.debug("Redis cache client initialized")
-            except Exception as e:
-                self.logger.warning(f"Failed to initialize cache client: {e}")
-                self._cache_enabled = False
-                return None
-                
-        return self._cache_client
-    
     def _generate_cache_key(self, target_llm: str, prompt: str, kwargs: Dict) -> str:
         """Generate cache key for LLM response"""
-        cache_data = f"{target_llm}:{prompt}:{json.dumps(kwargs, sort_keys=True)}"
-        return f"llm_response:{hashlib.sha256(cache_data.encode()).hexdigest()}"
+        return ResponseCache.make_key(target_llm, prompt, kwargs)
+    
+    async def _check_cache(self, cache_key: str) -> Optional[CacheHit]:
+        """Check L1 and Redis cache for existing response"""
+        cache_hit = await self.response_cache.get(cache_key)
+        if cache_hit:
+            self.logger.debug(f"Cache hit ({cache_hit.tier}, exact): {cache_key[:20]}...")
+        return cache_hit
     
-    async def _check_cache(self, cache_key: str) -> Optional[str]:
-        """Check cache for existing response"""
-        cache = await self._get_cache_client()
-        if not cache:
+    async def _check_similar(self, target_llm: str, prompt: str, kwargs: Dict) -> Optional[CacheHit]:
+        """Look up a near-duplicate prompt if the model has the similarity cache enabled"""
+        settings = self.similarity_settings.get(target_llm)
+        if not settings:
             return None
-            
-        try:
-            cached = await cache.get(cache_key)
-            if cached:
-                self.logger.debug(f"Cache hit: {cache_key[:20]}...")
-                return json.loads(cached)
-        except Exception as e:
-            self.logger.warning(f"Cache read error: {e}")
-            
-        return None
+        scope = ResponseCache.make_scope(target_llm, kwargs)
+        cache_hit = await self.response_cache.get_similar(scope, prompt, settings)
+        if cache_hit:
+            self.logger.debug(f"Cache hit ({cache_hit.tier}, approximate) for {target_llm}")
+        return cache_hit
     
-    async def _update_cache(self, cache_key: str, response: str, ttl: int = 3600) -> None:
-        """Update cache with new response"""
-        cache = await self._get_cache_client()
-        if not cache:
-            return
-            
-        try:
-            await cache.set(cache_key, json.dumps(response), ex=ttl)
-            self.logger.debug(f"Cache updated: {cache_key[:20]}...")
-        except Exception as e:
-            self.logger.warning(f"Cache write error: {e}")
+    async def _update_cache(self,
+                            cache_key: str,
+                            response: str,
+                            ttl: int = 3600,
+                            target_llm: Optional[str] = None,
+                            prompt: Optional[str] = None,
+                            kwargs: Optional[Dict] = None,
+                            max_entry_bytes: Optional[int] = None,
+                            adapter_service: Optional[str] = None) -> None:
+        """Update L1 and Redis cache with new response and index it for similarity lookups and invalidation"""
+        tags = ResponseCache.make_tags(target_llm, adapter_service) if target_llm else ()
+        await self.response_cache.set(cache_key, response, ttl, max_entry_bytes, tags)
+        settings = self.similarity_settings.get(target_llm)
+        if settings:
+            scope = ResponseCache.make_scope(target_llm, kwargs or {})
+            self.response_cache.index_similar(scope, prompt, cache_key, settings, ttl)
+        self.logger.debug(f"Cache updated: {cache_key[:20]}...")
     
     async def route_message(self,
                           conversation_id: str,
                           target_llm_name: str,
                           prompt: str,
+                          agent_name: Optional[str] = None,
                           **kwargs) -> str:
         """
         Route a message to the appropriate LLM
@@ -129,6 +142,7 @@ class Router(IRouter):
             conversation_id: Unique conversation identifier
             target_llm_name: Name of the target LLM
             prompt: Message prompt
+            agent_name: Calling agent, used to resolve per-agent cache policies
             **kwargs: Additional routing parameters
             
         Returns:
@@ -145,12 +159,35 @@ class Router(IRouter):
         )
         
         try:
-            # Check cache first
-            cache_key = self._generate_cache_key(target_llm_name, prompt, kwargs)
-            cached_response = await self._check_cache(cache_key)
-            if cached_response:
-                await self.telemetry.trace_end(trace_id, {"cache_hit": True})
-                return cached_response
+            # Check cache first; non-cacheable requests skip L1, Redis and coalescing
+            cache_policy = self.cache_policies.resolve(target_llm_name, agent_name)
+            cache_key = None
+            cache_hit = None
+            if cache_policy.allows(kwargs):
+                cache_key = self._generate_cache_key(target_llm_name, prompt, kwargs)
+                cache_hit = await self._check_cache(cache_key)
+                if not cache_hit:
+                    cache_hit = await self._check_similar(target_llm_name, prompt, kwargs)
+            if cache_hit:
+                stale = cache_policy.is_stale(cache_hit.age_seconds)
+                if stale:
+                    # Past the soft TTL: serve immediately, refresh in the background
+                    self.revalidator.schedule(
+                        cache_key,
+                        lambda: self._revalidate(
+                            cache_key, conversation_id, target_llm_name, prompt, dict(kwargs), cache_policy
+                        )
+                    )
+                await self.telemetry.trace_end(
+                    trace_id,
+                    {
+                        "cache_hit": True,
+                        "cache_tier": cache_hit.tier,
+                        "cache_match": cache_hit.match,
+                        "cache_stale": stale
+                    }
+                )
+                return cache_hit.value
             
             # Log routing event
             await self.event_store.log_event(
@@ -162,36 +199,38 @@ class Router(IRouter):
             )
             
             # Get or create conversation state
-            if conversation_id not in self.active_conversations:
-                self.active_conversations[conversation_id] = ConversationStateMachine(conversation_id)
-            state_machine = self.active_conversations[conversation_id]
-            
-            # Determine actual LLM to use based on configuration
-            actual_llm = self._determine_actual_llm(target_llm_name)
-            
-            # Get adapter and circuit breaker
-            adapter = self.adapters.get(actual_llm)
-            circuit_breaker = self.circuit_breakers.get(actual_llm)
+            state_machine = self.active_conversations.get_or_create(conversation_id)
             
-            if not adapter:
-                raise ValueError(f"No adapter found for LLM: {actual_llm}")
-            if not circuit_breaker:
-                raise ValueError(f"No circuit breaker found for LLM: {actual_llm}")
+            # Determine actual LLM, adapter and circuit breaker
+            actual_llm, adapter, circuit_breaker = self._resolve_upstream(target_llm_name)
             
-            # Call through circuit breaker
+            # Call through circuit breaker; identical in-flight requests are coalesced
             try:
-                response = await circuit_breaker.execute(
-                    adapter.send,
-                    prompt=prompt,
-                    conversation_id=conversation_id,
-                    **kwargs
-                )
+                def call_upstream():
+                    return circuit_breaker.execute(
+                        adapter.send,
+                        prompt=prompt,
+                        conversation_id=conversation_id,
+                        **kwargs
+                    )
+                
+                if cache_key:
+                    if cache_key in self.single_flight:
+                        self.logger.debug(f"Coalescing with in-flight request: {cache_key[:20]}...")
+                    response = await self.single_flight.run(cache_key, call_upstream)
+                else:
+                    response = await call_upstream()
                 
                 # Update conversation state
                 state_machine.record_response(actual_llm, self.event_store)
                 
                 # Update cache
-                await self._update_cache(cache_key, response)
+                if cache_key:
+                    await self._update_cache(
+                        cache_key, response, cache_policy.ttl_seconds,
+                        target_llm=target_llm_name, prompt=prompt, kwargs=kwargs,
+                        max_entry_bytes=cache_policy.max_entry_bytes, adapter_service=actual_llm
+                    )
                 
                 # Log success
                 await self.event_store.log_event(
@@ -243,6 +282,50 @@ class Router(IRouter):
             # Re-raise
             raise
     
+    def _resolve_upstream(self, target_llm_name: str):
+        """Resolve the actual LLM with its adapter and circuit breaker"""
+        actual_llm = self._determine_actual_llm(target_llm_name)
+        
+        adapter = self.adapters.get(actual_llm)
+        circuit_breaker = self.circuit_breakers.get(actual_llm)
+        
+        if not adapter:
+            raise ValueError(f"No adapter found for LLM: {actual_llm}")
+        if not circuit_breaker:
+            raise ValueError(f"No circuit breaker found for LLM: {actual_llm}")
+        
+        return actual_llm, adapter, circuit_breaker
+    
+    async def _revalidate(self,
+                          cache_key: str,
+                          conversation_id: str,
+                          target_llm_name: str,
+                          prompt: str,
+                          kwargs: Dict,
+                          cache_policy: Any) -> None:
+        """
+        Refresh a stale cache entry in the background.
+        
+        Runs through single-flight and the circuit breaker; an open breaker raises
+        CircuitBreakerError and the stale entry keeps being served.
+        """
+        actual_llm, adapter, circuit_breaker = self._resolve_upstream(target_llm_name)
+        response = await self.single_flight.run(
+            cache_key,
+            lambda: circuit_breaker.execute(
+                adapter.send,
+                prompt=prompt,
+                conversation_id=conversation_id,
+                **kwargs
+            )
+        )
+        await self._update_cache(
+            cache_key, response, cache_policy.ttl_seconds,
+            target_llm=target_llm_name, prompt=prompt, kwargs=kwargs,
+            max_entry_bytes=cache_policy.max_entry_bytes, adapter_service=actual_llm
+        )
+        self.logger.debug(f"Revalidated stale cache entry via {actual_llm}: {cache_key[:20]}...")
+    
     def _determine_actual_llm(self, target_llm_name: str) -> str:
         """
         Determine the actual LLM to use based on configuration
@@ -275,4 +358,20 @@ class Router(IRouter):
         """Clear conversation state"""
         if conversation_id in self.active_conversations:
             del self.active_conversations[conversation_id]
-            self.logger.debug(f"Cleared conversation state: {conversation_id}")
\ No newline at end of file
+            self.logger.debug(f"Cleared conversation state: {conversation_id}")
+    
+    def get_cache_status(self) -> Dict[str, Any]:
+        """Get response cache health and per-tier counters for API and monitoring"""
+        status = self.response_cache.get_status()
+        status["single_flight"] = self.single_flight.get_stats()
+        status["stale_while_revalidate"] = self.revalidator.get_stats()
+        status["policies"] = self.cache_policies.to_dict()
+        return status
+    
+    def get_conversation_stats(self) -> Dict[str, Any]:
+        """Get size and eviction counters of the conversation store"""
+        return self.active_conversations.get_stats()
+    
+    async def close(self) -> None:
+        """Stop background tasks owned by the router"""
+        await self.response_cache.close()
@@ -0,0 +1,247 @@
+# llm_bridge/routing/routing_table.py
+"""
+Vorkompilierte Routing-Tabelle des Routers.
+
+Die Auflösung eines Modellnamens zu Adapter, Circuit Breaker und
+Modell-Identifier (Plattform vs. API, native vs. OpenRouter-Namen, base_url)
+hängt nur von Registry und geladenen Adaptern ab. Sie wird daher einmal beim
+Laden berechnet statt bei jeder Nachricht. Ändern sich Registry oder Adapter,
+baut der Router eine neue Tabelle und tauscht sie als Ganzes aus; laufende
+Anfragen arbeiten mit der Tabelle weiter, die sie zu Beginn gelesen haben.
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from ..adapters.claude_adapter import ClaudeAdapter
+from ..adapters.gemini_adapter import GeminiAdapter
+from ..adapters.universal_adapter import UniversalAdapter
+from ..caching.policy import CachePolicyTable
+from ..caching.response_cache import ResponseCache
+from .hedging import HedgePolicy
+
+
+class Route:
+    """Aufgelöstes Ziel eines Modellnamens samt Fast-Path-Metadaten."""
+
+    __slots__ = ("name", "adapter_name", "adapter", "breaker", "model_identifier", "base_url",
+                 "is_universal", "cache_policy", "cache_tags", "similarity", "hedge", "hedge_policy",
+                 "capabilities", "groups", "cost")
+
+    def __init__(self, name: str, adapter_name: str, adapter: Any, breaker: Any,
+                 model_identifier: Optional[str], base_url: Optional[str], cache_policy: Any,
+                 similarity: Any = None, capabilities: Tuple[str, ...] = (), groups: Tuple[str, ...] = (),
+                 cost: Optional[float] = None):
+        self.name = name
+        self.adapter_name = adapter_name
+        self.adapter = adapter
+        self.breaker = breaker
+        self.model_identifier = model_identifier
+        self.base_url = base_url
+        self.is_universal = isinstance(adapter, UniversalAdapter)
+        # Policy ohne Agent-Overrides; Agent-spezifische Policies löst die CachePolicyTable auf
+        self.cache_policy = cache_policy
+        self.cache_tags = ResponseCache.make_tags(name, adapter_name)
+        self.similarity = similarity
+        # Gleichwertige Route für Hedged Requests (siehe hedging.py)
+        self.hedge: Optional["Route"] = None
+        self.hedge_policy: Optional[HedgePolicy] = None
+        # Für die Auswahl über capability:<x> / group:<x> (siehe selection.py)
+        self.capabilities = capabilities
+        self.groups = groups
+        self.cost = cost
+
+    def to_dict(self) -> dict:
+        return {
+            "adapter": self.adapter_name,
+            "model_identifier": self.model_identifier,
+            "base_url": self.base_url,
+            "universal": self.is_universal,
+            "cache_policy": self.cache_policy.to_dict(),
+            "similarity_cache": self.similarity is not None,
+            "hedge": (f"{self.hedge.adapter_name}:{self.hedge.model_identifier}" if self.hedge else None),
+            "capabilities": list(self.capabilities),
+            "groups": list(self.groups),
+            "cost_per_million_tokens": self.cost,
+        }
+
+
+def resolve_target(target_name: str, config: Dict[str, Any], adapters: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Findet den korrekten Adapter-Dienst und den passenden Modell-Identifier,
+    basierend auf der Plattform (API vs. CLI/Browser/Desktop).
+    """
+    if config.get('platform', 'api') != 'api':
+        # Dies ist ein Plattform-Adapter (CLI, Browser etc.)
+        # Der Adapter ist direkt unter target_name registriert
+        model_identifier = config.get("command") or config.get("tool_name")
+        return target_name, model_identifier
+
+    # Dies ist ein API-basierter Adapter
+    adapter_service_name = config.get('adapter_service')
+
+    # Den registrierten Adapter für diesen Dienst holen
+    active_adapter = adapters.get(adapter_service_name)
+    if not active_adapter:
+        return None, None
+
+    # INTELLIGENTE AUSWAHL für API-Adapter:
+    # Prüfen, ob der aktive Adapter ein direkter, nativer Adapter ist
+    if isinstance(active_adapter, (ClaudeAdapter, GeminiAdapter)):
+        # Ja -> Nutze den 'direct'-Modellnamen
+        model_identifier = config.get("model_name_direct")
+    else:
+        # Nein -> Nutze den 'openrouter'-Modellnamen, fallback auf 'direct'
+        model_identifier = config.get("model_name_openrouter") or config.get("model_name_direct")
+
+    return adapter_service_name, model_identifier
+
+
+def _blended_cost(config: Dict[str, Any]) -> Optional[float]:
+    """Summe der Preise pro Million Input- und Output-Tokens (None ohne Kostenangabe)."""
+    cost = config.get('cost')
+    if not isinstance(cost, dict):
+        return None
+    return float(cost.get('input_per_million_tokens') or 0.0) + float(cost.get('output_per_million_tokens') or 0.0)
+
+
+class RoutingTable:
+    """Unveränderliche Abbildung ``Modellname -> Route``."""
+
+    def __init__(self, routes: Dict[str, Route], errors: Dict[str, str],
+                 fallbacks: Optional[Dict[str, Tuple[str, ...]]] = None):
+        self._routes: Mapping[str, Route] = MappingProxyType(routes)
+        # Deklarative Fallback-Ketten pro Modell (auch für nicht auflösbare Modelle)
+        self._fallbacks: Mapping[str, Tuple[str, ...]] = MappingProxyType(fallbacks or {})
+        # Modelle, die sich nicht auflösen ließen, mit der Fehlermeldung für route_message
+        self._errors: Mapping[str, str] = MappingProxyType(errors)
+
+        # Vorberechnete Kandidaten für capability:<x> und group:<x>
+        selectors: Dict[Tuple[str, str], List[Route]] = {}
+        for route in routes.values():
+            for capability in route.capabilities:
+                selectors.setdefault(("capability", capability), []).append(route)
+            for group in route.groups:
+                selectors.setdefault(("group", group), []).append(route)
+        self._selectors: Mapping[Tuple[str, str], Tuple[Route, ...]] = MappingProxyType(
+            {key: tuple(members) for key, members in selectors.items()}
+        )
+
+    @classmethod
+    def build(cls,
+              model_config: Dict[str, Any],
+              adapters: Dict[str, Any],
+              circuit_breakers: Dict[str, Any],
+              cache_policies: CachePolicyTable,
+              similarity_settings: Optional[Dict[str, Any]] = None) -> "RoutingTable":
+        """Löst alle Modelle der Registry gegen die geladenen Adapter auf."""
+        similarity_settings = similarity_settings or {}
+        routes: Dict[str, Route] = {}
+        errors: Dict[str, str] = {}
+
+        for name, config in model_config.items():
+            if not isinstance(config, dict):
+                continue
+
+            adapter_name, model_identifier = resolve_target(name, config, adapters)
+            if not adapter_name:
+                errors[name] = f"Could not resolve target '{name}'."
+                continue
+
+            adapter = adapters.get(adapter_name)
+            breaker = circuit_breakers.get(adapter_name)
+            if not adapter or not breaker:
+                errors[name] = f"Adapter or Circuit Breaker for '{adapter_name}' not found."
+                continue
+
+            routes[name] = Route(
+                name=name,
+                adapter_name=adapter_name,
+                adapter=adapter,
+                breaker=breaker,
+                model_identifier=model_identifier,
+                base_url=config.get('base_url'),
+                cache_policy=cache_policies.resolve(name),
+                similarity=similarity_settings.get(name),
+                capabilities=tuple(config.get('capabilities') or ()),
+                groups=tuple(config.get('groups') or ()),
+                cost=_blended_cost(config),
+            )
+
+        for name, route in routes.items():
+            policy = HedgePolicy.from_config(model_config[name].get('hedging'))
+            if policy is None:
+                continue
+            hedge = cls._resolve_hedge(route, policy, model_config[name], routes, adapters, circuit_breakers)
+            if hedge is None:
+                print(f"⚠️ [Router] Keine gleichwertige Route für Hedging von '{name}' gefunden, Hedging deaktiviert")
+                continue
+            route.hedge, route.hedge_policy = hedge, policy
+
+        fallbacks = {
+            name: tuple(config['fallbacks'])
+            for name, config in model_config.items()
+            if isinstance(config, dict) and config.get('fallbacks')
+        }
+
+        return cls(routes, errors, fallbacks)
+
+    @staticmethod
+    def _resolve_hedge(route: Route, policy: HedgePolicy, config: Dict[str, Any], routes: Dict[str, Route],
+                       adapters: Dict[str, Any], circuit_breakers: Dict[str, Any]) -> Optional[Route]:
+        """
+        Gleichwertige Route für ein Modell: entweder ein anderes Registry-Modell
+        (``target``) oder dasselbe Modell über einen anderen Adapter-Dienst (``via``).
+        """
+        if policy.target:
+            hedge = routes.get(policy.target)
+        else:
+            adapter_name, model_identifier = resolve_target(route.name, {**config, 'adapter_service': policy.via,
+                                                                         'platform': 'api'}, adapters)
+            breaker = circuit_breakers.get(adapter_name)
+            if not adapter_name or not model_identifier or not breaker:
+                return None
+            hedge = Route(name=route.name, adapter_name=adapter_name, adapter=adapters[adapter_name],
+                          breaker=breaker, model_identifier=model_identifier, base_url=None,
+                          cache_policy=route.cache_policy)
+        # Eine Route über denselben Adapter ist kein unabhängiger zweiter Weg
+        if hedge is None or hedge.adapter_name == route.adapter_name:
+            return None
+        return hedge
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._routes
+
+    def get(self, name: str) -> Optional[Route]:
+        return self._routes.get(name)
+
+    def routes(self) -> Tuple[Route, ...]:
+        return tuple(self._routes.values())
+
+    def fallbacks(self, name: str) -> Tuple[str, ...]:
+        """Fallback-Ziele eines Modells in der konfigurierten Reihenfolge."""
+        return self._fallbacks.get(name, ())
+
+    def candidates(self, kind: str, value: str) -> Tuple[Route, ...]:
+        """Alle Routen mit einer Fähigkeit (``capability``) bzw. in einer Gruppe (``group``)."""
+        return self._selectors.get((kind, value), ())
+
+    def require(self, name: str) -> Route:
+        """Route eines Modells; wirft mit derselben Meldung wie bisher, wenn es keine gibt."""
+        route = self._routes.get(name)
+        if route is None:
+            raise Exception(self._errors.get(name, f"Could not resolve target '{name}'."))
+        return route
+
+    def to_dict(self) -> dict:
+        """Übersicht für Status-APIs: aufgelöste Routen und nicht auflösbare Modelle."""
+        return {
+            "routes": {name: route.to_dict() for name, route in self._routes.items()},
+            "unresolved": dict(self._errors),
+            "selectors": {f"{kind}:{value}": [route.name for route in members]
+                          for (kind, value), members in self._selectors.items()},
+            "fallbacks": {name: list(chain) for name, chain in self._fallbacks.items()},
+        }
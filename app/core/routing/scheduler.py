@@ -0,0 +1,208 @@
+# llm_bridge/routing/scheduler.py
+"""
+Prioritäts-Scheduler für Upstream-Aufrufe des Routers.
+
+Interaktive Chat-Nachrichten konkurrieren sonst gleichberechtigt mit langen
+Missionen, Workflows und Batches um dieselbe Provider-Kapazität. Der
+Scheduler teilt Aufrufe in Verkehrsklassen ein:
+
+* ``interactive``: ``/v1/conversation/{id}/message`` und alles ohne Präfix
+* ``mission``: Conversation-IDs ``mission_*`` (AgentOrchestrator)
+* ``workflow``: ``wf_*`` / ``workflow_*`` (WorkflowOrchestrator)
+* ``batch``: ``batch_*``, Cache-Warm-up und Hintergrund-Revalidierung
+
+Insgesamt laufen höchstens ``SCHEDULER_MAX_CONCURRENCY`` Aufrufe, pro Klasse
+höchstens ihr Limit (``SCHEDULER_CLASS_LIMITS``). Wird ein Platz frei, erhält
+ihn die wartende Klasse mit der kleinsten virtuellen Zeit; jede Zuteilung
+erhöht sie um ``1 / Gewicht`` (``SCHEDULER_WEIGHTS``). Bei Gewichten 8:4:2:1
+bekommt interaktiver Verkehr unter Last also 8 von 15 frei werdenden Plätzen.
+Da die Limits der Hintergrundklassen zusammen unter dem Gesamtlimit liegen,
+bleiben für Chat-Nachrichten immer Plätze frei.
+
+Cache-Treffer belegen keinen Platz; geplant wird erst der Upstream-Aufruf.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..utils.latency import LatencyTracker
+
+TRAFFIC_CLASSES = ("interactive", "mission", "workflow", "batch")
+DEFAULT_CLASS = "interactive"
+
+# Präfixe der Conversation-IDs, mit denen die Bridge selbst Anfragen erzeugt
+CLASS_PREFIXES = (
+    ("mission_", "mission"),
+    ("wf_", "workflow"),
+    ("workflow_", "workflow"),
+    ("batch_", "batch"),
+    ("cache_warmup_", "batch"),
+)
+
+DEFAULT_WEIGHTS = "interactive=8,mission=4,workflow=2,batch=1"
+DEFAULT_CLASS_LIMITS = "interactive=64,mission=24,workflow=16,batch=16"
+
+
+def _parse_class_map(value: str, cast: Callable[[str], Any]) -> Dict[str, Any]:
+    """Liest ``klasse=wert,klasse=wert`` aus einer Umgebungsvariable."""
+    result = {}
+    for item in value.split(","):
+        name, sep, raw = item.partition("=")
+        name = name.strip()
+        if sep and name in TRAFFIC_CLASSES:
+            result[name] = cast(raw.strip())
+    return result
+
+
+class _TrafficClass:
+    __slots__ = ("name", "weight", "limit", "active", "waiters", "virtual_time", "dispatched", "waits")
+
+    def __init__(self, name: str, weight: float, limit: int):
+        self.name = name
+        self.weight = weight
+        self.limit = limit
+        self.active = 0
+        self.waiters: deque = deque()
+        self.virtual_time = 0.0
+        self.dispatched = 0
+        self.waits = LatencyTracker()
+
+
+class PriorityScheduler:
+    """Gewichtete faire Warteschlangen pro Verkehrsklasse mit Limits pro Klasse und gesamt."""
+
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 weights: Optional[Dict[str, float]] = None,
+                 limits: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            max_concurrency: Gesamtlimit; sonst ``SCHEDULER_MAX_CONCURRENCY``.
+            weights: Gewichte pro Klasse; fehlende Klassen aus ``SCHEDULER_WEIGHTS``.
+            limits: Limits pro Klasse; fehlende Klassen aus ``SCHEDULER_CLASS_LIMITS``.
+        """
+        self.enabled = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "64"))
+        self.max_concurrency = max(1, max_concurrency)
+        weights = {**_parse_class_map(DEFAULT_WEIGHTS, float),
+                   **_parse_class_map(os.getenv("SCHEDULER_WEIGHTS", DEFAULT_WEIGHTS), float),
+                   **(weights or {})}
+        limits = {**_parse_class_map(DEFAULT_CLASS_LIMITS, int),
+                  **_parse_class_map(os.getenv("SCHEDULER_CLASS_LIMITS", DEFAULT_CLASS_LIMITS), int),
+                  **(limits or {})}
+        self.classes: Dict[str, _TrafficClass] = {
+            name: _TrafficClass(name, max(weights[name], 0.001), max(1, min(limits[name], self.max_concurrency)))
+            for name in TRAFFIC_CLASSES
+        }
+        self.active = 0
+        self._virtual_clock = 0.0
+
+    def classify(self, conversation_id: str, priority: Optional[str] = None) -> str:
+        """Verkehrsklasse einer Anfrage: explizite ``priority`` oder Präfix der Conversation-ID."""
+        if priority:
+            if priority not in self.classes:
+                raise ValueError(f"Unknown priority class '{priority}' (allowed: {', '.join(TRAFFIC_CLASSES)}).")
+            return priority
+        for prefix, traffic_class in CLASS_PREFIXES:
+            if conversation_id.startswith(prefix):
+                return traffic_class
+        return DEFAULT_CLASS
+
+    async def run(self, traffic_class: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Führt ``call`` aus, sobald die Klasse einen Platz zugeteilt bekommt."""
+        await self.acquire(traffic_class)
+        try:
+            return await call()
+        finally:
+            self.release(traffic_class)
+
+    async def acquire(self, traffic_class: str) -> None:
+        cls = self.classes[traffic_class]
+        started = time.perf_counter()
+        if not self.enabled:
+            cls.active += 1
+            self.active += 1
+            return
+
+        if not cls.waiters and not cls.active:
+            # Eine Klasse, die pausiert hat, sammelt keinen Vorsprung an
+            cls.virtual_time = max(cls.virtual_time, self._virtual_clock)
+        if not cls.waiters and self._has_room(cls) and not self._others_waiting():
+            self._grant(cls)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            cls.waiters.append(waiter)
+            self._dispatch()
+            try:
+                await waiter
+            except BaseException:
+                if waiter.done() and not waiter.cancelled():
+                    # Platz wurde bereits zugeteilt
+                    self.release(traffic_class)
+                else:
+                    waiter.cancel()
+                    try:
+                        cls.waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                raise
+        cls.waits.record(time.perf_counter() - started)
+
+    def release(self, traffic_class: str) -> None:
+        cls = self.classes[traffic_class]
+        cls.active -= 1
+        self.active -= 1
+        if self.enabled:
+            self._dispatch()
+
+    def _has_room(self, cls: _TrafficClass) -> bool:
+        return self.active < self.max_concurrency and cls.active < cls.limit
+
+    def _others_waiting(self) -> bool:
+        return any(cls.waiters for cls in self.classes.values())
+
+    def _grant(self, cls: _TrafficClass) -> None:
+        cls.active += 1
+        self.active += 1
+        cls.dispatched += 1
+        self._virtual_clock = max(self._virtual_clock, cls.virtual_time)
+        cls.virtual_time += 1 / cls.weight
+
+    def _dispatch(self) -> None:
+        """Verteilt freie Plätze an die wartende Klasse mit der kleinsten virtuellen Zeit."""
+        while self.active < self.max_concurrency:
+            candidates = []
+            for cls in self.classes.values():
+                while cls.waiters and cls.waiters[0].done():
+                    cls.waiters.popleft()
+                if cls.waiters and cls.active < cls.limit:
+                    candidates.append(cls)
+            if not candidates:
+                return
+            cls = min(candidates, key=lambda c: c.virtual_time)
+            self._grant(cls)
+            cls.waiters.popleft().set_result(None)
+
+    def get_stats(self) -> dict:
+        """Belegung, Warteschlangen und Wartezeiten pro Verkehrsklasse."""
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "active": self.active,
+            "classes": {
+                name: {
+                    "weight": cls.weight,
+                    "limit": cls.limit,
+                    "active": cls.active,
+                    "queued": len(cls.waiters),
+                    "dispatched": cls.dispatched,
+                    "p50_wait_ms": round((cls.waits.percentile(50) or 0.0) * 1000, 1),
+                    "p95_wait_ms": round((cls.waits.percentile(95) or 0.0) * 1000, 1),
+                }
+                for name, cls in self.classes.items()
+            },
+        }
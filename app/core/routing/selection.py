@@ -0,0 +1,155 @@
+# llm_bridge/routing/selection.py
+"""
+Latenz- und kostenbewusste Modellauswahl.
+
+Statt eines festen Modellnamens kann ein Aufrufer eine Gruppe oder Fähigkeit
+adressieren, z.B. ``capability:vision`` oder ``group:fast``. Der Router wählt
+dann das Mitglied mit dem besten (niedrigsten) Score:
+
+    score = w_latency * Latenz + w_errors * Fehlerrate + w_cost * Kosten
+
+* Latenz: EWMA der beobachteten Upstream-Latenz, normiert auf den langsamsten
+  Kandidaten. Modelle ohne Messwerte erhalten den Mittelwert der übrigen.
+* Fehlerrate: EWMA der beobachteten Fehler, die ohne neue Anfragen mit
+  ``ROUTING_ERROR_HALF_LIFE_SECONDS`` abklingt (sonst würde ein einmal
+  gescheitertes Modell nie wieder gewählt). Ein halb offener Circuit Breaker
+  zählt zusätzlich. Kandidaten mit offenem Breaker werden übersprungen,
+  solange es andere gibt.
+* Kosten: Summe der Registry-Preise pro Million Input- und Output-Tokens,
+  normiert auf den teuersten Kandidaten.
+
+Die Gewichte kommen aus ``ROUTING_WEIGHT_LATENCY``, ``ROUTING_WEIGHT_ERRORS`` und
+``ROUTING_WEIGHT_COST``.
+"""
+
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..orchestration.circuit_breaker import CircuitBreakerState
+
+SELECTOR_PREFIXES = ("capability", "group")
+
+
+def parse_selector(target: str) -> Optional[Tuple[str, str]]:
+    """Zerlegt ``capability:<name>`` bzw. ``group:<name>``; None für feste Modellnamen."""
+    kind, sep, value = target.partition(":")
+    if sep and kind in SELECTOR_PREFIXES and value:
+        return kind, value
+    return None
+
+
+class _ModelStats:
+    __slots__ = ("latency_ewma", "error_ewma", "requests", "failures", "updated_at")
+
+    def __init__(self):
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.updated_at = time.monotonic()
+
+
+class ModelSelector:
+    """Live-Statistiken pro Modell und Auswahl des besten Kandidaten."""
+
+    def __init__(self, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else float(os.getenv("ROUTING_EWMA_ALPHA", "0.2"))
+        self.error_half_life = float(os.getenv("ROUTING_ERROR_HALF_LIFE_SECONDS", "300"))
+        self.weights = {
+            "latency": float(os.getenv("ROUTING_WEIGHT_LATENCY", "0.4")),
+            "errors": float(os.getenv("ROUTING_WEIGHT_ERRORS", "0.4")),
+            "cost": float(os.getenv("ROUTING_WEIGHT_COST", "0.2")),
+        }
+        self._stats: Dict[str, _ModelStats] = {}
+        # Letzte Entscheidung pro Selektor, damit die API zeigen kann, warum gewählt wurde
+        self._decisions: Dict[str, dict] = {}
+
+    def _error_rate(self, stats: _ModelStats) -> float:
+        """Fehler-EWMA, seit dem letzten Aufruf mit der Halbwertszeit abgeklungen."""
+        if self.error_half_life <= 0:
+            return stats.error_ewma
+        return stats.error_ewma * 0.5 ** ((time.monotonic() - stats.updated_at) / self.error_half_life)
+
+    def record(self, model_name: str, latency_seconds: float, success: bool) -> None:
+        """Verbucht das Ergebnis eines Upstream-Aufrufs."""
+        stats = self._stats.get(model_name)
+        if stats is None:
+            stats = self._stats[model_name] = _ModelStats()
+        stats.requests += 1
+        if success:
+            # Nur erfolgreiche Aufrufe gehen in die Latenz ein; Fehler kommen oft sofort zurück
+            if stats.latency_ewma is None:
+                stats.latency_ewma = latency_seconds
+            else:
+                stats.latency_ewma += self.alpha * (latency_seconds - stats.latency_ewma)
+        else:
+            stats.failures += 1
+        error_rate = self._error_rate(stats)
+        stats.error_ewma = error_rate + self.alpha * ((0.0 if success else 1.0) - error_rate)
+        stats.updated_at = time.monotonic()
+
+    def score(self, routes: Sequence) -> List[dict]:
+        """Bewertet Kandidaten-Routen; das Ergebnis ist aufsteigend nach Score sortiert."""
+        stats = [self._stats.get(route.name) for route in routes]
+        known = [s.latency_ewma for s in stats if s is not None and s.latency_ewma is not None]
+        max_latency = max(known) if known else 0.0
+        mean_latency = sum(known) / len(known) if known else 0.0
+        max_cost = max((route.cost or 0.0) for route in routes) if routes else 0.0
+
+        scored = []
+        for route, model_stats in zip(routes, stats):
+            latency = model_stats.latency_ewma if model_stats and model_stats.latency_ewma is not None else mean_latency
+            error_rate = self._error_rate(model_stats) if model_stats else 0.0
+            breaker_state = getattr(route.breaker, "state", None)
+            if breaker_state == CircuitBreakerState.HALF_OPEN:
+                error_rate = min(1.0, error_rate + 0.5)
+
+            components = {
+                "latency": latency / max_latency if max_latency else 0.0,
+                "errors": error_rate,
+                "cost": (route.cost or 0.0) / max_cost if max_cost else 0.0,
+            }
+            scored.append({
+                "model": route.name,
+                "score": round(sum(self.weights[k] * v for k, v in components.items()), 4),
+                "components": {k: round(v, 4) for k, v in components.items()},
+                "latency_ewma_ms": round(latency * 1000, 1) if latency else None,
+                "cost_per_million_tokens": route.cost,
+                "breaker_state": breaker_state.value if breaker_state is not None else None,
+                "available": breaker_state != CircuitBreakerState.OPEN,
+            })
+
+        scored.sort(key=lambda entry: (not entry["available"], entry["score"]))
+        return scored
+
+    def select(self, target: str, routes: Sequence) -> str:
+        """
+        Wählt das Modell mit dem besten Score für einen Selektor.
+        Sind alle Breaker offen, wird trotzdem der beste Kandidat gewählt; der
+        Breaker weist die Anfrage dann mit ``CircuitBreakerError`` ab.
+        """
+        if not routes:
+            raise Exception(f"No models available for '{target}'.")
+        scored = self.score(routes)
+        chosen = scored[0]["model"]
+        self._decisions[target] = {"chosen": chosen, "at": time.time(), "candidates": scored}
+        return chosen
+
+    def get_stats(self) -> dict:
+        """Live-Statistiken pro Modell, Gewichte und letzte Entscheidungen für die API."""
+        return {
+            "weights": dict(self.weights),
+            "alpha": self.alpha,
+            "error_half_life_seconds": self.error_half_life,
+            "models": {
+                name: {
+                    "requests": stats.requests,
+                    "failures": stats.failures,
+                    "error_rate_ewma": round(self._error_rate(stats), 4),
+                    "latency_ewma_ms": round(stats.latency_ewma * 1000, 1) if stats.latency_ewma is not None else None,
+                }
+                for name, stats in self._stats.items()
+            },
+            "decisions": dict(self._decisions),
+        }
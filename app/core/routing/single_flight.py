@@ -0,0 +1,64 @@
+# llm_bridge/routing/single_flight.py
+"""
+Single-Flight-Koaleszierung identischer LLM-Anfragen.
+
+Senden N Aufrufer gleichzeitig dieselbe Anfrage (gleicher Cache-Schlüssel),
+wird nur ein Upstream-Call ausgeführt. Alle weiteren Aufrufer warten auf das
+Ergebnis bzw. die Exception dieses einen Calls.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    Führt pro Schlüssel höchstens einen Upstream-Call gleichzeitig aus.
+
+    Der Call läuft als eigener Task und wird von allen Aufrufern (auch dem
+    ersten) per ``asyncio.shield`` erwartet. Bricht ein einzelner Aufrufer ab
+    (z.B. Client-Disconnect), laufen der Call und die übrigen Wartenden weiter.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._in_flight
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Args:
+            key: Schlüssel der Anfrage (der sha256-Cache-Schlüssel des Routers).
+            factory: Erzeugt die Coroutine für den Upstream-Call; wird nur vom
+                     ersten Aufrufer (Leader) aufgerufen.
+
+        Returns:
+            Das Ergebnis des gemeinsamen Upstream-Calls.
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.leaders += 1
+        task = asyncio.ensure_future(factory())
+        self._in_flight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Exception als abgerufen markieren, falls alle Wartenden abgebrochen haben
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> dict:
+        return {
+            "in_flight": len(self._in_flight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
@@ -150,7 +150,7 @@ class ConfigurationService(IConfigurationProvider):
     def _is_model_config(self, key: str, value: Any = None) -> bool:
         """Check if a config entry is a model configuration"""
         # Skip private keys and known non-model sections
-        if key.startswith('_') or key in ['agents', 'crews', 'mission_templates']:
+        if key.startswith('_') or key in ['agents', 'crews', 'mission_templates', 'rate_limits']:
             return False
         
         # If we have the value, check for model-specific keys
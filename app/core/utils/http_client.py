@@ -1,136 +1,335 @@
 """
 Zentraler HTTP-Client-Manager für asynchrone Netzwerkanfragen mit Connection Pooling.
 
-Dieser Manager verwaltet eine einzige httpx.AsyncClient-Instanz für die gesamte
-Anwendungslebensdauer, um effizientes Connection Pooling und Ressourcen-Management
-zu ermöglichen.
+Jeder Adapter-Dienst (z.B. ``openrouter_gateway``, ``claude_service``) erhält
+einen eigenen httpx.AsyncClient mit eigenem Connection Pool. Ein langsamer
+Provider belegt so nur seine eigenen Verbindungen. Limits, Timeouts und
+HTTP/2 kommen aus dem ``http_clients``-Block der registry.yaml; ohne Eintrag
+gelten die bisherigen Standardwerte. Aufrufe ohne Dienst nutzen weiterhin den
+gemeinsamen Standard-Client.
+
+Pro Client zählt ein vorgeschalteter Transport laufende und wartende Anfragen
+und misst die Zeit bis zur Zuteilung eines Platzes (Pool-Sättigung).
 
 Autor: Claude AI
 Erstellt: 2024-12-20 (Roadmap Step 2.1)
 """
 
-import httpx
-from typing import Optional
 import asyncio
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+from .latency import LatencyTracker
+
+try:
+    import h2  # noqa: F401  (httpx[http2], siehe requirements.txt)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_SERVICE = "default"
+
+# Bisherige Werte des globalen Clients, gelten für Dienste ohne Eintrag in 'http_clients'
+DEFAULT_CLIENT_SETTINGS = {
+    "max_connections": 200,
+    "max_keepalive_connections": 50,
+    "keepalive_expiry": 300.0,     # 5 Minuten Keep-Alive
+    "connect_timeout": 5.0,        # Verbindungsaufbau
+    "read_timeout": 120.0,         # LLMs können lange antworten
+    "write_timeout": 10.0,         # Request senden
+    "pool_timeout": 10.0,          # Warten auf verfügbare Connection
+    "http2": False,
+    "max_concurrent_requests": None,
+    "prewarm_connections": 1,
+}
+
+# Gleichzeitige Streams pro HTTP/2-Verbindung, mit denen das Anfrage-Limit geschätzt wird
+HTTP2_STREAMS_PER_CONNECTION = 100
+
+
+class PoolStats:
+    """Sättigung des Pools eines Dienstes: laufende/wartende Anfragen und Wartezeit bis zur Zuteilung."""
+
+    def __init__(self, service: str, limit: int):
+        self.service = service
+        self.limit = limit
+        self.in_flight = 0
+        self.waiters = 0
+        self.max_waiters = 0
+        self.acquired = 0
+        self.pool_timeouts = 0
+        self.waits = LatencyTracker()
+
+    def to_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiters": self.waiters,
+            "max_waiters": self.max_waiters,
+            "acquired": self.acquired,
+            "pool_timeouts": self.pool_timeouts,
+            "p50_acquire_ms": round((self.waits.percentile(50) or 0.0) * 1000, 2),
+            "p95_acquire_ms": round((self.waits.percentile(95) or 0.0) * 1000, 2),
+        }
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Antwort-Body, der den Platz im Pool erst nach dem Lesen bzw. Schließen freigibt."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Begrenzt gleichzeitige Anfragen auf das Limit des Pools und misst dabei die
+    Wartezeit. Ohne diesen Transport wartet httpx intern auf eine Verbindung,
+    ohne dass sich die Sättigung beobachten lässt.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, stats: PoolStats):
+        self._transport = transport
+        self._stats = stats
+        self._slots = asyncio.Semaphore(stats.limit)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        started = time.perf_counter()
+        stats.waiters += 1
+        stats.max_waiters = max(stats.max_waiters, stats.waiters)
+        try:
+            # Gleiche Semantik wie das Pool-Timeout von httpx
+            pool_timeout = request.extensions.get("timeout", {}).get("pool")
+            await asyncio.wait_for(self._slots.acquire(), pool_timeout)
+        except asyncio.TimeoutError:
+            stats.pool_timeouts += 1
+            raise httpx.PoolTimeout(f"No free slot in HTTP pool '{stats.service}'", request=request) from None
+        finally:
+            stats.waiters -= 1
+        stats.acquired += 1
+        stats.in_flight += 1
+        stats.waits.record(time.perf_counter() - started)
+
+        released = False
+
+        def release():
+            nonlocal released
+            if not released:
+                released = True
+                stats.in_flight -= 1
+                self._slots.release()
+
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
 
 
 class HTTPClientManager:
     """
-    Verwaltet eine globale, asynchrone httpx.AsyncClient-Instanz,
-    um Connection Pooling über die gesamte Anwendung hinweg zu ermöglichen.
+    Verwaltet einen asynchronen httpx.AsyncClient pro Adapter-Dienst (und einen
+    Standard-Client), um Connection Pooling pro Provider zu ermöglichen.
     
     Diese Klasse implementiert das Singleton-Pattern für HTTP-Clients und
     bietet optimierte Einstellungen für LLM-API-Calls.
     """
     
-    _client: Optional[httpx.AsyncClient] = None
+    _clients: Dict[str, httpx.AsyncClient] = {}
+    _stats: Dict[str, PoolStats] = {}
+    _settings: Dict[str, dict] = {}
+    # Clients mit geänderter Konfiguration: laufende Anfragen dürfen sie noch zu Ende nutzen
+    _retired: List[httpx.AsyncClient] = []
     _lock = asyncio.Lock()
 
     @classmethod
-    async def get_client(cls) -> httpx.AsyncClient:
+    def configure(cls, settings: Dict[str, dict]) -> None:
+        """
+        Übernimmt Limits und Timeouts pro Dienst (``http_clients`` in registry.yaml).
+        Clients, deren Konfiguration sich geändert hat, werden beim nächsten
+        Zugriff neu erstellt; die alten werden beim Shutdown geschlossen.
+
+        Raises:
+            ValueError: ``http2: true`` ohne installiertes ``h2``.
+        """
+        settings = {service: {k: v for k, v in (config or {}).items() if v is not None}
+                    for service, config in settings.items()}
+        if not HTTP2_AVAILABLE:
+            # Ohne h2 liefe der Dienst still mit HTTP/1.1 und einem für HTTP/2 bemessenen Verbindungslimit
+            wanted = sorted(service for service, config in settings.items() if config.get("http2"))
+            if wanted:
+                raise ValueError(f"HTTP/2 für {', '.join(wanted)} konfiguriert, aber das Paket 'h2' fehlt "
+                                 f"(pip install 'httpx[http2]').")
+        for service in set(cls._settings) | set(settings):
+            if cls._settings.get(service) != settings.get(service) and service in cls._clients:
+                cls._retired.append(cls._clients.pop(service))
+        cls._settings = settings
+
+    @classmethod
+    async def get_client(cls, service: Optional[str] = None) -> httpx.AsyncClient:
         """
-        Gibt die globale Client-Instanz zurück. Erstellt sie thread-safe, falls sie nicht existiert.
+        Gibt den Client eines Adapter-Dienstes zurück (ohne Dienst: Standard-Client).
+        Erstellt ihn thread-safe, falls er nicht existiert.
         
         Returns:
-            httpx.AsyncClient: Die globale, konfigurierte Client-Instanz
+            httpx.AsyncClient: Die konfigurierte Client-Instanz
         """
+        service = service or DEFAULT_SERVICE
+        client = cls._clients.get(service)
         # Double-checked locking pattern für thread-safety
-        if cls._client is None or cls._client.is_closed:
+        if client is None or client.is_closed:
             async with cls._lock:
                 # Nochmal prüfen nach dem Lock
-                if cls._client is None or cls._client.is_closed:
-                    cls._client = cls._create_client()
-                    print("🌐 [HTTP] Neuer globaler HTTP-Client erstellt mit Connection Pooling")
+                client = cls._clients.get(service)
+                if client is None or client.is_closed:
+                    client = cls._clients[service] = cls._create_client(service)
         
-        return cls._client
+        return client
 
     @classmethod
-    def _create_client(cls) -> httpx.AsyncClient:
+    def _resolve_settings(cls, service: str) -> dict:
+        settings = {**DEFAULT_CLIENT_SETTINGS, **cls._settings.get(service, {})}
+        settings["http2"] = bool(settings["http2"])
+        return settings
+
+    @classmethod
+    def _create_client(cls, service: str = DEFAULT_SERVICE) -> httpx.AsyncClient:
         """
-        Erstellt eine neue httpx.AsyncClient-Instanz mit optimalen Einstellungen.
+        Erstellt eine neue httpx.AsyncClient-Instanz mit den Einstellungen des Dienstes.
         
         Returns:
             httpx.AsyncClient: Konfigurierte Client-Instanz
         """
-        # Timeout-Konfiguration für LLM-APIs
-        # - connect: 5s (Verbindungsaufbau)
-        # - read: 120s (LLM-Antworten können lange dauern)
-        # - write: 10s (Request senden)
-        # - pool: 10s (Warten auf verfügbare Connection)
+        settings = cls._resolve_settings(service)
         timeout = httpx.Timeout(
-            connect=5.0,
-            read=120.0,  # LLMs können lange antworten
-            write=10.0,
-            pool=10.0
+            connect=settings["connect_timeout"],
+            read=settings["read_timeout"],
+            write=settings["write_timeout"],
+            pool=settings["pool_timeout"]
         )
-        
-        # Connection Pool Limits
-        # - max_keepalive_connections: Anzahl wiederverwendbarer Verbindungen
-        # - max_connections: Maximale Gesamtverbindungen
         limits = httpx.Limits(
-            max_keepalive_connections=50,  # Für multiple LLM-Provider
-            max_connections=200,           # Hoher Durchsatz
-            keepalive_expiry=300.0         # 5 Minuten Keep-Alive
+            max_keepalive_connections=settings["max_keepalive_connections"],
+            max_connections=settings["max_connections"],
+            keepalive_expiry=settings["keepalive_expiry"]
         )
-        
-        return httpx.AsyncClient(
-            timeout=timeout,
+        # HTTP/1.1: eine Anfrage pro Verbindung; HTTP/2 multiplext Streams über wenige Verbindungen
+        limit = settings["max_concurrent_requests"] or (
+            settings["max_connections"] * (HTTP2_STREAMS_PER_CONNECTION if settings["http2"] else 1))
+        stats = cls._stats[service] = PoolStats(service, limit)
+        transport = httpx.AsyncHTTPTransport(
             limits=limits,
-            http2=False,                   # HTTP/2 deaktiviert (h2 package nicht erforderlich)
-            follow_redirects=True,         # Automatische Redirect-Behandlung
+            http2=settings["http2"],
             verify=True                    # SSL-Verifikation für Sicherheit
         )
+        print(f"🌐 [HTTP] Neuer HTTP-Client für '{service}' (max. {settings['max_connections']} Verbindungen, "
+              f"HTTP/{'2' if settings['http2'] else '1.1'})")
+        return httpx.AsyncClient(
+            timeout=timeout,
+            transport=MeteredTransport(transport, stats),
+            follow_redirects=True          # Automatische Redirect-Behandlung
+        )
+
+    @classmethod
+    async def prewarm(cls, targets: Dict[str, Iterable[str]], timeout: Optional[float] = None) -> dict:
+        """
+        Baut vorab Verbindungen (DNS, TCP, TLS) zu den ``base_url``s jedes Dienstes
+        auf, damit die erste echte Anfrage keinen Verbindungsaufbau bezahlt.
+        Jede HTTP-Antwort zählt als Erfolg, auch 404: die Verbindung steht dann im Pool.
+        
+        Returns:
+            dict: Pro Dienst und URL die Anzahl geöffneter Verbindungen bzw. den Fehler
+        """
+        timeout = timeout if timeout is not None else float(os.getenv("HTTP_CLIENT_PREWARM_TIMEOUT_SECONDS", "5"))
+
+        async def warm(client: httpx.AsyncClient, url: str) -> None:
+            response = await client.head(url, timeout=timeout)
+            await response.aclose()
+
+        results: Dict[str, dict] = {}
+        jobs, keys = [], []
+        for service, urls in targets.items():
+            client = await cls.get_client(service)
+            settings = cls._resolve_settings(service)
+            # HTTP/2 bündelt parallele Anfragen auf einer Verbindung
+            connections = 1 if settings["http2"] else max(1, int(settings["prewarm_connections"]))
+            for url in sorted(set(urls)):
+                keys.append((service, url))
+                jobs.append(asyncio.gather(*(warm(client, url) for _ in range(connections))))
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*jobs, return_exceptions=True)
+        for (service, url), outcome in zip(keys, outcomes):
+            if isinstance(outcome, Exception):
+                results.setdefault(service, {})[url] = f"error: {type(outcome).__name__}"
+            else:
+                results.setdefault(service, {})[url] = len(outcome)
+        warmed = sum(1 for outcome in outcomes if not isinstance(outcome, Exception))
+        print(f"🔥 [HTTP] Pre-Warm: {warmed}/{len(keys)} Ziele verbunden in {time.perf_counter() - started:.2f}s")
+        return results
 
     @classmethod
     async def close_client(cls):
         """
-        Schließt die globale Client-Instanz sauber und gibt Ressourcen frei.
+        Schließt alle Client-Instanzen sauber und gibt Ressourcen frei.
         
         Diese Methode sollte beim Anwendungs-Shutdown aufgerufen werden.
         """
         async with cls._lock:
-            if cls._client and not cls._client.is_closed:
-                print("🔒 [HTTP] Schließe globalen HTTP-Client...")
-                await cls._client.aclose()
-                cls._client = None
-                print("✅ [HTTP] HTTP-Client erfolgreich geschlossen")
+            clients = [c for c in [*cls._clients.values(), *cls._retired] if not c.is_closed]
+            if clients:
+                print(f"🔒 [HTTP] Schließe {len(clients)} HTTP-Client(s)...")
+                for client in clients:
+                    await client.aclose()
+                print("✅ [HTTP] HTTP-Clients erfolgreich geschlossen")
+            cls._clients = {}
+            cls._retired = []
 
     @classmethod
     def get_client_info(cls) -> dict:
         """
-        Gibt Informationen über den aktuellen Client-Status zurück.
+        Gibt Informationen über die Clients pro Dienst zurück.
         
         Returns:
-            dict: Status-Informationen des HTTP-Clients
+            dict: Status, Konfiguration und Pool-Sättigung pro Dienst
         """
-        if cls._client is None:
-            return {"status": "not_initialized"}
-        
-        if cls._client.is_closed:
-            return {"status": "closed"}
+        if not cls._clients:
+            return {"status": "not_initialized", "http2_available": HTTP2_AVAILABLE, "clients": {}}
         
-        # Verbindungspool-Statistiken
-        pool_info = {}
-        if hasattr(cls._client, '_transport') and cls._client._transport:
-            transport = cls._client._transport
-            if hasattr(transport, '_pool'):
-                pool = transport._pool
-                pool_info = {
-                    "active_connections": len(getattr(pool, '_connections', [])),
-                    "keepalive_connections": len(getattr(pool, '_keepalive_connections', [])),
-                }
-        
-        return {
-            "status": "active",
-            "http2_enabled": False,  # HTTP/2 deaktiviert
-            "pool_info": pool_info,
-            "timeout_config": {
-                "connect": cls._client.timeout.connect,
-                "read": cls._client.timeout.read,
-                "write": cls._client.timeout.write,
-                "pool": cls._client.timeout.pool,
+        clients = {}
+        for service, client in cls._clients.items():
+            settings = cls._resolve_settings(service)
+            clients[service] = {
+                "status": "closed" if client.is_closed else "active",
+                "http2_enabled": settings["http2"],
+                "max_connections": settings["max_connections"],
+                "max_keepalive_connections": settings["max_keepalive_connections"],
+                "timeout_config": {
+                    "connect": client.timeout.connect,
+                    "read": client.timeout.read,
+                    "write": client.timeout.write,
+                    "pool": client.timeout.pool,
+                },
+                "pool": cls._stats[service].to_dict() if service in cls._stats else {},
             }
-        }
+        return {"status": "active", "http2_available": HTTP2_AVAILABLE, "clients": clients}
 
     @classmethod
     async def health_check(cls) -> bool:
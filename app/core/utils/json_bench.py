@@ -0,0 +1,86 @@
+# llm_bridge/utils/json_bench.py
+"""
+Mikrobenchmark für den JSON-Codec (``llm-bridge bench json``).
+
+Misst die JSON-Arbeit einer typischen Anfrage durch die Bridge mit jedem
+installierten Backend: Cache-Schlüssel, Cache-Wert schreiben und lesen,
+Provider-Antwort dekodieren, Request-Body kodieren und zwei Events für den
+Event-Store. Ausgegeben werden µs pro Operation und die pro Anfrage gegenüber
+der Standardbibliothek eingesparte CPU-Zeit.
+"""
+
+import time
+from typing import Callable, Dict, List, Tuple
+
+from . import json_codec
+
+_MESSAGES = [
+    {"role": "system", "content": "Du bist ein hilfreicher Assistent. Antworte knapp und präzise."},
+    {"role": "user", "content": "Fasse die wichtigsten Punkte des folgenden Textes zusammen: " + "Lorem ipsum dolor sit amet. " * 40},
+]
+
+_CACHE_KWARGS = {"model": "gpt-4o", "prompt": _MESSAGES[1]["content"], "temperature": 0.2, "max_tokens": 1024,
+                 "top_p": 1.0, "stop": None}
+
+_RESPONSE_TEXT = "Zusammenfassung: Die Kernaussagen sind … " + "Ein weiterer Punkt mit Details und Zahlen 42. " * 30
+
+_PROVIDER_RESPONSE = {
+    "id": "chatcmpl-abc123", "object": "chat.completion", "created": 1760000000, "model": "gpt-4o-2024-08-06",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": _RESPONSE_TEXT}, "logprobs": None,
+                 "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 412, "completion_tokens": 389, "total_tokens": 801},
+}
+
+_EVENT = {"timestamp": "2026-01-01T12:00:00.000000", "event_type": "LLM_RESPONSE_RECEIVED",
+          "conversation_id": "conv_1234567890", "target_llm": "gpt4o", "latency_ms": 812.4,
+          "response_preview": _RESPONSE_TEXT[:200], "cache_hit": False}
+
+
+def _operations() -> List[Tuple[str, int, Callable[[], object]]]:
+    """(Name, Aufrufe pro Anfrage, Operation) für das aktive Backend."""
+    cache_value = json_codec.dumpb({"response": _RESPONSE_TEXT, "created_at": 1760000000.0})
+    provider_bytes = json_codec.dumpb(_PROVIDER_RESPONSE)
+    return [
+        ("cache_key", 1, lambda: json_codec.dumps(_CACHE_KWARGS, sort_keys=True)),
+        ("cache_value_encode", 1, lambda: json_codec.dumpb({"response": _RESPONSE_TEXT, "created_at": 1760000000.0})),
+        ("cache_value_decode", 1, lambda: json_codec.loads(cache_value)),
+        ("request_body_encode", 1, lambda: json_codec.dumpb({"model": "gpt-4o", "messages": _MESSAGES})),
+        ("provider_response_decode", 1, lambda: json_codec.loads(provider_bytes)),
+        ("event_encode", 2, lambda: json_codec.dumps(_EVENT)),
+    ]
+
+
+def _time_op(operation: Callable[[], object], iterations: int) -> float:
+    """Bester von drei Durchläufen in µs pro Aufruf (robuster gegen Störungen als der Mittelwert)."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            operation()
+        best = min(best, time.perf_counter() - started)
+    return best / iterations * 1e6
+
+
+def run_benchmark(iterations: int = 20000) -> Dict[str, object]:
+    """Führt den Benchmark für alle installierten Backends aus; das aktive Backend bleibt danach unverändert."""
+    active = json_codec.BACKEND
+    results: Dict[str, Dict[str, object]] = {}
+    try:
+        for backend in json_codec.BACKENDS:
+            if json_codec.resolve_backend(backend) != backend:
+                continue
+            json_codec.use_backend(backend)
+            ops = {name: (calls, _time_op(operation, iterations)) for name, calls, operation in _operations()}
+            results[backend] = {
+                "us_per_op": {name: round(us, 2) for name, (_, us) in ops.items()},
+                "us_per_request": round(sum(calls * us for calls, us in ops.values()), 2),
+            }
+    finally:
+        json_codec.use_backend(active)
+
+    baseline = results["json"]["us_per_request"]
+    for backend, result in results.items():
+        saved = baseline - result["us_per_request"]
+        result["us_saved_per_request"] = round(saved, 2)
+        result["speedup"] = round(baseline / result["us_per_request"], 2) if result["us_per_request"] else None
+    return {"iterations": iterations, "active_backend": active, "backends": results}
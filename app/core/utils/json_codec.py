@@ -0,0 +1,138 @@
+# llm_bridge/utils/json_codec.py
+"""
+JSON-Codec für die Hot Paths der Bridge.
+
+Cache-Schlüssel und -Werte, Adapter-Anfragen und -Antworten, der Event-Store
+und das Zustands-Repository laufen über dieses Modul. Es nutzt orjson oder
+msgspec, falls installiert, sonst die Standardbibliothek. Auswahl per
+``JSON_CODEC`` (``auto``, ``orjson``, ``msgspec``, ``json``); ``auto`` nimmt
+das erste verfügbare Backend in dieser Reihenfolge.
+
+Alle Backends erzeugen dasselbe Format: kompakt, UTF-8 statt ``\\u``-Escapes,
+mit ``sort_keys=True`` sortierte Schlüssel. Für übliche Anfrage-Parameter sind
+Cache-Schlüssel damit unabhängig vom Backend; nur Exponenten sehr großer oder
+kleiner Floats (``1e+16`` vs. ``1e16``) werden unterschiedlich geschrieben,
+Replikas mit gemeinsamem Redis sollten daher dasselbe Backend nutzen. Werte, die ein
+schnelles Backend ablehnt (z.B. Integer über 64 Bit, Nicht-String-Schlüssel),
+werden mit der Standardbibliothek kodiert.
+
+Pydantic-Modelle (Zustands-Repository) werden über den nativen JSON-Pfad von
+pydantic-core kodiert; ein Umweg über ``model_dump()`` und orjson wäre langsamer.
+"""
+
+import json
+import os
+from typing import Any, Type, TypeVar, Union
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install orjson
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # Optional: pip install msgspec
+    msgspec = None
+
+JSONDecodeError = json.JSONDecodeError
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+ModelT = TypeVar("ModelT")
+
+
+def _available(name: str) -> bool:
+    return name == "json" or (name == "orjson" and orjson is not None) or (name == "msgspec" and msgspec is not None)
+
+
+def resolve_backend(requested: str = None) -> str:
+    """Backend für ``JSON_CODEC``; ein nicht installiertes Backend fällt auf die Standardbibliothek zurück."""
+    requested = (requested or os.getenv("JSON_CODEC", "auto")).lower()
+    if requested == "auto":
+        return next(name for name in BACKENDS if _available(name))
+    if requested not in BACKENDS:
+        raise ValueError(f"Unknown JSON_CODEC '{requested}' (allowed: auto, {', '.join(BACKENDS)}).")
+    if not _available(requested):
+        print(f"⚠️ [JSON] Codec '{requested}' nicht installiert; nutze die Standardbibliothek")
+        return "json"
+    return requested
+
+
+def _json_dumpb(obj: Any, sort_keys: bool = False) -> bytes:
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumpb(obj: Any, sort_keys: bool = False) -> bytes:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    except TypeError:
+        return _json_dumpb(obj, sort_keys)
+
+
+def _msgspec_dumpb(obj: Any, sort_keys: bool = False) -> bytes:
+    try:
+        return _msgspec_encoder_sorted.encode(obj) if sort_keys else _msgspec_encoder.encode(obj)
+    except (TypeError, OverflowError):
+        return _json_dumpb(obj, sort_keys)
+
+
+def _msgspec_loads(data: Union[str, bytes]) -> Any:
+    try:
+        return _msgspec_decoder.decode(data)
+    except msgspec.DecodeError as e:
+        # Aufrufer fangen json.JSONDecodeError (wie bei orjson und der Standardbibliothek)
+        raise JSONDecodeError(str(e), data if isinstance(data, str) else data.decode("utf-8", "replace"), 0) from None
+
+
+def _select(backend: str) -> None:
+    global BACKEND, _dumpb, _loads, _msgspec_encoder, _msgspec_encoder_sorted, _msgspec_decoder
+    BACKEND = backend
+    if backend == "orjson":
+        _dumpb, _loads = _orjson_dumpb, orjson.loads
+    elif backend == "msgspec":
+        _msgspec_encoder = msgspec.json.Encoder()
+        _msgspec_encoder_sorted = msgspec.json.Encoder(order="sorted")
+        _msgspec_decoder = msgspec.json.Decoder()
+        _dumpb, _loads = _msgspec_dumpb, _msgspec_loads
+    else:
+        _dumpb, _loads = _json_dumpb, _json_loads
+
+
+BACKEND = "json"
+_msgspec_encoder = _msgspec_encoder_sorted = _msgspec_decoder = None
+_select(resolve_backend())
+
+
+def use_backend(backend: str) -> str:
+    """Wechselt das Backend zur Laufzeit (z.B. für den Benchmark); gibt das aktive Backend zurück."""
+    _select(resolve_backend(backend))
+    return BACKEND
+
+
+def dumpb(obj: Any, sort_keys: bool = False) -> bytes:
+    """Kodiert ``obj`` als kompaktes UTF-8-JSON (bytes), z.B. für HTTP-Bodies und Redis."""
+    return _dumpb(obj, sort_keys)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> str:
+    """Wie ``dumpb``, als str (z.B. für Cache-Schlüssel und JSONL-Zeilen)."""
+    return _dumpb(obj, sort_keys).decode("utf-8")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Dekodiert JSON aus str oder bytes; wirft ``json.JSONDecodeError`` bei ungültiger Eingabe."""
+    return _loads(data)
+
+
+def dump_model(model: Any) -> str:
+    """Kodiert ein Pydantic-Modell über pydantic-core."""
+    return model.model_dump_json()
+
+
+def load_model(model_class: Type[ModelT], data: Union[str, bytes]) -> ModelT:
+    """Validiert JSON direkt in ein Pydantic-Modell über pydantic-core."""
+    return model_class.model_validate_json(data)
@@ -0,0 +1,42 @@
+# llm_bridge/utils/latency.py
+"""
+Latenz-Fenster für Perzentile.
+
+Hedging (Verzögerung des zweiten Requests), Scheduler (Wartezeiten pro
+Verkehrsklasse), HTTP-Pools (Zeit bis zur Zuteilung) und Retries
+(Zusatzlatenz) messen damit ihre p50/p95-Werte.
+"""
+
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """Gleitendes Fenster der letzten Latenzen mit zwischengespeichertem Perzentil."""
+
+    def __init__(self, window: int = 256, refresh_every: int = 16):
+        self._samples: deque = deque(maxlen=window)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._cached: dict = {}
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._since_refresh += 1
+        if self._since_refresh >= self._refresh_every:
+            self._cached.clear()
+            self._since_refresh = 0
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Perzentil ``p`` (0-100) der Latenzen im Fenster; None ohne Messwerte."""
+        if not self._samples:
+            return None
+        value = self._cached.get(p)
+        if value is None:
+            ordered = sorted(self._samples)
+            value = ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+            self._cached[p] = value
+        return value
@@ -0,0 +1,137 @@
+"""AdaptiveConcurrency: AIMD-Fenster, Grenzen und Freigabe der Plätze im BaseAdapter."""
+
+import httpx
+import pytest
+
+from app.core.adapters.base_adapter import BaseAdapter
+from app.core.adapters.retry import RetryManager
+from app.core.ratelimit.adaptive import AdaptiveConcurrency
+
+URL = "https://provider.test/v1/chat"
+
+
+def _window(monkeypatch, initial: int, minimum: int = 1, maximum: int = 64) -> AdaptiveConcurrency:
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_INITIAL", str(initial))
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_MIN", str(minimum))
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_MAX", str(maximum))
+    return AdaptiveConcurrency("test")
+
+
+async def _saturate(window: AdaptiveConcurrency) -> None:
+    while window.in_flight < window.limit:
+        await window.acquire()
+
+
+async def test_window_grows_additively_when_saturated(monkeypatch):
+    window = _window(monkeypatch, initial=2)
+    await _saturate(window)
+
+    for expected in (2.5, 2.9):
+        window.observe(200, {}, 0.1)
+        assert window.window == pytest.approx(expected)
+    window.observe(200, {}, 0.1)
+    # Etwa +1 pro Runde des Fensters
+    assert window.limit == 3
+
+
+async def test_window_does_not_grow_without_load(monkeypatch):
+    window = _window(monkeypatch, initial=4)
+    await window.acquire()
+
+    window.observe(200, {}, 0.1)
+
+    assert window.window == 4.0
+
+
+@pytest.mark.parametrize("status", [429, 503])
+async def test_throttling_and_server_errors_shrink_multiplicatively(monkeypatch, status):
+    window = _window(monkeypatch, initial=8)
+
+    window.observe(status, {}, 0.1)
+
+    assert window.window == 4.0
+
+
+def test_timeout_shrinks_multiplicatively(monkeypatch):
+    window = _window(monkeypatch, initial=8)
+
+    window.observe_timeout()
+
+    assert window.window == 4.0 and window.timeouts == 1
+
+
+def test_slow_response_shrinks_by_ten_percent(monkeypatch):
+    window = _window(monkeypatch, initial=10)
+    window.observe(200, {}, 0.1)
+
+    # Mehr als das Dreifache der bisherigen Latenz
+    window.observe(200, {}, 0.5)
+
+    assert window.window == pytest.approx(9.0)
+    assert window.slow == 1
+
+
+def test_window_stays_within_bounds(monkeypatch):
+    shrinking = _window(monkeypatch, initial=3, minimum=2)
+    shrinking.observe(429, {}, 0.1)
+    assert shrinking.window == 2.0 and shrinking.limit == 2
+
+    # Rate-Limit-Header unter dem Minimum deckeln ebenfalls nur bis zum Minimum
+    capped = _window(monkeypatch, initial=8, minimum=2)
+    capped.observe(200, {"x-ratelimit-remaining-requests": "0"}, 0.1)
+    assert capped.window == 2.0
+
+
+async def test_window_does_not_grow_beyond_maximum(monkeypatch):
+    window = _window(monkeypatch, initial=4, maximum=4)
+    await _saturate(window)
+
+    for _ in range(10):
+        window.observe(200, {}, 0.1)
+
+    assert window.window == 4.0
+
+
+class SSEAdapter(BaseAdapter):
+    service_name = "aimd_service"
+
+    async def send(self, prompt: str, **kwargs) -> str:
+        raise NotImplementedError
+
+
+@pytest.fixture(autouse=True)
+def no_retries(monkeypatch):
+    monkeypatch.setattr(RetryManager, "_settings", {"aimd_service": {"enabled": False}})
+    monkeypatch.setattr(RetryManager, "_stats", {})
+
+
+def _client(status: int = 200) -> httpx.AsyncClient:
+    body = b"".join(f"data: chunk {i}\n\n".encode() for i in range(5))
+    return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(status, content=body)))
+
+
+async def test_stream_closed_early_releases_its_slot():
+    adapter = SSEAdapter()
+
+    async with _client() as client:
+        events = adapter._post_sse(client, URL, json={})
+        assert await events.__anext__() == "chunk 0"
+        assert adapter.concurrency.in_flight == 1
+
+        # Client bricht nach dem ersten Chunk ab
+        await events.aclose()
+
+    assert adapter.concurrency.in_flight == 0
+
+
+async def test_post_shrinks_window_on_server_error_and_releases_slot(monkeypatch):
+    monkeypatch.setenv("ADAPTIVE_CONCURRENCY_INITIAL", "8")
+    adapter = SSEAdapter()
+
+    async with _client(503) as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await adapter._post(client, URL, json={})
+
+    assert adapter.concurrency.window == 4.0
+    assert adapter.concurrency.server_errors == 1
+    assert adapter.concurrency.in_flight == 0
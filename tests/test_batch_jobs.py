@@ -0,0 +1,102 @@
+"""BatchJobManager: Fortsetzen nach einem Absturz mitten im Schreiben von ``output.jsonl``."""
+
+import json
+
+import pytest
+
+from app.core.batch.jobs import INPUT_FILE, OUTPUT_FILE, BatchJobManager, recover_output
+from app.core.batch.store import BatchJob, FileJobStore, resolve_job_dir
+
+JOB_ID = "job_torn"
+TORN_TAIL = b'{"type": "result", "index": 4, "st'
+
+
+class FakeRouter:
+    """Merkt sich die Prompts; ``fail`` und ``timeout`` lösen die entsprechenden Fehler aus."""
+
+    def __init__(self):
+        self.active_conversations = {}
+        self.prompts = []
+
+    async def route_message(self, conversation_id: str, target_llm_name, prompt: str, **kwargs) -> str:
+        self.prompts.append(prompt)
+        if prompt == "fail":
+            raise RuntimeError("provider down")
+        if prompt == "timeout":
+            raise TimeoutError("too slow")
+        return f"answer to {prompt}"
+
+
+def _line(data: dict) -> bytes:
+    return (json.dumps(data) + "\n").encode("utf-8")
+
+
+@pytest.fixture
+def job_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("BATCH_JOB_DIR", str(tmp_path))
+    monkeypatch.setenv("BATCH_JOB_STORE", "file")
+    directory = resolve_job_dir(JOB_ID, create=True)
+    prompts = ["p0", None, "timeout", "p3", "fail", "p5"]
+    with open(directory / INPUT_FILE, "wb") as f:
+        for i, prompt in enumerate(prompts):
+            f.write(_line({"id": i, "target_llm": "a", "prompt": prompt} if prompt else {"id": i}))
+    # Index 0 (ok), 1 (ungültig) und 2 (Fehler) sind erledigt; Index 0 steht doppelt drin,
+    # Index 4 wurde beim Absturz nur halb geschrieben
+    done = [
+        {"type": "result", "index": 0, "id": "0", "status": "ok", "response": "answer to p0"},
+        {"type": "result", "index": 1, "id": "1", "status": "invalid", "error": "Field 'target_llm' is required."},
+        {"type": "result", "index": 2, "id": "2", "status": "error", "error": "too slow", "error_type": "TimeoutError"},
+        {"type": "result", "index": 0, "id": "0", "status": "ok", "response": "answer to p0"},
+    ]
+    valid = b"".join(_line(result) for result in done)
+    with open(directory / OUTPUT_FILE, "wb") as f:
+        f.write(valid + TORN_TAIL)
+    return directory, len(valid)
+
+
+def test_recover_output_truncates_torn_line_and_skips_duplicates(job_dir):
+    directory, valid_size = job_dir
+    seen = []
+
+    done = recover_output(directory / OUTPUT_FILE, seen.append)
+
+    assert done == {0, 1, 2}
+    assert [result["index"] for result in seen] == [0, 1, 2]
+    assert (directory / OUTPUT_FILE).stat().st_size == valid_size
+    # Ein zweiter Durchlauf findet nichts mehr zum Abschneiden
+    assert recover_output(directory / OUTPUT_FILE) == {0, 1, 2}
+    assert (directory / OUTPUT_FILE).stat().st_size == valid_size
+
+
+def test_recover_output_without_output_file(tmp_path):
+    assert recover_output(tmp_path / OUTPUT_FILE) == set()
+
+
+async def test_resumed_job_skips_finished_items_and_rebuilds_counters(job_dir):
+    directory, valid_size = job_dir
+    # Veralteter Checkpoint: die Ausgabe enthält mehr als der letzte gespeicherte Stand
+    stale = BatchJob(JOB_ID, total=6, concurrency=2, status="running")
+    stale.processed, stale.succeeded = 1, 1
+    await FileJobStore().save(stale)
+    router = FakeRouter()
+    manager = BatchJobManager(router)
+
+    assert await manager.resume_pending() == 1
+    await manager._tasks[JOB_ID]
+
+    # Nur die offenen Einträge gehen an den Router, auch der halb geschriebene Index 4
+    assert sorted(router.prompts) == ["fail", "p3", "p5"]
+    assert router.active_conversations == {}
+
+    job = await manager.get(JOB_ID)
+    assert job.status == "completed"
+    assert (job.processed, job.succeeded, job.invalid, job.failed) == (6, 3, 1, 2)
+    assert job.errors == {"TimeoutError": 1, "RuntimeError": 1}
+
+    with open(directory / OUTPUT_FILE, "rb") as f:
+        content = f.read()
+    assert TORN_TAIL not in content
+    results = [json.loads(line) for line in content.splitlines()]
+    assert sorted({result["index"] for result in results}) == [0, 1, 2, 3, 4, 5]
+    # Neue Ergebnisse hängen direkt hinter der letzten gültigen Zeile
+    assert json.loads(content[valid_size:].splitlines()[0])["index"] in (3, 4, 5)
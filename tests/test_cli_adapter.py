@@ -0,0 +1,36 @@
+"""CLIToolAdapter: System-Prompt und Verlauf müssen beim CLI-Tool ankommen."""
+
+import shlex
+import sys
+
+from app.core.plugins.cli_plugin import CLIToolAdapter
+
+# Gibt stdin unverändert zurück
+ECHO = f"{shlex.quote(sys.executable)} -c 'import sys; sys.stdout.write(sys.stdin.read())'"
+
+
+def _adapter() -> CLIToolAdapter:
+    return CLIToolAdapter({"name": "echo_cli", "tool_name": "echo_cli", "platform": "cli", "command": ECHO})
+
+
+async def test_cli_adapter_receives_system_text_and_history():
+    messages = [
+        {"role": "system", "content": "Du bist ein Speed Test Agent."},
+        {"role": "user", "content": "Erste Frage"},
+        {"role": "assistant", "content": "Erste Antwort"},
+        {"role": "user", "content": "Zweite Frage"},
+    ]
+
+    response = await _adapter().chat_completion(messages)
+    text = response["choices"][0]["message"]["content"]
+
+    assert text.startswith("Du bist ein Speed Test Agent.")
+    assert "User: Erste Frage" in text
+    assert "Assistant: Erste Antwort" in text
+    assert text.endswith("Zweite Frage")
+
+
+async def test_cli_adapter_passes_single_prompt_unchanged():
+    response = await _adapter().chat_completion([{"role": "user", "content": "Nur ein Prompt"}])
+
+    assert response["choices"][0]["message"]["content"] == "Nur ein Prompt"
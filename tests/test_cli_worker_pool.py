@@ -0,0 +1,68 @@
+"""CLI-Worker-Pool: abgebrochene repl-Anfragen dürfen ihre Ausgabe nicht an die nächste Anfrage weitergeben."""
+
+import asyncio
+import sys
+
+from app.core.plugins.cli_worker_pool import CLIWorkerPool
+
+END_MARKER = "<<END>>\n"
+
+# Minimale REPL: antwortet in zwei Teilen mit Pause dazwischen und schließt mit dem End-Marker
+REPL = r"""
+import sys, time
+for line in sys.stdin:
+    prompt = line.strip()
+    sys.stdout.write(f"answer to {prompt}, part 1; ")
+    sys.stdout.flush()
+    time.sleep(0.3)
+    sys.stdout.write(f"answer to {prompt}, part 2")
+    sys.stdout.write("<<END>>\n")
+    sys.stdout.flush()
+"""
+
+
+def _pool() -> CLIWorkerPool:
+    return CLIWorkerPool("repl_test", [sys.executable, "-u", "-c", REPL],
+                         {"protocol": "repl", "end_marker": END_MARKER, "request_timeout_seconds": 10})
+
+
+async def _collect(pool: CLIWorkerPool, prompt: str) -> str:
+    return "".join([chunk async for chunk in pool.stream(prompt)])
+
+
+async def test_completed_requests_reuse_the_worker():
+    pool = _pool()
+    try:
+        assert await _collect(pool, "one") == "answer to one, part 1; answer to one, part 2"
+        assert await _collect(pool, "two") == "answer to two, part 1; answer to two, part 2"
+        assert pool.spawned == 1
+    finally:
+        await pool.close()
+
+
+async def test_abandoned_stream_does_not_leak_into_next_request():
+    pool = _pool()
+    try:
+        chunks = pool.stream("first")
+        assert (await chunks.__anext__()).startswith("answer to first")
+        # Client trennt die Verbindung mitten in der Antwort
+        await chunks.aclose()
+
+        assert await _collect(pool, "second") == "answer to second, part 1; answer to second, part 2"
+        assert pool.spawned == 2
+    finally:
+        await pool.close()
+
+
+async def test_cancelled_stream_does_not_leak_into_next_request():
+    pool = _pool()
+    try:
+        # z.B. unterlegener Hedge oder asyncio.wait_for
+        task = asyncio.ensure_future(_collect(pool, "first"))
+        await asyncio.sleep(0.15)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+        assert await _collect(pool, "second") == "answer to second, part 1; answer to second, part 2"
+    finally:
+        await pool.close()
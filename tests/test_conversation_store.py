@@ -0,0 +1,65 @@
+"""ConversationStore: LRU-Obergrenze und Idle-TTL der Konversationszustände."""
+
+import time
+
+from app.core.orchestration.conversation_store import ConversationStore
+
+
+def test_oldest_conversation_is_evicted_at_capacity():
+    store = ConversationStore(max_entries=3, idle_ttl_seconds=0)
+    for conversation_id in ("a", "b", "c", "d"):
+        store.get_or_create(conversation_id)
+
+    assert list(store) == ["b", "c", "d"]
+    assert "a" not in store
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_touched_conversation_survives_eviction():
+    store = ConversationStore(max_entries=3, idle_ttl_seconds=0)
+    first = store.get_or_create("a")
+    store.get_or_create("b")
+    store.get_or_create("c")
+
+    # Zugriff schiebt 'a' ans Ende; verdrängt wird jetzt 'b'
+    assert store.get("a") is first
+    store.get_or_create("d")
+
+    assert list(store) == ["c", "a", "d"]
+    assert store.get_or_create("a") is first
+
+
+def test_idle_conversations_expire():
+    store = ConversationStore(max_entries=100, idle_ttl_seconds=0.05)
+    store.get_or_create("idle")
+    time.sleep(0.1)
+
+    assert store.get("idle") is None
+    assert len(store) == 0
+    assert store.get_stats()["expirations"] == 1
+
+
+def test_expired_entries_are_dropped_when_new_conversations_arrive():
+    store = ConversationStore(max_entries=100, idle_ttl_seconds=0.05)
+    store.get_or_create("old_1")
+    store.get_or_create("old_2")
+    time.sleep(0.1)
+
+    store.get_or_create("new")
+
+    assert list(store) == ["new"]
+    assert store.get_stats()["expirations"] == 2
+    assert store.get_stats()["evictions"] == 0
+
+
+def test_touched_conversation_outlives_idle_ttl():
+    store = ConversationStore(max_entries=100, idle_ttl_seconds=0.2)
+    active = store.get_or_create("active")
+    store.get_or_create("idle")
+
+    for _ in range(3):
+        time.sleep(0.1)
+        assert store.get("active") is active
+
+    assert "idle" not in store
+    assert store.get("active") is active
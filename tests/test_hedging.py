@@ -0,0 +1,56 @@
+"""Hedger: Latenz der primären Route bei gewonnenem Hedge und abgebrochene Verlierer."""
+
+import asyncio
+import gc
+
+from app.core.routing.hedging import Hedger, HedgePolicy
+
+
+def _hedger() -> Hedger:
+    return Hedger(HedgePolicy(target=None, via="openrouter_gateway", percentile=95.0, budget=1.0,
+                              min_samples=20, initial_delay_ms=20))
+
+
+async def test_hedge_win_records_primary_lower_bound():
+    hedger = _hedger()
+
+    async def slow_primary():
+        await asyncio.sleep(1)
+        return "primary"
+
+    async def fast_hedge():
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    assert await hedger.run(slow_primary, fast_hedge) == "hedge"
+    assert hedger.hedge_wins == 1
+    assert len(hedger.latency) == 1
+    # Die primäre Route lief mindestens bis zur Antwort des Hedges
+    assert hedger.latency.percentile(100) >= 0.05
+
+
+async def test_cancelled_loser_exception_is_retrieved():
+    hedger = _hedger()
+    unretrieved = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda _, context: unretrieved.append(context))
+
+    async def primary_failing_on_cancel():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            # z.B. ein Adapter, der beim Abbruch selbst einen Fehler wirft
+            raise RuntimeError("cleanup failed")
+        return "primary"
+
+    async def fast_hedge():
+        await asyncio.sleep(0.05)
+        return "hedge"
+
+    try:
+        assert await hedger.run(primary_failing_on_cancel, fast_hedge) == "hedge"
+        await asyncio.sleep(0.01)
+        gc.collect()
+        assert unretrieved == []
+    finally:
+        loop.set_exception_handler(None)
@@ -0,0 +1,149 @@
+"""HTTP-Client-Pools pro Dienst gegen einen lokalen Stand-in-Server."""
+
+import asyncio
+
+import pytest
+
+from app.core.adapters.base_adapter import BaseAdapter
+from app.core.exceptions import RateLimitExceeded
+from app.core.utils.http_client import HTTPClientManager
+
+
+class StandInServer:
+    """Minimaler HTTP/1.1-Server mit Keep-Alive; ``/slow`` antwortet erst nach ``release``."""
+
+    def __init__(self):
+        self.connections = 0
+        self.release = asyncio.Event()
+        self._server = None
+
+    async def __aenter__(self) -> "StandInServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.release.set()
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = dict(line.split(": ", 1) for line in header_lines if ": " in line)
+                length = int(headers.get("content-length", headers.get("Content-Length", "0")))
+                if length:
+                    await reader.readexactly(length)
+                if path.startswith("/slow"):
+                    await self.release.wait()
+                elif method == "HEAD":
+                    # Kurz halten, damit parallele Pre-Warm-Anfragen eigene Verbindungen öffnen
+                    await asyncio.sleep(0.05)
+                body = b"" if method == "HEAD" else b"ok"
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n" + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+
+class StandInAdapter(BaseAdapter):
+    service_name = "slow_service"
+
+    async def send(self, prompt: str, **kwargs) -> str:
+        raise NotImplementedError
+
+
+@pytest.fixture
+async def server():
+    async with StandInServer() as stand_in:
+        try:
+            yield stand_in
+        finally:
+            # Erst die Clients schließen: der Server wartet beim Beenden auf offene Keep-Alive-Verbindungen
+            await HTTPClientManager.close_client()
+            HTTPClientManager.configure({})
+
+
+async def _wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "Bedingung nicht erreicht"
+        await asyncio.sleep(0.01)
+
+
+async def test_saturated_pool_does_not_delay_other_service(server):
+    HTTPClientManager.configure({"slow_service": {"max_connections": 1}, "fast_service": {}})
+    slow_client = await HTTPClientManager.get_client("slow_service")
+    fast_client = await HTTPClientManager.get_client("fast_service")
+    stats = HTTPClientManager._stats["slow_service"]
+
+    held = [asyncio.ensure_future(slow_client.get(f"{server.url}/slow")) for _ in range(2)]
+    await _wait_until(lambda: stats.in_flight == 1 and stats.waiters == 1)
+
+    response = await asyncio.wait_for(fast_client.get(f"{server.url}/fast"), timeout=1.0)
+    assert response.text == "ok"
+    assert HTTPClientManager._stats["fast_service"].waiters == 0
+
+    server.release.set()
+    assert [r.status_code for r in await asyncio.gather(*held)] == [200, 200]
+
+
+async def test_pool_timeout_surfaces_as_back_pressure(server):
+    HTTPClientManager.configure({"slow_service": {"max_connections": 1, "pool_timeout": 0.1}})
+    client = await HTTPClientManager.get_client("slow_service")
+    adapter = StandInAdapter()
+
+    held = asyncio.ensure_future(client.get(f"{server.url}/slow"))
+    await _wait_until(lambda: HTTPClientManager._stats["slow_service"].in_flight == 1)
+
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await adapter._post(client, f"{server.url}/chat", json={"prompt": "hi"})
+    assert exc_info.value.service == "slow_service"
+
+    pool = HTTPClientManager.get_client_info()["clients"]["slow_service"]["pool"]
+    assert pool["pool_timeouts"] == 1
+    # Lokale Drosselung: das AIMD-Fenster bleibt unverändert
+    assert adapter.concurrency.timeouts == 0
+
+    server.release.set()
+    await held
+
+
+async def test_waiter_and_acquire_metrics_move_under_saturation(server):
+    HTTPClientManager.configure({"slow_service": {"max_connections": 1}})
+    client = await HTTPClientManager.get_client("slow_service")
+    stats = HTTPClientManager._stats["slow_service"]
+
+    first = asyncio.ensure_future(client.get(f"{server.url}/slow"))
+    await _wait_until(lambda: stats.in_flight == 1)
+    second = asyncio.ensure_future(client.get(f"{server.url}/slow"))
+    await _wait_until(lambda: stats.waiters == 1)
+    await asyncio.sleep(0.2)
+    server.release.set()
+    await asyncio.gather(first, second)
+
+    pool = stats.to_dict()
+    assert pool["acquired"] == 2
+    assert pool["max_waiters"] == 1
+    assert pool["waiters"] == 0 and pool["in_flight"] == 0
+    # Die zweite Anfrage wartete auf den einzigen Platz
+    assert pool["p95_acquire_ms"] >= 150
+
+
+async def test_prewarm_opens_configured_connections(server):
+    HTTPClientManager.configure({"warm_service": {"prewarm_connections": 3}})
+
+    results = await HTTPClientManager.prewarm({"warm_service": [server.url]}, timeout=2.0)
+
+    assert results == {"warm_service": {server.url: 3}}
+    assert server.connections == 3
@@ -0,0 +1,128 @@
+"""RateLimiter: Auffüllen der RPM/TPM-Buckets, zu große Anfragen, FIFO und Redis-Backend."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.core.exceptions import RateLimitExceeded
+from app.core.ratelimit.limiter import LocalBucketStore, RateLimiter, RateLimitPolicy, take
+from app.core.ratelimit.redis_store import RedisBucketStore
+
+SERVICE = "limited_service"
+
+
+def _limiter(**policy) -> RateLimiter:
+    return RateLimiter({SERVICE: {"max_wait_seconds": 2.0, **policy}})
+
+
+def test_buckets_refill_continuously():
+    policy = RateLimitPolicy(requests_per_minute=60, tokens_per_minute=600, max_wait_seconds=30.0)
+    state = [0.0, 0.0, 100.0]
+
+    # 1 Anfrage/s und 10 Tokens/s: nach 0,5 s fehlt noch eine halbe Anfrage
+    assert take(state, policy, cost=5, now=100.5) == pytest.approx(0.5)
+    assert take(state, policy, cost=5, now=101.0) == 0.0
+    assert state[0] == pytest.approx(0.0) and state[1] == pytest.approx(5.0)
+    # Tokens bestimmen die Wartezeit, wenn sie knapper sind als Anfragen
+    assert take(state, policy, cost=50, now=103.0) == pytest.approx(2.5)
+    # Höchstens bis zur Kapazität auffüllen
+    take(state, policy, cost=1, now=1000.0)
+    assert state[0] == pytest.approx(59.0) and state[1] == pytest.approx(599.0)
+
+
+async def test_acquire_waits_for_refill():
+    limiter = _limiter(requests_per_minute=600)
+    for _ in range(600):
+        assert await limiter.acquire(SERVICE, "hi") < 0.01
+
+    waited = await limiter.acquire(SERVICE, "hi")
+
+    # 10 Anfragen/s: der nächste Platz ist nach etwa 0,1 s frei
+    assert 0.05 <= waited < 0.5
+    assert limiter.get_stats()["services"][SERVICE]["delayed"] == 1
+
+
+async def test_acquire_rejects_when_wait_exceeds_deadline():
+    limiter = _limiter(requests_per_minute=2, max_wait_seconds=0.1)
+    await limiter.acquire(SERVICE, "hi")
+    await limiter.acquire(SERVICE, "hi")
+
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await limiter.acquire(SERVICE, "hi")
+    assert exc_info.value.retry_after == pytest.approx(30.0, rel=0.05)
+    assert limiter.get_stats()["services"][SERVICE]["timeouts"] == 1
+
+
+async def test_request_larger_than_tpm_capacity_is_rejected_immediately():
+    limiter = _limiter(tokens_per_minute=1000)
+
+    started = time.monotonic()
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        # ~2000 Tokens Prompt: passt auch in einen vollen Bucket nie hinein
+        await limiter.acquire(SERVICE, "x" * 8000)
+    assert time.monotonic() - started < 0.1
+    assert exc_info.value.service == SERVICE
+
+    stats = limiter.get_stats()["services"][SERVICE]
+    assert stats["oversized"] == 1
+    assert stats["available"]["tokens"] == 1000
+    # Genau die Kapazität passt
+    assert await limiter.acquire(SERVICE, "x" * 4000) < 0.01
+
+
+async def test_waiters_are_served_in_arrival_order():
+    limiter = _limiter(tokens_per_minute=6000)
+    # Bucket leeren: 6000 Tokens bei 100 Tokens/s
+    await limiter.acquire(SERVICE, "x" * 24000)
+    order = []
+
+    async def request(name: str, prompt: str) -> None:
+        await limiter.acquire(SERVICE, prompt)
+        order.append(name)
+
+    # Die große Anfrage kommt zuerst; die kleinen dürfen sie nicht überholen
+    big = asyncio.ensure_future(request("big", "x" * 80))
+    await asyncio.sleep(0)
+    small = [asyncio.ensure_future(request(f"small{i}", "x")) for i in range(3)]
+    await asyncio.gather(big, *small)
+
+    assert order == ["big", "small0", "small1", "small2"]
+
+
+class _FailingRedis:
+    def register_script(self, script: str):
+        raise ConnectionError("redis down")
+
+
+async def test_redis_store_falls_back_to_local_buckets():
+    fallback = LocalBucketStore()
+    store = RedisBucketStore(_FailingRedis(), fallback=fallback)
+    policy = RateLimitPolicy(requests_per_minute=2, tokens_per_minute=None, max_wait_seconds=1.0)
+
+    assert await store.reserve(SERVICE, policy, 1) == 0.0
+    assert await store.reserve(SERVICE, policy, 1) == 0.0
+    assert await store.reserve(SERVICE, policy, 1) > 0
+    assert store.errors == 3
+
+
+async def test_redis_buckets_are_shared_between_replicas(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    monkeypatch.setenv("PROVIDER_RATE_LIMIT_BACKEND", "redis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    config = {SERVICE: {"requests_per_minute": 60, "tokens_per_minute": 600, "max_wait_seconds": 0.1}}
+    replicas = [RateLimiter(config, redis_client=client), RateLimiter(config, redis_client=client)]
+    assert all(limiter.store.name == "redis" for limiter in replicas)
+
+    # 60 Anfragen pro Minute insgesamt, egal über welche Replika
+    for i in range(60):
+        await replicas[i % 2].acquire(SERVICE, "hi")
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        await replicas[0].acquire(SERVICE, "hi")
+    assert 0 < exc_info.value.retry_after <= 1.0
+
+    # Auffüllen mit der Uhr des Redis-Servers: nach ~1 s ist wieder eine Anfrage frei
+    await asyncio.sleep(1.05)
+    assert await replicas[1].acquire(SERVICE, "hi") < 0.01
+    assert replicas[0].store.errors == 0 and replicas[1].store.errors == 0
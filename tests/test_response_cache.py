@@ -0,0 +1,127 @@
+"""ResponseCache: Größengrenzen für L1 und Redis, Tag-Index und Invalidierung."""
+
+import time
+
+import pytest
+
+from app.core.caching.compression import CacheValueCodec
+from app.core.caching.local_cache import LocalResponseCache
+from app.core.caching.response_cache import ResponseCache
+from app.core.caching.similarity import SimilarityIndex
+
+
+class FakeRedis:
+    """In-Memory-Ersatz für die genutzten Befehle eines ``redis.asyncio``-Clients."""
+
+    def __init__(self):
+        self.values = {}
+
+    async def ping(self) -> bool:
+        return True
+
+    async def get(self, key: str):
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str, ex=None) -> bool:
+        self.values[key] = value
+        return True
+
+
+@pytest.fixture
+async def cache():
+    response_cache = ResponseCache(client=FakeRedis(), local=LocalResponseCache(max_bytes=1024 * 1024),
+                                   similarity=SimilarityIndex(), codec=CacheValueCodec(max_entry_bytes=1000))
+    assert await response_cache.prober.probe_once()
+    yield response_cache
+    await response_cache.close()
+
+
+def test_max_size_counts_utf8_bytes():
+    codec = CacheValueCodec(max_entry_bytes=1000)
+
+    assert not codec.exceeds_max_size("a" * 600)
+    # 600 Zeichen, aber 1200 bzw. 1800 Bytes
+    assert codec.exceeds_max_size("ä" * 600)
+    assert codec.exceeds_max_size("日本語" * 200)
+    assert codec.skipped_too_large == 2
+
+
+async def test_oversized_multibyte_value_skips_both_tiers(cache):
+    await cache.set("llm_response:cjk", "日本語" * 200, ttl_seconds=60)
+
+    assert cache.local.get("llm_response:cjk") is None
+    assert cache._client.values == {}
+    assert cache.codec.skipped_too_large == 1
+
+
+async def test_value_rejected_by_encoder_is_not_kept_in_l1(cache):
+    # 999 Bytes passieren die Vorprüfung, als JSON (mit Anführungszeichen) sind es 1001
+    await cache.set("llm_response:edge", "a" * 999, ttl_seconds=60)
+
+    assert cache.local.get("llm_response:edge") is None
+    assert cache._client.values == {}
+
+
+async def test_value_within_limit_is_stored_in_both_tiers(cache):
+    await cache.set("llm_response:ok", "Grüße " * 10, ttl_seconds=60)
+
+    assert cache.local.get("llm_response:ok") == "Grüße " * 10
+    assert "llm_response:ok" in cache._client.values
+
+
+@pytest.fixture
+async def tagged_cache():
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    response_cache = ResponseCache(client=client, local=LocalResponseCache(max_bytes=1024 * 1024),
+                                   similarity=SimilarityIndex())
+    assert await response_cache.prober.probe_once()
+    yield response_cache
+    await response_cache.close()
+    await client.aclose()
+
+
+async def test_invalidate_tags_deletes_only_tagged_keys(tagged_cache):
+    cache, client = tagged_cache, tagged_cache._client
+    await cache.set("llm_response:a1", "A1", 60, tags=ResponseCache.make_tags("a", "svc_x"))
+    await cache.set("llm_response:a2", "A2", 60, tags=ResponseCache.make_tags("a"))
+    await cache.set("llm_response:b1", "B1", 60, tags=ResponseCache.make_tags("b", "svc_x"))
+    await cache.set("llm_response:plain", "P", 60)
+    assert await cache.find_tags("model:") == ["model:a", "model:b"]
+
+    result = await cache.invalidate_tags(["model:a"])
+
+    assert result == {"deleted": 2, "tags": {"model:a": 2}}
+    assert await client.exists("llm_response:a1", "llm_response:a2") == 0
+    assert await client.exists("llm_response:b1", "llm_response:plain") == 2
+    assert cache.local.get("llm_response:a1") is None and cache.local.get("llm_response:a2") is None
+    assert cache.local.get("llm_response:b1") == "B1"
+    assert await client.zcard("llm_response_tag:model:a") == 0
+    # Andere Tags des gelöschten Eintrags verweisen noch auf ihn; das Löschen ist idempotent
+    assert (await cache.invalidate_tags(["adapter:svc_x"]))["deleted"] == 1
+    assert await client.exists("llm_response:b1") == 0
+
+
+async def test_invalidate_tags_deletes_in_batches(tagged_cache):
+    cache, client = tagged_cache, tagged_cache._client
+    for i in range(7):
+        await cache.set(f"llm_response:c{i}", f"C{i}", 60, tags=ResponseCache.make_tags("c"))
+
+    result = await cache.invalidate_tags(["model:c"], batch_size=2)
+
+    assert result["deleted"] == 7
+    assert await client.dbsize() == 0
+
+
+async def test_writes_prune_expired_tag_index_entries(tagged_cache):
+    cache, client = tagged_cache, tagged_cache._client
+    tag_key = "llm_response_tag:model:a"
+    # Eintrag, dessen Wert in Redis längst per TTL verschwunden ist
+    await client.zadd(tag_key, {"llm_response:expired": 1.0})
+
+    await cache.set("llm_response:fresh", "F", 60, tags=ResponseCache.make_tags("a"))
+
+    members = await client.zrange(tag_key, 0, -1, withscores=True)
+    assert [member for member, _ in members] == ["llm_response:fresh"]
+    # Score ist der Ablaufzeitpunkt des Eintrags
+    assert members[0][1] > time.time() + 50
@@ -0,0 +1,122 @@
+"""RetryManager: globales Budget, Retry-After-Obergrenze und nicht wiederholbare 4xx."""
+
+import time
+
+import httpx
+import pytest
+
+from app.core.adapters.base_adapter import BaseAdapter
+from app.core.adapters.retry import RetryBudget, RetryManager
+
+SERVICE = "retry_service"
+URL = "https://provider.test/v1/chat"
+
+
+class RetryAdapter(BaseAdapter):
+    service_name = SERVICE
+
+    async def send(self, prompt: str, **kwargs) -> str:
+        raise NotImplementedError
+
+
+class Provider:
+    """Antwortet der Reihe nach mit den vorgegebenen (Status, Header); danach 200."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.responses:
+            status, headers = self.responses.pop(0)
+            return httpx.Response(status, headers=headers)
+        return httpx.Response(200, json={"ok": True})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+
+@pytest.fixture(autouse=True)
+def retry_manager(monkeypatch):
+    # Budget und Zähler sind prozessweit; jeder Test bekommt eigene
+    monkeypatch.setattr(RetryManager, "_settings", {})
+    monkeypatch.setattr(RetryManager, "_stats", {})
+    monkeypatch.setattr(RetryManager, "budget", RetryBudget(0.1))
+    RetryManager.configure({SERVICE: {"max_attempts": 3, "base_delay_ms": 1, "max_delay_ms": 5}})
+
+
+def _stats() -> dict:
+    return RetryManager.get_stats()["services"][SERVICE]
+
+
+async def test_transient_error_is_retried_until_success():
+    provider = Provider((503, {}), (502, {}))
+
+    async with provider.client() as client:
+        response = await RetryAdapter()._post(client, URL, json={})
+
+    assert response.status_code == 200
+    assert provider.calls == 3
+    assert _stats()["retries"] == 2 and _stats()["recovered"] == 1
+
+
+async def test_no_retries_once_budget_is_spent(monkeypatch):
+    # Ein einziger Credit, der bei 1% pro Anfrage nicht nachwächst
+    monkeypatch.setattr(RetryManager, "budget", RetryBudget(0.01))
+    provider = Provider(*[(503, {})] * 10)
+
+    async with provider.client() as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await RetryAdapter()._post(client, URL, json={})
+        assert provider.calls == 2
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await RetryAdapter()._post(client, URL, json={})
+        assert provider.calls == 3
+
+    assert _stats()["retries"] == 1
+    assert _stats()["budget_denied"] == 2
+    assert RetryManager.budget.credits < 1.0
+
+
+async def test_retry_after_is_honoured_as_lower_bound():
+    provider = Provider((429, {"retry-after": "0.2"}))
+
+    started = time.perf_counter()
+    async with provider.client() as client:
+        response = await RetryAdapter()._post(client, URL, json={})
+
+    assert response.status_code == 200
+    assert time.perf_counter() - started >= 0.2
+    assert _stats()["retry_after_honoured"] == 1
+
+
+async def test_retry_after_above_cap_is_not_waited_for():
+    RetryManager.configure({SERVICE: {"base_delay_ms": 1, "max_retry_after_seconds": 5.0}})
+    provider = Provider((429, {"retry-after": "60"}))
+
+    started = time.perf_counter()
+    async with provider.client() as client:
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            await RetryAdapter()._post(client, URL, json={})
+
+    assert exc_info.value.response.status_code == 429
+    assert time.perf_counter() - started < 1.0
+    assert provider.calls == 1
+    assert _stats()["retry_after_too_long"] == 1 and _stats()["retries"] == 0
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 422])
+async def test_non_transient_4xx_is_not_retried(status):
+    provider = Provider((status, {}))
+
+    async with provider.client() as client:
+        with pytest.raises(httpx.HTTPStatusError):
+            await RetryAdapter()._post(client, URL, json={})
+
+    assert provider.calls == 1
+    assert _stats()["retries"] == 0
+    # Nicht wiederholbar: zählt weder als erschöpft noch gegen das Budget
+    assert _stats()["exhausted"] == 0
+    assert RetryManager.budget.credits == RetryManager.budget.max_credits
@@ -0,0 +1,129 @@
+"""PriorityScheduler: gewichtete faire Zuteilung, Limits pro Klasse und abgebrochene Wartende."""
+
+import asyncio
+
+import pytest
+
+from app.core.routing.scheduler import PriorityScheduler
+
+
+def _scheduler(max_concurrency: int = 4, **limits) -> PriorityScheduler:
+    return PriorityScheduler(max_concurrency=max_concurrency,
+                             limits={"interactive": 4, "mission": 4, "workflow": 4, "batch": 4, **limits})
+
+
+def _queue(scheduler: PriorityScheduler, traffic_class: str, order: list) -> asyncio.Future:
+    task = asyncio.ensure_future(scheduler.acquire(traffic_class))
+    task.add_done_callback(lambda t: t.cancelled() or order.append(traffic_class))
+    return task
+
+
+async def _settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _class(scheduler: PriorityScheduler, name: str) -> dict:
+    return scheduler.get_stats()["classes"][name]
+
+
+async def test_interactive_is_not_starved_behind_batch_backlog():
+    scheduler = _scheduler()
+    order = []
+    for _ in range(4):
+        await scheduler.acquire("batch")
+    backlog = [_queue(scheduler, "batch", order) for _ in range(20)]
+    await _settle()
+    chats = [_queue(scheduler, "interactive", order) for _ in range(2)]
+    await _settle()
+    assert order == []
+
+    # Die ersten frei werdenden Plätze gehen an die Chat-Nachrichten, nicht an den älteren Batch-Rückstau
+    for _ in range(2):
+        scheduler.release("batch")
+        await _settle()
+    assert order == ["interactive", "interactive"]
+    assert _class(scheduler, "batch")["queued"] == 20
+
+    for task in backlog + chats:
+        task.cancel()
+    await asyncio.gather(*backlog, *chats, return_exceptions=True)
+
+
+async def test_weights_share_freed_slots_under_load():
+    scheduler = _scheduler(max_concurrency=1)
+    order = []
+    await scheduler.acquire("batch")
+    holder = "batch"
+    waiting = [_queue(scheduler, name, order) for name in ["batch"] * 30 + ["interactive"] * 30]
+    await _settle()
+
+    for _ in range(18):
+        # Der jeweilige Inhaber gibt seinen Platz sofort wieder frei
+        scheduler.release(holder)
+        await _settle()
+        holder = order[-1]
+    # Gewichte 8:1: 'interactive' bekommt fast alle Plätze, 'batch' verhungert aber nicht
+    assert order.count("interactive") >= 16
+    assert order.count("batch") >= 1
+
+    for task in waiting:
+        task.cancel()
+    await asyncio.gather(*waiting, return_exceptions=True)
+
+
+async def test_class_limit_is_enforced_while_total_has_room():
+    scheduler = _scheduler(max_concurrency=10, batch=2)
+    order = []
+    batches = [_queue(scheduler, "batch", order) for _ in range(5)]
+    await _settle()
+
+    assert _class(scheduler, "batch")["active"] == 2
+    assert _class(scheduler, "batch")["queued"] == 3
+    # Andere Klassen bekommen die übrigen Plätze sofort
+    await asyncio.wait_for(scheduler.acquire("interactive"), timeout=1.0)
+    assert scheduler.active == 3
+
+    scheduler.release("batch")
+    await _settle()
+    assert _class(scheduler, "batch")["active"] == 2
+    assert _class(scheduler, "batch")["queued"] == 2
+
+    for task in batches:
+        task.cancel()
+    await asyncio.gather(*batches, return_exceptions=True)
+
+
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    scheduler = _scheduler(max_concurrency=1)
+    await scheduler.acquire("interactive")
+    order = []
+    cancelled = _queue(scheduler, "interactive", order)
+    await _settle()
+
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert _class(scheduler, "interactive")["queued"] == 0
+
+    scheduler.release("interactive")
+    assert scheduler.active == 0
+    await asyncio.wait_for(scheduler.acquire("batch"), timeout=1.0)
+    assert scheduler.active == 1
+
+
+async def test_waiter_cancelled_after_grant_releases_its_slot():
+    scheduler = _scheduler(max_concurrency=1)
+    await scheduler.acquire("interactive")
+    waiter = asyncio.ensure_future(scheduler.acquire("interactive"))
+    await _settle()
+
+    # Platz wird übergeben, der Wartende aber abgebrochen, bevor er weiterläuft
+    scheduler.release("interactive")
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.active == 0
+    assert _class(scheduler, "interactive")["active"] == 0
+    await asyncio.wait_for(scheduler.acquire("batch"), timeout=1.0)
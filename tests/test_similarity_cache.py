@@ -0,0 +1,54 @@
+"""Ähnlichkeits-Cache: nahezu gleiche Prompts mit anderem Fakt dürfen keinen Treffer liefern."""
+
+from app.core.caching.similarity import SimilarityIndex, SimilaritySettings
+
+SCOPE = "gpt4o_via_or|{}"
+
+# ~230 Wörter, damit ein einzelnes geändertes Wort die MinHash-Schätzung kaum bewegt
+FILLER = " ".join(
+    f"Abschnitt {i} beschreibt Aspekt {i * 7} der Analyse mit Kennzahl {i * 13} und Quelle {i * 3}."
+    for i in range(25)
+)
+
+
+def _prompt(city: str) -> str:
+    return f"Fasse die folgenden Punkte zusammen. {FILLER} Wie viele Einwohner hat {city} laut der letzten Zählung?"
+
+
+def _settings(**config) -> SimilaritySettings:
+    return SimilaritySettings.from_config({"enabled": True, "threshold": 0.95, **config})
+
+
+def test_near_duplicate_with_different_fact_is_not_served():
+    index = SimilarityIndex()
+    settings = _settings()
+    berlin, paris = _prompt("Berlin"), _prompt("Paris")
+    assert len(berlin.split()) > 200
+    # Die Schätzung allein würde den Berlin-Eintrag für die Paris-Frage liefern
+    estimate = index.hasher.similarity(index.hasher.signature(berlin), index.hasher.signature(paris))
+    assert estimate >= settings.threshold
+
+    index.add(SCOPE, berlin, "key_berlin", settings, ttl_seconds=60)
+
+    assert index.lookup(SCOPE, paris, settings) is None
+    assert index.get_stats()["token_diff_rejected"] == 1
+
+
+def test_case_and_punctuation_variants_still_hit():
+    index = SimilarityIndex()
+    settings = _settings()
+    index.add(SCOPE, _prompt("Berlin"), "key_berlin", settings, ttl_seconds=60)
+
+    variant = _prompt("Berlin").replace("Fasse", "fasse").replace("Zählung?", "Zählung")
+
+    key, score = index.lookup(SCOPE, variant, settings)
+    assert key == "key_berlin"
+    assert score >= settings.threshold
+
+
+def test_max_token_diff_allows_configured_differences():
+    index = SimilarityIndex()
+    settings = _settings(max_token_diff=1)
+    index.add(SCOPE, _prompt("Berlin"), "key_berlin", settings, ttl_seconds=60)
+
+    assert index.lookup(SCOPE, _prompt("Paris"), settings)[0] == "key_berlin"
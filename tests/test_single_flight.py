@@ -0,0 +1,82 @@
+"""SingleFlight: identische gleichzeitige Anfragen teilen sich einen Upstream-Call."""
+
+import asyncio
+
+import pytest
+
+from app.core.routing.single_flight import SingleFlight
+
+
+class Upstream:
+    """Zählt Aufrufe und antwortet erst nach ``release``."""
+
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return "answer"
+
+
+async def test_concurrent_identical_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    upstream = Upstream()
+
+    callers = [asyncio.ensure_future(flight.run("key", upstream)) for _ in range(10)]
+    await asyncio.sleep(0)
+    assert "key" in flight
+    upstream.release.set()
+
+    assert await asyncio.gather(*callers) == ["answer"] * 10
+    assert upstream.calls == 1
+    assert flight.get_stats() == {"in_flight": 0, "leaders": 1, "coalesced": 9}
+
+
+async def test_exception_reaches_every_waiter():
+    flight = SingleFlight()
+    upstream = Upstream(error=RuntimeError("provider down"))
+
+    callers = [asyncio.ensure_future(flight.run("key", upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+    upstream.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert [type(result) for result in results] == [RuntimeError] * 3
+    assert all(str(result) == "provider down" for result in results)
+    assert upstream.calls == 1
+    # Nach dem Fehler startet die nächste Anfrage einen neuen Call
+    assert "key" not in flight
+
+
+@pytest.mark.parametrize("cancelled_index", [0, 1])
+async def test_cancelling_one_waiter_does_not_cancel_the_shared_call(cancelled_index):
+    flight = SingleFlight()
+    upstream = Upstream()
+
+    callers = [asyncio.ensure_future(flight.run("key", upstream)) for _ in range(3)]
+    await asyncio.sleep(0)
+    # Leader (Index 0) oder Follower trennt die Verbindung
+    callers[cancelled_index].cancel()
+    await asyncio.sleep(0)
+    assert "key" in flight
+
+    upstream.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert isinstance(results[cancelled_index], asyncio.CancelledError)
+    assert [r for i, r in enumerate(results) if i != cancelled_index] == ["answer", "answer"]
+    assert upstream.calls == 1
+
+
+async def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    upstream = Upstream()
+    upstream.release.set()
+
+    assert await asyncio.gather(flight.run("a", upstream), flight.run("b", upstream)) == ["answer", "answer"]
+    assert upstream.calls == 2